@@ -0,0 +1,261 @@
+"""Sparse entity co-occurrence statistics.
+
+Entity mentions are held as a sparse entity x note incidence matrix in
+CSR form (numpy only). Co-occurrence counts are the upper triangle of
+its product with its transpose, stored as sorted pair keys with counts,
+and scored with (normalized) pointwise mutual information so that pairs
+of ubiquitous entities do not outrank genuinely associated ones. Rows of
+the incidence matrix double as an inverted index from entities to notes.
+
+The shared index follows the entity store: when notes change, only the
+pairs of the changed notes are subtracted and re-added.
+"""
+
+import math
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from . import knowledge_graph
+
+logger = logging.getLogger(__name__)
+
+# Pair keys pack two entity positions into one int64
+PAIR_SHIFT = 32
+
+# Rebuild from scratch when more than this share of notes changed
+REBUILD_RATIO = 0.25
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def _pair_keys(note_rows: np.ndarray, members: np.ndarray) -> np.ndarray:
+    """
+    Keys of all entity pairs within each note.
+
+    Postings must be sorted by note, then entity, so each pair comes out
+    once with the smaller entity position first.
+    """
+    keys = []
+    positions = np.arange(len(note_rows) - 1)
+    k = 1
+    while len(positions):
+        same = note_rows[positions] == note_rows[positions + k]
+        positions = positions[same]
+        if len(positions):
+            keys.append((members[positions] << PAIR_SHIFT) | members[positions + k])
+        k += 1
+        positions = positions[positions + k < len(note_rows)]
+    return np.concatenate(keys) if keys else _EMPTY
+
+
+def _postings(note_members: Iterable[Tuple[int, ...]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(note row, entity position) postings, sorted by row then entity."""
+    sizes = []
+    flat = []
+    for members in note_members:
+        sizes.append(len(members))
+        flat.extend(members)
+    rows = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+    return rows, np.asarray(flat, dtype=np.int64)
+
+
+class CoOccurrenceIndex:
+    """
+    Entity co-occurrence counts over notes, with PMI scoring.
+
+    Entity and note positions are assigned on first sight and never reused.
+    """
+
+    def __init__(self):
+        self.entity_ids: List[str] = []
+        self.entity_positions: Dict[str, int] = {}
+        self.note_keys: List[str] = []
+        self.note_positions: Dict[str, int] = {}
+        # Sorted entity positions per note (the last synced state)
+        self.note_members: Dict[str, Tuple[int, ...]] = {}
+
+        # Sorted pair keys and their co-occurrence counts
+        self.pair_keys = _EMPTY
+        self.pair_counts = _EMPTY
+
+        # Entity x note incidence (CSR) and notes per entity
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = _EMPTY
+        self.note_counts = _EMPTY
+
+    def _position(self, entity_id: str) -> int:
+        position = self.entity_positions.get(entity_id)
+        if position is None:
+            position = len(self.entity_ids)
+            self.entity_positions[entity_id] = position
+            self.entity_ids.append(entity_id)
+        return position
+
+    def _members(self, entity_ids: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(sorted({self._position(eid) for eid in entity_ids}))
+
+    @property
+    def total_notes(self) -> int:
+        return len(self.note_members)
+
+    def sync(self, note_entities: Dict[str, List[str]]) -> bool:
+        """
+        Bring the index up to date with a note -> entity IDs mapping.
+
+        Returns:
+            True if anything changed
+        """
+        current = {key: self._members(ids) for key, ids in note_entities.items()}
+        changed = {key: members for key, members in current.items() if self.note_members.get(key) != members}
+        removed = [key for key in self.note_members if key not in note_entities]
+        if not changed and not removed:
+            return False
+
+        if not self.note_members or len(changed) + len(removed) > REBUILD_RATIO * max(len(note_entities), 1):
+            self._rebuild(current)
+        else:
+            self._apply(changed, removed)
+
+        self._build_incidence()
+        return True
+
+    def _rebuild(self, note_members: Dict[str, Tuple[int, ...]]):
+        self.note_members = note_members
+        for note_key in note_members:
+            if note_key not in self.note_positions:
+                self.note_positions[note_key] = len(self.note_keys)
+                self.note_keys.append(note_key)
+
+        keys = _pair_keys(*_postings(note_members.values()))
+        self.pair_keys, self.pair_counts = np.unique(keys, return_counts=True)
+        self.pair_counts = self.pair_counts.astype(np.int64)
+        logger.info(f"Built co-occurrence index: {len(self.pair_keys)} pairs over {len(note_members)} notes")
+
+    def _apply(self, changed: Dict[str, Tuple[int, ...]], removed: List[str]):
+        old = [self.note_members[key] for key in list(changed) + removed if key in self.note_members]
+        old_keys = _pair_keys(*_postings(old))
+        new_keys = _pair_keys(*_postings(changed.values()))
+
+        # Net change per pair, merged into the sorted pair arrays
+        delta_keys, inverse = np.unique(np.concatenate([old_keys, new_keys]), return_inverse=True)
+        weights = np.r_[-np.ones(len(old_keys), dtype=np.int64), np.ones(len(new_keys), dtype=np.int64)]
+        delta = np.bincount(inverse.ravel(), weights=weights, minlength=len(delta_keys)).astype(np.int64)
+        delta_keys, delta = delta_keys[delta != 0], delta[delta != 0]
+
+        slots = np.searchsorted(self.pair_keys, delta_keys)
+        found = slots < len(self.pair_keys)
+        found[found] = self.pair_keys[slots[found]] == delta_keys[found]
+        counts = self.pair_counts.copy()
+        counts[slots[found]] += delta[found]
+        keys = np.insert(self.pair_keys, slots[~found], delta_keys[~found])
+        counts = np.insert(counts, slots[~found], delta[~found])
+        keep = counts > 0
+        self.pair_keys, self.pair_counts = keys[keep], counts[keep]
+
+        for note_key in removed:
+            del self.note_members[note_key]
+        for note_key, members in changed.items():
+            if note_key not in self.note_positions:
+                self.note_positions[note_key] = len(self.note_keys)
+                self.note_keys.append(note_key)
+            self.note_members[note_key] = members
+        logger.debug(f"Updated co-occurrence index for {len(changed)} changed and {len(removed)} removed notes")
+
+    def _build_incidence(self):
+        note_members = self.note_members
+        rows, members = _postings(note_members.values())
+        notes = np.asarray([self.note_positions[key] for key in note_members], dtype=np.int64)[rows] if len(rows) else _EMPTY
+
+        order = np.lexsort((notes, members))
+        counts = np.bincount(members, minlength=len(self.entity_ids))
+        self.indptr = np.r_[0, np.cumsum(counts)].astype(np.int64)
+        self.indices = notes[order]
+        self.note_counts = counts
+
+    def count(self, entity_a: str, entity_b: str) -> int:
+        """Number of notes mentioning both entities."""
+        a = self.entity_positions.get(entity_a)
+        b = self.entity_positions.get(entity_b)
+        if a is None or b is None or a == b:
+            return 0
+        key = (min(a, b) << PAIR_SHIFT) | max(a, b)
+        i = int(np.searchsorted(self.pair_keys, key))
+        if i < len(self.pair_keys) and self.pair_keys[i] == key:
+            return int(self.pair_counts[i])
+        return 0
+
+    def notes_for(self, entity_id: str) -> np.ndarray:
+        """Sorted note positions mentioning an entity."""
+        position = self.entity_positions.get(entity_id)
+        if position is None or position + 1 >= len(self.indptr):
+            return _EMPTY
+        return self.indices[self.indptr[position]:self.indptr[position + 1]]
+
+    def shared_notes(self, entity_a: str, entity_b: str, limit: Optional[int] = None) -> List[str]:
+        """Keys of notes mentioning both entities, in note order."""
+        shared = np.intersect1d(self.notes_for(entity_a), self.notes_for(entity_b), assume_unique=True)
+        if limit is not None:
+            shared = shared[:limit]
+        return [self.note_keys[i] for i in shared.tolist()]
+
+    def pair_stats(self, min_count: int = 1) -> Dict[str, np.ndarray]:
+        """
+        Co-occurring pairs with their association scores.
+
+        Args:
+            min_count: Minimum number of shared notes
+
+        Returns:
+            Dict of parallel arrays: "a" and "b" (entity positions, a < b),
+            "count", "pmi" and "npmi"
+        """
+        mask = self.pair_counts >= min_count
+        keys, counts = self.pair_keys[mask], self.pair_counts[mask]
+        a, b = keys >> PAIR_SHIFT, keys & ((1 << PAIR_SHIFT) - 1)
+
+        total = max(self.total_notes, 1)
+        joint = counts / total
+        pmi = np.log(joint / ((self.note_counts[a] / total) * (self.note_counts[b] / total)))
+        denominator = -np.log(joint)
+        npmi = np.divide(pmi, denominator, out=np.ones_like(pmi), where=denominator > 0)
+        return {"a": a, "b": b, "count": counts, "pmi": pmi, "npmi": npmi}
+
+    def npmi(self, entity_a: str, entity_b: str) -> float:
+        """Normalized PMI of two entities in [-1, 1] (-1 if they never co-occur)."""
+        count = self.count(entity_a, entity_b)
+        if not count:
+            return -1.0
+        total = self.total_notes
+        df_a = self.note_counts[self.entity_positions[entity_a]]
+        df_b = self.note_counts[self.entity_positions[entity_b]]
+        if count == total:
+            return 1.0
+        return math.log(count * total / (df_a * df_b)) / -math.log(count / total)
+
+
+_index_lock = threading.Lock()
+_index = CoOccurrenceIndex()
+_synced_key: Optional[Tuple[int, int]] = None
+
+
+def get_co_occurrence_index() -> CoOccurrenceIndex:
+    """Shared co-occurrence index, synced with the current entity store."""
+    global _synced_key
+    data, _ = knowledge_graph.get_indexed_entities()
+    key = (data.get("version", 0), id(data))
+    with _index_lock:
+        if _synced_key != key:
+            _index.sync(data.get("note_entities", {}))
+            _synced_key = key
+        return _index
+
+
+def reset_co_occurrence_index():
+    """Drop the shared index (it is rebuilt on next use)."""
+    global _index, _synced_key
+    with _index_lock:
+        _index = CoOccurrenceIndex()
+        _synced_key = None
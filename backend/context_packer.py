@@ -0,0 +1,213 @@
+"""Token-budgeted packing of context items into prompts.
+
+Items (notes, comments, pinned segments) are packed highest-value first
+into a token budget derived from the target model's context window.
+Bodies that do not fit whole are cut down to their most salient
+sentences instead of the item being dropped. Token counts are local
+approximations per model family; no tokenizer is downloaded.
+"""
+
+import re
+import math
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Set
+
+from .settings import get_model_context_limit
+
+logger = logging.getLogger(__name__)
+
+# Average characters per token of English text, by model ID prefix
+CHARS_PER_TOKEN = {
+    "anthropic/": 3.5,
+    "openai/": 4.0,
+    "google/": 4.0,
+    "meta-llama/": 3.8,
+    "mistralai/": 3.6,
+    "deepseek/": 3.8,
+    "x-ai/": 3.8,
+    "moonshotai/": 3.8,
+}
+DEFAULT_CHARS_PER_TOKEN = 3.7
+
+# Share of the model's context window a packed context may use by default
+DEFAULT_CONTEXT_SHARE = 0.5
+
+# Bodies are not trimmed below this many tokens; smaller leftovers are skipped
+MIN_EXCERPT_TOKENS = 40
+
+ELLIPSIS = " […] "
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+_WORD = re.compile(r"[a-z0-9]{3,}")
+_STOPWORDS = frozenset(
+    "the and for are but not you all any can had her was one our out has how its who did get "
+    "what when where which why with this that from they will would there their about into than "
+    "them then these those does some such".split()
+)
+
+
+def chars_per_token(model: Optional[str]) -> float:
+    """Approximate characters per token for a model family."""
+    if model:
+        for prefix, ratio in CHARS_PER_TOKEN.items():
+            if model.startswith(prefix):
+                return ratio
+    return DEFAULT_CHARS_PER_TOKEN
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Estimate the number of tokens in a text for a model.
+
+    Non-ASCII characters are counted as roughly one token each, since
+    tokenizers split them far more finely than English text.
+    """
+    if not text:
+        return 0
+    non_ascii = len(text) - len(text.encode("ascii", "ignore"))
+    return math.ceil((len(text) - non_ascii) / chars_per_token(model)) + non_ascii
+
+
+def context_budget(model: Optional[str], share: float = DEFAULT_CONTEXT_SHARE, cap: Optional[int] = None) -> int:
+    """
+    Token budget for packed context.
+
+    Args:
+        model: Target model ID (its context window comes from settings)
+        share: Fraction of the context window to use
+        cap: Optional absolute upper bound in tokens
+    """
+    budget = int(get_model_context_limit(model) * share)
+    return min(budget, cap) if cap else budget
+
+
+def _terms(text: str) -> Set[str]:
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def salient_excerpt(text: str, max_tokens: int, query: Optional[str] = None, model: Optional[str] = None) -> str:
+    """
+    Cut a text down to its most salient sentences within a token budget.
+
+    Sentences are scored by overlap with the query terms (or, without a
+    query, by overlap with the text's own frequent terms), with a bonus
+    for the lead sentence. Chosen sentences keep their original order;
+    gaps are marked with an ellipsis.
+
+    Args:
+        text: Text to shorten
+        max_tokens: Token budget for the excerpt
+        query: Optional text the excerpt should be relevant to
+        model: Target model ID, for token counting
+
+    Returns:
+        Excerpt (the text itself if it already fits)
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+
+    sentences = [s.strip() for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+    if query:
+        focus = _terms(query)
+    else:
+        counts = {}
+        for sentence in sentences:
+            for term in _terms(sentence):
+                counts[term] = counts.get(term, 0) + 1
+        focus = {t for t, c in counts.items() if c > 1}
+
+    def score(i: int) -> float:
+        terms = _terms(sentences[i])
+        overlap = len(terms & focus) / math.sqrt(len(terms) + 1)
+        return overlap + (0.5 if i == 0 else 0.0)
+
+    ellipsis_tokens = count_tokens(ELLIPSIS, model)
+    chosen = []
+    used = 0
+    for i in sorted(range(len(sentences)), key=lambda i: (-score(i), i)):
+        cost = count_tokens(sentences[i], model) + ellipsis_tokens
+        if used + cost <= max_tokens:
+            chosen.append(i)
+            used += cost
+
+    if not chosen:
+        # Not even one sentence fits; hard-cut the best one
+        best = max(range(len(sentences)), key=lambda i: (score(i), -i))
+        return sentences[best][:int(max_tokens * chars_per_token(model))].rstrip() + ELLIPSIS.rstrip()
+
+    chosen.sort()
+    parts = []
+    for n, i in enumerate(chosen):
+        if n and i != chosen[n - 1] + 1:
+            parts.append(ELLIPSIS.strip())
+        parts.append(sentences[i])
+    if chosen[-1] != len(sentences) - 1:
+        parts.append(ELLIPSIS.strip())
+    return " ".join(parts)
+
+
+@dataclass
+class ContextItem:
+    """
+    One unit of context.
+
+    The header (title, labels) is always kept whole; the body may be
+    shortened to an excerpt. Higher scores are packed first.
+    """
+
+    header: str
+    body: str = ""
+    score: float = 0.0
+
+
+def pack_context(
+    items: Sequence[ContextItem],
+    budget_tokens: int,
+    model: Optional[str] = None,
+    query: Optional[str] = None,
+    separator: str = "\n"
+) -> List[Optional[str]]:
+    """
+    Fit items into a token budget, highest score first.
+
+    Items that fit whole are kept whole; otherwise the body is replaced by
+    a salient excerpt of the remaining budget, and items whose header alone
+    (plus a minimal excerpt) does not fit are dropped.
+
+    Args:
+        items: Items to pack
+        budget_tokens: Total token budget
+        model: Target model ID, for token counting
+        query: Optional text excerpts should be relevant to
+        separator: Text that will be placed between rendered items
+
+    Returns:
+        One entry per item, in the input order: the rendered item text
+        (header + possibly shortened body), or None if it was dropped
+    """
+    packed: List[Optional[str]] = [None] * len(items)
+    remaining = budget_tokens
+    separator_tokens = count_tokens(separator, model)
+
+    for i in sorted(range(len(items)), key=lambda i: -items[i].score):
+        item = items[i]
+        full = item.header + item.body
+        cost = count_tokens(full, model) + separator_tokens
+        if cost <= remaining:
+            packed[i] = full
+            remaining -= cost
+            continue
+
+        header_cost = count_tokens(item.header, model) + separator_tokens
+        body_budget = remaining - header_cost
+        if not item.body or body_budget < MIN_EXCERPT_TOKENS:
+            continue
+        excerpt = salient_excerpt(item.body, body_budget, query, model)
+        packed[i] = item.header + excerpt
+        remaining -= header_cost + count_tokens(excerpt, model)
+
+    dropped = sum(1 for p in packed if p is None)
+    if dropped:
+        logger.debug(f"Context packing dropped {dropped} of {len(items)} items (budget {budget_tokens} tokens)")
+    return packed
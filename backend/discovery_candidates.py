@@ -0,0 +1,179 @@
+"""Candidate-pair mining for knowledge discovery.
+
+Before notes are sent to the discovery model, the pairs worth asking about
+are mined locally. Note embeddings from the graph search index give a
+cross-source similarity matrix. Pairs the graph already connects (shared
+tags or entities, manual links) are dropped, and the rest are ranked by
+how semantically close but structurally distant they are. Only the top
+pairs and their notes go into the prompt.
+"""
+
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+
+from . import graph_search
+from .knowledge_graph import get_indexed_entities, load_manual_links
+
+logger = logging.getLogger(__name__)
+
+# Pairs sent to the model per run, and how many of them one note may join
+MAX_CANDIDATE_PAIRS = 12
+MAX_PAIRS_PER_NOTE = 3
+
+# Cosine similarity below which a pair is not worth a model call
+# (unrelated notes typically score 0.4-0.6 with bge-small)
+MIN_PAIR_SIMILARITY = 0.6
+
+
+def _incidence(feature_sets: List[set]) -> np.ndarray:
+    """Binary (notes x features) matrix from per-note feature sets."""
+    columns: Dict[str, int] = {}
+    for features in feature_sets:
+        for feature in features:
+            columns.setdefault(feature, len(columns))
+
+    matrix = np.zeros((len(feature_sets), max(len(columns), 1)), dtype=np.float32)
+    for i, features in enumerate(feature_sets):
+        for feature in features:
+            matrix[i, columns[feature]] = 1.0
+    return matrix
+
+
+def _note_structure(notes: List[Dict[str, Any]]):
+    """
+    Per-note direct links (tags, entities) and entity neighbourhoods.
+
+    The neighbourhood is a note's entities plus the entities they are
+    related to, so two notes about related entities count as close in the
+    graph even when they share none directly.
+    """
+    data, relationships = get_indexed_entities()
+    note_entities = data.get("note_entities", {})
+
+    direct = []
+    neighbourhoods = []
+    for note in notes:
+        entity_ids = set(note_entities.get(note["id"].replace("note:", "", 1), []))
+        tags = {tag.lower().strip() for tag in note.get("tags", [])}
+        direct.append({f"tag:{tag}" for tag in tags} | {f"entity:{e}" for e in entity_ids})
+
+        neighbourhood = set(entity_ids)
+        for rel in relationships.for_entities(entity_ids):
+            neighbourhood.add(rel.get("source_entity_id"))
+            neighbourhood.add(rel.get("target_entity_id"))
+        neighbourhood.discard(None)
+        neighbourhoods.append(neighbourhood)
+
+    return direct, neighbourhoods
+
+
+def mine_candidate_pairs(
+    notes: List[Dict[str, Any]],
+    limit: int = MAX_CANDIDATE_PAIRS,
+    min_similarity: float = MIN_PAIR_SIMILARITY,
+    per_note: int = MAX_PAIRS_PER_NOTE
+) -> List[Dict[str, Any]]:
+    """
+    Find cross-source note pairs that are semantically close but unconnected.
+
+    Uses the note vectors already indexed, so it does no embedding and can
+    run in a worker thread; sync the index first (graph_search.sync_kg_index)
+    to include new notes.
+
+    Args:
+        notes: Candidate notes (dicts with id, source_id and tags)
+        limit: Maximum pairs to return
+        min_similarity: Minimum cosine similarity of a pair
+        per_note: Maximum pairs any one note may appear in
+
+    Returns:
+        List of {"notes": [id, id], "similarity", "overlap", "score"} dicts,
+        best first; empty if the notes are not embedded yet
+    """
+    ids, rows, matrix = graph_search.get_node_vectors("note", sync=False)
+    embedded = [note for note in notes if note["id"] in rows]
+    if len(embedded) < 2:
+        return []
+
+    vectors = matrix[[rows[note["id"]] for note in embedded]]
+    similarity = vectors @ vectors.T
+
+    # Each unordered cross-source pair once
+    sources = np.asarray([note.get("source_id") or note["id"] for note in embedded])
+    valid = np.triu(np.ones(similarity.shape, dtype=bool), k=1)
+    valid &= sources[:, None] != sources[None, :]
+    valid &= similarity >= min_similarity
+
+    # Already connected: shared tags or entities, or a manual link
+    direct, neighbourhoods = _note_structure(embedded)
+    incidence = _incidence(direct)
+    valid &= (incidence @ incidence.T) == 0
+
+    positions = {note["id"]: i for i, note in enumerate(embedded)}
+    for link in load_manual_links().get("manual_links", []):
+        i = positions.get(link.get("source"))
+        j = positions.get(link.get("target"))
+        if i is not None and j is not None:
+            valid[i, j] = valid[j, i] = False
+
+    # Graph closeness: Jaccard overlap of the entity neighbourhoods
+    incidence = _incidence(neighbourhoods)
+    shared = incidence @ incidence.T
+    sizes = incidence.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - shared
+    overlap = np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+    score = similarity * (1.0 - overlap)
+
+    first, second = np.nonzero(valid)
+    order = np.argsort(-score[first, second], kind="stable")
+
+    pairs = []
+    uses = np.zeros(len(embedded), dtype=np.int64)
+    for k in order:
+        i, j = int(first[k]), int(second[k])
+        if uses[i] >= per_note or uses[j] >= per_note:
+            continue
+        uses[i] += 1
+        uses[j] += 1
+        pairs.append({
+            "notes": [embedded[i]["id"], embedded[j]["id"]],
+            "similarity": round(float(similarity[i, j]), 3),
+            "overlap": round(float(overlap[i, j]), 3),
+            "score": round(float(score[i, j]), 3),
+        })
+        if len(pairs) >= limit:
+            break
+
+    logger.info(f"Mined {len(pairs)} candidate pairs from {len(embedded)} notes")
+    return pairs
+
+
+def select_pair_notes(
+    notes: List[Dict[str, Any]],
+    pairs: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Keep only the notes that appear in a candidate pair, in their original order."""
+    paired = {note_id for pair in pairs for note_id in pair["notes"]}
+    return [note for note in notes if note["id"] in paired]
+
+
+def format_candidate_pairs(
+    pairs: List[Dict[str, Any]],
+    notes: List[Dict[str, Any]]
+) -> str:
+    """Format candidate pairs as a prompt section."""
+    titles = {note["id"]: note.get("title", "") for note in notes}
+    lines = [
+        "## Candidate Pairs",
+        "These pairs are semantically close but not yet connected in the graph "
+        "(no shared tags, entities or manual links). Build connections from them.",
+    ]
+    for i, pair in enumerate(pairs, 1):
+        first, second = pair["notes"]
+        lines.append(
+            f"{i}. {first} ({titles.get(first, '')}) <-> {second} ({titles.get(second, '')})"
+            f" - similarity {pair['similarity']:.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,335 @@
+"""Scalable duplicate-entity candidate generation.
+
+Instead of comparing every pair of entity names, names are normalized to
+compact keys and blocked by character trigrams: each name is indexed only
+under its rarest trigrams (prefix filtering), which surfaces every pair
+that can reach a looser trigram-cosine blocking threshold. Candidates
+are filtered in bulk by the cosine of hashed trigram bitsets, the
+survivors scored with SequenceMatcher (as before blocking, so short names
+like "LLM"/"LLMs" still match), and grouped with union-find.
+
+Results are cached per entity store version.
+"""
+
+import re
+import hashlib
+import logging
+import threading
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from . import knowledge_graph
+
+logger = logging.getLogger(__name__)
+
+# Trigram buckets larger than this are skipped when generating pairs; only
+# names made entirely of very common trigrams can be missed
+MAX_BUCKET_SIZE = 400
+
+# Candidates are blocked at this much below the similarity threshold in
+# trigram cosine; trigram overlap of short names is low even when only a
+# character differs ("llm"/"llms" is 0.67)
+BLOCKING_MARGIN = 0.2
+
+# Candidate pairs filtered per batch (bounds memory to batch * TRIGRAM_BITS / 4 bytes)
+SCORE_BATCH_SIZE = 65536
+
+_ARTICLES = ("the ", "a ", "an ")
+_SUFFIXES = (" inc", " inc.", " llc", " corp", " corp.")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Trigram alphabet: "#" padding, a-z and 0-9
+_ALPHABET = 37
+TRIGRAM_CODES = _ALPHABET ** 3
+_CHAR_CODES = np.zeros(256, dtype=np.int64)
+for _code, _char in enumerate("#abcdefghijklmnopqrstuvwxyz0123456789"):
+    _CHAR_CODES[ord(_char)] = _code
+
+# Bits per name in the hashed trigram sets used for scoring, and the
+# popcount of every byte value
+TRIGRAM_BITS = 512
+_BIT_SHIFT = 32 - (TRIGRAM_BITS.bit_length() - 1)
+_POPCOUNT = np.array([bin(b).count("1") for b in range(256)], dtype=np.int32)
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Any] = {"key": None, "pairs": None}
+
+
+def normalize_key(name: str) -> str:
+    """
+    Compact comparison key for an entity name.
+
+    Lowercased, leading articles and company suffixes removed, and all
+    punctuation and whitespace dropped ("The GPT-4" -> "gpt4").
+    """
+    name = name.lower().strip()
+    for article in _ARTICLES:
+        if name.startswith(article):
+            name = name[len(article):]
+    for suffix in _SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return _NON_ALNUM.sub("", name)
+
+
+def _trigram_postings(keys: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (name index, trigram code) postings for the distinct trigrams of each
+    normalized name, sorted by name.
+
+    Keys only contain [a-z0-9], so with "#" padding each trigram maps to an
+    integer below TRIGRAM_CODES and all names are processed in one pass.
+    """
+    indices = [i for i, key in enumerate(keys) if key]
+    if not indices:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    text = "".join(f"##{keys[i]}#" for i in indices).encode("ascii")
+    chars = _CHAR_CODES[np.frombuffer(text, dtype=np.uint8)]
+    owner = np.repeat(np.asarray(indices, dtype=np.int64), [len(keys[i]) + 3 for i in indices])
+
+    # Trigram starting at each position, kept if it lies within one name
+    codes = (chars[:-2] * _ALPHABET + chars[1:-1]) * _ALPHABET + chars[2:]
+    inside = owner[:-2] == owner[2:]
+    postings = np.unique(owner[:-2][inside] * TRIGRAM_CODES + codes[inside])
+    return postings // TRIGRAM_CODES, postings % TRIGRAM_CODES
+
+
+def _hash_bits(codes: np.ndarray) -> np.ndarray:
+    """Multiplicative hash of trigram codes to bit positions below TRIGRAM_BITS."""
+    return ((codes * 2654435761) & 0xFFFFFFFF) >> _BIT_SHIFT
+
+
+def _char_histograms(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-text character counts over the trigram alphabet, and text lengths.
+
+    Characters outside [a-z0-9] share the "#" bucket, so
+    2 * sum(min(counts)) / (len_a + len_b) bounds SequenceMatcher's ratio
+    from above (it is quick_ratio over coarser characters).
+    """
+    lengths = np.asarray([len(text) for text in texts], dtype=np.int64)
+    data = [text.encode("utf-8") for text in texts]
+    chars = _CHAR_CODES[np.frombuffer(b"".join(data), dtype=np.uint8)]
+    owner = np.repeat(np.arange(len(texts), dtype=np.int64), [len(d) for d in data])
+    counts = np.bincount(owner * _ALPHABET + chars, minlength=len(texts) * _ALPHABET)
+    return counts.reshape(len(texts), _ALPHABET).astype(np.int32), lengths
+
+
+def _ratio_bound(histograms: Tuple[np.ndarray, np.ndarray], a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    counts, lengths = histograms
+    matches = np.minimum(counts[a], counts[b]).sum(axis=1)
+    return 2.0 * matches / np.maximum(lengths[a] + lengths[b], 1)
+
+
+def _candidate_pairs(rows: np.ndarray, columns: np.ndarray, n: int, threshold: float) -> np.ndarray:
+    """
+    Pairs of names sharing at least one prefix trigram, encoded as i * n + j.
+
+    With trigrams ordered rarest first, two sets whose cosine similarity is
+    at least t must share one of the first |A| - ceil(t^2 |A|) + 1
+    trigrams of A, so only those are indexed.
+    """
+    frequency = np.bincount(columns, minlength=TRIGRAM_CODES)
+    sizes = np.bincount(rows, minlength=n)
+
+    # Order each name's trigrams rarest first and keep its prefix
+    order = np.lexsort((columns, frequency[columns], rows))
+    rows, columns = rows[order], columns[order]
+    row_starts = np.r_[0, np.cumsum(sizes)[:-1]]
+    rank = np.arange(len(rows)) - row_starts[rows]
+    prefix = sizes - np.ceil(threshold * threshold * sizes).astype(np.int64) + 1
+    keep = rank < prefix[rows]
+    names, grams = rows[keep], columns[keep]
+
+    order = np.lexsort((names, grams))
+    names, grams = names[order], grams[order]
+
+    # Drop oversized buckets
+    starts = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]])
+    bucket_sizes = np.diff(np.r_[starts, len(grams)])
+    keep = np.repeat(bucket_sizes <= MAX_BUCKET_SIZE, bucket_sizes)
+    if not keep.all():
+        logger.debug(f"Skipping {int((bucket_sizes > MAX_BUCKET_SIZE).sum())} oversized trigram buckets")
+    names, grams = names[keep], grams[keep]
+
+    # Pair each posting with the ones k positions later in the same bucket,
+    # for growing k, considering only positions still inside their bucket
+    pairs = []
+    positions = np.arange(len(grams) - 1)
+    k = 1
+    while len(positions):
+        same = grams[positions] == grams[positions + k]
+        positions = positions[same]
+        if len(positions):
+            pairs.append(names[positions] * n + names[positions + k])
+        k += 1
+        positions = positions[positions + k < len(grams)]
+
+    if not pairs:
+        return np.zeros(0, dtype=np.int64)
+    # Names within a bucket are sorted, so every pair is already (smaller, larger)
+    return np.unique(np.concatenate(pairs))
+
+
+def find_similar_pairs(names: Sequence[str], threshold: float = 0.7) -> List[Tuple[int, int, float]]:
+    """
+    Find pairs of similar names.
+
+    Similarity is the best SequenceMatcher ratio of the normalized keys or
+    the lowercased names, so identical keys score 1.0. Only pairs whose
+    trigram cosine is within BLOCKING_MARGIN of the threshold are scored.
+
+    Args:
+        names: Entity names
+        threshold: Minimum similarity (0-1)
+
+    Returns:
+        List of (i, j, similarity) with i < j, indices into names
+    """
+    n = len(names)
+    keys = [normalize_key(name) for name in names]
+    rows, columns = _trigram_postings(keys)
+    if n < 2 or not len(rows):
+        return []
+
+    blocking = max(threshold - BLOCKING_MARGIN, 0.0)
+    encoded = _candidate_pairs(rows, columns, n, blocking)
+    if not len(encoded):
+        return []
+    first, second = encoded // n, encoded % n
+
+    # Size filter: cosine >= t requires min(|A|, |B|) >= t^2 max(|A|, |B|)
+    sizes = np.bincount(rows, minlength=n)
+    small = np.minimum(sizes[first], sizes[second])
+    large = np.maximum(sizes[first], sizes[second])
+    feasible = small >= blocking * blocking * large
+    first, second = first[feasible], second[feasible]
+
+    # Hashed trigram bitsets for the names that are in a candidate pair
+    involved = np.unique(np.r_[first, second])
+    local = np.full(n, -1, dtype=np.int64)
+    local[involved] = np.arange(len(involved))
+    posting = local[rows] >= 0
+    bits = np.zeros((len(involved), TRIGRAM_BITS), dtype=bool)
+    bits[local[rows[posting]], _hash_bits(columns[posting])] = True
+    packed = np.packbits(bits, axis=1)
+    counts = _POPCOUNT[packed].sum(axis=1)
+
+    # Upper bounds on the SequenceMatcher ratios, to skip most of the calls
+    lowered = [name.lower() for name in names]
+    key_chars = _char_histograms([keys[i] for i in involved])
+    name_chars = _char_histograms([lowered[i] for i in involved])
+
+    results = []
+    for start in range(0, len(first), SCORE_BATCH_SIZE):
+        a = local[first[start:start + SCORE_BATCH_SIZE]]
+        b = local[second[start:start + SCORE_BATCH_SIZE]]
+        shared = _POPCOUNT[packed[a] & packed[b]].sum(axis=1)
+        cosine = shared / np.sqrt(counts[a] * counts[b])
+        hits = np.flatnonzero(cosine >= blocking - 1e-6)
+        a, b = a[hits], b[hits]
+        bound = np.maximum(_ratio_bound(key_chars, a, b), _ratio_bound(name_chars, a, b))
+        hits = hits[bound >= threshold - 1e-9]
+        for i, j in zip(first[start:start + SCORE_BATCH_SIZE][hits].tolist(),
+                        second[start:start + SCORE_BATCH_SIZE][hits].tolist()):
+            similarity = 1.0 if keys[i] == keys[j] else max(
+                SequenceMatcher(None, keys[i], keys[j]).ratio(),
+                SequenceMatcher(None, lowered[i], lowered[j]).ratio()
+            )
+            if similarity >= threshold:
+                results.append((i, j, similarity))
+
+    return results
+
+
+class UnionFind:
+    """Disjoint sets over hashable items, with path halving."""
+
+    def __init__(self):
+        self.parent: Dict[Any, Any] = {}
+
+    def find(self, item: Any) -> Any:
+        parent = self.parent.setdefault(item, item)
+        while parent != item:
+            grandparent = self.parent[parent]
+            self.parent[item] = grandparent
+            item, parent = parent, self.parent[grandparent]
+        return item
+
+    def union(self, a: Any, b: Any):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+    def groups(self) -> List[List[Any]]:
+        members: Dict[Any, List[Any]] = {}
+        for item in self.parent:
+            members.setdefault(self.find(item), []).append(item)
+        return [group for group in members.values() if len(group) > 1]
+
+
+def get_duplicate_pairs(threshold: float = 0.7) -> List[Tuple[str, str, float]]:
+    """
+    Similar entity name pairs for the current entity store, cached per version.
+
+    Args:
+        threshold: Minimum similarity (0-1)
+
+    Returns:
+        List of (entity_id, entity_id, similarity), most similar first
+    """
+    data, _ = knowledge_graph.get_indexed_entities()
+    key = (data.get("version", 0), id(data), threshold)
+
+    with _cache_lock:
+        if _cache["key"] == key:
+            return _cache["pairs"]
+
+        entities = data.get("entities", {})
+        ids = list(entities)
+        names = [entities[eid].get("name", "") for eid in ids]
+        pairs = [(ids[i], ids[j], sim) for i, j, sim in find_similar_pairs(names, threshold)]
+        pairs.sort(key=lambda p: -p[2])
+
+        _cache.update({"key": key, "pairs": pairs})
+        logger.info(f"Found {len(pairs)} similar entity pairs among {len(ids)} entities")
+        return pairs
+
+
+def group_duplicates(
+    pairs: Iterable[Tuple[str, str, float]],
+    allowed: Optional[Set[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Cluster similar pairs into duplicate groups.
+
+    Args:
+        pairs: (entity_id, entity_id, similarity) tuples
+        allowed: Optional set of entity IDs to consider (others are ignored)
+
+    Returns:
+        List of {"group_id", "members", "similarity"} where similarity maps
+        each member to its best similarity with another member
+    """
+    uf = UnionFind()
+    best: Dict[str, float] = {}
+    for a, b, sim in pairs:
+        if allowed is not None and (a not in allowed or b not in allowed):
+            continue
+        uf.union(a, b)
+        best[a] = max(best.get(a, 0.0), sim)
+        best[b] = max(best.get(b, 0.0), sim)
+
+    groups = []
+    for members in uf.groups():
+        members.sort()
+        group_id = hashlib.sha1("|".join(members).encode()).hexdigest()[:8]
+        groups.append({
+            "group_id": group_id,
+            "members": members,
+            "similarity": {m: best[m] for m in members},
+        })
+    return groups
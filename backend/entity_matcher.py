@@ -0,0 +1,265 @@
+"""Multi-pattern entity name matching for knowledge graph queries.
+
+Entity names and aliases are compiled into an Aho-Corasick automaton over
+normalized text, so all entities mentioned in a question are found in one
+pass over it, on word boundaries. The automaton is updated incrementally
+as entities are added, renamed or removed. Questions without an exact
+mention fall back to the nearest entities in the semantic search index.
+"""
+
+import re
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, FrozenSet, List, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Names shorter than this match too much incidental text
+MIN_NAME_LENGTH = 3
+
+# Embedding fallback for questions without an exact entity mention
+FALLBACK_LIMIT = 3
+FALLBACK_MIN_SIMILARITY = 0.75
+
+# Rebuild the trie from scratch once this share of its patterns are removed ones
+STALE_REBUILD_RATIO = 0.25
+
+_NON_WORD = re.compile(r"[^\w+#]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse punctuation and whitespace to single spaces."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def entity_patterns(entity: Dict[str, Any]) -> FrozenSet[str]:
+    """Normalized name and aliases of an entity that are long enough to match."""
+    names = [entity.get("name", "")] + list(entity.get("aliases", []) or [])
+    patterns = {normalize(name) for name in names if name}
+    return frozenset(p for p in patterns if len(p) >= MIN_NAME_LENGTH)
+
+
+class EntityMatcher:
+    """Aho-Corasick automaton mapping entity names and aliases to entity IDs."""
+
+    def __init__(self):
+        self._entity_patterns: Dict[str, FrozenSet[str]] = {}
+        self._reset_trie()
+
+    def _reset_trie(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._depth: List[int] = [0]
+        self._out: List[Set[str]] = [set()]
+        self._out_link: List[int] = [0]
+        self._terminal: Dict[str, int] = {}
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._entity_patterns)
+
+    def _insert(self, pattern: str, entity_id: str):
+        node = self._terminal.get(pattern)
+        if node is None:
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._depth.append(self._depth[node] + 1)
+                    self._out.append(set())
+                    self._out_link.append(0)
+                node = nxt
+            self._terminal[pattern] = node
+        self._out[node].add(entity_id)
+
+    def _remove(self, pattern: str, entity_id: str):
+        node = self._terminal.get(pattern)
+        if node is None:
+            return
+        self._out[node].discard(entity_id)
+        if not self._out[node]:
+            # Trie nodes are left in place; they are dropped on the next full rebuild
+            del self._terminal[pattern]
+            self._stale += 1
+
+    def _link(self):
+        """Recompute failure and output links breadth-first."""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._out_link[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail = self._goto[fallback].get(ch, 0)
+                self._fail[child] = fail if fail != child else 0
+                self._out_link[child] = fail if self._out[fail] else self._out_link[fail]
+                queue.append(child)
+
+    def sync(self, entities: Dict[str, Any]) -> bool:
+        """
+        Update the automaton to match an entities dict.
+
+        Only entities whose name or aliases changed are re-inserted.
+
+        Args:
+            entities: Mapping of entity ID to entity
+
+        Returns:
+            True if the automaton changed
+        """
+        current = {eid: entity_patterns(e) for eid, e in entities.items()}
+        previous = self._entity_patterns
+
+        removed = [eid for eid in previous if previous[eid] != current.get(eid)]
+        added = [eid for eid in current if current[eid] != previous.get(eid)]
+        if not removed and not added:
+            return False
+
+        for eid in removed:
+            for pattern in previous[eid]:
+                self._remove(pattern, eid)
+        for eid in added:
+            for pattern in current[eid]:
+                self._insert(pattern, eid)
+        self._entity_patterns = current
+
+        if self._stale > STALE_REBUILD_RATIO * max(len(self._terminal), 1):
+            self._reset_trie()
+            for eid, patterns in current.items():
+                for pattern in patterns:
+                    self._insert(pattern, eid)
+
+        self._link()
+        return True
+
+    def match(self, text: str) -> List[str]:
+        """
+        Find entities whose name or alias occurs in the text as whole words.
+
+        Args:
+            text: Text to scan (normalized internally)
+
+        Returns:
+            Entity IDs in order of first occurrence
+        """
+        text = normalize(text)
+        matched: Dict[str, None] = {}
+        node = 0
+        goto, fail = self._goto, self._fail
+
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            if i + 1 < len(text) and text[i + 1] != " ":
+                continue
+            hit = node if self._out[node] else self._out_link[node]
+            while hit:
+                start = i - self._depth[hit] + 1
+                if start == 0 or text[start - 1] == " ":
+                    for eid in sorted(self._out[hit]):
+                        matched.setdefault(eid, None)
+                hit = self._out_link[hit]
+
+        return list(matched)
+
+
+_matcher_lock = threading.Lock()
+_matcher_cache: Dict[str, Any] = {"entities": None, "matcher": EntityMatcher()}
+
+
+def get_entity_matcher(entities: Dict[str, Any]) -> EntityMatcher:
+    """
+    Get the shared matcher, synced to the given entities.
+
+    Passing the same (cached, read-only) entities dict again costs nothing;
+    a different dict is diffed against the matcher's current patterns.
+    """
+    with _matcher_lock:
+        matcher = _matcher_cache["matcher"]
+        if _matcher_cache["entities"] is not entities:
+            if matcher.sync(entities):
+                logger.debug(f"Entity matcher synced to {len(matcher)} entities")
+            _matcher_cache["entities"] = entities
+        return matcher
+
+
+def nearest_entities(
+    question: str,
+    entities: Dict[str, Any],
+    limit: int = FALLBACK_LIMIT,
+    min_similarity: float = FALLBACK_MIN_SIMILARITY
+) -> List[str]:
+    """
+    Find entities semantically closest to a question via the search index.
+
+    Uses whatever entity embeddings are already indexed; returns nothing
+    if the embedding model or index is unavailable.
+
+    Args:
+        question: User's question
+        entities: Mapping of entity ID to entity (results are limited to these)
+        limit: Maximum entities to return
+        min_similarity: Minimum cosine similarity
+
+    Returns:
+        Entity IDs, most similar first
+    """
+    try:
+        from .graph_search import load_kg_index, get_model
+        index = load_kg_index()
+        ids, vectors = [], []
+        for node_id, data in index.items():
+            if data.get("type") == "entity":
+                entity_id = node_id.split(":", 1)[1]
+                if entity_id in entities:
+                    ids.append(entity_id)
+                    vectors.append(data["embedding"])
+        if not ids:
+            return []
+        query = np.asarray(list(get_model().embed([question]))[0], dtype=np.float32)
+    except Exception as e:
+        logger.debug(f"Entity embedding fallback unavailable: {e}")
+        return []
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    scores = matrix @ query / np.maximum(norms, 1e-9)
+    order = np.argsort(-scores)[:limit]
+    return [ids[i] for i in order if scores[i] >= min_similarity]
+
+
+def extract_entities(
+    question: str,
+    entities: Dict[str, Any],
+    fuzzy: bool = True
+) -> List[str]:
+    """
+    Find the entities a question refers to.
+
+    Args:
+        question: User's question
+        entities: Mapping of entity ID to entity
+        fuzzy: Fall back to embedding similarity when nothing matches exactly
+
+    Returns:
+        Matching entity IDs
+    """
+    matched = get_entity_matcher(entities).match(question)
+    if not matched and fuzzy:
+        matched = nearest_entities(question, entities)
+    return matched
@@ -0,0 +1,240 @@
+"""Append-only columnar event log.
+
+Events are stored column by column: one flat binary file per column that
+rows are only ever appended to, so analyses can load whole columns as
+NumPy arrays and aggregate them with vectorized group-bys instead of
+iterating over record dicts.
+
+Column kinds:
+- "category": int32 codes into a per-column dictionary of values (any
+  JSON value, including None), appended to a JSON-lines file as new
+  values appear
+- "float": float64, None stored as NaN
+- "int": int64
+- "bool": int8
+
+The log offset (row count) only grows, so results derived from the log
+can be cached by offset and extended with just the rows added since.
+"""
+
+import json
+import os
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COLUMN_DTYPES = {
+    "category": np.int32,
+    "float": np.float64,
+    "int": np.int64,
+    "bool": np.int8,
+}
+
+
+class ColumnarLog:
+    """An append-only table stored as one binary file per column."""
+
+    def __init__(self, directory: str, name: str, schema: Dict[str, str]):
+        """
+        Args:
+            directory: Directory holding the log files
+            name: Table name, used as the file prefix
+            schema: Column name -> column kind (see COLUMN_DTYPES)
+        """
+        self.directory = directory
+        self.name = name
+        self.schema = dict(schema)
+        self._lock = threading.Lock()
+        self._categories: Dict[str, List[Any]] = {}
+        self._category_codes: Dict[str, Dict[str, int]] = {}
+        self._categories_size = -1
+
+    def _column_path(self, column: str) -> str:
+        return os.path.join(self.directory, f"{self.name}.{column}.bin")
+
+    def _categories_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.categories.jsonl")
+
+    def _column_rows(self, column: str) -> int:
+        try:
+            size = os.path.getsize(self._column_path(column))
+        except FileNotFoundError:
+            return 0
+        return size // np.dtype(COLUMN_DTYPES[self.schema[column]]).itemsize
+
+    def offset(self) -> int:
+        """Number of complete rows (a torn append is ignored)."""
+        return min(self._column_rows(column) for column in self.schema)
+
+    def _load_categories(self):
+        """Load category dictionaries appended since the last call."""
+        path = self._categories_path()
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            size = 0
+        if size == self._categories_size:
+            return
+
+        categories = {column: [] for column, kind in self.schema.items() if kind == "category"}
+        if size:
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        column, value = json.loads(line)
+                    except ValueError:
+                        continue  # Torn final line; its rows were never written
+                    if column in categories:
+                        categories[column].append(value)
+
+        self._categories = categories
+        self._category_codes = {
+            column: {json.dumps(value): code for code, value in enumerate(values)}
+            for column, values in categories.items()
+        }
+        self._categories_size = size
+
+    def categories(self, column: str) -> List[Any]:
+        """Values of a category column, indexed by code."""
+        self._load_categories()
+        return self._categories[column]
+
+    def append(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Append rows to the log.
+
+        Args:
+            records: Dicts keyed by column name; missing columns are None
+
+        Returns:
+            The new log offset
+        """
+        if not records:
+            return self.offset()
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._load_categories()
+            self._truncate(self.offset())
+
+            new_values = []
+            columns = {}
+            for column, kind in self.schema.items():
+                values = [record.get(column) for record in records]
+                if kind == "category":
+                    codes = self._category_codes[column]
+                    encoded = []
+                    for value in values:
+                        key = json.dumps(value)
+                        if key not in codes:
+                            codes[key] = len(self._categories[column])
+                            self._categories[column].append(value)
+                            new_values.append([column, value])
+                        encoded.append(codes[key])
+                    values = encoded
+                elif kind == "float":
+                    values = [np.nan if value is None else value for value in values]
+                else:
+                    values = [value or 0 for value in values]
+                columns[column] = np.asarray(values, dtype=COLUMN_DTYPES[kind])
+
+            # Dictionary entries land before the codes that reference them
+            if new_values:
+                with open(self._categories_path(), "a") as f:
+                    for entry in new_values:
+                        f.write(json.dumps(entry) + "\n")
+                self._categories_size = os.path.getsize(self._categories_path())
+
+            for column, array in columns.items():
+                with open(self._column_path(column), "ab") as f:
+                    array.tofile(f)
+
+            return self.offset()
+
+    def _truncate(self, rows: int):
+        """Cut every column back to `rows` rows (drops a torn append)."""
+        for column, kind in self.schema.items():
+            if self._column_rows(column) > rows:
+                logger.warning(f"Truncating torn append in {self.name}.{column} to {rows} rows")
+                with open(self._column_path(column), "r+b") as f:
+                    f.truncate(rows * np.dtype(COLUMN_DTYPES[kind]).itemsize)
+
+    def check(self, repair: bool = True) -> Dict[str, Any]:
+        """
+        Check that every column has the same number of rows.
+
+        Args:
+            repair: Truncate columns left longer by an interrupted append
+
+        Returns:
+            Dict with "rows" and "torn_columns" (column -> row count)
+        """
+        with self._lock:
+            rows = self.offset()
+            torn = {
+                column: self._column_rows(column)
+                for column in self.schema
+                if self._column_rows(column) != rows
+            }
+            if torn and repair:
+                self._truncate(rows)
+        return {"rows": rows, "torn_columns": torn}
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Load rows [start, stop) as one array per column.
+
+        Category columns are returned as codes; see categories().
+        """
+        stop = self.offset() if stop is None else stop
+        count = max(stop - start, 0)
+        columns = {}
+        for column, kind in self.schema.items():
+            dtype = np.dtype(COLUMN_DTYPES[kind])
+            if count == 0:
+                columns[column] = np.empty(0, dtype=dtype)
+                continue
+            columns[column] = np.fromfile(
+                self._column_path(column), dtype=dtype, count=count, offset=start * dtype.itemsize
+            )
+        return columns
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Load rows [start, stop) decoded back into dicts."""
+        columns = self.read(start, stop)
+        decoded = {}
+        for column, kind in self.schema.items():
+            array = columns[column]
+            if kind == "category":
+                values = self.categories(column)
+                decoded[column] = [values[code] for code in array.tolist()]
+            elif kind == "float":
+                decoded[column] = [None if np.isnan(value) else value for value in array.tolist()]
+            elif kind == "bool":
+                decoded[column] = [bool(value) for value in array.tolist()]
+            else:
+                decoded[column] = array.tolist()
+
+        count = len(next(iter(columns.values()))) if columns else 0
+        return [{column: decoded[column][i] for column in self.schema} for i in range(count)]
+
+
+def group_counts(keys: np.ndarray, weights: Optional[np.ndarray] = None):
+    """
+    Count (or sum weights) per distinct key.
+
+    Returns:
+        (keys, totals) with keys in order of first occurrence
+    """
+    if len(keys) == 0:
+        return keys[:0], np.zeros(0, dtype=np.int64)
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=weights, minlength=len(unique))
+    if weights is None or weights.dtype.kind in "biu":
+        totals = totals.astype(np.int64)
+    order = np.argsort(first, kind="stable")
+    return unique[order], totals[order]
@@ -0,0 +1,263 @@
+"""Community clustering for a level-of-detail knowledge graph overview.
+
+Runs weighted label propagation over the graph adjacency index and
+summarizes each community as a super-node. Assignments are cached per
+graph version and persisted, and each new version is warm-started from the
+previous labels so small graph edits converge in a couple of sweeps.
+"""
+
+import hashlib
+import json
+import os
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from . import knowledge_graph
+from .graph_index import GraphIndex, LINK_WEIGHTS, get_graph_index
+
+logger = logging.getLogger(__name__)
+
+# Label propagation sweeps before giving up on convergence
+MAX_PROPAGATION_ITERATIONS = 20
+
+# Members listed per super-node in the overview
+CLUSTER_PREVIEW_MEMBERS = 5
+
+_clusters_cache: Dict[str, Any] = {"version": None, "index": None, "result": None}
+
+
+def get_clusters_path() -> str:
+    """Get the path to the persisted cluster assignments."""
+    return os.path.join(knowledge_graph.KNOWLEDGE_GRAPH_DIR, "graph_clusters.json")
+
+
+def load_cluster_labels() -> Dict[str, Any]:
+    """Load the last persisted cluster assignments."""
+    path = get_clusters_path()
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Failed to load cluster labels: {e}")
+    return {"version": None, "labels": {}}
+
+
+def save_cluster_labels(version: int, labels: Dict[str, str]):
+    """Persist cluster assignments for warm-starting the next version."""
+    knowledge_graph.ensure_kg_dir()
+    path = get_clusters_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({"version": version, "labels": labels}, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def propagate_labels(
+    index: GraphIndex,
+    initial: Optional[Dict[str, str]] = None,
+    max_iterations: int = MAX_PROPAGATION_ITERATIONS
+) -> Dict[str, str]:
+    """
+    Assign each node to a community by weighted label propagation.
+
+    Each sweep moves every node to the label with the highest total edge
+    weight among its neighbours, keeping its current label on ties.
+    Nodes are visited in sorted order so results are deterministic.
+
+    Args:
+        index: Graph adjacency index
+        initial: Optional previous labels to warm-start from; other nodes
+            start in their own community
+        max_iterations: Maximum sweeps
+
+    Returns:
+        Dict mapping node ID to community label
+    """
+    initial = initial or {}
+    labels = {node_id: initial.get(node_id, node_id) for node_id in index.nodes}
+    order = sorted(index.nodes)
+
+    for _ in range(max_iterations):
+        changed = 0
+        for node_id in order:
+            weights: Dict[str, int] = {}
+            for neighbor_id, link in index.neighbors(node_id):
+                label = labels[neighbor_id]
+                weights[label] = weights.get(label, 0) + LINK_WEIGHTS.get(link.get("type"), 1)
+            if not weights:
+                continue
+
+            current = labels[node_id]
+            best_weight = max(weights.values())
+            if weights.get(current, 0) == best_weight:
+                continue
+            labels[node_id] = min(label for label, w in weights.items() if w == best_weight)
+            changed += 1
+
+        if changed == 0:
+            break
+
+    return labels
+
+
+def cluster_id_for(label: str) -> str:
+    """Stable cluster ID for a community label."""
+    return "cluster:" + hashlib.sha1(label.encode()).hexdigest()[:10]
+
+
+def _cluster_title(index: GraphIndex, members: List[str]) -> str:
+    entities = [m for m in members if index.nodes[m].get("type") == "entity"]
+    if entities:
+        top = max(entities, key=lambda m: (len(index.neighbors(m)), m))
+        return index.nodes[top].get("name", top)
+
+    tags = Counter(
+        tag.lower()
+        for m in members
+        for tag in index.nodes[m].get("tags", [])
+    )
+    if tags:
+        return tags.most_common(1)[0][0]
+
+    first = index.nodes[sorted(members)[0]]
+    return first.get("title") or first.get("name") or first["id"]
+
+
+def _build_clusters(index: GraphIndex, labels: Dict[str, str], version: int) -> Dict[str, Any]:
+    members_by_cluster: Dict[str, List[str]] = {}
+    node_cluster = {}
+    for node_id, label in labels.items():
+        cluster_id = cluster_id_for(label)
+        members_by_cluster.setdefault(cluster_id, []).append(node_id)
+        node_cluster[node_id] = cluster_id
+
+    clusters = []
+    for cluster_id, members in members_by_cluster.items():
+        members.sort(key=lambda m: (-len(index.neighbors(m)), m))
+        clusters.append({
+            "id": cluster_id,
+            "type": "cluster",
+            "title": _cluster_title(index, members),
+            "size": len(members),
+            "counts": dict(Counter(index.nodes[m].get("type") for m in members)),
+            "preview": [
+                {"id": m, "type": index.nodes[m].get("type"),
+                 "title": index.nodes[m].get("title") or index.nodes[m].get("name", "")}
+                for m in members[:CLUSTER_PREVIEW_MEMBERS]
+            ],
+        })
+    clusters.sort(key=lambda c: (-c["size"], c["id"]))
+
+    # Aggregate edges between clusters, counting each undirected edge once
+    inter: Dict[tuple, Dict[str, Any]] = {}
+    seen = set()
+    for node_id, edges in index.adjacency.items():
+        for neighbor_id, link in edges:
+            if id(link) in seen:
+                continue
+            seen.add(id(link))
+            a, b = node_cluster[node_id], node_cluster[neighbor_id]
+            if a == b:
+                continue
+            key = (a, b) if a < b else (b, a)
+            agg = inter.setdefault(key, {"source": key[0], "target": key[1], "type": "cluster", "weight": 0, "count": 0})
+            agg["weight"] += LINK_WEIGHTS.get(link.get("type"), 1)
+            agg["count"] += 1
+
+    return {
+        "version": version,
+        "clusters": clusters,
+        "links": sorted(inter.values(), key=lambda l: (-l["weight"], l["source"], l["target"])),
+        "node_clusters": node_cluster,
+        "members": members_by_cluster,
+    }
+
+
+def get_graph_clusters() -> Dict[str, Any]:
+    """
+    Get community clusters for the current graph version.
+
+    Returns:
+        Dict with version, clusters (super-nodes) and aggregated
+        inter-cluster links, plus internal node and member lookups
+    """
+    index, version = get_graph_index()
+    cache = _clusters_cache
+    if cache["version"] == version and cache["index"] is index:
+        return cache["result"]
+
+    persisted = load_cluster_labels()
+    if persisted.get("version") == version:
+        labels = persisted["labels"]
+        # Version state was reset since the labels were saved
+        if set(labels) != set(index.nodes):
+            labels = propagate_labels(index, labels)
+    else:
+        labels = propagate_labels(index, persisted.get("labels"))
+        save_cluster_labels(version, labels)
+
+    result = _build_clusters(index, labels, version)
+    cache.update({"version": version, "index": index, "result": result})
+    return result
+
+
+def get_cluster_overview() -> Dict[str, Any]:
+    """Get the clustered overview: super-nodes and inter-cluster links."""
+    result = get_graph_clusters()
+    clusters = result["clusters"]
+    return {
+        "version": result["version"],
+        "nodes": clusters,
+        "links": result["links"],
+        "stats": {
+            "clusters": len(clusters),
+            "nodes": sum(c["size"] for c in clusters),
+            "connections": len(result["links"]),
+        },
+    }
+
+
+def expand_cluster(cluster_id: str) -> Dict[str, Any]:
+    """
+    Expand one cluster into its member nodes.
+
+    Args:
+        cluster_id: Cluster ID from the overview
+
+    Returns:
+        Dict with member nodes, links among them, and links from members
+        to other clusters (as cluster super-node targets)
+    """
+    result = get_graph_clusters()
+    members = result["members"].get(cluster_id)
+    if members is None:
+        return {"error": "Cluster not found"}
+
+    index, _ = get_graph_index()
+    member_set = set(members)
+    node_clusters = result["node_clusters"]
+
+    links = []
+    external: Dict[tuple, Dict[str, Any]] = {}
+    seen = set()
+    for node_id in members:
+        for neighbor_id, link in index.neighbors(node_id):
+            if neighbor_id in member_set:
+                if id(link) not in seen:
+                    seen.add(id(link))
+                    links.append(link)
+                continue
+            key = (node_id, node_clusters[neighbor_id])
+            agg = external.setdefault(key, {"source": node_id, "target": key[1], "type": "cluster", "weight": 0, "count": 0})
+            agg["weight"] += LINK_WEIGHTS.get(link.get("type"), 1)
+            agg["count"] += 1
+
+    return {
+        "id": cluster_id,
+        "version": result["version"],
+        "nodes": [index.nodes[m] for m in members],
+        "links": links,
+        "external_links": list(external.values()),
+    }
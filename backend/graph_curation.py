@@ -19,14 +19,19 @@ from typing import List, Dict, Any, Optional, Tuple, Set
 from difflib import SequenceMatcher
 from collections import defaultdict
 
+import numpy as np
+
 from .knowledge_graph import (
     load_entities,
-    save_entities,
+    add_entity_relationship,
+    delete_entity_relationship,
     load_manual_links,
     save_manual_links,
     find_similar_entity,
     VALID_RELATIONSHIP_TYPES
 )
+from .co_occurrence import CoOccurrenceIndex, get_co_occurrence_index
+from .entity_dedup import get_duplicate_pairs
 from .openrouter import query_model
 from .settings import get_knowledge_graph_model
 
@@ -136,7 +141,7 @@ def find_duplicate_candidates(
     max_candidates: int = 50
 ) -> List[CurationCandidate]:
     """
-    Find potential duplicate entities using fuzzy string matching.
+    Find potential duplicate entities by trigram similarity of their names.
 
     Args:
         threshold: Minimum similarity threshold (0-1) for considering duplicates
@@ -149,87 +154,75 @@ def find_duplicate_candidates(
     curation_data = load_curation_data()
 
     entities = data.get("entities", {})
-    note_entities = data.get("note_entities", {})
     dismissed = set(curation_data.get("dismissed_candidates", []))
 
-    # Build entity list with mention counts
-    entity_list = []
-    for entity_id, entity in entities.items():
+    # Entity info with mention counts, in store order (candidate IDs follow it)
+    entity_info = {}
+    for position, (entity_id, entity) in enumerate(entities.items()):
         mention_count = len(entity.get("mentions", []))
         if mention_count > 0:  # Only consider entities with mentions
-            entity_list.append({
+            entity_info[entity_id] = {
                 "id": entity_id,
                 "name": entity.get("name", ""),
                 "type": entity.get("type", "concept"),
                 "mention_count": mention_count,
-                "normalized": normalize_for_comparison(entity.get("name", ""))
-            })
+                "normalized": normalize_for_comparison(entity.get("name", "")),
+                "position": position
+            }
 
     candidates = []
-    processed_pairs = set()
-
-    for i, e1 in enumerate(entity_list):
-        for e2 in entity_list[i + 1:]:
-            # Skip already processed pairs
-            pair_key = tuple(sorted([e1["id"], e2["id"]]))
-            if pair_key in processed_pairs:
-                continue
-            processed_pairs.add(pair_key)
-
-            # Calculate lexical similarity
-            lexical_sim = calculate_lexical_similarity(e1["normalized"], e2["normalized"])
-
-            # Also check normalized similarity
-            norm_sim = calculate_lexical_similarity(e1["name"], e2["name"])
-
-            # Combined similarity
-            similarity = max(lexical_sim, norm_sim)
-
-            if similarity >= threshold:
-                # Calculate confidence based on multiple factors
-                confidence = similarity * 0.6  # Base from similarity
-
-                # Boost if same type
-                if e1["type"] == e2["type"]:
-                    confidence += 0.15
-
-                # Boost if one is substring of other
-                if e1["normalized"] in e2["normalized"] or e2["normalized"] in e1["normalized"]:
-                    confidence += 0.1
-
-                # Boost if high mention count for both (more likely to be significant)
-                if e1["mention_count"] >= 2 and e2["mention_count"] >= 2:
-                    confidence += 0.1
-
-                confidence = min(confidence, 1.0)
-
-                # Generate candidate ID
-                candidate_id = f"dup_{e1['id']}_{e2['id']}"
-
-                # Skip dismissed candidates
-                if candidate_id in dismissed:
-                    continue
-
-                # Determine which entity should be canonical (more mentions)
-                if e1["mention_count"] >= e2["mention_count"]:
-                    canonical, merge_target = e1, e2
-                else:
-                    canonical, merge_target = e2, e1
-
-                candidate = CurationCandidate(
-                    id=candidate_id,
-                    rubric="duplicate",
-                    confidence=confidence,
-                    entities=[canonical["id"], merge_target["id"]],
-                    entity_names=[canonical["name"], merge_target["name"]],
-                    suggested_action="merge",
-                    reasoning=f"'{canonical['name']}' and '{merge_target['name']}' have {similarity:.0%} similarity and may refer to the same concept.",
-                    evidence=[
-                        {"type": "canonical", "entity_id": canonical["id"], "mention_count": canonical["mention_count"]},
-                        {"type": "merge_target", "entity_id": merge_target["id"], "mention_count": merge_target["mention_count"]}
-                    ]
-                )
-                candidates.append(candidate)
+
+    for id1, id2, similarity in get_duplicate_pairs(threshold):
+        if id1 not in entity_info or id2 not in entity_info:
+            continue
+        e1, e2 = entity_info[id1], entity_info[id2]
+        if e1["position"] > e2["position"]:
+            e1, e2 = e2, e1
+
+        # Calculate confidence based on multiple factors
+        confidence = similarity * 0.6  # Base from similarity
+
+        # Boost if same type
+        if e1["type"] == e2["type"]:
+            confidence += 0.15
+
+        # Boost if one is substring of other
+        if e1["normalized"] in e2["normalized"] or e2["normalized"] in e1["normalized"]:
+            confidence += 0.1
+
+        # Boost if high mention count for both (more likely to be significant)
+        if e1["mention_count"] >= 2 and e2["mention_count"] >= 2:
+            confidence += 0.1
+
+        confidence = min(confidence, 1.0)
+
+        # Generate candidate ID
+        candidate_id = f"dup_{e1['id']}_{e2['id']}"
+
+        # Skip dismissed candidates
+        if candidate_id in dismissed:
+            continue
+
+        # Determine which entity should be canonical (more mentions)
+        if e1["mention_count"] >= e2["mention_count"]:
+            canonical, merge_target = e1, e2
+        else:
+            canonical, merge_target = e2, e1
+
+        candidate = CurationCandidate(
+            id=candidate_id,
+            rubric="duplicate",
+            confidence=confidence,
+            entities=[canonical["id"], merge_target["id"]],
+            entity_names=[canonical["name"], merge_target["name"]],
+            suggested_action="merge",
+            reasoning=f"'{canonical['name']}' and '{merge_target['name']}' have {similarity:.0%} similarity and may refer to the same concept.",
+            evidence=[
+                {"type": "canonical", "entity_id": canonical["id"], "mention_count": canonical["mention_count"]},
+                {"type": "merge_target", "entity_id": merge_target["id"], "mention_count": merge_target["mention_count"]}
+            ]
+        )
+        candidates.append(candidate)
 
     # Sort by confidence descending
     candidates.sort(key=lambda c: -c.confidence)
@@ -248,14 +241,15 @@ def build_co_occurrence_matrix(entities: Dict, note_entities: Dict) -> Dict[str,
     Returns:
         Dict mapping entity_id -> {other_entity_id: count}
     """
-    co_occurrence = defaultdict(lambda: defaultdict(int))
+    index = CoOccurrenceIndex()
+    index.sync(note_entities)
+    stats = index.pair_stats()
 
-    for note_key, entity_ids in note_entities.items():
-        # Count co-occurrences for each pair in this note
-        for i, e1 in enumerate(entity_ids):
-            for e2 in entity_ids[i + 1:]:
-                co_occurrence[e1][e2] += 1
-                co_occurrence[e2][e1] += 1
+    co_occurrence = defaultdict(dict)
+    for a, b, count in zip(stats["a"].tolist(), stats["b"].tolist(), stats["count"].tolist()):
+        e1, e2 = index.entity_ids[a], index.entity_ids[b]
+        co_occurrence[e1][e2] = count
+        co_occurrence[e2][e1] = count
 
     return co_occurrence
 
@@ -266,7 +260,10 @@ def find_missing_relationship_candidates(
     model: Optional[str] = None
 ) -> List[CurationCandidate]:
     """
-    Find entity pairs that co-occur frequently but have no existing relationship.
+    Find entity pairs that are strongly associated but have no existing relationship.
+
+    Pairs must share at least min_co_occurrence notes and are ranked by
+    normalized PMI, so entities that appear everywhere do not dominate.
 
     Args:
         min_co_occurrence: Minimum number of co-occurrences to consider
@@ -280,7 +277,6 @@ def find_missing_relationship_candidates(
     curation_data = load_curation_data()
 
     entities = data.get("entities", {})
-    note_entities = data.get("note_entities", {})
     relationships = data.get("entity_relationships", [])
     dismissed = set(curation_data.get("dismissed_candidates", []))
 
@@ -290,73 +286,57 @@ def find_missing_relationship_candidates(
         pair = tuple(sorted([rel.get("source_entity_id"), rel.get("target_entity_id")]))
         existing_rels.add(pair)
 
-    # Build co-occurrence matrix
-    co_occurrence = build_co_occurrence_matrix(entities, note_entities)
+    index = get_co_occurrence_index()
+    stats = index.pair_stats(min_count=min_co_occurrence)
+
+    # Confidence from positive association (normalized PMI)
+    confidence = np.minimum(0.3 + 0.6 * np.clip(stats["npmi"], 0.0, 1.0), 0.9)
+
+    # Boost if both entities have high mention counts
+    mention_counts = np.array([len(entities.get(eid, {}).get("mentions", [])) for eid in index.entity_ids], dtype=np.int64)
+    both_frequent = (mention_counts[stats["a"]] >= 3) & (mention_counts[stats["b"]] >= 3)
+    confidence = np.minimum(confidence + 0.1 * both_frequent, 1.0)
 
     candidates = []
 
-    for e1_id, co_occurrences in co_occurrence.items():
-        e1 = entities.get(e1_id)
-        if not e1:
+    # Highest confidence first; each unordered pair appears once
+    for i in np.argsort(-confidence, kind="stable").tolist():
+        if len(candidates) >= max_candidates:
+            break
+        e1_id = index.entity_ids[stats["a"][i]]
+        e2_id = index.entity_ids[stats["b"][i]]
+        e1, e2 = entities.get(e1_id), entities.get(e2_id)
+        if not e1 or not e2:
             continue
 
-        for e2_id, count in co_occurrences.items():
-            if count < min_co_occurrence:
-                continue
-
-            e2 = entities.get(e2_id)
-            if not e2:
-                continue
-
-            # Check if relationship already exists
-            pair = tuple(sorted([e1_id, e2_id]))
-            if pair in existing_rels:
-                continue
-
-            # Generate candidate ID
-            candidate_id = f"rel_{e1_id}_{e2_id}"
-
-            # Skip dismissed candidates
-            if candidate_id in dismissed:
-                continue
-
-            # Skip if we already have this candidate (pairs are symmetric)
-            if any(c.id == candidate_id for c in candidates):
-                continue
-
-            # Calculate confidence based on co-occurrence count
-            # Higher co-occurrence = higher confidence
-            confidence = min(0.3 + (count - min_co_occurrence) * 0.1, 0.9)
-
-            # Boost if both entities have high mention counts
-            e1_mentions = len(e1.get("mentions", []))
-            e2_mentions = len(e2.get("mentions", []))
-            if e1_mentions >= 3 and e2_mentions >= 3:
-                confidence += 0.1
-            confidence = min(confidence, 1.0)
-
-            # Find shared notes for evidence
-            shared_notes = []
-            for note_key, entity_ids in note_entities.items():
-                if e1_id in entity_ids and e2_id in entity_ids:
-                    shared_notes.append(note_key)
-
-            candidate = CurationCandidate(
-                id=candidate_id,
-                rubric="missing_relationship",
-                confidence=confidence,
-                entities=[e1_id, e2_id],
-                entity_names=[e1.get("name", ""), e2.get("name", "")],
-                suggested_action="create_relationship",
-                reasoning=f"'{e1.get('name')}' and '{e2.get('name')}' appear together in {count} notes but have no relationship defined.",
-                evidence=[{"shared_notes": shared_notes[:5], "co_occurrence_count": count}]
-            )
-            candidates.append(candidate)
+        # Check if relationship already exists
+        if tuple(sorted([e1_id, e2_id])) in existing_rels:
+            continue
 
-    # Sort by confidence descending
-    candidates.sort(key=lambda c: -c.confidence)
+        # Generate candidate ID; skip dismissed candidates in either orientation
+        candidate_id = f"rel_{e1_id}_{e2_id}"
+        if candidate_id in dismissed or f"rel_{e2_id}_{e1_id}" in dismissed:
+            continue
 
-    return candidates[:max_candidates]
+        count = int(stats["count"][i])
+        candidate = CurationCandidate(
+            id=candidate_id,
+            rubric="missing_relationship",
+            confidence=float(confidence[i]),
+            entities=[e1_id, e2_id],
+            entity_names=[e1.get("name", ""), e2.get("name", "")],
+            suggested_action="create_relationship",
+            reasoning=f"'{e1.get('name')}' and '{e2.get('name')}' appear together in {count} notes but have no relationship defined.",
+            evidence=[{
+                "shared_notes": index.shared_notes(e1_id, e2_id, limit=5),
+                "co_occurrence_count": count,
+                "pmi": round(float(stats["pmi"][i]), 3),
+                "npmi": round(float(stats["npmi"][i]), 3)
+            }]
+        )
+        candidates.append(candidate)
+
+    return candidates
 
 
 # ============================================================================
@@ -381,12 +361,11 @@ def validate_existing_relationships(
     curation_data = load_curation_data()
 
     entities = data.get("entities", {})
-    note_entities = data.get("note_entities", {})
     relationships = data.get("entity_relationships", [])
     dismissed = set(curation_data.get("dismissed_candidates", []))
 
-    # Build co-occurrence matrix for validation
-    co_occurrence = build_co_occurrence_matrix(entities, note_entities)
+    # Co-occurrence counts for validation
+    co_occurrence = get_co_occurrence_index()
 
     candidates = []
 
@@ -416,7 +395,7 @@ def validate_existing_relationships(
         reasons = []
 
         # Check co-occurrence
-        co_count = co_occurrence.get(source_id, {}).get(target_id, 0)
+        co_count = co_occurrence.count(source_id, target_id)
         if co_count == 0:
             suspicion_score += 0.4
             reasons.append("entities never appear together in any note")
@@ -623,9 +602,7 @@ def execute_create_relationship(
     if relationship_type not in VALID_RELATIONSHIP_TYPES:
         return {"error": f"Invalid relationship type: {relationship_type}"}
 
-    data = load_entities()
-    entities = data.get("entities", {})
-    relationships = data.get("entity_relationships", [])
+    entities = load_entities().get("entities", {})
 
     source = entities.get(source_id)
     target = entities.get(target_id)
@@ -633,13 +610,6 @@ def execute_create_relationship(
     if not source or not target:
         return {"error": "Entity not found"}
 
-    # Check if relationship already exists
-    for rel in relationships:
-        if (rel.get("source_entity_id") == source_id and
-            rel.get("target_entity_id") == target_id and
-            rel.get("type") == relationship_type):
-            return {"error": "Relationship already exists"}
-
     # Create relationship
     rel_id = f"rel_cur_{uuid.uuid4().hex[:8]}"
     relationship = {
@@ -654,9 +624,8 @@ def execute_create_relationship(
         "manually_created": True
     }
 
-    relationships.append(relationship)
-    data["entity_relationships"] = relationships
-    save_entities(data)
+    if not add_entity_relationship(relationship):
+        return {"error": "Relationship already exists"}
 
     # Record in history
     curation_data = load_curation_data()
@@ -692,24 +661,11 @@ def execute_delete_relationship(
     Returns:
         Deleted relationship
     """
-    data = load_entities()
-    relationships = data.get("entity_relationships", [])
-
-    # Find and remove relationship
-    deleted = None
-    remaining = []
-    for rel in relationships:
-        if rel.get("id") == relationship_id:
-            deleted = rel
-        else:
-            remaining.append(rel)
+    deleted = delete_entity_relationship(relationship_id)
 
     if not deleted:
         return {"error": "Relationship not found"}
 
-    data["entity_relationships"] = remaining
-    save_entities(data)
-
     # Record in history
     curation_data = load_curation_data()
     curation_data["history"].append({
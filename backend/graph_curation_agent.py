@@ -11,14 +11,19 @@ The key insight: "Bitter Lesson" and "Bitter Lesson - Compute Scaling" are
 not merged.
 """
 
+import os
 import json
 import re
 import uuid
+import asyncio
+import hashlib
 import logging
+import threading
 from datetime import datetime
 from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 
+from .co_occurrence import get_co_occurrence_index
 from .openrouter import query_model
 from .settings import get_knowledge_graph_model
 from .knowledge_graph import (
@@ -47,6 +52,7 @@ class AgentDecision:
     reasoning: str
     relationship_type: Optional[str] = None  # For "related" decisions
     relationship_direction: Optional[str] = None  # "a_to_b", "b_to_a", "bidirectional"
+    source: str = "agent"  # "agent", "cache" or "fallback"
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -128,6 +134,19 @@ Respond in JSON format ONLY (no other text):
     "relationship_direction": "a_to_b|b_to_a|bidirectional or null"
 }}"""
 
+# Identifies the prompt that produced a cached decision; changing the
+# prompt invalidates earlier decisions
+PROMPT_VERSION = hashlib.sha1(ENTITY_ANALYSIS_PROMPT.encode()).hexdigest()[:8]
+
+# Entity pairs analyzed by the LLM at the same time (default and upper bound)
+AGENT_CONCURRENCY = 4
+MAX_AGENT_CONCURRENCY = 10
+
+# Cached decisions kept (oldest are pruned first)
+DECISION_CACHE_MAX_ENTRIES = 5000
+
+_decision_cache_lock = threading.Lock()
+
 
 def get_entity_contexts(entity: Dict[str, Any], max_contexts: int = 3) -> List[str]:
     """Extract sample contexts from entity mentions."""
@@ -294,6 +313,7 @@ def _fallback_decision(entity_a: Dict[str, Any], entity_b: Dict[str, Any]) -> Ag
             decision="same",
             confidence=0.95,
             reasoning="Names are identical (ignoring spacing)",
+            source="fallback",
         )
 
     # One is substring of other - likely RELATED not SAME
@@ -304,6 +324,7 @@ def _fallback_decision(entity_a: Dict[str, Any], entity_b: Dict[str, Any]) -> Ag
             reasoning="One entity name contains the other, likely a specialization",
             relationship_type="specialization_of",
             relationship_direction="b_to_a" if name_a in name_b else "a_to_b",
+            source="fallback",
         )
 
     # High similarity but not identical - conservative approach
@@ -313,6 +334,7 @@ def _fallback_decision(entity_a: Dict[str, Any], entity_b: Dict[str, Any]) -> Ag
             decision="same",
             confidence=similarity * 0.8,
             reasoning=f"Very high lexical similarity ({similarity:.0%})",
+            source="fallback",
         )
     elif similarity >= 0.7:
         # Previously this would suggest merge, now we're more conservative
@@ -321,45 +343,73 @@ def _fallback_decision(entity_a: Dict[str, Any], entity_b: Dict[str, Any]) -> Ag
             confidence=0.5,
             reasoning=f"Moderate lexical similarity ({similarity:.0%}), needs manual review",
             relationship_type=None,  # User should choose
+            source="fallback",
         )
 
     return AgentDecision(
         decision="unrelated",
         confidence=0.4,
         reasoning="Insufficient similarity for automatic classification",
+        source="fallback",
     )
 
 
-async def analyze_duplicate_candidates_with_agent(
+def _enhance_candidate(candidate: CurationCandidate, decision: AgentDecision) -> EnhancedCurationCandidate:
+    """Combine a base candidate with the agent's decision."""
+    return EnhancedCurationCandidate(
+        id=candidate.id,
+        rubric=candidate.rubric,
+        confidence=decision.confidence,  # Override with agent confidence
+        entities=candidate.entities,
+        entity_names=candidate.entity_names,
+        suggested_action=_map_decision_to_action(decision),
+        reasoning=decision.reasoning,
+        evidence=candidate.evidence,
+        relationship_type=decision.relationship_type,
+        created_at=candidate.created_at,
+        agent_decision=decision.to_dict(),
+        agent_reasoning=decision.reasoning,
+        agent_confidence=decision.confidence,
+        suggested_relationship_type=decision.relationship_type,
+        suggested_relationship_direction=decision.relationship_direction,
+        shared_contexts=[],  # Could populate from shared notes
+    )
+
+
+async def stream_duplicate_analysis(
     candidates: List[CurationCandidate],
     model: Optional[str] = None,
-    batch_size: int = 10
-) -> List[EnhancedCurationCandidate]:
+    concurrency: int = AGENT_CONCURRENCY
+) -> AsyncIterator[Tuple[int, EnhancedCurationCandidate]]:
     """
-    Enhance duplicate candidates with LLM analysis.
+    Analyze duplicate candidates with the LLM, yielding results as they arrive.
 
-    Processes candidates in batches, building context as decisions are made.
+    Pairs whose entities and prompt are unchanged since a previous analysis
+    are answered from the decision cache and yielded first; the rest are
+    analyzed with at most `concurrency` requests in flight and yielded in
+    completion order. New LLM decisions are added to the cache (fallback
+    decisions are not).
 
     Args:
         candidates: List of CurationCandidate objects from find_duplicate_candidates
         model: Model to use for analysis
-        batch_size: Number of candidates per batch
+        concurrency: Maximum number of simultaneous LLM requests
+            (clamped to 1-MAX_AGENT_CONCURRENCY)
 
-    Returns:
-        List of EnhancedCurationCandidate with agent decisions
+    Yields:
+        (index into candidates, EnhancedCurationCandidate) tuples
     """
     if model is None:
         model = get_knowledge_graph_model()
 
     data = load_entities()
     entities = data.get("entities", {})
-    note_entities = data.get("note_entities", {})
     relationships = data.get("entity_relationships", [])
+    co_occurrence = get_co_occurrence_index()
+    cached_decisions = load_decision_cache()["entries"]
 
-    enhanced_candidates = []
-    decided_relationships = []  # Track for context in subsequent decisions
-
-    for candidate in candidates:
+    pending = []
+    for position, candidate in enumerate(candidates):
         if len(candidate.entities) < 2:
             continue
 
@@ -373,7 +423,7 @@ async def analyze_duplicate_candidates_with_agent(
             continue
 
         # Find shared notes
-        shared_notes = find_shared_notes(entity_a_id, entity_b_id, note_entities)
+        shared_notes = co_occurrence.shared_notes(entity_a_id, entity_b_id)
 
         # Get existing relationships for context
         existing_rels = (
@@ -381,49 +431,73 @@ async def analyze_duplicate_candidates_with_agent(
             get_existing_relationships_for_entity(entity_b_id, relationships, entities)
         )
 
-        # Add recently decided relationships for context
-        existing_rels.extend(decided_relationships[-5:])
+        content_hash = entity_pair_content_hash(entity_a, entity_b, len(shared_notes), existing_rels)
+        cache_key = decision_cache_key(entity_a_id, entity_b_id, content_hash, model)
+        cached = cached_decisions.get(cache_key)
+        if cached:
+            decision = AgentDecision(**{**cached["decision"], "source": "cache"})
+            yield position, _enhance_candidate(candidate, decision)
+        else:
+            pending.append((position, candidate, entity_a, entity_b, shared_notes, existing_rels, cache_key))
+
+    if not pending:
+        return
+
+    semaphore = asyncio.Semaphore(max(1, min(MAX_AGENT_CONCURRENCY, concurrency)))
+
+    async def analyze(item):
+        _, _, entity_a, entity_b, shared_notes, existing_rels, _ = item
+        async with semaphore:
+            decision = await analyze_entity_pair(
+                entity_a,
+                entity_b,
+                shared_notes=shared_notes,
+                existing_relationships=existing_rels,
+                model=model,
+            )
+        return item, decision
+
+    tasks = [asyncio.create_task(analyze(item)) for item in pending]
+    new_decisions = {}
+    try:
+        for completed in asyncio.as_completed(tasks):
+            item, decision = await completed
+            position, candidate, *_, cache_key = item
+            if decision.source == "agent":
+                new_decisions[cache_key] = {
+                    "decision": decision.to_dict(),
+                    "model": model,
+                    "cached_at": datetime.utcnow().isoformat(),
+                }
+            yield position, _enhance_candidate(candidate, decision)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if new_decisions:
+            store_cached_decisions(new_decisions)
 
-        # Analyze with agent
-        decision = await analyze_entity_pair(
-            entity_a,
-            entity_b,
-            shared_notes=shared_notes,
-            existing_relationships=existing_rels,
-            model=model,
-        )
 
-        # Create enhanced candidate
-        enhanced = EnhancedCurationCandidate(
-            id=candidate.id,
-            rubric=candidate.rubric,
-            confidence=decision.confidence,  # Override with agent confidence
-            entities=candidate.entities,
-            entity_names=candidate.entity_names,
-            suggested_action=_map_decision_to_action(decision),
-            reasoning=decision.reasoning,
-            evidence=candidate.evidence,
-            relationship_type=decision.relationship_type,
-            created_at=candidate.created_at,
-            agent_decision=decision.to_dict(),
-            agent_reasoning=decision.reasoning,
-            agent_confidence=decision.confidence,
-            suggested_relationship_type=decision.relationship_type,
-            suggested_relationship_direction=decision.relationship_direction,
-            shared_contexts=[],  # Could populate from shared notes
-        )
+async def analyze_duplicate_candidates_with_agent(
+    candidates: List[CurationCandidate],
+    model: Optional[str] = None,
+    concurrency: int = AGENT_CONCURRENCY
+) -> List[EnhancedCurationCandidate]:
+    """
+    Enhance duplicate candidates with LLM analysis.
 
-        enhanced_candidates.append(enhanced)
+    Args:
+        candidates: List of CurationCandidate objects from find_duplicate_candidates
+        model: Model to use for analysis
+        concurrency: Maximum number of simultaneous LLM requests
 
-        # Track relationship decisions for context
-        if decision.decision == "related" and decision.relationship_type:
-            decided_relationships.append({
-                "source": entity_a.get("name", ""),
-                "target": entity_b.get("name", ""),
-                "type": decision.relationship_type,
-            })
+    Returns:
+        List of EnhancedCurationCandidate with agent decisions, in candidate order
+    """
+    results = {}
+    async for position, enhanced in stream_duplicate_analysis(candidates, model=model, concurrency=concurrency):
+        results[position] = enhanced
 
-    return enhanced_candidates
+    return [results[position] for position in sorted(results)]
 
 
 def _map_decision_to_action(decision: AgentDecision) -> str:
@@ -484,6 +558,80 @@ def save_decision_history(data: Dict[str, Any]):
         json.dump(data, f, indent=2)
 
 
+# =============================================================================
+# Decision Cache
+# =============================================================================
+
+def get_decision_cache_path() -> str:
+    """Get path to the agent decision cache file."""
+    from .graph_curation import CURATION_DIR
+    return os.path.join(CURATION_DIR, "agent_decision_cache.json")
+
+
+def entity_pair_content_hash(
+    entity_a: Dict[str, Any],
+    entity_b: Dict[str, Any],
+    shared_note_count: int,
+    existing_relationships: List[Dict[str, Any]]
+) -> str:
+    """Hash of everything about an entity pair that goes into the analysis prompt."""
+    def content(entity: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": entity.get("name", ""),
+            "type": entity.get("type", "concept"),
+            "mentions": len(entity.get("mentions", [])),
+            "contexts": get_entity_contexts(entity),
+        }
+
+    payload = json.dumps(
+        [content(entity_a), content(entity_b), shared_note_count, existing_relationships[:5]],
+        sort_keys=True
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def decision_cache_key(entity_a_id: str, entity_b_id: str, content_hash: str, model: str) -> str:
+    """Cache key for a decision: entity pair, pair content, model and prompt version."""
+    return f"{entity_a_id}|{entity_b_id}|{content_hash}|{model}|{PROMPT_VERSION}"
+
+
+def load_decision_cache() -> Dict[str, Any]:
+    """Load cached agent decisions."""
+    path = get_decision_cache_path()
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Failed to load agent decision cache: {e}")
+    return {"entries": {}, "updated_at": None}
+
+
+def store_cached_decisions(entries: Dict[str, Dict[str, Any]]):
+    """
+    Add decisions to the persistent cache.
+
+    Merges with the cache on disk (other runs may have added entries) and
+    prunes the oldest entries beyond DECISION_CACHE_MAX_ENTRIES.
+    """
+    from .graph_curation import ensure_curation_dir
+
+    with _decision_cache_lock:
+        ensure_curation_dir()
+        cache = load_decision_cache()
+        cache["entries"].update(entries)
+        if len(cache["entries"]) > DECISION_CACHE_MAX_ENTRIES:
+            newest = sorted(cache["entries"].items(), key=lambda kv: kv[1].get("cached_at") or "", reverse=True)
+            cache["entries"] = dict(newest[:DECISION_CACHE_MAX_ENTRIES])
+        cache["updated_at"] = datetime.utcnow().isoformat()
+
+        path = get_decision_cache_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, path)
+
+
 def record_decision_outcome(
     candidate_id: str,
     agent_decision: str,
@@ -583,7 +731,8 @@ def get_agent_accuracy_stats() -> Dict[str, Any]:
 async def find_duplicate_candidates_with_agent(
     threshold: float = 0.7,
     max_candidates: int = 50,
-    model: Optional[str] = None
+    model: Optional[str] = None,
+    concurrency: int = AGENT_CONCURRENCY
 ) -> List[EnhancedCurationCandidate]:
     """
     Find duplicate candidates and enhance with LLM analysis.
@@ -599,9 +748,28 @@ async def find_duplicate_candidates_with_agent(
     enhanced = await analyze_duplicate_candidates_with_agent(
         base_candidates[:max_candidates],
         model=model,
+        concurrency=concurrency,
     )
 
     # Sort by agent confidence
     enhanced.sort(key=lambda c: -c.agent_confidence if c.agent_confidence else 0)
 
     return enhanced[:max_candidates]
+
+
+async def stream_duplicate_candidates_with_agent(
+    threshold: float = 0.7,
+    max_candidates: int = 50,
+    model: Optional[str] = None,
+    concurrency: int = AGENT_CONCURRENCY
+) -> AsyncIterator[EnhancedCurationCandidate]:
+    """
+    Like find_duplicate_candidates_with_agent, but yields each candidate as
+    soon as its decision is available (cached decisions first).
+    """
+    from .graph_curation import find_duplicate_candidates
+
+    base_candidates = find_duplicate_candidates(threshold=threshold, max_candidates=max_candidates)
+
+    async for _, enhanced in stream_duplicate_analysis(base_candidates, model=model, concurrency=concurrency):
+        yield enhanced
@@ -0,0 +1,237 @@
+"""Shortest-path distances over the knowledge graph.
+
+Hop distances over the graph_index adjacency, where every link type counts
+as one hop. Distances come from breadth-first search over a compressed
+adjacency array, one frontier at a time. BFS distances from a fixed set of
+landmark nodes (the best-connected nodes plus a spread of notes) are
+cached per graph build. On large graphs these landmark distances bound
+the distance between any two nodes, so queries need no full search, and
+they provide the sample over which average path lengths are estimated.
+
+Bridge candidates (a proposed note linking some existing notes) are scored
+by how far apart those notes currently are and by how much the bridge
+would shorten paths across the graph, so bridges can be prioritised by
+structural impact.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import graph_index
+
+logger = logging.getLogger(__name__)
+
+# Landmarks: highest-degree nodes, plus notes spread evenly by ID
+LANDMARK_HUBS = 16
+LANDMARK_NOTES = 16
+
+# Above this many nodes, distance() answers from landmark bounds
+EXACT_DISTANCE_MAX_NODES = 50000
+
+_distance_cache: Dict[str, Any] = {"index": None, "distances": None}
+
+
+class DistanceIndex:
+    """Compressed adjacency for one graph build, with cached landmark distances."""
+
+    def __init__(self, index: graph_index.GraphIndex):
+        self.ids: List[str] = list(index.nodes)
+        self.rows: Dict[str, int] = {node_id: i for i, node_id in enumerate(self.ids)}
+        self.types = [index.nodes[node_id].get("type") for node_id in self.ids]
+
+        neighbors = [
+            sorted({self.rows[neighbor_id] for neighbor_id, _ in index.neighbors(node_id)})
+            for node_id in self.ids
+        ]
+        self.degree = np.asarray([len(n) for n in neighbors], dtype=np.int64)
+        self.indptr = np.zeros(len(self.ids) + 1, dtype=np.int64)
+        np.cumsum(self.degree, out=self.indptr[1:])
+        self.indices = np.asarray([row for n in neighbors for row in n], dtype=np.int64)
+
+        self._landmarks: Optional[np.ndarray] = None
+        self._landmark_distances: Optional[np.ndarray] = None
+
+    def bfs(self, sources: List[int]) -> np.ndarray:
+        """
+        Hop distances from a set of source rows (multi-source BFS).
+
+        Returns:
+            int32 array over all nodes, -1 where unreachable
+        """
+        distances = np.full(len(self.ids), -1, dtype=np.int32)
+        frontier = np.unique(np.asarray(sources, dtype=np.int64))
+        distances[frontier] = 0
+        depth = 0
+        while frontier.size:
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+            # Positions of every frontier node's neighbours in `indices`
+            offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            neighbors = self.indices[offsets + np.arange(total)]
+            neighbors = np.unique(neighbors[distances[neighbors] < 0])
+            depth += 1
+            distances[neighbors] = depth
+            frontier = neighbors
+        return distances
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """Rows of the landmark nodes."""
+        if self._landmarks is None:
+            by_degree = sorted(range(len(self.ids)), key=lambda i: (-self.degree[i], self.ids[i]))
+            hubs = by_degree[:LANDMARK_HUBS]
+            notes = sorted(i for i, node_type in enumerate(self.types) if node_type == "note")
+            stride = max(1, len(notes) // LANDMARK_NOTES)
+            spread = notes[::stride][:LANDMARK_NOTES]
+            self._landmarks = np.asarray(sorted(set(hubs) | set(spread)), dtype=np.int64)
+        return self._landmarks
+
+    @property
+    def landmark_distances(self) -> np.ndarray:
+        """(landmarks x nodes) hop distances, -1 where unreachable."""
+        if self._landmark_distances is None:
+            if len(self.landmarks):
+                self._landmark_distances = np.vstack([self.bfs([row]) for row in self.landmarks])
+            else:
+                self._landmark_distances = np.zeros((0, len(self.ids)), dtype=np.int32)
+        return self._landmark_distances
+
+    def distance(self, source: str, target: str) -> Optional[int]:
+        """
+        Hop distance between two nodes.
+
+        Exact on graphs up to EXACT_DISTANCE_MAX_NODES nodes; above that,
+        the shortest route through a landmark (an upper bound, exact when
+        either node is a landmark or lies on a shortest path through one).
+
+        Returns:
+            Distance, or None if either node is missing or they are not connected
+        """
+        a, b = self.rows.get(source), self.rows.get(target)
+        if a is None or b is None:
+            return None
+
+        if len(self.ids) <= EXACT_DISTANCE_MAX_NODES:
+            distance = int(self.bfs([a])[b])
+            return distance if distance >= 0 else None
+
+        to_a = self.landmark_distances[:, a]
+        to_b = self.landmark_distances[:, b]
+        reachable = (to_a >= 0) & (to_b >= 0)
+        if not reachable.any():
+            return None
+        return int((to_a[reachable] + to_b[reachable]).min())
+
+
+def get_distance_index() -> DistanceIndex:
+    """Get the distance index for the current graph, rebuilt only when it changes."""
+    index, _ = graph_index.get_graph_index()
+    if _distance_cache["index"] is not index:
+        _distance_cache["distances"] = DistanceIndex(index)
+        _distance_cache["index"] = index
+    return _distance_cache["distances"]
+
+
+def score_bridge(note_ids: List[str]) -> Dict[str, Any]:
+    """
+    Score a bridge note that would link the given notes.
+
+    The bridge is modelled as a new node adjacent to each of the notes.
+    Its effect is estimated over the sample of landmarks plus the notes
+    themselves: the mean shortest-path length between sample pairs before
+    and after adding it. Disconnected pairs count as one hop longer than
+    the longest sampled path, so bridges that join components score high.
+
+    Args:
+        note_ids: Node IDs of the notes the bridge connects
+
+    Returns:
+        Dict with current pairwise distances (None when unconnected), the
+        largest of them, mean sampled path length before and after, the
+        reduction, and structural_impact (relative reduction, 0-1)
+    """
+    distances = get_distance_index()
+    rows = list(dict.fromkeys(distances.rows[n] for n in note_ids if n in distances.rows))
+    result: Dict[str, Any] = {
+        "notes": [distances.ids[row] for row in rows],
+        "pairwise": {},
+        "distance": None,
+        "connected": False,
+        "path_length_before": None,
+        "path_length_after": None,
+        "path_length_reduction": 0.0,
+        "structural_impact": 0.0,
+    }
+    if len(rows) < 2:
+        return result
+
+    from_notes = np.vstack([distances.bfs([row]) for row in rows])
+
+    pairwise = []
+    for i in range(len(rows)):
+        for j in range(i + 1, len(rows)):
+            d = int(from_notes[i, rows[j]])
+            pairwise.append(d)
+            result["pairwise"][f"{distances.ids[rows[i]]}|{distances.ids[rows[j]]}"] = d if d >= 0 else None
+    result["connected"] = min(pairwise) >= 0
+    result["distance"] = max(pairwise) if result["connected"] else None
+
+    # Distances among the sample: landmark rows and note rows, restricted to sample columns
+    landmark_rows = distances.landmarks.tolist()
+    keep = [k for k, row in enumerate(landmark_rows) if row not in rows]
+    sample = [landmark_rows[k] for k in keep] + rows
+    matrix = np.vstack([distances.landmark_distances[keep], from_notes])[:, sample].astype(np.float64)
+
+    unreachable = matrix < 0
+    penalty = (matrix.max() if (~unreachable).any() else 0) + 1
+    matrix[unreachable] = penalty
+
+    # Through the bridge: one hop to the nearest bridged note from each end
+    reach = from_notes[:, sample].astype(np.float64)
+    reach[reach < 0] = np.inf
+    to_bridge = reach.min(axis=0) + 1
+    through = np.minimum(to_bridge[:, None] + to_bridge[None, :], penalty)
+    after = np.minimum(matrix, through)
+
+    upper = np.triu_indices(len(sample), k=1)
+    before_mean = float(matrix[upper].mean())
+    after_mean = float(after[upper].mean())
+    result["path_length_before"] = round(before_mean, 3)
+    result["path_length_after"] = round(after_mean, 3)
+    result["path_length_reduction"] = round(before_mean - after_mean, 3)
+    result["structural_impact"] = round((before_mean - after_mean) / before_mean, 4) if before_mean else 0.0
+    return result
+
+
+def rank_bridges(
+    candidates: List[Dict[str, Any]],
+    notes_key: str = "source_notes"
+) -> List[Dict[str, Any]]:
+    """
+    Attach graph distance scores to bridge candidates and order them by impact.
+
+    Candidates keep their incoming (model-judged) order among equal
+    impact. If the graph cannot be loaded, they are returned unscored in
+    their original order.
+
+    Args:
+        candidates: Bridge suggestions, each listing the notes it links
+        notes_key: Key of the note ID list in each candidate
+
+    Returns:
+        The candidates, each with a "graph_distance" score dict, highest
+        structural impact first
+    """
+    try:
+        for candidate in candidates:
+            candidate["graph_distance"] = score_bridge(candidate.get(notes_key) or [])
+    except Exception as e:
+        logger.warning(f"Could not score bridge candidates by graph distance: {e}")
+        return candidates
+
+    return sorted(candidates, key=lambda c: -c["graph_distance"]["structural_impact"])
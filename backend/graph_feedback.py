@@ -8,17 +8,24 @@ Features:
 - Extraction confidence calibration (accuracy vs stated confidence)
 - Rejection reason analysis
 - Prompt refinement recommendations
+
+Feedback events are stored in append-only columnar logs; the analyses
+read counters built from them with vectorized group-bys and cached by
+log offset, so they stay fast as history grows.
 """
 
+import copy
 import json
 import os
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
-from collections import defaultdict
 from pathlib import Path
 
+import numpy as np
+
 from .knowledge_graph import load_entities, save_entities
+from .feedback_log import ColumnarLog, group_counts
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +33,60 @@ logger = logging.getLogger(__name__)
 DATA_DIR = os.environ.get("DATA_DIR", "data")
 FEEDBACK_DIR = os.path.join(DATA_DIR, "feedback")
 
+RECORD_KINDS = ("entity_corrections", "relationship_corrections", "decision_outcomes")
+
+# Columns of each feedback event log. "name_correction" is derived when an
+# entity correction is recorded (see _classify_name_correction).
+FEEDBACK_SCHEMAS = {
+    "entity_corrections": {
+        "entity_id": "category",
+        "action": "category",
+        "original_name": "category",
+        "original_type": "category",
+        "corrected_name": "category",
+        "corrected_type": "category",
+        "rejection_reason": "category",
+        "extraction_confidence": "float",
+        "extraction_model": "category",
+        "name_correction": "category",
+        "recorded_at": "int",
+    },
+    "relationship_corrections": {
+        "relationship_id": "category",
+        "action": "category",
+        "original_type": "category",
+        "corrected_type": "category",
+        "rejection_reason": "category",
+        "source_entity_name": "category",
+        "target_entity_name": "category",
+        "recorded_at": "int",
+    },
+    "decision_outcomes": {
+        "candidate_id": "category",
+        "agent_decision": "category",
+        "user_action": "category",
+        "user_agreed": "bool",
+        "entity_a_name": "category",
+        "entity_b_name": "category",
+        "agent_confidence": "float",
+        "override_reason": "category",
+        "recorded_at": "int",
+    },
+}
+
+CONFIDENCE_BRACKETS = ("0.0-0.5", "0.5-0.7", "0.7-0.85", "0.85-0.95", "0.95-1.0", "unknown")
+CONFIDENCE_BRACKET_EDGES = np.array([0.5, 0.7, 0.85, 0.95])
+
+# recorded_at is logged as microseconds since this (naive UTC) epoch
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Open logs per feedback directory
+_feedback_logs: Dict[str, Dict[str, ColumnarLog]] = {}
+
+# Counters computed up to the given log offsets
+_counters_cache: Dict[str, Any] = {"directory": None, "offsets": None, "counters": None}
+
 
 def ensure_feedback_dir():
     """Ensure the feedback directory exists."""
@@ -33,35 +94,368 @@ def ensure_feedback_dir():
 
 
 def get_feedback_path() -> str:
-    """Get the path to the feedback data file."""
+    """Get the path to the legacy feedback data file (imported into the log)."""
     return os.path.join(FEEDBACK_DIR, "feedback_data.json")
 
 
-def load_feedback_data() -> Dict[str, Any]:
-    """Load feedback data from storage."""
-    ensure_feedback_dir()
+def get_feedback_logs() -> Dict[str, ColumnarLog]:
+    """Get the event log for each kind of feedback record."""
+    logs = _feedback_logs.get(FEEDBACK_DIR)
+    if logs is None:
+        ensure_feedback_dir()
+        log_dir = os.path.join(FEEDBACK_DIR, "log")
+        logs = {kind: ColumnarLog(log_dir, kind, FEEDBACK_SCHEMAS[kind]) for kind in RECORD_KINDS}
+        _import_legacy_feedback(logs)
+        _feedback_logs[FEEDBACK_DIR] = logs
+    return logs
+
+
+def _to_log_row(kind: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a feedback record to a log row."""
+    row = dict(record)
+    recorded_at = record.get("recorded_at")
+    row["recorded_at"] = (datetime.fromisoformat(recorded_at) - _EPOCH) // _MICROSECOND if recorded_at else 0
+
+    if kind == "entity_corrections" and record.get("action") == "correct":
+        orig_name = record.get("original_name", "")
+        corr_name = record.get("corrected_name", "")
+        if orig_name and corr_name:
+            row["name_correction"] = _classify_name_correction(orig_name, corr_name)
+    return row
+
+
+def _from_log_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a log row back to a feedback record."""
+    record = dict(row)
+    record.pop("name_correction", None)
+    micros = row.get("recorded_at")
+    record["recorded_at"] = (_EPOCH + micros * _MICROSECOND).isoformat() if micros else None
+    return record
+
+
+def _import_legacy_feedback(logs: Dict[str, ColumnarLog]):
+    """Move records from the old JSON feedback file into empty logs."""
     path = get_feedback_path()
+    if not os.path.exists(path) or any(log.offset() for log in logs.values()):
+        return
 
-    if os.path.exists(path):
-        with open(path, 'r') as f:
-            return json.load(f)
+    with open(path, 'r') as f:
+        legacy = json.load(f)
 
+    for kind in RECORD_KINDS:
+        records = legacy.get(kind, [])
+        logs[kind].append([_to_log_row(kind, record) for record in records])
+
+    os.replace(path, path + ".imported")
+    logger.info(f"Imported legacy feedback records into the feedback log: {path}")
+
+
+def load_feedback_data() -> Dict[str, Any]:
+    """Load every feedback record from the logs."""
+    logs = get_feedback_logs()
     return {
-        "entity_corrections": [],
-        "relationship_corrections": [],
-        "decision_outcomes": [],  # For agentic structure review
-        "updated_at": None,
+        kind: [_from_log_row(row) for row in logs[kind].records()]
+        for kind in RECORD_KINDS
     }
 
 
-def save_feedback_data(data: Dict[str, Any]):
-    """Save feedback data to storage."""
-    ensure_feedback_dir()
-    data["updated_at"] = datetime.utcnow().isoformat()
+def _record_feedback(kind: str, record: Dict[str, Any]):
+    """Append a feedback record to its log."""
+    get_feedback_logs()[kind].append([_to_log_row(kind, record)])
 
-    path = get_feedback_path()
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=2)
+
+# =============================================================================
+# Feedback Counters
+# =============================================================================
+
+def empty_feedback_counters() -> Dict[str, Any]:
+    """Counters for an empty feedback store."""
+    return {
+        "entity_types": {},
+        "relationships": {
+            "total": 0,
+            "validated": 0,
+            "type_corrected": 0,
+            "rejected": 0,
+            "rejection_reasons": {},
+            "type_corrections": {},
+        },
+        "confidence_brackets": {
+            bracket: {"total": 0, "validated": 0}
+            for bracket in CONFIDENCE_BRACKETS
+        },
+        "decisions": {
+            "total": 0,
+            "agreed": 0,
+            "by_decision": {},
+            "override_reasons": {},
+        },
+        "records": {kind: 0 for kind in RECORD_KINDS},
+    }
+
+
+def _labels(log: ColumnarLog, column: str, default: Optional[str] = None) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Map a category column's codes to (optionally defaulted) labels.
+
+    Returns:
+        (remap, labels): remap[code] is the index into labels
+    """
+    labels: List[Any] = []
+    index: Dict[Any, int] = {}
+    remap = []
+    for value in log.categories(column):
+        if default is not None:
+            value = value or default
+        if value not in index:
+            index[value] = len(labels)
+            labels.append(value)
+        remap.append(index[value])
+    return np.asarray(remap, dtype=np.int64), labels
+
+
+def _add_counts(table: Dict[Any, int], labels: List[Any], keys: np.ndarray, counts: np.ndarray):
+    for key, count in zip(keys.tolist(), counts.tolist()):
+        table[labels[key]] = table.get(labels[key], 0) + count
+
+
+def _aggregate_entity_corrections(log: ColumnarLog, start: int, stop: int, counters: Dict[str, Any]):
+    """Add entity correction rows [start, stop) to the counters."""
+    columns = log.read(start, stop)
+    if not len(columns["action"]):
+        return
+
+    type_remap, type_labels = _labels(log, "original_type", "unknown")
+    action_labels = log.categories("action")
+    types = type_remap[columns["original_type"]]
+    actions = columns["action"].astype(np.int64)
+    num_actions = len(action_labels)
+
+    def type_stats(type_index):
+        return counters["entity_types"].setdefault(type_labels[type_index], {
+            "total": 0,
+            "actions": {},
+            "corrections": {},
+            "rejections": {},
+        })
+
+    keys, counts = group_counts(types)
+    for type_index, count in zip(keys.tolist(), counts.tolist()):
+        type_stats(type_index)["total"] += count
+
+    keys, counts = group_counts(types * num_actions + actions)
+    for key, count in zip(keys.tolist(), counts.tolist()):
+        actions_table = type_stats(key // num_actions)["actions"]
+        label = action_labels[key % num_actions]
+        actions_table[label] = actions_table.get(label, 0) + count
+
+    is_action = {
+        action: np.isin(actions, [code for code, label in enumerate(action_labels) if label == action])
+        for action in ("correct", "reject")
+    }
+
+    # Correction patterns: name correction class, then type change, per row
+    correct_rows = np.flatnonzero(is_action["correct"])
+    name_classes = log.categories("name_correction")
+    name_codes = columns["name_correction"][correct_rows]
+    has_name = np.array([bool(name_classes[code]) for code in name_codes.tolist()], dtype=bool)
+
+    corrected_remap, corrected_labels = _labels(log, "corrected_type")
+    corrected = corrected_remap[columns["corrected_type"][correct_rows]]
+    row_types = types[correct_rows]
+    corrected_names = np.array([corrected_labels[i] or "" for i in corrected.tolist()], dtype=object)
+    original_names = np.array([type_labels[i] for i in row_types.tolist()], dtype=object)
+    has_type_change = (corrected_names != "") & (corrected_names != original_names)
+
+    pattern_labels = list(name_classes)
+    type_change_keys = row_types[has_type_change] * len(corrected_labels) + corrected[has_type_change]
+    change_keys, change_index = np.unique(type_change_keys, return_inverse=True)
+    for key in change_keys.tolist():
+        pattern_labels.append(f"type:{type_labels[key // len(corrected_labels)]}->{corrected_labels[key % len(corrected_labels)]}")
+
+    order = np.concatenate([correct_rows[has_name] * 2, correct_rows[has_type_change] * 2 + 1])
+    pattern_types = np.concatenate([row_types[has_name], row_types[has_type_change]])
+    patterns = np.concatenate([name_codes[has_name].astype(np.int64), len(name_classes) + change_index.ravel()])
+    sort = np.argsort(order, kind="stable")
+    keys, counts = group_counts(pattern_types[sort] * len(pattern_labels) + patterns[sort])
+    for key, count in zip(keys.tolist(), counts.tolist()):
+        table = type_stats(key // len(pattern_labels))["corrections"]
+        label = pattern_labels[key % len(pattern_labels)]
+        table[label] = table.get(label, 0) + count
+
+    # Rejection reasons
+    reject_rows = np.flatnonzero(is_action["reject"])
+    reason_remap, reason_labels = _labels(log, "rejection_reason", "unspecified")
+    reasons = reason_remap[columns["rejection_reason"][reject_rows]]
+    keys, counts = group_counts(types[reject_rows] * len(reason_labels) + reasons)
+    for key, count in zip(keys.tolist(), counts.tolist()):
+        table = type_stats(key // len(reason_labels))["rejections"]
+        label = reason_labels[key % len(reason_labels)]
+        table[label] = table.get(label, 0) + count
+
+    # Calibration histogram
+    confidence = columns["extraction_confidence"]
+    brackets = np.digitize(np.nan_to_num(confidence, nan=0.0), CONFIDENCE_BRACKET_EDGES)
+    brackets[np.isnan(confidence)] = len(CONFIDENCE_BRACKETS) - 1
+    validated = np.isin(actions, [code for code, label in enumerate(action_labels) if label in ("validate", "correct")])
+    totals = np.bincount(brackets, minlength=len(CONFIDENCE_BRACKETS))
+    validated_totals = np.bincount(brackets[validated], minlength=len(CONFIDENCE_BRACKETS))
+    for bracket, total, validated_total in zip(CONFIDENCE_BRACKETS, totals.tolist(), validated_totals.tolist()):
+        counters["confidence_brackets"][bracket]["total"] += total
+        counters["confidence_brackets"][bracket]["validated"] += validated_total
+
+
+def _aggregate_relationship_corrections(log: ColumnarLog, start: int, stop: int, counters: Dict[str, Any]):
+    """Add relationship correction rows [start, stop) to the counters."""
+    columns = log.read(start, stop)
+    if not len(columns["action"]):
+        return
+
+    stats = counters["relationships"]
+    action_labels = log.categories("action")
+    actions = columns["action"]
+    stats["total"] += len(actions)
+
+    action_counts = dict(zip(*(array.tolist() for array in group_counts(actions))))
+    action_codes = {label: code for code, label in enumerate(action_labels)}
+    for action, key in (("validate", "validated"), ("correct_type", "type_corrected"), ("reject", "rejected")):
+        stats[key] += action_counts.get(action_codes.get(action), 0)
+
+    # Type corrections
+    rows = actions == action_codes.get("correct_type", -1)
+    original_remap, original_labels = _labels(log, "original_type", "unknown")
+    corrected_remap, corrected_labels = _labels(log, "corrected_type", "unknown")
+    keys, counts = group_counts(
+        original_remap[columns["original_type"][rows]] * len(corrected_labels)
+        + corrected_remap[columns["corrected_type"][rows]]
+    )
+    change_labels = {
+        key: f"{original_labels[key // len(corrected_labels)]}->{corrected_labels[key % len(corrected_labels)]}"
+        for key in keys.tolist()
+    }
+    _add_counts(stats["type_corrections"], change_labels, keys, counts)
+
+    # Rejection reasons
+    rows = actions == action_codes.get("reject", -1)
+    reason_remap, reason_labels = _labels(log, "rejection_reason", "unspecified")
+    keys, counts = group_counts(reason_remap[columns["rejection_reason"][rows]])
+    _add_counts(stats["rejection_reasons"], reason_labels, keys, counts)
+
+
+def _aggregate_decision_outcomes(log: ColumnarLog, start: int, stop: int, counters: Dict[str, Any]):
+    """Add curation decision rows [start, stop) to the counters."""
+    columns = log.read(start, stop)
+    if not len(columns["agent_decision"]):
+        return
+
+    stats = counters["decisions"]
+    decisions = columns["agent_decision"]
+    agreed = columns["user_agreed"].astype(bool)
+    decision_labels = log.categories("agent_decision")
+    stats["total"] += len(decisions)
+    stats["agreed"] += int(agreed.sum())
+
+    keys, totals = group_counts(decisions)
+    _, agreed_totals = group_counts(decisions, weights=agreed.astype(np.int64))
+    for key, total, agreed_total in zip(keys.tolist(), totals.tolist(), agreed_totals.tolist()):
+        decision = stats["by_decision"].setdefault(decision_labels[key], {"total": 0, "agreed": 0})
+        decision["total"] += total
+        decision["agreed"] += agreed_total
+
+    reason_remap, reason_labels = _labels(log, "override_reason", "no reason given")
+    keys, counts = group_counts(reason_remap[columns["override_reason"][~agreed]])
+    _add_counts(stats["override_reasons"], reason_labels, keys, counts)
+
+
+_AGGREGATORS = {
+    "entity_corrections": _aggregate_entity_corrections,
+    "relationship_corrections": _aggregate_relationship_corrections,
+    "decision_outcomes": _aggregate_decision_outcomes,
+}
+
+
+def compute_feedback_counters(
+    start: Optional[Dict[str, int]] = None,
+    counters: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Aggregate the feedback logs into counters.
+
+    Args:
+        start: Log offset per kind to aggregate from (default: the beginning)
+        counters: Counters covering the rows before `start`, updated in place
+
+    Returns:
+        Counters covering every row in the logs
+    """
+    logs = get_feedback_logs()
+    counters = counters if counters is not None else empty_feedback_counters()
+    for kind in RECORD_KINDS:
+        stop = logs[kind].offset()
+        _AGGREGATORS[kind](logs[kind], (start or {}).get(kind, 0), stop, counters)
+        counters["records"][kind] = stop
+    return counters
+
+
+def get_feedback_counters() -> Dict[str, Any]:
+    """
+    Current feedback counters.
+
+    Cached by log offset: rows appended since the last call are aggregated
+    and added to the cached counters, so the cost follows new events
+    rather than the whole history.
+    """
+    logs = get_feedback_logs()
+    offsets = {kind: logs[kind].offset() for kind in RECORD_KINDS}
+
+    cached = _counters_cache
+    if cached["directory"] == FEEDBACK_DIR and cached["offsets"] == offsets:
+        return cached["counters"]
+
+    if cached["directory"] == FEEDBACK_DIR and all(offsets[k] >= cached["offsets"][k] for k in RECORD_KINDS):
+        counters = compute_feedback_counters(cached["offsets"], copy.deepcopy(cached["counters"]))
+    else:
+        counters = compute_feedback_counters()
+
+    _counters_cache.update(directory=FEEDBACK_DIR, offsets=offsets, counters=counters)
+    return counters
+
+
+def check_feedback_counters(repair: bool = True) -> Dict[str, Any]:
+    """
+    Check the feedback logs and rebuild the counters from scratch.
+
+    Args:
+        repair: Truncate torn log appends and replace drifted cached counters
+
+    Returns:
+        Dict with "torn_columns" (kind -> column -> rows), "drift"
+        (counter path -> {"stored", "actual"}) and "repaired"
+    """
+    from .quality_counters import counter_drift
+
+    logs = get_feedback_logs()
+    torn = {}
+    for kind in RECORD_KINDS:
+        result = logs[kind].check(repair=repair)
+        if result["torn_columns"]:
+            torn[kind] = result["torn_columns"]
+
+    actual = compute_feedback_counters()
+    drift = counter_drift(get_feedback_counters(), actual)
+
+    repaired = repair and (bool(torn) or bool(drift))
+    if repair and drift:
+        _counters_cache.update(
+            directory=FEEDBACK_DIR,
+            offsets=dict(actual["records"]),
+            counters=actual,
+        )
+
+    if drift:
+        logger.warning(f"Feedback counters drifted from the feedback log: {drift}")
+
+    return {"torn_columns": torn, "drift": drift, "repaired": repaired}
 
 
 # =============================================================================
@@ -93,8 +487,6 @@ def record_entity_correction(
         extraction_confidence: LLM's stated confidence
         extraction_model: Model used for extraction
     """
-    feedback_data = load_feedback_data()
-
     correction = {
         "entity_id": entity_id,
         "action": action,
@@ -108,8 +500,7 @@ def record_entity_correction(
         "recorded_at": datetime.utcnow().isoformat(),
     }
 
-    feedback_data["entity_corrections"].append(correction)
-    save_feedback_data(feedback_data)
+    _record_feedback("entity_corrections", correction)
 
     return correction
 
@@ -135,8 +526,6 @@ def record_relationship_correction(
         source_entity_name: Source entity name (for context)
         target_entity_name: Target entity name (for context)
     """
-    feedback_data = load_feedback_data()
-
     correction = {
         "relationship_id": relationship_id,
         "action": action,
@@ -148,8 +537,7 @@ def record_relationship_correction(
         "recorded_at": datetime.utcnow().isoformat(),
     }
 
-    feedback_data["relationship_corrections"].append(correction)
-    save_feedback_data(feedback_data)
+    _record_feedback("relationship_corrections", correction)
 
     return correction
 
@@ -177,8 +565,6 @@ def record_curation_decision(
         agent_confidence: Agent's confidence in decision
         override_reason: Reason for override if user disagreed
     """
-    feedback_data = load_feedback_data()
-
     outcome = {
         "candidate_id": candidate_id,
         "agent_decision": agent_decision,
@@ -191,8 +577,7 @@ def record_curation_decision(
         "recorded_at": datetime.utcnow().isoformat(),
     }
 
-    feedback_data["decision_outcomes"].append(outcome)
-    save_feedback_data(feedback_data)
+    _record_feedback("decision_outcomes", outcome)
 
     return outcome
 
@@ -209,95 +594,48 @@ def analyze_correction_patterns() -> Dict[str, Any]:
         Dict with patterns for entity corrections, relationship rejections,
         and confidence accuracy.
     """
-    feedback_data = load_feedback_data()
-    entity_corrections = feedback_data.get("entity_corrections", [])
-    relationship_corrections = feedback_data.get("relationship_corrections", [])
-
-    # Analyze entity corrections by type
-    entity_patterns = defaultdict(lambda: {
-        "total": 0,
-        "validated": 0,
-        "corrected": 0,
-        "rejected": 0,
-        "common_corrections": defaultdict(int),
-        "common_rejections": defaultdict(int),
-    })
-
-    for corr in entity_corrections:
-        orig_type = corr.get("original_type") or "unknown"
-        action = corr.get("action")
-        pattern = entity_patterns[orig_type]
-
-        pattern["total"] += 1
-        pattern[action] = pattern.get(action, 0) + 1
-
-        # Track correction patterns
-        if action == "correct":
-            # Name correction pattern
-            orig_name = corr.get("original_name", "")
-            corr_name = corr.get("corrected_name", "")
-            if orig_name and corr_name:
-                correction_type = _classify_name_correction(orig_name, corr_name)
-                pattern["common_corrections"][correction_type] += 1
-
-            # Type correction pattern
-            corr_type = corr.get("corrected_type")
-            if corr_type and corr_type != orig_type:
-                pattern["common_corrections"][f"type:{orig_type}->{corr_type}"] += 1
-
-        # Track rejection reasons
-        if action == "reject":
-            reason = corr.get("rejection_reason") or "unspecified"
-            pattern["common_rejections"][reason] += 1
-
-    # Convert defaultdicts to regular dicts
-    for type_key in entity_patterns:
-        entity_patterns[type_key]["common_corrections"] = dict(
-            sorted(entity_patterns[type_key]["common_corrections"].items(),
-                   key=lambda x: -x[1])[:5]
-        )
-        entity_patterns[type_key]["common_rejections"] = dict(
-            sorted(entity_patterns[type_key]["common_rejections"].items(),
-                   key=lambda x: -x[1])[:5]
-        )
+    counters = get_feedback_counters()
+
+    # Entity corrections by type
+    entity_patterns = {}
+    for orig_type, stats in counters["entity_types"].items():
+        pattern = {
+            "total": stats["total"],
+            "validated": 0,
+            "corrected": 0,
+            "rejected": 0,
+            "common_corrections": dict(
+                sorted(stats["corrections"].items(), key=lambda x: -x[1])[:5]
+            ),
+            "common_rejections": dict(
+                sorted(stats["rejections"].items(), key=lambda x: -x[1])[:5]
+            ),
+        }
+        # Counts per raw action ("validate", "correct", "reject")
+        for action, count in stats["actions"].items():
+            pattern[action] = pattern.get(action, 0) + count
+        entity_patterns[orig_type] = pattern
 
-    # Analyze relationship rejections
+    # Relationship rejections
+    relationship_counters = counters["relationships"]
     relationship_patterns = {
-        "total": 0,
-        "validated": 0,
-        "type_corrected": 0,
-        "rejected": 0,
-        "rejection_reasons": defaultdict(int),
-        "type_corrections": defaultdict(int),
+        "total": relationship_counters["total"],
+        "validated": relationship_counters["validated"],
+        "type_corrected": relationship_counters["type_corrected"],
+        "rejected": relationship_counters["rejected"],
+        "rejection_reasons": dict(
+            sorted(relationship_counters["rejection_reasons"].items(), key=lambda x: -x[1])[:5]
+        ),
+        "type_corrections": dict(
+            sorted(relationship_counters["type_corrections"].items(), key=lambda x: -x[1])[:5]
+        ),
     }
 
-    for corr in relationship_corrections:
-        action = corr.get("action")
-        relationship_patterns["total"] += 1
-
-        if action == "validate":
-            relationship_patterns["validated"] += 1
-        elif action == "correct_type":
-            relationship_patterns["type_corrected"] += 1
-            orig_type = corr.get("original_type") or "unknown"
-            new_type = corr.get("corrected_type") or "unknown"
-            relationship_patterns["type_corrections"][f"{orig_type}->{new_type}"] += 1
-        elif action == "reject":
-            relationship_patterns["rejected"] += 1
-            reason = corr.get("rejection_reason") or "unspecified"
-            relationship_patterns["rejection_reasons"][reason] += 1
-
-    relationship_patterns["rejection_reasons"] = dict(
-        sorted(relationship_patterns["rejection_reasons"].items(), key=lambda x: -x[1])[:5]
-    )
-    relationship_patterns["type_corrections"] = dict(
-        sorted(relationship_patterns["type_corrections"].items(), key=lambda x: -x[1])[:5]
-    )
-
+    records = counters["records"]
     return {
-        "entity_corrections": dict(entity_patterns),
+        "entity_corrections": entity_patterns,
         "relationship_corrections": relationship_patterns,
-        "total_corrections": len(entity_corrections) + len(relationship_corrections),
+        "total_corrections": records["entity_corrections"] + records["relationship_corrections"],
     }
 
 
@@ -344,41 +682,14 @@ def analyze_confidence_accuracy() -> Dict[str, Any]:
     Returns:
         Dict with accuracy metrics by confidence bracket.
     """
-    feedback_data = load_feedback_data()
-    entity_corrections = feedback_data.get("entity_corrections", [])
+    counters = get_feedback_counters()
 
-    # Group by confidence brackets
+    # Counts by confidence bracket
     brackets = {
-        "0.0-0.5": {"total": 0, "validated": 0},
-        "0.5-0.7": {"total": 0, "validated": 0},
-        "0.7-0.85": {"total": 0, "validated": 0},
-        "0.85-0.95": {"total": 0, "validated": 0},
-        "0.95-1.0": {"total": 0, "validated": 0},
-        "unknown": {"total": 0, "validated": 0},
+        bracket: dict(stats)
+        for bracket, stats in counters["confidence_brackets"].items()
     }
 
-    for corr in entity_corrections:
-        confidence = corr.get("extraction_confidence")
-        action = corr.get("action")
-        is_validated = action in ("validate", "correct")
-
-        if confidence is None:
-            bracket = "unknown"
-        elif confidence < 0.5:
-            bracket = "0.0-0.5"
-        elif confidence < 0.7:
-            bracket = "0.5-0.7"
-        elif confidence < 0.85:
-            bracket = "0.7-0.85"
-        elif confidence < 0.95:
-            bracket = "0.85-0.95"
-        else:
-            bracket = "0.95-1.0"
-
-        brackets[bracket]["total"] += 1
-        if is_validated:
-            brackets[bracket]["validated"] += 1
-
     # Calculate accuracy for each bracket
     for bracket, stats in brackets.items():
         if stats["total"] > 0:
@@ -457,10 +768,9 @@ def analyze_agent_accuracy() -> Dict[str, Any]:
     Returns:
         Dict with agent accuracy metrics.
     """
-    feedback_data = load_feedback_data()
-    decision_outcomes = feedback_data.get("decision_outcomes", [])
+    decisions = get_feedback_counters()["decisions"]
 
-    if not decision_outcomes:
+    if not decisions["total"]:
         return {
             "total_decisions": 0,
             "agreement_rate": None,
@@ -468,36 +778,23 @@ def analyze_agent_accuracy() -> Dict[str, Any]:
             "interpretation": "No agent decisions recorded yet.",
         }
 
-    total = len(decision_outcomes)
-    agreed = sum(1 for d in decision_outcomes if d.get("user_agreed"))
+    total = decisions["total"]
+    agreed = decisions["agreed"]
 
-    # Breakdown by agent decision type
-    by_decision = defaultdict(lambda: {"total": 0, "agreed": 0})
-    for outcome in decision_outcomes:
-        decision = outcome.get("agent_decision", "unknown")
-        by_decision[decision]["total"] += 1
-        if outcome.get("user_agreed"):
-            by_decision[decision]["agreed"] += 1
-
-    # Calculate accuracy per decision type
-    for decision_type in by_decision:
-        stats = by_decision[decision_type]
+    # Accuracy per agent decision type
+    by_decision = {}
+    for decision_type, stats in decisions["by_decision"].items():
+        stats = dict(stats)
         if stats["total"] > 0:
             stats["agreement_rate"] = round(stats["agreed"] / stats["total"], 3)
-
-    # Analyze override patterns
-    override_reasons = defaultdict(int)
-    for outcome in decision_outcomes:
-        if not outcome.get("user_agreed"):
-            reason = outcome.get("override_reason") or "no reason given"
-            override_reasons[reason] += 1
+        by_decision[decision_type] = stats
 
     return {
         "total_decisions": total,
         "agreement_rate": round(agreed / total, 3) if total > 0 else None,
-        "by_decision_type": dict(by_decision),
+        "by_decision_type": by_decision,
         "common_override_reasons": dict(
-            sorted(override_reasons.items(), key=lambda x: -x[1])[:5]
+            sorted(decisions["override_reasons"].items(), key=lambda x: -x[1])[:5]
         ),
         "interpretation": _interpret_agent_accuracy(agreed, total, by_decision),
     }
@@ -675,10 +972,10 @@ def get_feedback_dashboard() -> Dict[str, Any]:
     recommendations = get_prompt_recommendations()
 
     # Quick stats
-    feedback_data = load_feedback_data()
-    total_entity_feedback = len(feedback_data.get("entity_corrections", []))
-    total_relationship_feedback = len(feedback_data.get("relationship_corrections", []))
-    total_agent_feedback = len(feedback_data.get("decision_outcomes", []))
+    records = get_feedback_counters()["records"]
+    total_entity_feedback = records["entity_corrections"]
+    total_relationship_feedback = records["relationship_corrections"]
+    total_agent_feedback = records["decision_outcomes"]
 
     # Calculate overall health score (0-100)
     health_score = 100
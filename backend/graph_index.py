@@ -0,0 +1,170 @@
+"""Adjacency index over the knowledge graph for server-side traversal.
+
+Built once per graph build (see graph_sync) and shared by traversal
+queries such as k-hop subgraphs, so focused exploration never has to
+serialize or rescan the full graph.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import graph_sync, knowledge_graph
+
+logger = logging.getLogger(__name__)
+
+# Edge weights, matching the connection scores in knowledge_graph.get_related_notes
+LINK_WEIGHTS = {
+    "mentions": 10,       # shared_entity
+    "manual": 10,         # user-asserted connection
+    "relationship": 7,    # via_relationship
+    "shared_tag": 5,      # build_graph only emits cross-source tag links
+    "sequential": 3,
+    "source": 2,          # same_source
+}
+
+# Upper bounds for subgraph requests
+MAX_SUBGRAPH_HOPS = 4
+MAX_SUBGRAPH_NODES = 500
+
+Edge = Tuple[str, Dict[str, Any]]
+
+_index_cache: Dict[str, Any] = {"graph": None, "index": None}
+
+
+class GraphIndex:
+    """
+    Node lookup and undirected adjacency lists for one graph build.
+
+    Besides the links build_graph emits, adds entity relationship edges
+    and note -> source membership edges so traversals see the same
+    connections get_related_notes scores.
+    """
+
+    def __init__(self, graph: Dict[str, Any], entity_relationships: List[Dict[str, Any]]):
+        self.nodes: Dict[str, Dict[str, Any]] = {n["id"]: n for n in graph.get("nodes", [])}
+        self.adjacency: Dict[str, List[Edge]] = {node_id: [] for node_id in self.nodes}
+
+        for link in graph.get("links", []):
+            self._add_edge(link)
+
+        for node in self.nodes.values():
+            if node.get("type") == "note" and node.get("sourceId"):
+                self._add_edge({"source": node["id"], "target": node["sourceId"], "type": "source"})
+
+        for rel in entity_relationships:
+            self._add_edge({
+                "source": f"entity:{rel.get('source_entity_id')}",
+                "target": f"entity:{rel.get('target_entity_id')}",
+                "type": "relationship",
+                "label": rel.get("type"),
+            })
+
+    def _add_edge(self, link: Dict[str, Any]):
+        source = link.get("source")
+        target = link.get("target")
+        if source not in self.nodes or target not in self.nodes or source == target:
+            return
+        self.adjacency[source].append((target, link))
+        self.adjacency[target].append((source, link))
+
+    def neighbors(self, node_id: str) -> List[Edge]:
+        """Get (neighbor_id, link) pairs for a node."""
+        return self.adjacency.get(node_id, [])
+
+
+def get_graph_index() -> Tuple[GraphIndex, int]:
+    """
+    Get the adjacency index for the current graph, rebuilt only when it changes.
+
+    Returns:
+        Tuple of (GraphIndex, graph version)
+    """
+    graph, version = graph_sync.get_versioned_graph()
+    if _index_cache["graph"] is not graph:
+        data, _ = knowledge_graph.get_indexed_entities()
+        _index_cache["index"] = GraphIndex(graph, data.get("entity_relationships", []))
+        _index_cache["graph"] = graph
+    return _index_cache["index"], version
+
+
+def get_subgraph(
+    center: str,
+    hops: int = 2,
+    limit: int = 50,
+    types: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Get the k-hop neighbourhood of a node.
+
+    Expands breadth-first one hop at a time. Candidates at each hop are
+    ranked by the summed weight of their edges into the previous hop, and
+    expansion stops once the node budget is spent.
+
+    Args:
+        center: Node ID to start from (e.g. "note:conv:note" or "entity:id")
+        hops: Maximum hops from the center
+        limit: Maximum nodes to return, including the center
+        types: Optional node types to traverse and return (entity, note, source)
+
+    Returns:
+        Dict with nodes (annotated with hop and score), links among them,
+        and whether the budget truncated the expansion
+    """
+    index, version = get_graph_index()
+    if center not in index.nodes:
+        return {"error": "Node not found"}
+
+    hops = max(1, min(MAX_SUBGRAPH_HOPS, hops))
+    limit = max(1, min(MAX_SUBGRAPH_NODES, limit))
+    allowed_types = set(types) if types else None
+
+    included = {center: {"hop": 0, "score": 0}}
+    frontier = [center]
+    truncated = False
+
+    for hop in range(1, hops + 1):
+        candidates: Dict[str, int] = {}
+        for node_id in frontier:
+            for neighbor_id, link in index.neighbors(node_id):
+                if neighbor_id in included:
+                    continue
+                if allowed_types and index.nodes[neighbor_id].get("type") not in allowed_types:
+                    continue
+                candidates[neighbor_id] = candidates.get(neighbor_id, 0) + LINK_WEIGHTS.get(link.get("type"), 1)
+
+        if not candidates:
+            break
+
+        ranked = sorted(candidates.items(), key=lambda item: (-item[1], item[0]))
+        budget = limit - len(included)
+        if len(ranked) > budget:
+            ranked = ranked[:budget]
+            truncated = True
+
+        frontier = []
+        for node_id, score in ranked:
+            included[node_id] = {"hop": hop, "score": score}
+            frontier.append(node_id)
+
+        if truncated:
+            break
+
+    nodes = [{**index.nodes[node_id], **info} for node_id, info in included.items()]
+
+    links = []
+    seen_links = set()
+    for node_id in included:
+        for neighbor_id, link in index.neighbors(node_id):
+            if neighbor_id not in included or id(link) in seen_links:
+                continue
+            seen_links.add(id(link))
+            links.append({**link, "weight": LINK_WEIGHTS.get(link.get("type"), 1)})
+
+    return {
+        "center": center,
+        "hops": hops,
+        "version": version,
+        "nodes": nodes,
+        "links": links,
+        "truncated": truncated,
+    }
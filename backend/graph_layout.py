@@ -0,0 +1,283 @@
+"""Server-side force-directed layout for the knowledge graph.
+
+Computes x/y coordinates once per graph version with a vectorized
+Fruchterman-Reingold simulation over the graph adjacency index, so the
+client can render immediately instead of settling a layout on every
+visit. Positions are persisted and new versions warm-start from them:
+existing nodes keep their place and only new nodes need to settle.
+"""
+
+import asyncio
+import json
+import hashlib
+import os
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import knowledge_graph
+from .graph_index import GraphIndex, LINK_WEIGHTS, get_graph_index
+
+logger = logging.getLogger(__name__)
+
+# Simulation sweeps for a cold start and for warm-started updates
+LAYOUT_ITERATIONS = 80
+WARM_START_ITERATIONS = 25
+
+# Spectral initialisation uses a dense eigendecomposition, so cap its size
+SPECTRAL_INIT_MAX_NODES = 1500
+
+# Rows per block when computing pairwise repulsion (bounds memory to O(block * n))
+REPULSION_BLOCK_SIZE = 256
+
+_layout_cache: Dict[str, Any] = {"version": None, "index": None, "positions": None}
+
+
+def get_layout_path() -> str:
+    """Get the path to the persisted layout."""
+    return os.path.join(knowledge_graph.KNOWLEDGE_GRAPH_DIR, "graph_layout.json")
+
+
+def load_layout() -> Dict[str, Any]:
+    """Load the last persisted layout."""
+    path = get_layout_path()
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Failed to load graph layout: {e}")
+    return {"version": None, "positions": {}}
+
+
+def save_layout(version: int, positions: Dict[str, List[float]]):
+    """Persist layout positions for a graph version."""
+    knowledge_graph.ensure_kg_dir()
+    path = get_layout_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({"version": version, "positions": positions}, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _edge_arrays(index: GraphIndex, order: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    sources, targets, weights = [], [], []
+    seen = set()
+    for node_id, edges in index.adjacency.items():
+        for neighbor_id, link in edges:
+            if id(link) in seen:
+                continue
+            seen.add(id(link))
+            sources.append(order[node_id])
+            targets.append(order[neighbor_id])
+            weights.append(LINK_WEIGHTS.get(link.get("type"), 1) / 10.0)
+    return (
+        np.asarray(sources, dtype=np.int64),
+        np.asarray(targets, dtype=np.int64),
+        np.asarray(weights, dtype=np.float64),
+    )
+
+
+def _seeded_jitter(node_id: str) -> np.ndarray:
+    """Deterministic small offset per node, so layouts are reproducible."""
+    digest = hashlib.sha1(node_id.encode()).digest()
+    return (np.frombuffer(digest[:8], dtype=np.uint32) / 2**32 - 0.5).astype(np.float64)
+
+
+def _spectral_init(n: int, sources: np.ndarray, targets: np.ndarray, weights: np.ndarray) -> Optional[np.ndarray]:
+    """Initial positions from the two smallest non-trivial Laplacian eigenvectors."""
+    if n < 3 or n > SPECTRAL_INIT_MAX_NODES or len(sources) == 0:
+        return None
+    adjacency = np.zeros((n, n))
+    np.add.at(adjacency, (sources, targets), weights)
+    np.add.at(adjacency, (targets, sources), weights)
+    degree = adjacency.sum(axis=1)
+    laplacian = np.diag(degree) - adjacency
+    try:
+        _, vectors = np.linalg.eigh(laplacian)
+    except np.linalg.LinAlgError:
+        return None
+    coords = vectors[:, 1:3]
+    spread = np.abs(coords).max()
+    if spread == 0:
+        return None
+    return coords / spread * np.sqrt(n)
+
+
+def force_layout(
+    n: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    weights: np.ndarray,
+    initial: np.ndarray,
+    iterations: int,
+    temperature: float,
+    fixed: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Run a Fruchterman-Reingold simulation.
+
+    Args:
+        n: Number of nodes
+        sources, targets: Edge endpoint indices
+        weights: Edge attraction weights
+        initial: (n, 2) starting positions
+        iterations: Number of sweeps
+        temperature: Maximum displacement per node in the first sweep
+        fixed: Optional boolean mask of nodes that keep their initial
+            position (the layout is then not re-centred)
+
+    Returns:
+        (n, 2) array of positions
+    """
+    pos = initial.astype(np.float64).copy()
+    k = 1.0  # Ideal edge length; the layout spans roughly sqrt(n) units
+    cooling = (0.01 / temperature) ** (1.0 / max(iterations, 1)) if temperature > 0.01 else 1.0
+
+    for _ in range(iterations):
+        disp = np.zeros_like(pos)
+
+        # Repulsion between all pairs, in row blocks (x and y kept separate
+        # and updated in place to limit temporary allocations)
+        x = pos[:, 0]
+        y = pos[:, 1]
+        for start in range(0, n, REPULSION_BLOCK_SIZE):
+            end = start + REPULSION_BLOCK_SIZE
+            dx = x[start:end, None] - x[None, :]
+            dy = y[start:end, None] - y[None, :]
+            inv = dx * dx
+            inv += dy * dy
+            np.maximum(inv, 1e-6, out=inv)
+            np.divide(k * k, inv, out=inv)
+            disp[start:end, 0] += np.einsum('ij,ij->i', dx, inv)
+            disp[start:end, 1] += np.einsum('ij,ij->i', dy, inv)
+
+        # Attraction along edges
+        if len(sources):
+            delta = pos[sources] - pos[targets]
+            dist = np.maximum(np.linalg.norm(delta, axis=1), 1e-6)
+            force = (delta / dist[:, None]) * (dist * dist / k * weights)[:, None]
+            np.add.at(disp, sources, -force)
+            np.add.at(disp, targets, force)
+
+        if fixed is not None:
+            disp[fixed] = 0.0
+        length = np.maximum(np.linalg.norm(disp, axis=1), 1e-9)
+        pos += disp / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature *= cooling
+
+    if fixed is not None and fixed.any():
+        return pos
+    return pos - pos.mean(axis=0)
+
+
+def compute_layout(
+    index: GraphIndex,
+    previous: Optional[Dict[str, List[float]]] = None
+) -> Dict[str, List[float]]:
+    """
+    Compute node positions, warm-starting from previous positions if given.
+
+    Nodes with a previous position keep it; new nodes start at the mean
+    of their already-placed neighbours (plus a small deterministic offset)
+    and settle around them in fewer, cooler sweeps. Graph deltas only
+    carry positions for added and changed nodes, so clients patching
+    their copy rely on existing nodes never moving.
+
+    Args:
+        index: Graph adjacency index
+        previous: Optional mapping of node ID to [x, y] from an earlier version
+
+    Returns:
+        Dict mapping node ID to [x, y]
+    """
+    node_ids = sorted(index.nodes)
+    n = len(node_ids)
+    if n == 0:
+        return {}
+
+    order = {node_id: i for i, node_id in enumerate(node_ids)}
+    sources, targets, weights = _edge_arrays(index, order)
+    previous = previous or {}
+    known = [node_id for node_id in node_ids if node_id in previous]
+    placed = None
+
+    if len(known) == n:
+        return {node_id: list(previous[node_id]) for node_id in node_ids}
+    if known:
+        initial = np.zeros((n, 2))
+        placed = np.zeros(n, dtype=bool)
+        for node_id in known:
+            initial[order[node_id]] = previous[node_id]
+            placed[order[node_id]] = True
+        for node_id in node_ids:
+            i = order[node_id]
+            if placed[i]:
+                continue
+            anchors = [order[nb] for nb, _ in index.neighbors(node_id) if placed[order[nb]]]
+            center = initial[anchors].mean(axis=0) if anchors else np.zeros(2)
+            initial[i] = center + _seeded_jitter(node_id)
+        iterations = WARM_START_ITERATIONS
+        temperature = 0.5
+    else:
+        initial = _spectral_init(n, sources, targets, weights)
+        if initial is None:
+            initial = np.stack([_seeded_jitter(node_id) for node_id in node_ids]) * np.sqrt(n) * 2
+        iterations = LAYOUT_ITERATIONS
+        temperature = 0.1 * np.sqrt(n) + 1.0
+
+    pos = force_layout(n, sources, targets, weights, initial, iterations, temperature, fixed=placed)
+    return {node_id: [round(float(x), 2), round(float(y), 2)] for node_id, (x, y) in zip(node_ids, pos)}
+
+
+def _cached_layout(index: GraphIndex, version: int) -> Tuple[Optional[Dict[str, List[float]]], Dict[str, Any]]:
+    """Positions for this build from memory or disk, plus the persisted layout to warm-start from."""
+    cache = _layout_cache
+    if cache["version"] == version and cache["index"] is index:
+        return cache["positions"], {}
+
+    persisted = load_layout()
+    if persisted.get("version") == version and set(persisted["positions"]) == set(index.nodes):
+        cache.update({"version": version, "index": index, "positions": persisted["positions"]})
+        return persisted["positions"], persisted
+    return None, persisted
+
+
+def _store_layout(index: GraphIndex, version: int, positions: Dict[str, List[float]]):
+    save_layout(version, positions)
+    _layout_cache.update({"version": version, "index": index, "positions": positions})
+
+
+def get_graph_layout() -> Tuple[Dict[str, List[float]], int]:
+    """
+    Get node positions for the current graph version.
+
+    Returns:
+        Tuple of (node ID -> [x, y], graph version)
+    """
+    index, version = get_graph_index()
+    positions, persisted = _cached_layout(index, version)
+    if positions is None:
+        positions = compute_layout(index, persisted.get("positions"))
+        _store_layout(index, version, positions)
+    return positions, version
+
+
+async def get_graph_layout_async() -> Tuple[Dict[str, List[float]], int]:
+    """
+    Get node positions for the current graph version without blocking the event loop.
+
+    The graph index, caches and layout file are only touched on the calling
+    loop; just the simulation runs in the default executor.
+
+    Returns:
+        Tuple of (node ID -> [x, y], graph version)
+    """
+    index, version = get_graph_index()
+    positions, persisted = _cached_layout(index, version)
+    if positions is None:
+        loop = asyncio.get_running_loop()
+        positions = await loop.run_in_executor(None, compute_layout, index, persisted.get("positions"))
+        _store_layout(index, version, positions)
+    return positions, version
@@ -4,18 +4,20 @@ This module handles:
 - Entity validation (extracted|validated|rejected|corrected)
 - Relationship validation
 - Provenance tracking
-- Quality metrics aggregation
+- Quality metrics aggregation (from incrementally maintained counters)
 """
 
 import json
 import os
+import asyncio
 import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
-from .knowledge_graph import load_entities, save_entities
-from .graph_feedback import record_entity_correction, record_relationship_correction
+from .knowledge_graph import load_entities, entity_transaction, get_indexed_entities
+from .graph_feedback import record_entity_correction, record_relationship_correction, check_feedback_counters
+from . import quality_counters
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,12 @@ logger = logging.getLogger(__name__)
 DATA_DIR = os.environ.get("DATA_DIR", "data")
 QUALITY_DIR = os.path.join(DATA_DIR, "quality")
 
+# Seconds between background consistency checks of the counters
+CONSISTENCY_CHECK_INTERVAL = 6 * 60 * 60
+
+# Counters rebuilt for a store version whose stored counters were stale
+_rebuilt_counters: Dict[str, Any] = {"key": None, "counters": None}
+
 
 def ensure_quality_dir():
     """Ensure the quality directory exists."""
@@ -60,69 +68,73 @@ def validate_entity(
     Returns:
         Updated entity
     """
-    data = load_entities()
-    entities = data.get("entities", {})
-
-    entity = entities.get(entity_id)
-    if not entity:
-        return {"error": "Entity not found"}
-
-    # Initialize validation if not present
-    if "validation" not in entity:
-        entity["validation"] = {
-            "status": "extracted",
-            "validated_by": None,
-            "validated_at": None,
-            "original_name": None,
-            "rejection_reason": None,
-        }
+    with entity_transaction() as txn:
+        entities = txn.data.get("entities", {})
 
-    # Initialize provenance if not present
-    if "provenance" not in entity:
-        entity["provenance"] = {
-            "source": "extraction",
-            "extraction_model": None,
-            "extraction_confidence": None,
-            "source_note": None,
-            "created_at": entity.get("created_at") or datetime.utcnow().isoformat(),
-        }
-
-    validation = entity["validation"]
-
-    if action == "validate":
-        validation["status"] = "validated"
-        validation["validated_by"] = "user"
-        validation["validated_at"] = datetime.utcnow().isoformat()
-
-    elif action == "correct":
-        if correction:
-            # Store original before correction
-            if validation.get("original_name") is None:
-                validation["original_name"] = entity.get("name")
-
-            # Apply corrections
-            if correction.get("name"):
-                entity["name"] = correction["name"]
-            if correction.get("type"):
-                entity["type"] = correction["type"]
-
-            validation["status"] = "corrected"
+        entity = entities.get(entity_id)
+        if not entity:
+            txn.rollback()
+            return {"error": "Entity not found"}
+
+        before = quality_counters.snapshot(entity)
+
+        # Initialize validation if not present
+        if "validation" not in entity:
+            entity["validation"] = {
+                "status": "extracted",
+                "validated_by": None,
+                "validated_at": None,
+                "original_name": None,
+                "rejection_reason": None,
+            }
+
+        # Initialize provenance if not present
+        if "provenance" not in entity:
+            entity["provenance"] = {
+                "source": "extraction",
+                "extraction_model": None,
+                "extraction_confidence": None,
+                "source_note": None,
+                "created_at": entity.get("created_at") or datetime.utcnow().isoformat(),
+            }
+
+        validation = entity["validation"]
+
+        if action == "validate":
+            validation["status"] = "validated"
             validation["validated_by"] = "user"
             validation["validated_at"] = datetime.utcnow().isoformat()
-        else:
-            return {"error": "Correction data required"}
 
-    elif action == "reject":
-        validation["status"] = "rejected"
-        validation["validated_by"] = "user"
-        validation["validated_at"] = datetime.utcnow().isoformat()
-        validation["rejection_reason"] = reason
+        elif action == "correct":
+            if correction:
+                # Store original before correction
+                if validation.get("original_name") is None:
+                    validation["original_name"] = entity.get("name")
+
+                # Apply corrections
+                if correction.get("name"):
+                    entity["name"] = correction["name"]
+                if correction.get("type"):
+                    entity["type"] = correction["type"]
+
+                validation["status"] = "corrected"
+                validation["validated_by"] = "user"
+                validation["validated_at"] = datetime.utcnow().isoformat()
+            else:
+                txn.rollback()
+                return {"error": "Correction data required"}
+
+        elif action == "reject":
+            validation["status"] = "rejected"
+            validation["validated_by"] = "user"
+            validation["validated_at"] = datetime.utcnow().isoformat()
+            validation["rejection_reason"] = reason
 
-    else:
-        return {"error": f"Unknown action: {action}"}
+        else:
+            txn.rollback()
+            return {"error": f"Unknown action: {action}"}
 
-    # Save changes
-    save_entities(data)
+        quality_counters.record_changes(txn.data, entities_before=[before], entities_after=[entity])
 
     # Record feedback for learning
     try:
@@ -164,9 +176,6 @@ def add_manual_entity(
     """
     import uuid
 
-    data = load_entities()
-    entities = data.get("entities", {})
-
     # Create new entity ID
     entity_id = str(uuid.uuid4())
 
@@ -202,18 +211,18 @@ def add_manual_entity(
             "created_at": datetime.utcnow().isoformat(),
         })
 
-    # Add to entities
-    entities[entity_id] = entity
+    with entity_transaction() as txn:
+        # Add to entities
+        txn.data.setdefault("entities", {})[entity_id] = entity
 
-    # Update note_entities mapping
-    note_entities = data.get("note_entities", {})
-    if note_id not in note_entities:
-        note_entities[note_id] = []
-    if entity_id not in note_entities[note_id]:
-        note_entities[note_id].append(entity_id)
+        # Update note_entities mapping
+        note_entities = txn.data.setdefault("note_entities", {})
+        if note_id not in note_entities:
+            note_entities[note_id] = []
+        if entity_id not in note_entities[note_id]:
+            note_entities[note_id].append(entity_id)
 
-    # Save changes
-    save_entities(data)
+        quality_counters.record_changes(txn.data, entities_after=[entity])
 
     return {"success": True, "entity": entity}
 
@@ -297,60 +306,59 @@ def validate_relationship(
     Returns:
         Updated relationship
     """
-    data = load_entities()
-    relationships = data.get("entity_relationships", [])
-
-    # Find the relationship
-    relationship = None
-    rel_idx = None
-    for idx, rel in enumerate(relationships):
-        if rel.get("id") == relationship_id:
-            relationship = rel
-            rel_idx = idx
-            break
-
-    if relationship is None:
-        return {"error": "Relationship not found"}
-
-    # Initialize validation if not present
-    if "validation" not in relationship:
-        relationship["validation"] = {
-            "status": "extracted",
-            "validated_by": None,
-            "validated_at": None,
-            "rejection_reason": None,
-        }
-
-    validation = relationship["validation"]
-
-    if action == "validate":
-        validation["status"] = "validated"
-        validation["validated_by"] = "user"
-        validation["validated_at"] = datetime.utcnow().isoformat()
-
-    elif action == "correct_type":
-        if new_type:
-            relationship["type"] = new_type
+    with entity_transaction() as txn:
+        relationships = txn.data.get("entity_relationships", [])
+
+        # Find the relationship
+        relationship = None
+        for rel in relationships:
+            if rel.get("id") == relationship_id:
+                relationship = rel
+                break
+
+        if relationship is None:
+            txn.rollback()
+            return {"error": "Relationship not found"}
+
+        before = quality_counters.snapshot(relationship)
+
+        # Initialize validation if not present
+        if "validation" not in relationship:
+            relationship["validation"] = {
+                "status": "extracted",
+                "validated_by": None,
+                "validated_at": None,
+                "rejection_reason": None,
+            }
+
+        validation = relationship["validation"]
+
+        if action == "validate":
             validation["status"] = "validated"
             validation["validated_by"] = "user"
             validation["validated_at"] = datetime.utcnow().isoformat()
-        else:
-            return {"error": "New type required for correct_type action"}
 
-    elif action == "reject":
-        validation["status"] = "rejected"
-        validation["validated_by"] = "user"
-        validation["validated_at"] = datetime.utcnow().isoformat()
-        validation["rejection_reason"] = reason
-
-    else:
-        return {"error": f"Unknown action: {action}"}
+        elif action == "correct_type":
+            if new_type:
+                relationship["type"] = new_type
+                validation["status"] = "validated"
+                validation["validated_by"] = "user"
+                validation["validated_at"] = datetime.utcnow().isoformat()
+            else:
+                txn.rollback()
+                return {"error": "New type required for correct_type action"}
+
+        elif action == "reject":
+            validation["status"] = "rejected"
+            validation["validated_by"] = "user"
+            validation["validated_at"] = datetime.utcnow().isoformat()
+            validation["rejection_reason"] = reason
 
-    # Update relationship in list
-    relationships[rel_idx] = relationship
+        else:
+            txn.rollback()
+            return {"error": f"Unknown action: {action}"}
 
-    # Save changes
-    save_entities(data)
+        quality_counters.record_changes(txn.data, relationships_before=[before], relationships_after=[relationship])
 
     # Record feedback for learning
     try:
@@ -403,43 +411,49 @@ def get_unvalidated_relationships(limit: int = 50) -> List[Dict[str, Any]]:
 # Quality Metrics
 # =============================================================================
 
+def get_quality_counters() -> Dict[str, Any]:
+    """
+    Current quality counters for the entity store.
+
+    Reads the counters persisted with the store; if a write did not keep
+    them up to date, rebuilds them once for that store version.
+    """
+    data, _ = get_indexed_entities()
+    if quality_counters.is_current(data):
+        return data[quality_counters.COUNTERS_KEY]
+
+    key = (data.get("version", 0), id(data))
+    if _rebuilt_counters["key"] != key:
+        _rebuilt_counters["counters"] = quality_counters.compute_counters(data)
+        _rebuilt_counters["key"] = key
+    return _rebuilt_counters["counters"]
+
+
 def get_quality_metrics() -> Dict[str, Any]:
     """Get overall quality metrics for the knowledge graph."""
-    data = load_entities()
-    entities = data.get("entities", {})
-    relationships = data.get("entity_relationships", [])
+    counters = get_quality_counters()
+    entity_counters = counters["entities"]
+    relationship_counters = counters["relationships"]
 
     # Entity metrics
     entity_stats = {
-        "total": len(entities),
+        "total": entity_counters["total"],
         "extracted": 0,
         "validated": 0,
         "corrected": 0,
         "rejected": 0,
-        "manual": 0,
+        "manual": entity_counters["manual"],
     }
-
-    for entity in entities.values():
-        validation = entity.get("validation", {})
-        status = validation.get("status", "extracted")
-        entity_stats[status] = entity_stats.get(status, 0) + 1
-
-        provenance = entity.get("provenance", {})
-        if provenance.get("source") == "manual":
-            entity_stats["manual"] += 1
+    entity_stats.update(entity_counters["status"])
 
     # Relationship metrics
     relationship_stats = {
-        "total": len(relationships),
+        "total": relationship_counters["total"],
         "extracted": 0,
         "validated": 0,
         "rejected": 0,
     }
-
-    for rel in relationships:
-        validation = rel.get("validation", {})
-        status = validation.get("status", "extracted")
-        relationship_stats[status] = relationship_stats.get(status, 0) + 1
+    relationship_stats.update(relationship_counters["status"])
 
     # Review backlog
     review_backlog = {
@@ -447,27 +461,64 @@ def get_quality_metrics() -> Dict[str, Any]:
         "unvalidated_relationships": relationship_stats["extracted"],
     }
 
-    # Entity type breakdown
-    entity_types = {}
-    for entity in entities.values():
-        entity_type = entity.get("type", "unknown")
-        entity_types[entity_type] = entity_types.get(entity_type, 0) + 1
-
-    # Relationship type breakdown
-    relationship_types = {}
-    for rel in relationships:
-        rel_type = rel.get("type", "unknown")
-        relationship_types[rel_type] = relationship_types.get(rel_type, 0) + 1
-
     return {
         "entities": entity_stats,
         "relationships": relationship_stats,
         "review_backlog": review_backlog,
-        "entity_types": entity_types,
-        "relationship_types": relationship_types,
+        "entity_types": dict(entity_counters["types"]),
+        "relationship_types": dict(relationship_counters["types"]),
     }
 
 
+def check_quality_counters(repair: bool = True) -> Dict[str, Any]:
+    """
+    Rebuild the quality counters from scratch and report any drift.
+
+    Args:
+        repair: Persist the rebuilt counters if they differ
+
+    Returns:
+        Dict with "stale" (counters were not maintained by the last write),
+        "drift" (counter path -> {"stored", "actual"}) and "repaired"
+    """
+    with entity_transaction() as txn:
+        stale = not quality_counters.is_current(txn.data)
+        stored = txn.data.get(quality_counters.COUNTERS_KEY)
+        actual = quality_counters.compute_counters(txn.data)
+        drift = quality_counters.counter_drift(stored, actual)
+
+        repaired = repair and (stale or bool(drift))
+        if repaired:
+            actual["version"] = txn.data.get("version", 0) + 1
+            txn.data[quality_counters.COUNTERS_KEY] = actual
+        else:
+            txn.rollback()
+
+    if drift and not stale:
+        logger.warning(f"Quality counters drifted from the entity store: {drift}")
+
+    return {"stale": stale, "drift": drift, "repaired": repaired}
+
+
+def run_consistency_check() -> Dict[str, Any]:
+    """Check (and repair) the quality and feedback counters."""
+    return {
+        "quality": check_quality_counters(),
+        "feedback": check_feedback_counters(),
+        "checked_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def run_consistency_checks_periodically(interval: float = CONSISTENCY_CHECK_INTERVAL):
+    """Background task: run the counter consistency check every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(run_consistency_check)
+        except Exception as e:
+            logger.error(f"Counter consistency check failed: {e}")
+
+
 # =============================================================================
 # Provenance Queries
 # =============================================================================
@@ -531,37 +582,13 @@ def get_provenance_stats() -> Dict[str, Any]:
     Returns:
         Dict with provenance statistics
     """
-    data = load_entities()
-    entities = data.get("entities", {})
-
-    by_source = {}
-    by_model = {}
-    by_validator = {}
-
-    for entity in entities.values():
-        provenance = entity.get("provenance", {})
-        validation = entity.get("validation", {})
-
-        # Count by source
-        source = provenance.get("source") or "unknown"
-        by_source[source] = by_source.get(source, 0) + 1
-
-        # Count by model
-        model = provenance.get("extraction_model")
-        if model:
-            model_short = model.split("/")[-1] if "/" in model else model
-            by_model[model_short] = by_model.get(model_short, 0) + 1
-
-        # Count by validator
-        validator = validation.get("validated_by")
-        if validator:
-            by_validator[validator] = by_validator.get(validator, 0) + 1
+    counters = get_quality_counters()["entities"]
 
     return {
-        "by_source": by_source,
-        "by_model": by_model,
-        "by_validator": by_validator,
-        "total_entities": len(entities),
+        "by_source": dict(counters["by_source"]),
+        "by_model": dict(counters["by_model"]),
+        "by_validator": dict(counters["by_validator"]),
+        "total_entities": counters["total"],
     }
 
 
@@ -0,0 +1,237 @@
+"""Filtered knowledge graph queries evaluated against per-version indexes.
+
+Filters (tags, node types, entity types, source types, date range and
+minimum mention count) are resolved to node ID sets through indexes built
+once per graph build, so a narrow filter only touches the nodes and links
+it returns. Used by the graph endpoint and by semantic search.
+"""
+
+import bisect
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from . import graph_sync
+
+logger = logging.getLogger(__name__)
+
+NODE_TYPES = ("note", "source", "entity")
+
+_query_index_cache: Dict[str, Any] = {"graph": None, "index": None}
+
+
+def normalize_tag(tag: str) -> str:
+    """Normalize a tag for matching (case-insensitive, no leading #)."""
+    return tag.strip().lower().lstrip("#")
+
+
+@dataclass
+class GraphQuery:
+    """Filters for a knowledge graph query. Unset filters match everything."""
+
+    tags: Optional[List[str]] = None
+    node_types: Optional[List[str]] = None
+    entity_types: Optional[List[str]] = None
+    source_types: Optional[List[str]] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    min_mentions: Optional[int] = None
+
+    def has_note_filters(self) -> bool:
+        """Whether any filter narrows the set of notes."""
+        return bool(self.tags or self.source_types or self.date_from or self.date_to)
+
+    def is_empty(self) -> bool:
+        return not (self.has_note_filters() or self.node_types or self.entity_types or self.min_mentions)
+
+
+class GraphQueryIndex:
+    """Lookup indexes over one graph build."""
+
+    def __init__(self, graph: Dict[str, Any]):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.order: Dict[str, int] = {}
+        self.by_type: Dict[str, Set[str]] = {t: set() for t in NODE_TYPES}
+        self.by_tag: Dict[str, Set[str]] = {}
+        self.by_source_type: Dict[str, Set[str]] = {}
+        self.by_entity_type: Dict[str, Set[str]] = {}
+        self.incident_links: Dict[str, List[Dict[str, Any]]] = {}
+        self.note_entities: Dict[str, Set[str]] = {}
+        dated = []
+
+        for node in graph.get("nodes", []):
+            node_id = node["id"]
+            node_type = node.get("type")
+            self.nodes[node_id] = node
+            self.order[node_id] = len(self.order)
+            self.by_type.setdefault(node_type, set()).add(node_id)
+
+            if node_type == "note":
+                for tag in node.get("tags", []):
+                    self.by_tag.setdefault(normalize_tag(tag), set()).add(node_id)
+                if node.get("created_at"):
+                    dated.append((node["created_at"], node_id))
+            if node_type in ("note", "source") and node.get("sourceType"):
+                self.by_source_type.setdefault(node["sourceType"], set()).add(node_id)
+            if node_type == "entity":
+                self.by_entity_type.setdefault(node.get("entityType", "concept"), set()).add(node_id)
+
+        for link in graph.get("links", []):
+            self.incident_links.setdefault(link["source"], []).append(link)
+            self.incident_links.setdefault(link["target"], []).append(link)
+            if link.get("type") == "mentions":
+                self.note_entities.setdefault(link["source"], set()).add(link["target"])
+
+        dated.sort()
+        self._dates = [d for d, _ in dated]
+        self._dated_ids = [node_id for _, node_id in dated]
+
+    def _date_bounds(self, date_from: Optional[str], date_to: Optional[str]) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self._dates, date_from) if date_from else 0
+        # "2025-01-31" must include "2025-01-31T12:00", so compare up to the bound's length
+        hi = bisect.bisect_right(self._dates, date_to + "\uffff") if date_to else len(self._dates)
+        return lo, hi
+
+    def notes_in_range(self, date_from: Optional[str], date_to: Optional[str]) -> Set[str]:
+        """Notes created within an ISO date range (inclusive, prefix-compared)."""
+        lo, hi = self._date_bounds(date_from, date_to)
+        return set(self._dated_ids[lo:hi])
+
+    def select_notes(self, query: GraphQuery) -> Set[str]:
+        """
+        Notes matching the note filters (tags, source types, dates).
+
+        Candidates come from the smallest applicable bucket (tag, source
+        type or date range) and are checked against the other filters, so
+        the cost follows the narrowest filter rather than the note count.
+        """
+        tags = {normalize_tag(t) for t in query.tags or ()}
+        source_types = set(query.source_types or ())
+        dated = bool(query.date_from or query.date_to)
+        lo, hi = self._date_bounds(query.date_from, query.date_to) if dated else (0, 0)
+
+        # (bucket size, candidate IDs) per active filter
+        buckets = []
+        if tags:
+            buckets.append((
+                sum(len(self.by_tag.get(t, ())) for t in tags),
+                lambda: (n for t in tags for n in self.by_tag.get(t, ())),
+            ))
+        if source_types:
+            buckets.append((
+                sum(len(self.by_source_type.get(t, ())) for t in source_types),
+                lambda: (n for t in source_types for n in self.by_source_type.get(t, ())),
+            ))
+        if dated:
+            buckets.append((hi - lo, lambda: self._dated_ids[lo:hi]))
+        if not buckets:
+            return set(self.by_type["note"])
+        _, candidates = min(buckets, key=lambda bucket: bucket[0])
+
+        date_from = query.date_from or ""
+        date_to = query.date_to + "\uffff" if query.date_to else None
+        notes = set()
+        for node_id in candidates():
+            node = self.nodes[node_id]
+            if node.get("type") != "note":
+                continue
+            if tags and not tags.intersection(normalize_tag(t) for t in node.get("tags", [])):
+                continue
+            if source_types and node.get("sourceType") not in source_types:
+                continue
+            if dated:
+                created = node.get("created_at")
+                if not created or created < date_from or (date_to and created > date_to):
+                    continue
+            notes.add(node_id)
+        return notes
+
+    def select(self, query: GraphQuery) -> Set[str]:
+        """
+        Resolve a query to the set of matching node IDs.
+
+        Note filters (tags, source types, dates) select notes; sources are
+        then those of the selected notes and entities those the selected
+        notes mention. Entity filters narrow entities further, and
+        node_types limits which kinds of node are returned.
+        """
+        types = set(query.node_types) if query.node_types else set(NODE_TYPES)
+        result: Set[str] = set()
+
+        if query.has_note_filters():
+            notes = self.select_notes(query)
+            sources = {self.nodes[n].get("sourceId") for n in notes} & self.by_type["source"]
+            entities = set().union(*(self.note_entities.get(n, set()) for n in notes)) if notes else set()
+        else:
+            notes = self.by_type["note"]
+            sources = self.by_type["source"]
+            entities = self.by_type["entity"]
+
+        if query.entity_types:
+            entities = entities & set().union(*(self.by_entity_type.get(t, set()) for t in query.entity_types))
+        if query.min_mentions:
+            entities = {e for e in entities if self.nodes[e].get("mentionCount", 0) >= query.min_mentions}
+
+        if "note" in types:
+            result |= notes
+        if "source" in types:
+            result |= sources
+        if "entity" in types:
+            result |= entities
+        return result
+
+    def subgraph(self, node_ids: Set[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Nodes and the links between them, in graph order for nodes."""
+        links = []
+        seen = set()
+        for node_id in node_ids:
+            for link in self.incident_links.get(node_id, []):
+                if id(link) in seen:
+                    continue
+                seen.add(id(link))
+                if link["source"] in node_ids and link["target"] in node_ids:
+                    links.append(link)
+
+        nodes = [self.nodes[n] for n in sorted(node_ids, key=self.order.__getitem__)]
+        return {"nodes": nodes, "links": links}
+
+
+def get_query_index() -> GraphQueryIndex:
+    """Get the query index for the current graph, rebuilt only when it changes."""
+    graph, _ = graph_sync.get_versioned_graph()
+    if _query_index_cache["graph"] is not graph:
+        _query_index_cache["index"] = GraphQueryIndex(graph)
+        _query_index_cache["graph"] = graph
+    return _query_index_cache["index"]
+
+
+def select_node_ids(query: GraphQuery) -> Set[str]:
+    """Resolve a query to matching node IDs for the current graph."""
+    return get_query_index().select(query)
+
+
+def query_graph(query: GraphQuery) -> Dict[str, Any]:
+    """
+    Get the nodes and links matching a query.
+
+    Args:
+        query: Filters to apply
+
+    Returns:
+        Dict with nodes, links and stats, shaped like build_graph output
+    """
+    graph, _ = graph_sync.get_versioned_graph()
+    if query.is_empty():
+        return graph
+
+    index = get_query_index()
+    result = index.subgraph(index.select(query))
+    node_types = [n.get("type") for n in result["nodes"]]
+    result["stats"] = {
+        "notes": node_types.count("note"),
+        "sources": node_types.count("source"),
+        "entities": node_types.count("entity"),
+        "connections": len(result["links"]),
+        "processedConversations": graph.get("stats", {}).get("processedConversations", 0),
+    }
+    return result
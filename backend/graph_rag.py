@@ -3,14 +3,15 @@
 import json
 import re
 import logging
-from typing import List, Dict, Any, Optional
-from difflib import SequenceMatcher
+from typing import AsyncIterator, List, Dict, Any, Optional
 
-from .openrouter import query_model
+from .openrouter import query_model, stream_model
 from .storage import get_conversation, list_conversations
-from .knowledge_graph import load_entities, build_graph
-from .settings import get_knowledge_graph_model
-from . import kg_chat_storage
+from .knowledge_graph import get_indexed_entities
+from .entity_matcher import extract_entities
+from .settings import get_knowledge_graph_model, get_kg_chat_settings
+from .context_packer import ContextItem, chars_per_token, context_budget, pack_context
+from . import kg_chat_storage, graph_search, graph_sync, rag_retrieval
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,9 @@ def extract_query_entities(question: str, entities: Dict[str, Any]) -> List[str]
     """
     Extract entity names from the question that match our knowledge graph.
 
+    Names and aliases are matched on word boundaries in a single pass; if
+    none occur, the semantically nearest entities are used instead.
+
     Args:
         question: User's natural language question
         entities: Dictionary of entities from knowledge graph
@@ -26,19 +30,7 @@ def extract_query_entities(question: str, entities: Dict[str, Any]) -> List[str]
     Returns:
         List of matching entity IDs
     """
-    question_lower = question.lower()
-    matched = []
-
-    for entity_id, entity in entities.items():
-        name = entity.get("name", "").lower()
-        if name and len(name) > 2:
-            # Check for exact or fuzzy match
-            if name in question_lower:
-                matched.append(entity_id)
-            elif SequenceMatcher(None, name, question_lower).ratio() > 0.8:
-                matched.append(entity_id)
-
-    return matched
+    return extract_entities(question, entities)
 
 
 def find_relevant_notes(
@@ -172,83 +164,97 @@ def get_full_note_content(note_nodes: List[Dict[str, Any]]) -> List[Dict[str, An
     return full_notes
 
 
-def build_rag_context(notes: List[Dict[str, Any]], max_length: int = 8000) -> str:
+def build_rag_context(
+    notes: List[Dict[str, Any]],
+    max_length: int = 8000,
+    model: Optional[str] = None,
+    question: Optional[str] = None
+) -> str:
     """
     Build context string from retrieved notes.
 
+    Notes are packed by score into a token budget; long bodies are cut to
+    the sentences most relevant to the question rather than dropping the
+    note. Notes keep their [Note N] numbers (N is the position in notes).
+
     Args:
         notes: List of note data with full content
-        max_length: Maximum context length
+        max_length: Maximum context length in characters
+        model: Model the context is for (sets the token budget and counting)
+        question: User's question, used to choose excerpts
 
     Returns:
         Formatted context string
     """
-    context_parts = []
-    current_length = 0
-
+    items = []
     for i, note in enumerate(notes, 1):
         tags_str = " ".join(note.get("tags", [])) if note.get("tags") else ""
-        note_text = f"""[Note {i}] "{note['title']}"
+        header = f"""[Note {i}] "{note['title']}"
 Source: {note.get('source_title', 'Unknown')}
 Tags: {tags_str}
-Content: {note['body']}
-"""
-        if current_length + len(note_text) > max_length:
-            break
+Content: """
+        # Earlier notes rank higher when scores tie
+        items.append(ContextItem(header, note["body"] + "\n", note.get("score", 0) - i * 1e-6))
 
-        context_parts.append(note_text)
-        current_length += len(note_text)
+    budget = context_budget(model, cap=int(max_length / chars_per_token(model)))
+    packed = pack_context(items, budget, model=model, query=question, separator="\n---\n")
+    return "\n---\n".join(text for text in packed if text is not None)
 
-    return "\n---\n".join(context_parts)
 
-
-async def query_knowledge_graph(
+def prepare_rag_turn(
     question: str,
     conversation_history: Optional[List[Dict[str, str]]] = None,
     model: Optional[str] = None
 ) -> Dict[str, Any]:
     """
-    Query the knowledge graph with a natural language question.
+    Retrieve notes for a question and build the answer prompt.
 
     Args:
         question: User's question
         conversation_history: Previous messages in the chat
-        model: LLM model to use for answering (defaults to settings)
+        model: Model that will answer (sets the context budget)
 
     Returns:
-        Dict with answer, citations, and follow-up suggestions
+        Dict with full_notes and messages, or with a final "result" when
+        there is nothing to ask the model (no notes found)
     """
-    if model is None:
-        model = get_knowledge_graph_model()
-
-    # Load graph and entity data
-    entities_data = load_entities()
-    graph_data = build_graph()
+    chat_settings = get_kg_chat_settings()
 
-    # Find relevant notes
-    relevant = find_relevant_notes(question, graph_data, entities_data)
+    # Find relevant notes: vector search + entity expansion + MMR, falling
+    # back to keyword scoring if the embedding index is unavailable
+    try:
+        relevant = rag_retrieval.retrieve_notes(question)
+        fetch_content = rag_retrieval.get_note_content
+    except Exception as e:
+        logger.warning(f"Embedding retrieval failed, using keyword matching: {e}")
+        entities_data, _ = get_indexed_entities()
+        graph_data, _ = graph_sync.get_versioned_graph()
+        relevant = find_relevant_notes(question, graph_data, entities_data)
+        fetch_content = get_full_note_content
 
     if not relevant:
-        return {
+        return {"result": {
             "answer": "I couldn't find any notes in your knowledge graph related to your question. Try running the migration to index your existing notes, or create some Synthesizer notes first.",
             "citations": [],
             "follow_ups": [],
             "notes_searched": 0
-        }
+        }}
 
     # Get full content for relevant notes
-    full_notes = get_full_note_content(relevant)
+    full_notes = fetch_content(relevant)
 
     if not full_notes:
-        return {
+        return {"result": {
             "answer": "I found some potentially relevant notes but couldn't retrieve their content. The knowledge graph may need to be rebuilt.",
             "citations": [],
             "follow_ups": [],
             "notes_searched": len(relevant)
-        }
+        }}
 
     # Build context
-    context = build_rag_context(full_notes)
+    context = build_rag_context(
+        full_notes, max_length=chat_settings["context_max_length"], model=model, question=question
+    )
 
     # Build conversation history for prompt
     history_text = ""
@@ -287,10 +293,99 @@ FOLLOW_UPS:
 - [Question 2]
 - [Question 3]"""
 
-    messages = [{"role": "user", "content": prompt}]
+    return {"full_notes": full_notes, "messages": [{"role": "user", "content": prompt}]}
+
+
+def make_citation(note: Dict[str, Any]) -> Dict[str, Any]:
+    """Citation entry for a retrieved note."""
+    return {
+        "note_id": note["id"],
+        "title": note["title"],
+        "snippet": note["body"][:150] + "..." if len(note["body"]) > 150 else note["body"],
+        "conversation_id": note["conversation_id"]
+    }
+
+
+def parse_rag_response(content: str, full_notes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Split a model response into answer, citations and follow-ups.
+
+    Args:
+        content: Raw model output in the ANSWER: / FOLLOW_UPS: format
+        full_notes: Notes given to the model, in [Note N] order
+
+    Returns:
+        Dict with answer, citations, follow_ups and notes_searched
+    """
+    answer = content
+    follow_ups = []
+
+    # Extract answer section
+    if "ANSWER:" in content:
+        parts = content.split("FOLLOW_UPS:")
+        answer = parts[0].replace("ANSWER:", "").strip()
+
+        if len(parts) > 1:
+            follow_ups_text = parts[1].strip()
+            # Extract bullet points
+            for line in follow_ups_text.split("\n"):
+                line = line.strip()
+                if line.startswith("-") or line.startswith("•"):
+                    follow_ups.append(line[1:].strip())
+
+    # Build citations from the notes we provided
+    citations = []
+    for i, note in enumerate(full_notes, 1):
+        citation_marker = f"[Note {i}]"
+        if citation_marker in answer:
+            citations.append(make_citation(note))
+
+    return {
+        "answer": answer,
+        "citations": citations,
+        "follow_ups": follow_ups[:5],
+        "notes_searched": len(full_notes)
+    }
+
+
+def empty_response_result(model: str, full_notes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Answer to show when the model returned no content."""
+    return {
+        "answer": f"Model '{model}' returned empty response. Try a different model in Settings > Knowledge Graph.",
+        "citations": [],
+        "follow_ups": [],
+        "notes_searched": len(full_notes)
+    }
+
+
+async def query_knowledge_graph(
+    question: str,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    model: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Query the knowledge graph with a natural language question.
+
+    Args:
+        question: User's question
+        conversation_history: Previous messages in the chat
+        model: LLM model to use for answering (defaults to settings)
+
+    Returns:
+        Dict with answer, citations, and follow-up suggestions
+    """
+    if model is None:
+        model = get_knowledge_graph_model()
+
+    # Embed new and changed notes in the background; this turn uses the vectors already indexed
+    graph_search.refresh_kg_index_in_background()
+    turn = prepare_rag_turn(question, conversation_history, model)
+    if "result" in turn:
+        return turn["result"]
+    full_notes = turn["full_notes"]
 
     try:
-        response = await query_model(model, messages, timeout=90.0)
+        response = await query_model(model, turn["messages"], timeout=90.0)
 
         # Check for error response from query_model
         if response and response.get("error"):
@@ -302,59 +397,172 @@ FOLLOW_UPS:
             }
 
         if not response or not response.get("content"):
-            return {
-                "answer": f"Model '{model}' returned empty response. Try a different model in Settings > Knowledge Graph.",
-                "citations": [],
-                "follow_ups": [],
-                "notes_searched": len(full_notes)
-            }
+            return empty_response_result(model, full_notes)
 
-        content = response["content"]
-
-        # Parse response
-        answer = content
-        follow_ups = []
-
-        # Extract answer section
-        if "ANSWER:" in content:
-            parts = content.split("FOLLOW_UPS:")
-            answer = parts[0].replace("ANSWER:", "").strip()
-
-            if len(parts) > 1:
-                follow_ups_text = parts[1].strip()
-                # Extract bullet points
-                for line in follow_ups_text.split("\n"):
-                    line = line.strip()
-                    if line.startswith("-") or line.startswith("•"):
-                        follow_ups.append(line[1:].strip())
-
-        # Build citations from the notes we provided
-        citations = []
-        for i, note in enumerate(full_notes, 1):
-            citation_marker = f"[Note {i}]"
-            if citation_marker in answer:
-                citations.append({
-                    "note_id": note["id"],
-                    "title": note["title"],
-                    "snippet": note["body"][:150] + "..." if len(note["body"]) > 150 else note["body"],
-                    "conversation_id": note["conversation_id"]
-                })
+        return parse_rag_response(response["content"], full_notes)
 
+    except Exception as e:
+        logger.error(f"Error in Graph RAG query: {e}")
         return {
-            "answer": answer,
-            "citations": citations,
-            "follow_ups": follow_ups[:5],
+            "answer": f"An error occurred while answering: {str(e)}",
+            "citations": [],
+            "follow_ups": [],
             "notes_searched": len(full_notes)
         }
 
+
+class AnswerStreamParser:
+    """
+    Incrementally extracts the answer section from a streamed response.
+
+    Text before the answer marker and from the follow-ups marker on is
+    withheld; a marker-length tail is held back until it can no longer be
+    the start of the follow-ups marker.
+    """
+
+    ANSWER_MARKER = "ANSWER:"
+    FOLLOW_UPS_MARKER = "FOLLOW_UPS:"
+
+    def __init__(self):
+        self.text = ""
+        self._start: Optional[int] = None
+        self._emitted = 0
+        self._done = False
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of model output; returns newly available answer text."""
+        self.text += chunk
+        if self._done:
+            return ""
+
+        if self._start is None:
+            stripped = self.text.lstrip()
+            if self.ANSWER_MARKER.startswith(stripped):
+                return ""
+            if stripped.startswith(self.ANSWER_MARKER):
+                self._start = self.text.index(self.ANSWER_MARKER) + len(self.ANSWER_MARKER)
+            else:
+                self._start = 0
+            self._emitted = self._start
+
+        end = self.text.find(self.FOLLOW_UPS_MARKER, self._start)
+        if end == -1:
+            end = len(self.text) - len(self.FOLLOW_UPS_MARKER) + 1
+        else:
+            self._done = True
+        return self._emit(end)
+
+    def finish(self) -> str:
+        """Flush the remaining answer text at the end of the stream."""
+        if self._done:
+            return ""
+        self._done = True
+        if self._start is None:
+            self._start = self._emitted = 0
+        return self._emit(len(self.text))
+
+    def _emit(self, end: int) -> str:
+        if self._emitted == self._start:
+            # Skip whitespace after the marker
+            while self._emitted < end and self.text[self._emitted].isspace():
+                self._emitted += 1
+                self._start = self._emitted
+        if end <= self._emitted:
+            return ""
+        out = self.text[self._emitted:end]
+        self._emitted = end
+        return out
+
+    @property
+    def answer_so_far(self) -> str:
+        return self.text[self._start or 0:self._emitted]
+
+
+async def stream_knowledge_graph_query(
+    question: str,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    model: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Query the knowledge graph, streaming retrieval results and answer tokens.
+
+    Yields events in order:
+        {"type": "notes", "data": [...]} - retrieved notes, before generation
+        {"type": "token", "data": str} - answer text as it arrives
+        {"type": "citation", "data": {...}} - first time a note is cited
+        {"type": "complete", "data": result} - same shape as query_knowledge_graph
+
+    Args:
+        question: User's question
+        conversation_history: Previous messages in the chat
+        model: LLM model to use for answering (defaults to settings)
+    """
+    if model is None:
+        model = get_knowledge_graph_model()
+
+    # Embed new and changed notes in the background; this turn uses the vectors already indexed
+    graph_search.refresh_kg_index_in_background()
+    turn = prepare_rag_turn(question, conversation_history, model)
+    if "result" in turn:
+        yield {"type": "notes", "data": []}
+        yield {"type": "complete", "data": turn["result"]}
+        return
+    full_notes = turn["full_notes"]
+
+    yield {"type": "notes", "data": [make_citation(note) for note in full_notes]}
+
+    parser = AnswerStreamParser()
+    cited = set()
+    scanned = 0
+
+    def new_citations():
+        nonlocal scanned
+        answer = parser.answer_so_far
+        # Re-scan a little before the last position so markers split across chunks are found
+        for match in re.finditer(r"\[Note (\d+)\]", answer[max(0, scanned - 12):]):
+            n = int(match.group(1))
+            if n not in cited and 1 <= n <= len(full_notes):
+                cited.add(n)
+                yield {"type": "citation", "data": make_citation(full_notes[n - 1])}
+        scanned = len(answer)
+
+    try:
+        async for chunk in stream_model(model, turn["messages"], timeout=90.0):
+            if chunk.get("error"):
+                yield {"type": "complete", "data": {
+                    "answer": f"Error: {chunk['error']}",
+                    "citations": [],
+                    "follow_ups": [],
+                    "notes_searched": len(full_notes)
+                }}
+                return
+            if chunk.get("content"):
+                text = parser.feed(chunk["content"])
+                if text:
+                    yield {"type": "token", "data": text}
+                    for event in new_citations():
+                        yield event
+
+        text = parser.finish()
+        if text:
+            yield {"type": "token", "data": text}
+            for event in new_citations():
+                yield event
+
+        if not parser.text.strip():
+            yield {"type": "complete", "data": empty_response_result(model, full_notes)}
+            return
+
+        yield {"type": "complete", "data": parse_rag_response(parser.text, full_notes)}
+
     except Exception as e:
-        logger.error(f"Error in Graph RAG query: {e}")
-        return {
+        logger.error(f"Error in streaming Graph RAG query: {e}")
+        yield {"type": "complete", "data": {
             "answer": f"An error occurred while answering: {str(e)}",
             "citations": [],
             "follow_ups": [],
             "notes_searched": len(full_notes)
-        }
+        }}
 
 
 # Chat session management - delegates to kg_chat_storage for persistence
@@ -1,19 +1,36 @@
 """Semantic search for knowledge graph nodes using fastembed."""
 
+import asyncio
 import hashlib
+import logging
 import math
 import os
 import pickle
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 import numpy as np
 
 from .search import get_model  # Share model with conversation search
+from .graph_query import GraphQuery, select_node_ids
+
+logger = logging.getLogger(__name__)
 
 # Module-level cache for knowledge graph index
 _kg_index: Optional[Dict[str, Any]] = None
 
+# Graph build the in-memory index was last synced against
+_indexed_graph: Optional[Dict[str, Any]] = None
+
+# Incremented whenever the in-memory index changes
+_index_version = 0
+
+# Normalized embedding matrices per node type, valid for one index version
+_vector_cache: Dict[str, Dict[str, Any]] = {}
+
+# Lock serializing async index syncs, and the background sync task
+_sync_state: Dict[str, Any] = {"lock": None, "loop": None, "task": None}
+
 # Index file path
 INDEX_DIR = os.getenv("DATA_DIR", "data")
 KG_INDEX_PATH = os.path.join(
@@ -112,22 +129,12 @@ def save_kg_index(index: Dict[str, Any]):
         pickle.dump(index, f)
 
 
-def build_kg_index() -> Dict[str, Any]:
-    """Build/update the search index from the knowledge graph."""
-    from . import knowledge_graph
-
-    index = load_kg_index()
-    model = get_model()
-
-    # Get the full graph
-    graph = knowledge_graph.build_graph()
-    nodes = graph.get("nodes", [])
-
-    # Track which nodes need (re)indexing
+def _plan_index_sync(graph: Dict[str, Any], index: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Nodes of a graph build that need (re)embedding, and index entries to delete."""
     to_index = []
     current_ids = set()
 
-    for node in nodes:
+    for node in graph.get("nodes", []):
         node_id = node.get("id", "")
         if not node_id:
             continue
@@ -166,33 +173,159 @@ def build_kg_index() -> Dict[str, Any]:
                 "created_at": node.get("created_at", ""),
             })
 
-    # Remove deleted nodes from index
-    deleted = set(index.keys()) - current_ids
-    for node_id in deleted:
-        del index[node_id]
-
-    # Generate embeddings for new/changed nodes
-    if to_index:
-        contents = [item["content"] for item in to_index]
-        embeddings = list(model.embed(contents))
-
-        for item, embedding in zip(to_index, embeddings):
-            index[item["id"]] = {
-                "embedding": np.array(embedding),
-                "content_hash": item["hash"],
-                "type": item["type"],
-                "name": item["name"],
-                "entity_type": item["entity_type"],
-                "tags": item["tags"],
-                "mention_count": item["mention_count"],
-                "created_at": item["created_at"],
-            }
+    deleted = [node_id for node_id in index if node_id not in current_ids]
+    return to_index, deleted
+
+
+def _embed_contents(contents: List[str]) -> List[np.ndarray]:
+    """Embed node contents (the slow part of an index sync; touches no shared state)."""
+    return [np.array(embedding) for embedding in get_model().embed(contents)]
+
 
+def _apply_index_sync(
+    graph: Dict[str, Any],
+    index: Dict[str, Any],
+    to_index: List[Dict[str, Any]],
+    embeddings: List[np.ndarray],
+    deleted: List[str]
+):
+    """Write a planned sync into the index and mark it synced against the graph build."""
+    global _indexed_graph, _index_version
+
+    for node_id in deleted:
+        index.pop(node_id, None)
+
+    for item, embedding in zip(to_index, embeddings):
+        index[item["id"]] = {
+            "embedding": embedding,
+            "content_hash": item["hash"],
+            "type": item["type"],
+            "name": item["name"],
+            "entity_type": item["entity_type"],
+            "tags": item["tags"],
+            "mention_count": item["mention_count"],
+            "created_at": item["created_at"],
+        }
+
+    if to_index or deleted:
         save_kg_index(index)
 
+    _indexed_graph = graph
+    _index_version += 1
+
+
+def build_kg_index() -> Dict[str, Any]:
+    """Build/update the search index from the knowledge graph."""
+    from . import graph_sync
+
+    index = load_kg_index()
+
+    # The graph build is cached until its inputs change; if it is the same
+    # build the index was last synced against, there is nothing to do
+    graph, _ = graph_sync.get_versioned_graph()
+    if graph is _indexed_graph and index:
+        return index
+
+    to_index, deleted = _plan_index_sync(graph, index)
+    embeddings = _embed_contents([item["content"] for item in to_index]) if to_index else []
+    _apply_index_sync(graph, index, to_index, embeddings, deleted)
     return index
 
 
+async def sync_kg_index() -> Dict[str, Any]:
+    """
+    build_kg_index for async callers.
+
+    The graph build, index and index file are only touched on the event
+    loop; just the embedding of new or changed nodes runs in a worker
+    thread. Concurrent calls wait for the sync in progress.
+    """
+    from . import graph_sync
+
+    async with _get_sync_lock():
+        index = load_kg_index()
+        graph, _ = graph_sync.get_versioned_graph()
+        if graph is _indexed_graph and index:
+            return index
+
+        to_index, deleted = _plan_index_sync(graph, index)
+        embeddings = []
+        if to_index:
+            embeddings = await asyncio.to_thread(_embed_contents, [item["content"] for item in to_index])
+        _apply_index_sync(graph, index, to_index, embeddings, deleted)
+        return index
+
+
+def _get_sync_lock() -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    if _sync_state["lock"] is None or _sync_state["loop"] is not loop:
+        _sync_state.update(lock=asyncio.Lock(), loop=loop)
+    return _sync_state["lock"]
+
+
+def refresh_kg_index_in_background() -> Optional[asyncio.Task]:
+    """
+    Start an index sync unless one is already running.
+
+    Request paths call this and read the vectors already indexed, so a
+    large re-embedding never delays the request that noticed it.
+
+    Returns:
+        The running sync task, or None if the index is current
+    """
+    from . import graph_sync
+
+    task = _sync_state["task"]
+    if task is not None and not task.done():
+        return task
+
+    graph, _ = graph_sync.get_versioned_graph()
+    if graph is _indexed_graph and load_kg_index():
+        return None
+
+    task = asyncio.get_running_loop().create_task(sync_kg_index())
+    task.add_done_callback(_log_sync_failure)
+    _sync_state["task"] = task
+    return task
+
+
+def _log_sync_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.warning(f"Background search index sync failed: {task.exception()}")
+
+
+def get_node_vectors(node_type: str, sync: bool = True) -> Tuple[List[str], Dict[str, int], np.ndarray]:
+    """
+    Get unit-normalized embeddings for all indexed nodes of one type.
+
+    The matrix is rebuilt only when the index has changed.
+
+    Args:
+        node_type: Node type (note, entity, source)
+        sync: Sync the index against the current graph first (embeds new
+            and changed nodes); pass False on async paths, which should
+            await sync_kg_index() or use refresh_kg_index_in_background()
+
+    Returns:
+        Tuple of (node IDs, node ID -> row, (n, dim) float32 matrix)
+    """
+    index = build_kg_index() if sync else load_kg_index()
+    cached = _vector_cache.get(node_type)
+    if cached and cached["index"] is index and cached["version"] == _index_version:
+        return cached["ids"], cached["rows"], cached["matrix"]
+
+    ids = [node_id for node_id, data in index.items() if data["type"] == node_type]
+    if ids:
+        matrix = np.asarray([index[node_id]["embedding"] for node_id in ids], dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-9)
+    else:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+    rows = {node_id: i for i, node_id in enumerate(ids)}
+
+    _vector_cache[node_type] = {"index": index, "version": _index_version, "ids": ids, "rows": rows, "matrix": matrix}
+    return ids, rows, matrix
+
+
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     """Calculate cosine similarity between two vectors."""
     dot = np.dot(a, b)
@@ -216,17 +349,28 @@ def search_knowledge_graph(
     node_types: Optional[List[str]] = None,
     entity_types: Optional[List[str]] = None,
     tags: Optional[List[str]] = None,
-    limit: int = 20
+    limit: int = 20,
+    source_types: Optional[List[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    min_mentions: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Search knowledge graph nodes by semantic similarity.
 
+    Filters are resolved to a candidate set by the graph query layer, so
+    only matching nodes are scored.
+
     Args:
         query: Search query string
         node_types: Optional list of node types to filter (entity, note, source)
         entity_types: Optional list of entity types to filter (person, organization, etc.)
         tags: Optional list of tags to filter notes by
         limit: Maximum results to return
+        source_types: Optional list of source types to filter notes by
+        date_from: Optional ISO date; only notes created on or after it
+        date_to: Optional ISO date; only notes created on or before it
+        min_mentions: Optional minimum mention count for entities
 
     Returns:
         List of results with id, type, name, score, and other metadata
@@ -245,23 +389,24 @@ def search_knowledge_graph(
     query_embedding = list(model.embed([query]))[0]
     query_embedding = np.array(query_embedding)
 
-    # Score all nodes
+    filters = GraphQuery(
+        tags=tags,
+        node_types=node_types,
+        entity_types=entity_types,
+        source_types=source_types,
+        date_from=date_from,
+        date_to=date_to,
+        min_mentions=min_mentions,
+    )
+    if filters.is_empty():
+        candidates = index.keys()
+    else:
+        candidates = select_node_ids(filters) & index.keys()
+
+    # Score candidate nodes
     results = []
-    for node_id, data in index.items():
-        # Apply type filters
-        if node_types and data["type"] not in node_types:
-            continue
-
-        if entity_types and data["type"] == "entity":
-            if data["entity_type"] not in entity_types:
-                continue
-
-        if tags and data["type"] == "note":
-            node_tags = [t.lower().lstrip("#") for t in data.get("tags", [])]
-            query_tags = [t.lower().lstrip("#") for t in tags]
-            if not any(qt in node_tags for qt in query_tags):
-                continue
-
+    for node_id in candidates:
+        data = index[node_id]
         similarity = cosine_similarity(query_embedding, data["embedding"])
 
         # Combined score: 70% similarity, 30% mention boost (for entities)
@@ -288,8 +433,11 @@ def search_knowledge_graph(
 
 def clear_kg_index():
     """Clear the in-memory index cache."""
-    global _kg_index
+    global _kg_index, _indexed_graph, _index_version
     _kg_index = None
+    _indexed_graph = None
+    _index_version += 1
+    _vector_cache.clear()
 
     # Also remove the file if it exists
     if os.path.exists(KG_INDEX_PATH):
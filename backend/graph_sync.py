@@ -0,0 +1,256 @@
+"""Versioned knowledge graph snapshots for ETag and delta sync.
+
+The graph is rebuilt only when its inputs (conversation files, entities,
+manual links) change on disk. Each rebuild is diffed against the previous
+snapshot; if any node or link changed, the graph version is bumped and the
+changed IDs are appended to a bounded change log, so clients that already
+hold version N can fetch only what changed since then.
+"""
+
+import hashlib
+import json
+import os
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import knowledge_graph, storage
+
+logger = logging.getLogger(__name__)
+
+# Number of versions kept in the change log; older clients get the full graph
+GRAPH_CHANGE_LOG_LIMIT = 50
+
+_graph_cache: Dict[str, Any] = {"input_key": None, "graph": None, "state": None}
+
+
+def get_graph_versions_path() -> str:
+    """Get the path to the graph version state file."""
+    return os.path.join(knowledge_graph.KNOWLEDGE_GRAPH_DIR, "graph_versions.json")
+
+
+def _empty_state() -> Dict[str, Any]:
+    return {"version": 0, "input_key": None, "nodes": {}, "links": {}, "changes": []}
+
+
+def load_graph_versions() -> Dict[str, Any]:
+    """Load graph version state (snapshot fingerprints and change log)."""
+    path = get_graph_versions_path()
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Failed to load graph versions, starting fresh: {e}")
+    return _empty_state()
+
+
+def save_graph_versions(state: Dict[str, Any]):
+    """Save graph version state atomically."""
+    knowledge_graph.ensure_kg_dir()
+    path = get_graph_versions_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _file_signature(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size]
+    except FileNotFoundError:
+        return None
+
+
+def compute_input_key() -> str:
+    """
+    Fingerprint the files the graph is built from, without parsing them.
+
+    Returns:
+        Hex digest that changes whenever any input file changes
+    """
+    signatures = {
+        "entities": _file_signature(knowledge_graph.get_entities_path()),
+        "manual_links": _file_signature(knowledge_graph.get_manual_links_path()),
+    }
+
+    conversations = []
+    if os.path.isdir(storage.DATA_DIR):
+        with os.scandir(storage.DATA_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    conversations.append([entry.name, stat.st_mtime_ns, stat.st_size])
+    signatures["conversations"] = sorted(conversations)
+
+    return hashlib.sha1(json.dumps(signatures).encode()).hexdigest()
+
+
+def link_key(link: Dict[str, Any]) -> str:
+    """
+    Identity of a link for delta sync: "source|target|type|value-or-label".
+
+    Clients use this to match links listed as removed in a delta.
+    """
+    return "|".join([
+        str(link.get("source", "")),
+        str(link.get("target", "")),
+        str(link.get("type", "")),
+        str(link.get("value") or link.get("label") or ""),
+    ])
+
+
+def _fingerprint(obj: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _keyed_links(links: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Map link keys to links, suffixing repeats so every link has a unique key."""
+    keyed = {}
+    for link in links:
+        key = link_key(link)
+        if key in keyed:
+            n = 2
+            while f"{key}#{n}" in keyed:
+                n += 1
+            key = f"{key}#{n}"
+        keyed[key] = link
+    return keyed
+
+
+def _diff(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, List[str]]:
+    return {
+        "added": [k for k in new if k not in old],
+        "changed": [k for k in new if k in old and old[k] != new[k]],
+        "removed": [k for k in old if k not in new],
+    }
+
+
+def get_versioned_graph() -> Tuple[Dict[str, Any], int]:
+    """
+    Get the knowledge graph and its version, rebuilding only when inputs change.
+
+    The returned graph is shared between callers and must not be mutated.
+
+    Returns:
+        Tuple of (graph, version)
+    """
+    input_key = compute_input_key()
+    if _graph_cache["input_key"] == input_key and _graph_cache["graph"] is not None:
+        return _graph_cache["graph"], _graph_cache["state"]["version"]
+
+    graph = knowledge_graph.build_graph()
+    state = _graph_cache["state"] or load_graph_versions()
+
+    node_hashes = {n["id"]: _fingerprint(n) for n in graph["nodes"]}
+    link_hashes = {k: _fingerprint(l) for k, l in _keyed_links(graph["links"]).items()}
+
+    node_diff = _diff(state["nodes"], node_hashes)
+    link_diff = _diff(state["links"], link_hashes)
+    changed = any(node_diff.values()) or any(link_diff.values())
+
+    if state["version"] == 0:
+        # First snapshot: nothing for clients to have synced against yet
+        state["version"] = 1
+    elif changed:
+        state["version"] += 1
+        state["changes"].append({
+            "version": state["version"],
+            "at": datetime.utcnow().isoformat(),
+            "nodes": node_diff,
+            "links": link_diff,
+        })
+        state["changes"] = state["changes"][-GRAPH_CHANGE_LOG_LIMIT:]
+
+    state["nodes"] = node_hashes
+    state["links"] = link_hashes
+    state["input_key"] = input_key
+    save_graph_versions(state)
+
+    _graph_cache.update({"input_key": input_key, "graph": graph, "state": state})
+    return graph, state["version"]
+
+
+def _collapse(entries: List[Dict[str, Any]], section: str) -> Dict[str, str]:
+    """Reduce consecutive change entries to the first operation seen per ID."""
+    first_op = {}
+    for entry in entries:
+        for op in ("added", "changed", "removed"):
+            for item_id in entry[section][op]:
+                first_op.setdefault(item_id, op)
+    return first_op
+
+
+def _resolve(first_op: Dict[str, str], current: Dict[str, Dict[str, Any]]) -> Dict[str, list]:
+    result = {"added": [], "changed": [], "removed": []}
+    for item_id, op in first_op.items():
+        if item_id in current:
+            result["added" if op == "added" else "changed"].append(current[item_id])
+        elif op != "added":
+            result["removed"].append(item_id)
+    return result
+
+
+def get_graph_delta(since: int) -> Optional[Dict[str, Any]]:
+    """
+    Get the nodes and links that changed after a given graph version.
+
+    Added and changed entries carry the current node/link; removed entries
+    are node IDs and link keys (see link_key).
+
+    Args:
+        since: Graph version the client already has
+
+    Returns:
+        Delta dict, or None if the version is unknown or older than the
+        change log (the client should fetch the full graph)
+    """
+    graph, version = get_versioned_graph()
+    state = _graph_cache["state"]
+
+    if since > version:
+        return None
+
+    entries = [c for c in state["changes"] if c["version"] > since]
+    if since < version and (not entries or entries[0]["version"] != since + 1):
+        return None
+
+    nodes = {n["id"]: n for n in graph["nodes"]}
+    links = _keyed_links(graph["links"])
+
+    return {
+        "delta": True,
+        "since": since,
+        "version": version,
+        "nodes": _resolve(_collapse(entries, "nodes"), nodes),
+        "links": _resolve(_collapse(entries, "links"), links),
+        "stats": graph["stats"],
+    }
+
+
+def graph_etag(version: int, variant: Optional[str] = None) -> str:
+    """
+    Build the ETag for a graph version.
+
+    Args:
+        version: Graph version
+        variant: Optional request variant (e.g. tag filter) that changes the body
+    """
+    if variant:
+        suffix = hashlib.sha1(variant.encode()).hexdigest()[:8]
+        return f'"kg-{version}-{suffix}"'
+    return f'"kg-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
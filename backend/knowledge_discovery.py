@@ -17,6 +17,7 @@ import asyncio
 from .openrouter import query_model, get_generation_cost
 from .storage import get_conversation, list_conversations, save_conversation, update_conversation_cost, update_conversation_summary
 from .graph_search import search_knowledge_graph
+from . import discovery_candidates, graph_distance, graph_search, note_catalog
 from .knowledge_graph import load_entities, build_graph, extract_entities_for_conversation
 from .summarizer import generate_summary
 
@@ -200,33 +201,18 @@ def _collect_notes_for_discovery(prompt: str, limit: int = 50) -> List[Dict[str,
     Uses semantic search to find notes relevant to the user's prompt,
     then enriches with additional context.
     """
-    # Get all synthesizer conversations
-    all_conversations = list_conversations()
-    synth_conversations = [c for c in all_conversations if c.get("mode") == "synthesizer"]
-
-    # Collect all notes with full context
-    all_notes = []
-    for conv in synth_conversations:
-        full_conv = get_conversation(conv["id"])
-        if not full_conv:
-            continue
-
-        source_title = full_conv.get("title", "Untitled")
-
-        for msg in full_conv.get("messages", []):
-            if msg.get("role") != "assistant":
-                continue
-
-            for note in msg.get("notes", []):
-                note_id = f"note:{conv['id']}:{note['id']}"
-                all_notes.append({
-                    "id": note_id,
-                    "title": note.get("title", ""),
-                    "body": note.get("body", ""),
-                    "tags": note.get("tags", []),
-                    "source_id": conv["id"],
-                    "source_title": source_title
-                })
+    # Collect all synthesizer notes from the note catalog
+    all_notes = [
+        {
+            "id": note["id"],
+            "title": note["title"],
+            "body": note["body"],
+            "tags": note["tags"],
+            "source_id": note["conversation_id"],
+            "source_title": note["conversation_title"]
+        }
+        for note in note_catalog.list_notes()
+    ]
 
     if not all_notes:
         return []
@@ -377,7 +363,7 @@ async def run_discovery_analysis(
         discovery_state.phase = "searching"
         discovery_state.progress = 10
 
-        notes = _collect_notes_for_discovery(prompt, limit=30)
+        notes = _collect_notes_for_discovery(prompt, limit=50)
         discovery_state.total_notes = len(notes)
 
         if len(notes) < 2:
@@ -392,7 +378,16 @@ async def run_discovery_analysis(
         discovery_state.progress = 30
 
         notes = _filter_trivial_connections(notes)
+
+        # Only send the notes of the mined candidate pairs; without pairs
+        # (e.g. notes not embedded yet), fall back to the full selection
+        await graph_search.sync_kg_index()
+        candidate_pairs = await asyncio.to_thread(discovery_candidates.mine_candidate_pairs, notes)
+        if candidate_pairs:
+            notes = discovery_candidates.select_pair_notes(notes, candidate_pairs)
         notes_content = _format_notes_for_prompt(notes)
+        if candidate_pairs:
+            notes_content += "\n\n" + discovery_candidates.format_candidate_pairs(candidate_pairs, notes)
 
         # Optional: Web search for bridging concepts
         web_research = "No web research performed."
@@ -545,6 +540,9 @@ async def run_discovery_analysis(
 
             discoveries.append(discovery)
 
+        # Prioritise bridges by how much they would shorten paths in the graph
+        discoveries = graph_distance.rank_bridges(discoveries)
+
         discovery_state.progress = 100
 
         # Save discoveries
@@ -556,6 +554,7 @@ async def run_discovery_analysis(
             "started_at": discovery_state.started_at,
             "completed_at": datetime.utcnow().isoformat(),
             "notes_analyzed": len(notes),
+            "candidate_pairs": len(candidate_pairs),
             "discoveries_generated": len(discoveries),
             "model": model
         })
@@ -580,7 +579,8 @@ async def run_discovery_analysis(
 
 def list_discoveries(
     status: Optional[str] = None,
-    limit: int = 50
+    limit: int = 50,
+    sort: str = "recent"
 ) -> List[Dict[str, Any]]:
     """
     List discoveries with optional status filter.
@@ -588,6 +588,7 @@ def list_discoveries(
     Args:
         status: Filter by status (pending, approved, dismissed)
         limit: Maximum discoveries to return
+        sort: "recent" (newest first) or "impact" (highest structural impact first)
 
     Returns:
         List of discovery dicts
@@ -601,6 +602,12 @@ def list_discoveries(
     # Sort by created_at descending (most recent first)
     discoveries.sort(key=lambda d: d.get("created_at", ""), reverse=True)
 
+    if sort == "impact":
+        discoveries.sort(
+            key=lambda d: (d.get("graph_distance") or {}).get("structural_impact", 0),
+            reverse=True
+        )
+
     return discoveries[:limit]
 
 
@@ -648,6 +655,12 @@ async def approve_discovery(
     body = edits.get("body", discovery["suggested_body"]) if edits else discovery["suggested_body"]
     tags = edits.get("tags", discovery["suggested_tags"]) if edits else discovery["suggested_tags"]
 
+    # Distances as they stand just before the bridge is added
+    try:
+        discovery["graph_distance"] = graph_distance.score_bridge(discovery["source_notes"])
+    except Exception as e:
+        logger.warning(f"Failed to score graph distance for discovery {discovery_id}: {e}")
+
     # Create a discovery conversation
     conv_id = f"disc-{uuid.uuid4().hex[:8]}"
     note_id = f"note-{uuid.uuid4().hex[:8]}"
@@ -1,19 +1,31 @@
 """Knowledge Graph module for connecting Synthesizer notes."""
 
 import json
+import hashlib
 import os
 import re
 import uuid
+import time
 import asyncio
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from difflib import SequenceMatcher
 
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
 from .openrouter import query_model
+from .rate_limiter import TokenBucketRateLimiter
+from .relationship_index import RelationshipIndex, compact_relationships, expand_relationships
+from . import quality_counters
 from .storage import get_conversation, list_conversations
-from .settings import get_knowledge_graph_model
+from .settings import get_knowledge_graph_model, get_kg_entity_extraction_settings, get_kg_migration_settings
 from .source_metadata import (
     SourceMetadata,
     extract_source_metadata,
@@ -50,6 +62,10 @@ def load_entities() -> Dict[str, Any]:
     if os.path.exists(path):
         with open(path, 'r') as f:
             data = json.load(f)
+            # Relationships are persisted in compact columnar form
+            compact = data.pop("entity_relationships_compact", None)
+            if compact is not None:
+                data["entity_relationships"] = expand_relationships(compact)
             # Ensure entity_relationships exists (migration)
             if "entity_relationships" not in data:
                 data["entity_relationships"] = []
@@ -64,14 +80,256 @@ def load_entities() -> Dict[str, Any]:
     }
 
 
+# Bumped on every save so cached read-only views are invalidated
+_entities_version = 0
+_indexed_entities_cache: Dict[str, Any] = {"key": None, "data": None, "index": None}
+
+# Serializes entity store transactions within this process
+_entities_lock = threading.RLock()
+_entities_txn_local = threading.local()
+
+
+def get_entities_lock_path() -> str:
+    """Get the path to the entity store lock file."""
+    return os.path.join(KNOWLEDGE_GRAPH_DIR, "entities.lock")
+
+
 def save_entities(data: Dict[str, Any]):
-    """Save entities to storage."""
+    """
+    Save entities to storage.
+
+    The file is replaced atomically so readers never see a partial write.
+    Prefer entity_transaction() for load-modify-save updates; calling this
+    directly can overwrite changes made since the data was loaded.
+    """
+    global _entities_version
+
     ensure_kg_dir()
     data["updated_at"] = datetime.utcnow().isoformat()
+    data["version"] = data.get("version", 0) + 1
+
+    payload = {k: v for k, v in data.items() if k != "entity_relationships"}
+    payload["entity_relationships_compact"] = compact_relationships(data.get("entity_relationships", []))
 
     path = get_entities_path()
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=2)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    _entities_version += 1
+
+
+class EntityTransaction:
+    """Handle for an open entity store transaction."""
+
+    def __init__(self, data: Dict[str, Any], parent: Optional["EntityTransaction"] = None):
+        self.data = data
+        self.rolled_back = False
+        self._root = parent._root if parent is not None else self
+        self._relationship_index: Optional[RelationshipIndex] = None
+
+    def rollback(self):
+        """Discard this transaction's changes instead of saving them."""
+        self.rolled_back = True
+
+    def relationship_index(self) -> RelationshipIndex:
+        """
+        Index over the transaction's relationships, shared with nested blocks.
+
+        Built on first use and kept while relationships are added through
+        it; rebuilt if the list is replaced or changes size outside it.
+        """
+        root = self._root
+        relationships = self.data["entity_relationships"]
+        index = root._relationship_index
+        if index is None or index.relationships is not relationships or index.is_stale():
+            index = root._relationship_index = RelationshipIndex(relationships)
+        return index
+
+
+def _snapshot_containers(*roots: Any) -> List[Tuple[Any, Any]]:
+    """Shallow copies of every dict and list reachable from the roots."""
+    saved = []
+    seen = set()
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        if isinstance(obj, dict):
+            seen.add(id(obj))
+            saved.append((obj, dict(obj)))
+            stack.extend(v for v in obj.values() if isinstance(v, (dict, list)))
+        elif isinstance(obj, list):
+            seen.add(id(obj))
+            saved.append((obj, list(obj)))
+            stack.extend(v for v in obj if isinstance(v, (dict, list)))
+    return saved
+
+
+def _restore_containers(saved: List[Tuple[Any, Any]]):
+    """Put snapshotted containers back in place, so existing references stay valid."""
+    for obj, contents in saved:
+        if isinstance(obj, dict):
+            obj.clear()
+            obj.update(contents)
+        else:
+            obj[:] = contents
+
+
+def _restore_savepoint(txn: EntityTransaction, saved: List[Tuple[Any, Any]], changes: Optional[Sequence[str]]):
+    _restore_containers(saved)
+    # Restored relationships may differ from what the shared index saw
+    if changes is None or "entity_relationships" in changes:
+        txn._root._relationship_index = None
+
+
+@contextmanager
+def entity_transaction(changes: Optional[Sequence[str]] = None):
+    """
+    Load, modify and save the entity store as a single transaction.
+
+    Holds an in-process lock and an exclusive lock on entities.lock while
+    the block runs, so concurrent writers (background extraction, merges,
+    curation and validation) apply on top of each other instead of
+    overwriting each other's changes. Changes are saved when the block
+    exits normally, unless rollback() was called; an exception discards
+    them. Do not await inside the block.
+
+    Nested transactions share the outermost transaction's data and are
+    saved with it. A nested block is a savepoint: its rollback(), or an
+    exception leaving it, undoes only the changes made inside it. The
+    savepoint copies every container in the store on entry unless the
+    block names the top-level keys whose contents it may have to undo.
+
+    Args:
+        changes: Top-level keys whose contents a nested block relies on
+            its savepoint to undo; only those are copied (top-level keys
+            it adds or replaces are always restored). Ignored by the
+            outermost transaction.
+
+    Yields:
+        EntityTransaction whose .data is the loaded entity store
+    """
+    outer = getattr(_entities_txn_local, "txn", None)
+    if outer is not None:
+        if changes is None:
+            saved = _snapshot_containers(outer.data)
+        else:
+            saved = [(outer.data, dict(outer.data))]
+            saved += _snapshot_containers(*(outer.data[key] for key in changes if key in outer.data))
+        txn = EntityTransaction(outer.data, parent=outer)
+        try:
+            yield txn
+        except BaseException:
+            _restore_savepoint(txn, saved, changes)
+            raise
+        if txn.rolled_back:
+            _restore_savepoint(txn, saved, changes)
+        return
+
+    with _entities_lock:
+        ensure_kg_dir()
+        with open(get_entities_lock_path(), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            txn = EntityTransaction(load_entities())
+            _entities_txn_local.txn = txn
+            try:
+                yield txn
+                if not txn.rolled_back:
+                    save_entities(txn.data)
+            finally:
+                _entities_txn_local.txn = None
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def add_entity_relationship(relationship: Dict[str, Any]) -> bool:
+    """
+    Add a relationship unless one with the same source, target and type exists.
+
+    Args:
+        relationship: Relationship dict with source_entity_id, target_entity_id and type
+
+    Returns:
+        True if the relationship was added
+    """
+    # The savepoint covers the counters; the list change is undone here,
+    # so the relationship list is not copied on every call
+    with entity_transaction(changes=(quality_counters.COUNTERS_KEY,)) as txn:
+        if not txn.relationship_index().add(relationship):
+            txn.rollback()
+            return False
+        try:
+            quality_counters.record_changes(txn.data, relationships_after=[relationship])
+        except BaseException:
+            txn.data["entity_relationships"].pop()
+            raise
+        return True
+
+
+def delete_entity_relationship(relationship_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Delete a relationship by ID.
+
+    Args:
+        relationship_id: The relationship ID
+
+    Returns:
+        The deleted relationship, or None if it was not found
+    """
+    # As in add_entity_relationship, the list change is undone here
+    with entity_transaction(changes=(quality_counters.COUNTERS_KEY,)) as txn:
+        relationships = txn.data["entity_relationships"]
+        removed = txn.relationship_index().get(relationship_id)
+        if removed is None:
+            txn.rollback()
+            return None
+        position = next(i for i, rel in enumerate(relationships) if rel is removed)
+        del relationships[position]
+        try:
+            quality_counters.record_changes(txn.data, relationships_before=[removed])
+        except BaseException:
+            relationships.insert(position, removed)
+            raise
+        return removed
+
+
+def get_entities_version() -> int:
+    """Get the entity store version, incremented on every save."""
+    data, _ = get_indexed_entities()
+    return data.get("version", 0)
+
+
+def get_indexed_entities() -> Tuple[Dict[str, Any], RelationshipIndex]:
+    """
+    Get entity data with a relationship index, rebuilt only when storage changes.
+
+    The returned data is shared between callers and must be treated as
+    read-only; use load_entities() for data you intend to modify and save.
+
+    Returns:
+        Tuple of (entity data, RelationshipIndex over its relationships)
+    """
+    path = get_entities_path()
+    try:
+        stat = os.stat(path)
+        key = (path, _entities_version, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        key = (path, _entities_version, None, None)
+
+    cache = _indexed_entities_cache
+    if cache["key"] != key:
+        data = load_entities()
+        cache["data"] = data
+        cache["index"] = RelationshipIndex(data["entity_relationships"])
+        cache["key"] = key
+
+    return cache["data"], cache["index"]
 
 
 def load_manual_links() -> Dict[str, Any]:
@@ -143,6 +401,38 @@ Rules:
 - Return ONLY the JSON array, no explanation"""
 
 
+# Batched extraction prompt: entities and relationships for several notes in one request
+BATCH_EXTRACTION_PROMPT = """Extract key entities, and the conceptual relationships between them, from each of these knowledge notes.
+{source_context}
+{notes}
+
+Return format (JSON object only, no other text), keyed by the note id shown in each [Note ...] header:
+{{"note id": {{"entities": [{{"name": "Entity Name", "type": "person|organization|concept|technology|event", "context": "brief context from the note"}}], "relationships": [{{"source": "Entity A name", "target": "Entity B name", "type": "relationship_type"}}]}}}}
+
+Entity rules:
+- Extract only significant, reusable entities (not generic terms like "technology", "system", "data")
+- Normalize names (e.g., "AI" not "artificial intelligence" if that's the common form)
+- Type must be one of: person, organization, concept, technology, event
+- If source context mentions an author/creator, include them if they are relevant to the note content
+- Maximum 5 entities per note
+
+Relationship types (choose the most appropriate):
+- specialization_of: Source is a specific form/type of target
+- enabled_by: Source is powered by or depends on target
+- builds_on: Source extends or is built upon target
+- contrasts_with: Source is an alternative or opposite of target
+- applies_to: Source is used in or applies to target domain
+- created_by: Source was created by target
+
+Relationship rules:
+- Only relate entities extracted from the same note
+- Maximum 3 relationships per note
+
+Rules:
+- Include every note id exactly once, with empty arrays if nothing significant is found
+- Return ONLY the JSON object, no explanation"""
+
+
 # Valid relationship types
 VALID_RELATIONSHIP_TYPES = {
     "specialization_of",
@@ -156,10 +446,91 @@ VALID_RELATIONSHIP_TYPES = {
 }
 
 
+# Valid entity types
+VALID_ENTITY_TYPES = {"person", "organization", "concept", "technology", "event"}
+
+
+def _parse_json_content(content: Optional[str]) -> Any:
+    """Parse a JSON payload from an LLM response, stripping markdown code fences."""
+    content = (content or "").strip()
+
+    # Handle potential markdown code blocks
+    if content.startswith("```"):
+        content = re.sub(r'^```(?:json)?\n?', '', content)
+        content = re.sub(r'\n?```$', '', content)
+
+    return json.loads(content)
+
+
+def _validate_entities(entities: Any) -> List[Dict[str, Any]]:
+    """Validate raw entity dicts returned by the LLM."""
+    if not isinstance(entities, list):
+        raise ValueError("Entity payload is not a list")
+
+    valid_entities = []
+    for entity in entities:
+        if isinstance(entity, dict) and "name" in entity and "type" in entity:
+            if entity["type"] in VALID_ENTITY_TYPES:
+                valid_entities.append({
+                    "name": str(entity["name"]).strip(),
+                    "type": entity["type"],
+                    "context": entity.get("context", "")
+                })
+
+    return valid_entities[:5]  # Max 5 entities per note
+
+
+def _validate_relationships(
+    relationships_raw: Any,
+    entities: List[Dict[str, Any]],
+    conversation_id: str,
+    note_id: str
+) -> List[Dict[str, Any]]:
+    """Validate raw relationship dicts returned by the LLM against a note's entities."""
+    if not isinstance(relationships_raw, list):
+        raise ValueError("Relationship payload is not a list")
+
+    valid_relationships = []
+    entity_names = {e["name"].lower() for e in entities}
+
+    for rel in relationships_raw:
+        if not isinstance(rel, dict):
+            continue
+
+        source = str(rel.get("source", "")).strip()
+        target = str(rel.get("target", "")).strip()
+        rel_type = str(rel.get("type", "")).strip()
+
+        # Validate relationship type
+        if rel_type not in VALID_RELATIONSHIP_TYPES:
+            continue
+
+        # Validate entities exist in our list (case-insensitive)
+        if source.lower() not in entity_names or target.lower() not in entity_names:
+            continue
+
+        # Create relationship with unique ID
+        valid_relationships.append({
+            "id": f"rel_{uuid.uuid4().hex[:8]}",
+            "source_entity": source,
+            "target_entity": target,
+            "type": rel_type,
+            "bidirectional": rel_type == "contrasts_with",
+            "source_note": f"note:{conversation_id}:{note_id}"
+        })
+
+    return valid_relationships[:3]  # Max 3 relationships per note
+
+
+class ExtractionError(Exception):
+    """Raised by strict extraction calls when the LLM request or parsing fails."""
+
+
 async def extract_entities_from_note(
     note: Dict[str, Any],
     model: Optional[str] = None,
-    source_context: Optional[SourceMetadata] = None
+    source_context: Optional[SourceMetadata] = None,
+    strict: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Extract entities from a single note using LLM.
@@ -168,6 +539,7 @@ async def extract_entities_from_note(
         note: Note dict with title and body
         model: Model to use for extraction (defaults to settings)
         source_context: Optional SourceMetadata for enriching extraction
+        strict: Raise ExtractionError on failure instead of returning []
 
     Returns:
         List of entity dicts with name, type, context
@@ -193,42 +565,28 @@ async def extract_entities_from_note(
     ]
 
     try:
-        response = await query_model(model, messages, timeout=30.0)
+        response = await _query_extraction_model(model, messages, timeout=30.0)
 
         if response is None:
             logger.warning(f"Failed to extract entities from note: {note.get('title', 'unknown')}")
+            if strict:
+                raise ExtractionError("No response from model")
             return []
 
-        content = response.get("content", "").strip()
-
-        # Parse JSON from response
-        # Handle potential markdown code blocks
-        if content.startswith("```"):
-            content = re.sub(r'^```(?:json)?\n?', '', content)
-            content = re.sub(r'\n?```$', '', content)
-
-        entities = json.loads(content)
-
-        # Validate entity structure
-        valid_entities = []
-        valid_types = {"person", "organization", "concept", "technology", "event"}
-
-        for entity in entities:
-            if isinstance(entity, dict) and "name" in entity and "type" in entity:
-                if entity["type"] in valid_types:
-                    valid_entities.append({
-                        "name": entity["name"].strip(),
-                        "type": entity["type"],
-                        "context": entity.get("context", "")
-                    })
-
-        return valid_entities[:5]  # Max 5 entities per note
+        entities = _parse_json_content(response.get("content", ""))
+        return _validate_entities(entities)
 
+    except ExtractionError:
+        raise
     except json.JSONDecodeError as e:
         logger.warning(f"Failed to parse entity JSON for note '{note.get('title', 'unknown')}': {e}")
+        if strict:
+            raise ExtractionError(str(e)) from e
         return []
     except Exception as e:
         logger.error(f"Error extracting entities: {e}")
+        if strict:
+            raise ExtractionError(str(e)) from e
         return []
 
 
@@ -236,7 +594,8 @@ async def extract_entity_relationships(
     entities: List[Dict[str, Any]],
     conversation_id: str,
     note_id: str,
-    model: Optional[str] = None
+    model: Optional[str] = None,
+    strict: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Extract conceptual relationships between entities from the same note.
@@ -246,6 +605,7 @@ async def extract_entity_relationships(
         conversation_id: Source conversation ID
         note_id: Source note ID
         model: Model to use for extraction (defaults to settings)
+        strict: Raise ExtractionError on failure instead of returning []
 
     Returns:
         List of relationship dicts with source, target, type
@@ -267,59 +627,351 @@ async def extract_entity_relationships(
     ]
 
     try:
-        response = await query_model(model, messages, timeout=30.0)
+        response = await _query_extraction_model(model, messages, timeout=30.0)
 
         if response is None:
             logger.warning(f"Failed to extract relationships for note: {note_id}")
+            if strict:
+                raise ExtractionError("No response from model")
             return []
 
-        content = response.get("content", "").strip()
+        relationships_raw = _parse_json_content(response.get("content", ""))
+        return _validate_relationships(relationships_raw, entities, conversation_id, note_id)
 
-        # Parse JSON from response
-        if content.startswith("```"):
-            content = re.sub(r'^```(?:json)?\n?', '', content)
-            content = re.sub(r'\n?```$', '', content)
+    except ExtractionError:
+        raise
+    except json.JSONDecodeError as e:
+        logger.warning(f"Failed to parse relationship JSON for note '{note_id}': {e}")
+        if strict:
+            raise ExtractionError(str(e)) from e
+        return []
+    except Exception as e:
+        logger.error(f"Error extracting relationships: {e}")
+        if strict:
+            raise ExtractionError(str(e)) from e
+        return []
 
-        relationships_raw = json.loads(content)
 
-        # Validate and format relationships
-        valid_relationships = []
-        entity_names = {e["name"].lower() for e in entities}
+# Rough characters-per-token ratio used to estimate prompt sizes
+CHARS_PER_TOKEN = 4
 
-        for rel in relationships_raw:
-            if not isinstance(rel, dict):
-                continue
+# Estimated completion tokens per extraction request (for rate limiting)
+EXTRACTION_OUTPUT_TOKENS = 400
+SOURCE_METADATA_TOKENS = 1500
 
-            source = rel.get("source", "").strip()
-            target = rel.get("target", "").strip()
-            rel_type = rel.get("type", "").strip()
+# Shared limiter for extraction requests, installed while a migration job runs
+_extraction_rate_limiter: Optional[TokenBucketRateLimiter] = None
 
-            # Validate relationship type
-            if rel_type not in VALID_RELATIONSHIP_TYPES:
-                continue
 
-            # Validate entities exist in our list (case-insensitive)
-            if source.lower() not in entity_names or target.lower() not in entity_names:
-                continue
+def _estimate_tokens(text: str) -> int:
+    """Estimate the token count of a prompt fragment."""
+    return len(text or "") // CHARS_PER_TOKEN + 1
 
-            # Create relationship with unique ID
-            valid_relationships.append({
-                "id": f"rel_{uuid.uuid4().hex[:8]}",
-                "source_entity": source,
-                "target_entity": target,
-                "type": rel_type,
-                "bidirectional": rel_type == "contrasts_with",
-                "source_note": f"note:{conversation_id}:{note_id}"
-            })
 
-        return valid_relationships[:3]  # Max 3 relationships per note
+async def _query_extraction_model(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float
+) -> Optional[Dict[str, Any]]:
+    """Query the extraction model, waiting on the shared rate limiter if one is active."""
+    if _extraction_rate_limiter is not None:
+        prompt_tokens = sum(_estimate_tokens(m.get("content", "")) for m in messages)
+        await _extraction_rate_limiter.acquire(prompt_tokens + EXTRACTION_OUTPUT_TOKENS)
+    return await query_model(model, messages, timeout=timeout)
 
-    except json.JSONDecodeError as e:
-        logger.warning(f"Failed to parse relationship JSON for note '{note_id}': {e}")
-        return []
+
+def _format_batch_note(note: Dict[str, Any]) -> str:
+    """Format one note for the batched extraction prompt."""
+    return f"[Note {note['id']}]\nTitle: {note.get('title', '')}\nContent: {note.get('body', '')}\n"
+
+
+def pack_note_batches(
+    notes: List[Dict[str, Any]],
+    max_notes: int,
+    token_budget: int
+) -> List[List[Dict[str, Any]]]:
+    """
+    Pack notes into batches bounded by note count and estimated token budget.
+
+    A note larger than the budget on its own still gets a batch of one.
+
+    Args:
+        notes: Note dicts with id, title, body
+        max_notes: Maximum notes per batch
+        token_budget: Maximum estimated note tokens per batch
+
+    Returns:
+        List of note batches, preserving note order
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+
+    for note in notes:
+        note_tokens = _estimate_tokens(_format_batch_note(note))
+        if current and (len(current) >= max_notes or current_tokens + note_tokens > token_budget):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(note)
+        current_tokens += note_tokens
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def _parse_batch_response(content: Optional[str], note_ids: List[str]) -> Dict[str, Any]:
+    """
+    Parse a batched extraction response into per-note payloads.
+
+    Tries the whole object first; if the response is truncated or malformed,
+    each note's payload is decoded independently so one bad entry does not
+    discard the rest of the batch.
+
+    Returns:
+        Dict of note_id -> raw payload for every note that could be decoded
+    """
+    try:
+        parsed = _parse_json_content(content)
+        if isinstance(parsed, dict):
+            return {nid: parsed[nid] for nid in note_ids if nid in parsed}
+    except (json.JSONDecodeError, ValueError):
+        pass
+
+    content = content or ""
+    decoder = json.JSONDecoder()
+    results = {}
+
+    for nid in note_ids:
+        match = re.search(r'"' + re.escape(nid) + r'"\s*:\s*', content)
+        if not match:
+            continue
+        try:
+            payload, _ = decoder.raw_decode(content, match.end())
+        except json.JSONDecodeError:
+            continue
+        results[nid] = payload
+
+    return results
+
+
+async def extract_entities_batch(
+    notes: List[Dict[str, Any]],
+    conversation_id: str,
+    model: Optional[str] = None,
+    source_context: Optional[SourceMetadata] = None
+) -> Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """
+    Extract entities and relationships for several notes in a single request.
+
+    Args:
+        notes: Note dicts with id, title, body
+        conversation_id: Source conversation ID
+        model: Model to use for extraction (defaults to settings)
+        source_context: Optional SourceMetadata shared by all notes
+
+    Returns:
+        Dict of note_id -> (entities, relationships) for notes that parsed
+        cleanly. Notes missing from the result should fall back to the
+        single-note path.
+    """
+    if not notes:
+        return {}
+
+    if model is None:
+        model = get_knowledge_graph_model()
+
+    source_context_str = ""
+    if source_context:
+        source_context_str = build_source_context_prompt(source_context)
+        if source_context_str:
+            source_context_str = "\n" + source_context_str + "\n"
+
+    prompt = BATCH_EXTRACTION_PROMPT.format(
+        notes="\n".join(_format_batch_note(note) for note in notes),
+        source_context=source_context_str
+    )
+
+    messages = [
+        {"role": "user", "content": prompt}
+    ]
+
+    note_ids = [note["id"] for note in notes]
+
+    try:
+        response = await _query_extraction_model(model, messages, timeout=60.0)
     except Exception as e:
-        logger.error(f"Error extracting relationships: {e}")
-        return []
+        logger.error(f"Error in batched entity extraction: {e}")
+        return {}
+
+    if response is None or not response.get("content"):
+        logger.warning(f"Batched extraction failed for {len(notes)} notes in {conversation_id}")
+        return {}
+
+    payloads = _parse_batch_response(response["content"], note_ids)
+
+    results = {}
+    for nid, payload in payloads.items():
+        if not isinstance(payload, dict):
+            continue
+        try:
+            entities = _validate_entities(payload.get("entities", []))
+            relationships = _validate_relationships(
+                payload.get("relationships", []), entities, conversation_id, nid
+            )
+        except ValueError as e:
+            logger.warning(f"Invalid batched extraction payload for note '{nid}': {e}")
+            continue
+        results[nid] = (entities, relationships)
+
+    return results
+
+
+def _single_note_prompt_tokens(note: Dict[str, Any], source_context_str: str) -> int:
+    """Estimate prompt tokens the single-note path spends on one note."""
+    entity_tokens = _estimate_tokens(ENTITY_EXTRACTION_PROMPT) + _estimate_tokens(source_context_str)
+    entity_tokens += _estimate_tokens(note.get("title", "")) + _estimate_tokens(note.get("body", ""))
+    return entity_tokens + _estimate_tokens(RELATIONSHIP_EXTRACTION_PROMPT)
+
+
+# Extraction stats (cumulative, persisted alongside the graph data)
+
+def get_extraction_stats_path() -> str:
+    """Get the path to the extraction stats file."""
+    return os.path.join(KNOWLEDGE_GRAPH_DIR, "extraction_stats.json")
+
+
+def _empty_extraction_stats() -> Dict[str, Any]:
+    return {
+        "notes_processed": 0,
+        "llm_requests": 0,
+        "batched_requests": 0,
+        "notes_batched": 0,
+        "fallback_notes": 0,
+        "requests_saved": 0,
+        "estimated_prompt_tokens_saved": 0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "requests_avoided_by_cache": 0,
+        "estimated_prompt_tokens_avoided_by_cache": 0,
+    }
+
+
+def get_extraction_stats() -> Dict[str, Any]:
+    """Get cumulative entity extraction stats."""
+    path = get_extraction_stats_path()
+    stats = _empty_extraction_stats()
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            stats.update(json.load(f))
+    return stats
+
+
+def get_extraction_stats_summary() -> Dict[str, Any]:
+    """Get cumulative extraction stats plus the current cache size."""
+    stats = get_extraction_stats()
+    stats["cache_entries"] = len(load_extraction_cache().get("notes", {}))
+    stats["prompt_version"] = EXTRACTION_PROMPT_VERSION
+    return stats
+
+
+def record_extraction_stats(run_stats: Dict[str, Any]):
+    """Add one extraction run's counters to the cumulative stats."""
+    ensure_kg_dir()
+    stats = get_extraction_stats()
+    for key, value in run_stats.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            stats[key] = stats.get(key, 0) + value
+    stats["updated_at"] = datetime.utcnow().isoformat()
+
+    with open(get_extraction_stats_path(), 'w') as f:
+        json.dump(stats, f, indent=2)
+
+
+# Per-note extraction cache
+#
+# Results are keyed by note and stamped with (content hash, prompt version,
+# model); an entry is only reused when all three still match.
+
+# Sample inputs rendered into the version, so a change to how source
+# context or batched notes are formatted also invalidates cached results
+_PROMPT_VERSION_SAMPLE_CONTEXT = SourceMetadata(
+    author_entities=[EntityInfo(name="Author", type="person", role="author")],
+    context_entities=[EntityInfo(name="Venue", type="publication", role="publisher")],
+    temporal_context="Time",
+    inferred_context="Background",
+)
+_PROMPT_VERSION_SAMPLE_NOTE = {"id": "note", "title": "Title", "body": "Body"}
+
+
+def extraction_prompt_version() -> str:
+    """Hash of every prompt and format that cached extraction results depend on."""
+    return hashlib.sha256("\n".join([
+        ENTITY_EXTRACTION_PROMPT,
+        RELATIONSHIP_EXTRACTION_PROMPT,
+        BATCH_EXTRACTION_PROMPT,
+        build_source_context_prompt(_PROMPT_VERSION_SAMPLE_CONTEXT),
+        _format_batch_note(_PROMPT_VERSION_SAMPLE_NOTE),
+    ]).encode("utf-8")).hexdigest()[:12]
+
+
+EXTRACTION_PROMPT_VERSION = extraction_prompt_version()
+
+
+def get_extraction_cache_path() -> str:
+    """Get the path to the per-note extraction cache file."""
+    return os.path.join(KNOWLEDGE_GRAPH_DIR, "extraction_cache.json")
+
+
+def load_extraction_cache() -> Dict[str, Any]:
+    """Load the per-note extraction cache."""
+    path = get_extraction_cache_path()
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {"notes": {}}
+
+
+def save_extraction_cache(cache: Dict[str, Any]):
+    """Save the per-note extraction cache."""
+    ensure_kg_dir()
+    cache["updated_at"] = datetime.utcnow().isoformat()
+    with open(get_extraction_cache_path(), 'w') as f:
+        json.dump(cache, f)
+
+
+def note_content_hash(note: Dict[str, Any]) -> str:
+    """Hash the note fields that feed the extraction prompt."""
+    content = f"{note.get('title', '')}\n{note.get('body', '')}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def get_cached_extraction(
+    cache: Dict[str, Any],
+    note_key: str,
+    content_hash: str,
+    model: str
+) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """Return cached (entities, relationships) for a note if the cache key still matches."""
+    entry = cache.get("notes", {}).get(note_key)
+    if not entry:
+        return None
+    if (entry.get("content_hash") != content_hash or
+            entry.get("prompt_version") != EXTRACTION_PROMPT_VERSION or
+            entry.get("model") != model):
+        return None
+    return entry.get("entities", []), entry.get("relationships", [])
+
+
+def update_extraction_cache(entries: Dict[str, Dict[str, Any]]):
+    """Merge freshly extracted note results into the cache file."""
+    if not entries:
+        return
+    cache = load_extraction_cache()
+    cache.setdefault("notes", {}).update(entries)
+    save_extraction_cache(cache)
 
 
 def create_hierarchical_relationships(entities: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -386,31 +1038,24 @@ def run_hierarchical_normalization() -> Dict[str, Any]:
     Returns:
         Summary of relationships created
     """
-    data = load_entities()
-    entities = data.get("entities", {})
-    existing_relationships = data.get("entity_relationships", [])
-
-    # Find new hierarchical relationships
-    new_relationships = create_hierarchical_relationships(entities)
-
-    # Filter out duplicates (same source and target entity pair with same type)
-    existing_pairs = set()
-    for rel in existing_relationships:
-        pair = (rel.get("source_entity_id"), rel.get("target_entity_id"), rel.get("type"))
-        existing_pairs.add(pair)
-
-    added_count = 0
-    for rel in new_relationships:
-        pair = (rel.get("source_entity_id"), rel.get("target_entity_id"), rel.get("type"))
-        if pair not in existing_pairs:
-            existing_relationships.append(rel)
-            existing_pairs.add(pair)
-            added_count += 1
-
-    # Save if we added any new relationships
-    if added_count > 0:
-        data["entity_relationships"] = existing_relationships
-        save_entities(data)
+    with entity_transaction() as txn:
+        entities = txn.data.get("entities", {})
+        existing_relationships = txn.data.get("entity_relationships", [])
+
+        # Find new hierarchical relationships
+        new_relationships = create_hierarchical_relationships(entities)
+
+        # Filter out duplicates (same source and target entity pair with same type)
+        relationship_index = txn.relationship_index()
+
+        added = [rel for rel in new_relationships if relationship_index.add(rel)]
+        added_count = len(added)
+
+        # Save only if we added any new relationships
+        if added_count == 0:
+            txn.rollback()
+        else:
+            quality_counters.record_changes(txn.data, relationships_after=added)
 
     return {
         "total_entities": len(entities),
@@ -520,75 +1165,229 @@ def standardize_entity(
     return entity_id
 
 
-async def extract_entities_for_conversation(
+async def _extract_source_context(
+    conversation: Dict[str, Any],
     conversation_id: str,
-    model: Optional[str] = None,
-    use_source_context: bool = True
-) -> Dict[str, Any]:
+    use_source_context: bool
+) -> Tuple[Optional[SourceMetadata], str]:
+    """Find the conversation's source and extract its metadata."""
+    source_metadata = None
+    source_url = None
+    source_type = "article"
+    source_title = conversation.get("title", "Untitled")
+
+    if not use_source_context:
+        return source_metadata, source_title
+
+    # Find source info from first assistant message
+    for msg in conversation.get("messages", []):
+        if msg.get("role") == "assistant":
+            source_url = msg.get("source_url")
+            source_type = msg.get("source_type", "article")
+            if msg.get("source_title"):
+                source_title = msg["source_title"]
+            break
+
+    # Extract source metadata (use Crawl4AI for articles, LLM for others)
+    if source_url:
+        try:
+            if _extraction_rate_limiter is not None:
+                await _extraction_rate_limiter.acquire(SOURCE_METADATA_TOKENS)
+            source_metadata = await extract_source_metadata(
+                url=source_url,
+                title=source_title,
+                source_type=source_type,
+                use_crawler=(source_type == "article"),
+                use_llm=True
+            )
+            logger.info(f"Extracted source metadata for {conversation_id}: {source_metadata.content_type}")
+        except Exception as e:
+            logger.warning(f"Failed to extract source metadata: {e}")
+
+    return source_metadata, source_title
+
+
+def _lookup_cached_extractions(
+    conv_notes: List[Dict[str, Any]],
+    conversation_id: str,
+    model: str,
+    bypass_cache: bool = False
+) -> Tuple[Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]], Dict[str, str]]:
     """
-    Extract entities from all notes in a conversation.
+    Find cached extraction results for a conversation's notes.
 
-    Args:
-        conversation_id: Conversation ID
-        model: Model to use for extraction (defaults to settings)
-        use_source_context: Whether to extract and use source metadata
+    Returns:
+        Tuple of (note ID -> (entities, relationships) for notes whose
+        content, prompt version and model match a cached result,
+        note ID -> content hash for every note)
+    """
+    cache = {} if bypass_cache else load_extraction_cache()
+    cached_results = {}
+    content_hashes = {}
+    for note in conv_notes:
+        content_hashes[note["id"]] = note_content_hash(note)
+        if bypass_cache:
+            continue
+        cached = get_cached_extraction(
+            cache, f"{conversation_id}:{note['id']}", content_hashes[note["id"]], model
+        )
+        if cached is not None:
+            cached_results[note["id"]] = cached
+    return cached_results, content_hashes
+
+
+async def _extract_note_entities(
+    conv_notes: List[Dict[str, Any]],
+    conversation_id: str,
+    model: str,
+    source_metadata: Optional[SourceMetadata],
+    use_batch: bool,
+    extraction_settings: Dict[str, Any],
+    run_stats: Dict[str, Any],
+    cached_results: Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]],
+    content_hashes: Dict[str, str]
+) -> Tuple[List[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]], Dict[str, Dict[str, Any]]]:
+    """
+    Run LLM extraction for every note without touching the entity store.
+
+    Notes with a cached result (see _lookup_cached_extractions) reuse it;
+    only new or edited notes are sent to the LLM.
 
     Returns:
-        Dict with extracted entity count and details
+        Tuple of ((note, entities, relationships) list in note order,
+        new cache entries keyed by note key)
     """
-    if model is None:
-        model = get_knowledge_graph_model()
+    source_context_str = build_source_context_prompt(source_metadata) if source_metadata else ""
+
+    # Reuse cached results for unchanged notes
+    for note in conv_notes:
+        if note["id"] in cached_results:
+            entities = cached_results[note["id"]][0]
+            run_stats["cache_hits"] += 1
+            run_stats["requests_avoided_by_cache"] += 2 if len(entities) >= 2 else 1
+            run_stats["estimated_prompt_tokens_avoided_by_cache"] += _single_note_prompt_tokens(note, source_context_str)
+
+    uncached_notes = [n for n in conv_notes if n["id"] not in cached_results]
+    run_stats["cache_misses"] += len(uncached_notes)
+
+    # Batched mode: one request per packed group of notes, relationships included
+    batched_results = {}
+    batch_attempted = use_batch and len(uncached_notes) > 1
+    if batch_attempted:
+        batches = pack_note_batches(
+            uncached_notes,
+            max_notes=extraction_settings.get("batch_max_notes", 8),
+            token_budget=extraction_settings.get("batch_token_budget", 6000)
+        )
+        for note_batch in batches:
+            results = await extract_entities_batch(note_batch, conversation_id, model, source_metadata)
+            run_stats["llm_requests"] += 1
+            run_stats["batched_requests"] += 1
+            run_stats["notes_batched"] += len(results)
+
+            if results:
+                batch_tokens = _estimate_tokens(BATCH_EXTRACTION_PROMPT) + _estimate_tokens(source_context_str)
+                batch_tokens += sum(_estimate_tokens(_format_batch_note(n)) for n in note_batch)
+                single_tokens = sum(
+                    _single_note_prompt_tokens(n, source_context_str)
+                    for n in note_batch if n["id"] in results
+                )
+                run_stats["estimated_prompt_tokens_saved"] += max(0, single_tokens - batch_tokens)
+            batched_results.update(results)
+
+    extracted = []
+    new_cache_entries = {}
+    for note in conv_notes:
+        succeeded = True
+        if note["id"] in cached_results:
+            entities, relationships = cached_results[note["id"]]
+            extracted.append((note, entities, relationships))
+            continue
 
-    conversation = get_conversation(conversation_id)
+        if note["id"] in batched_results:
+            entities, relationships = batched_results[note["id"]]
+            # Single-note path would have needed one or two requests
+            run_stats["requests_saved"] += 2 if len(entities) >= 2 else 1
+        else:
+            if batch_attempted:
+                run_stats["fallback_notes"] += 1
+            entities = []
+            relationships = []
+            try:
+                # Extract entities with source context
+                run_stats["llm_requests"] += 1
+                entities = await extract_entities_from_note(note, model, source_metadata, strict=True)
+
+                # Extract relationships between entities in this note
+                if len(entities) >= 2:
+                    run_stats["llm_requests"] += 1
+                    relationships = await extract_entity_relationships(
+                        entities, conversation_id, note["id"], model, strict=True
+                    )
+            except ExtractionError:
+                # Keep whatever was extracted, but don't cache a failed result
+                succeeded = False
+
+        if len(entities) < 2:
+            relationships = []
+        extracted.append((note, entities, relationships))
+
+        if succeeded:
+            new_cache_entries[f"{conversation_id}:{note['id']}"] = {
+                "content_hash": content_hashes[note["id"]],
+                "prompt_version": EXTRACTION_PROMPT_VERSION,
+                "model": model,
+                "entities": entities,
+                "relationships": relationships,
+                "cached_at": datetime.utcnow().isoformat()
+            }
 
-    if not conversation:
-        return {"error": "Conversation not found", "count": 0}
+    return extracted, new_cache_entries
 
-    # Accept both synthesizer and discovery conversations (both have indexable notes)
-    if conversation.get("mode") not in ("synthesizer", "discovery"):
-        return {"error": "Not a synthesizer or discovery conversation", "count": 0}
 
-    # Load existing entities
-    data = load_entities()
+def _apply_conversation_extraction(
+    conversation_id: str,
+    extracted: List[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]],
+    source_metadata: Optional[SourceMetadata],
+    source_title: str
+) -> Dict[str, Any]:
+    """
+    Merge one conversation's extraction results into the entity store.
+
+    Runs as a single entity transaction, so it cannot overwrite merges,
+    validations or other extractions that land while the LLM calls ran.
+
+    Returns:
+        Dict with extraction counters
+    """
+    with entity_transaction() as txn:
+        return _merge_conversation_extraction(
+            txn.data, conversation_id, extracted, source_metadata, source_title
+        )
+
+
+def _merge_conversation_extraction(
+    data: Dict[str, Any],
+    conversation_id: str,
+    extracted: List[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]],
+    source_metadata: Optional[SourceMetadata],
+    source_title: str
+) -> Dict[str, Any]:
+    """Merge extraction results into loaded entity data in place."""
     existing_entities = data.get("entities", {})
     note_entities = data.get("note_entities", {})
     entity_relationships = data.get("entity_relationships", [])
+    relationship_index = RelationshipIndex(entity_relationships)
+
+    # New entities are appended to the dict and new relationships to the list
+    entities_before = len(existing_entities)
+    relationships_before = len(entity_relationships)
 
     total_extracted = 0
     total_relationships = 0
     notes_processed = 0
     source_entities_created = 0
 
-    # Extract source metadata once per conversation
-    source_metadata = None
-    source_url = None
-    source_type = "article"
-    source_title = conversation.get("title", "Untitled")
-
-    if use_source_context:
-        # Find source info from first assistant message
-        for msg in conversation.get("messages", []):
-            if msg.get("role") == "assistant":
-                source_url = msg.get("source_url")
-                source_type = msg.get("source_type", "article")
-                if msg.get("source_title"):
-                    source_title = msg["source_title"]
-                break
-
-        # Extract source metadata (use Crawl4AI for articles, LLM for others)
-        if source_url:
-            try:
-                source_metadata = await extract_source_metadata(
-                    url=source_url,
-                    title=source_title,
-                    source_type=source_type,
-                    use_crawler=(source_type == "article"),
-                    use_llm=True
-                )
-                logger.info(f"Extracted source metadata for {conversation_id}: {source_metadata.content_type}")
-            except Exception as e:
-                logger.warning(f"Failed to extract source metadata: {e}")
-
     # Create source entities (author, publisher) once per conversation
     source_entity_ids = []
     if source_metadata:
@@ -622,107 +1421,78 @@ async def extract_entities_for_conversation(
             source_entity_ids.append((entity_id, "published_on", context_entity.role))
             source_entities_created += 1
 
-    # Process each message with notes
-    for msg in conversation.get("messages", []):
-        if msg.get("role") != "assistant":
-            continue
-
-        notes = msg.get("notes", [])
+    for note, entities, relationships in extracted:
+        note_key = f"{conversation_id}:{note['id']}"
 
-        for note in notes:
-            note_key = f"{conversation_id}:{note['id']}"
+        # Standardize and store
+        entity_ids = []
+        for entity in entities:
+            entity_id = standardize_entity(
+                entity, existing_entities, conversation_id, note["id"]
+            )
+            entity_ids.append(entity_id)
 
-            # Extract entities with source context
-            entities = await extract_entities_from_note(note, model, source_metadata)
+        note_entities[note_key] = entity_ids
+        total_extracted += len(entities)
 
-            # Standardize and store
-            entity_ids = []
+        if relationships:
+            # Map entity names to IDs for storage
+            name_to_id = {}
             for entity in entities:
-                entity_id = standardize_entity(
-                    entity, existing_entities, conversation_id, note["id"]
-                )
-                entity_ids.append(entity_id)
-
-            note_entities[note_key] = entity_ids
-            total_extracted += len(entities)
-
-            # Extract relationships between entities in this note
-            if len(entities) >= 2:
-                relationships = await extract_entity_relationships(
-                    entities, conversation_id, note["id"], model
-                )
-
-                # Map entity names to IDs for storage
-                name_to_id = {}
-                for entity in entities:
-                    entity_id = find_similar_entity(entity["name"], existing_entities)
-                    if entity_id:
-                        name_to_id[entity["name"].lower()] = entity_id
-
-                # Store relationships with entity IDs
-                for rel in relationships:
-                    source_id = name_to_id.get(rel["source_entity"].lower())
-                    target_id = name_to_id.get(rel["target_entity"].lower())
-
-                    if source_id and target_id:
-                        # Check for duplicate relationship
-                        existing = any(
-                            r["source_entity_id"] == source_id and
-                            r["target_entity_id"] == target_id and
-                            r["type"] == rel["type"]
-                            for r in entity_relationships
-                        )
-
-                        if not existing:
-                            entity_relationships.append({
-                                "id": rel["id"],
-                                "source_entity_id": source_id,
-                                "target_entity_id": target_id,
-                                "source_entity_name": rel["source_entity"],
-                                "target_entity_name": rel["target_entity"],
-                                "type": rel["type"],
-                                "bidirectional": rel["bidirectional"],
-                                "source_note": rel["source_note"]
-                            })
-                            total_relationships += 1
-
-            notes_processed += 1
-
-            # Create source-level relationships for this note's entities
-            if source_entity_ids and entity_ids:
-                for note_entity_id in entity_ids:
-                    note_entity = existing_entities.get(note_entity_id, {})
-                    note_entity_name = note_entity.get("name", "")
-
-                    for source_entity_id, rel_type, role in source_entity_ids:
-                        # Don't create self-referential relationships
-                        if source_entity_id == note_entity_id:
-                            continue
-
-                        # Check if relationship already exists
-                        existing_rel = any(
-                            r["source_entity_id"] == note_entity_id and
-                            r["target_entity_id"] == source_entity_id and
-                            r["type"] == rel_type
-                            for r in entity_relationships
-                        )
-
-                        if not existing_rel:
-                            source_entity = existing_entities.get(source_entity_id, {})
-                            source_entity_name = source_entity.get("name", "")
-
-                            entity_relationships.append({
-                                "id": f"rel_src_{uuid.uuid4().hex[:8]}",
-                                "source_entity_id": note_entity_id,
-                                "target_entity_id": source_entity_id,
-                                "source_entity_name": note_entity_name,
-                                "target_entity_name": source_entity_name,
-                                "type": rel_type,
-                                "bidirectional": False,
-                                "source_note": f"note:{conversation_id}:{note['id']}",
-                                "auto_generated": True
-                            })
-                            total_relationships += 1
+                entity_id = find_similar_entity(entity["name"], existing_entities)
+                if entity_id:
+                    name_to_id[entity["name"].lower()] = entity_id
+
+            # Store relationships with entity IDs
+            for rel in relationships:
+                source_id = name_to_id.get(rel["source_entity"].lower())
+                target_id = name_to_id.get(rel["target_entity"].lower())
+
+                if source_id and target_id:
+                    # Skip duplicates (same source, target and type)
+                    added = relationship_index.add({
+                        "id": rel["id"],
+                        "source_entity_id": source_id,
+                        "target_entity_id": target_id,
+                        "source_entity_name": rel["source_entity"],
+                        "target_entity_name": rel["target_entity"],
+                        "type": rel["type"],
+                        "bidirectional": rel["bidirectional"],
+                        "source_note": rel["source_note"]
+                    })
+                    if added:
+                        total_relationships += 1
+
+        notes_processed += 1
+
+        # Create source-level relationships for this note's entities
+        if source_entity_ids and entity_ids:
+            for note_entity_id in entity_ids:
+                note_entity = existing_entities.get(note_entity_id, {})
+                note_entity_name = note_entity.get("name", "")
+
+                for source_entity_id, rel_type, role in source_entity_ids:
+                    # Don't create self-referential relationships
+                    if source_entity_id == note_entity_id:
+                        continue
+
+                    # Check if relationship already exists
+                    if not relationship_index.contains(note_entity_id, source_entity_id, rel_type):
+                        source_entity = existing_entities.get(source_entity_id, {})
+                        source_entity_name = source_entity.get("name", "")
+
+                        relationship_index.add({
+                            "id": f"rel_src_{uuid.uuid4().hex[:8]}",
+                            "source_entity_id": note_entity_id,
+                            "target_entity_id": source_entity_id,
+                            "source_entity_name": note_entity_name,
+                            "target_entity_name": source_entity_name,
+                            "type": rel_type,
+                            "bidirectional": False,
+                            "source_note": f"note:{conversation_id}:{note['id']}",
+                            "auto_generated": True
+                        })
+                        total_relationships += 1
 
     # Mark conversation as processed
     processed = data.get("processed_conversations", [])
@@ -734,16 +1504,102 @@ async def extract_entities_for_conversation(
     data["note_entities"] = note_entities
     data["entity_relationships"] = entity_relationships
     data["processed_conversations"] = processed
-    save_entities(data)
+
+    new_entities = list(existing_entities.values())[entities_before:]
+    quality_counters.record_changes(
+        data,
+        entities_after=new_entities,
+        relationships_after=entity_relationships[relationships_before:]
+    )
 
     return {
-        "conversation_id": conversation_id,
         "notes_processed": notes_processed,
         "entities_extracted": total_extracted,
         "relationships_extracted": total_relationships,
         "unique_entities": len(existing_entities),
         "source_entities_created": source_entities_created,
-        "source_metadata": source_metadata.to_dict() if source_metadata else None
+    }
+
+
+async def extract_entities_for_conversation(
+    conversation_id: str,
+    model: Optional[str] = None,
+    use_source_context: bool = True,
+    batch: Optional[bool] = None,
+    bypass_cache: bool = False
+) -> Dict[str, Any]:
+    """
+    Extract entities from all notes in a conversation.
+
+    All LLM requests complete before the entity store is loaded and
+    updated, so several conversations can be extracted concurrently.
+    Notes unchanged since their last extraction reuse cached results.
+
+    Args:
+        conversation_id: Conversation ID
+        model: Model to use for extraction (defaults to settings)
+        use_source_context: Whether to extract and use source metadata
+        batch: Pack several notes per extraction request (defaults to settings)
+        bypass_cache: Re-extract every note even if a cached result matches
+
+    Returns:
+        Dict with extracted entity count and details
+    """
+    if model is None:
+        model = get_knowledge_graph_model()
+
+    extraction_settings = get_kg_entity_extraction_settings()
+    if batch is None:
+        batch = extraction_settings.get("batch_extraction", False)
+
+    conversation = get_conversation(conversation_id)
+
+    if not conversation:
+        return {"error": "Conversation not found", "count": 0}
+
+    # Accept both synthesizer and discovery conversations (both have indexable notes)
+    if conversation.get("mode") not in ("synthesizer", "discovery"):
+        return {"error": "Not a synthesizer or discovery conversation", "count": 0}
+
+    # Collect notes from all assistant messages
+    conv_notes = []
+    for msg in conversation.get("messages", []):
+        if msg.get("role") == "assistant":
+            conv_notes.extend(msg.get("notes", []))
+
+    cached_results, content_hashes = _lookup_cached_extractions(
+        conv_notes, conversation_id, model, bypass_cache=bypass_cache
+    )
+
+    # Extract source metadata once per conversation. It only feeds the
+    # extraction prompts and the source entities, which the extraction
+    # that cached these notes already merged, so skip it if all are cached
+    needs_extraction = len(cached_results) < len(conv_notes)
+    source_metadata, source_title = await _extract_source_context(
+        conversation, conversation_id, use_source_context and needs_extraction
+    )
+
+    run_stats = _empty_extraction_stats()
+    run_stats["notes_processed"] = len(conv_notes)
+    use_batch = bool(batch) and len(conv_notes) > 1
+
+    extracted, new_cache_entries = await _extract_note_entities(
+        conv_notes, conversation_id, model, source_metadata,
+        use_batch, extraction_settings, run_stats, cached_results, content_hashes
+    )
+
+    result = _apply_conversation_extraction(conversation_id, extracted, source_metadata, source_title)
+    update_extraction_cache(new_cache_entries)
+
+    # Batch requests also count against the saved total
+    run_stats["requests_saved"] = max(0, run_stats["requests_saved"] - run_stats["batched_requests"])
+    record_extraction_stats(run_stats)
+
+    return {
+        "conversation_id": conversation_id,
+        **result,
+        "source_metadata": source_metadata.to_dict() if source_metadata else None,
+        "extraction_stats": {**run_stats, "mode": "batched" if use_batch else "single"}
     }
 
 
@@ -962,8 +1818,7 @@ def get_related_notes(note_id: str) -> Dict[str, Any]:
     graph = build_graph()
     nodes = graph.get("nodes", [])
     links = graph.get("links", [])
-    data = load_entities()
-    entity_relationships = data.get("entity_relationships", [])
+    data, relationship_index = get_indexed_entities()
     entities = data.get("entities", {})
 
     # Build lookups
@@ -1026,6 +1881,8 @@ def get_related_notes(note_id: str) -> Dict[str, Any]:
                 add_found(connected_id, "shared_tag", score, {"sharedTags": shared_tags})
 
     # 2. Find shared entity connections (direct)
+    # Index mention links once: entity node -> notes mentioning it
+    mentioned_by: Dict[str, List[str]] = {}
     note_entity_ids = set()
     for link in links:
         if link.get("type") != "mentions":
@@ -1037,6 +1894,7 @@ def get_related_notes(note_id: str) -> Dict[str, Any]:
         if isinstance(target, dict):
             target = target.get("id")
 
+        mentioned_by.setdefault(target, []).append(source)
         if source == note_id and target.startswith("entity:"):
             note_entity_ids.add(target)
 
@@ -1045,17 +1903,8 @@ def get_related_notes(note_id: str) -> Dict[str, Any]:
         entity_node = node_map.get(entity_id) or entity_map.get(entity_id)
         entity_name = entity_node.get("name") if entity_node else entity_id.split(":")[-1]
 
-        for link in links:
-            if link.get("type") != "mentions":
-                continue
-            source = link.get("source")
-            target = link.get("target")
-            if isinstance(source, dict):
-                source = source.get("id")
-            if isinstance(target, dict):
-                target = target.get("id")
-
-            if target == entity_id and source != note_id:
+        for source in mentioned_by.get(entity_id, []):
+            if source != note_id:
                 add_found(source, "shared_entity", 10, {"sharedEntity": entity_name})
 
     # 3. Find multi-hop connections via entity relationships
@@ -1065,17 +1914,15 @@ def get_related_notes(note_id: str) -> Dict[str, Any]:
         entity = entities.get(entity_id, {})
         entity_name = entity.get("name", "")
 
-        # Find relationships where this entity is source or target
-        for rel in entity_relationships:
-            related_entity_id = None
+        # Relationships where this entity is source or target
+        for rel in relationship_index.for_entity(entity_id):
             relationship_type = rel.get("type")
             is_source = rel.get("source_entity_id") == entity_id
-            is_target = rel.get("target_entity_id") == entity_id
 
             if is_source:
                 related_entity_id = rel.get("target_entity_id")
                 related_entity_name = rel.get("target_entity_name")
-            elif is_target:
+            else:
                 related_entity_id = rel.get("source_entity_id")
                 related_entity_name = rel.get("source_entity_name")
 
@@ -1083,18 +1930,8 @@ def get_related_notes(note_id: str) -> Dict[str, Any]:
                 continue
 
             # Find notes mentioning the related entity
-            related_entity_node_id = f"entity:{related_entity_id}"
-            for link in links:
-                if link.get("type") != "mentions":
-                    continue
-                source = link.get("source")
-                target = link.get("target")
-                if isinstance(source, dict):
-                    source = source.get("id")
-                if isinstance(target, dict):
-                    target = target.get("id")
-
-                if target == related_entity_node_id and source != note_id:
+            for source in mentioned_by.get(f"entity:{related_entity_id}", []):
+                if source != note_id:
                     path_info = {
                         "sourceEntity": entity_name,
                         "relationship": relationship_type,
@@ -1293,11 +2130,10 @@ def get_note_entities(note_id: str) -> Dict[str, Any]:
     Returns:
         Dict with entities list and extraction status
     """
-    data = load_entities()
+    data, relationship_index = get_indexed_entities()
     entities = data.get("entities", {})
     note_entities = data.get("note_entities", {})
     processed_conversations = data.get("processed_conversations", [])
-    entity_relationships = data.get("entity_relationships", [])
 
     # Parse note_id to get conversation_id
     # Format: "note:conversation_id:note_id"
@@ -1343,16 +2179,14 @@ def get_note_entities(note_id: str) -> Dict[str, Any]:
 
     # Find relationships involving these entities
     related_relationships = []
-    entity_id_set = set(entity_ids)
-    for rel in entity_relationships:
-        if rel.get("source_entity_id") in entity_id_set or rel.get("target_entity_id") in entity_id_set:
-            related_relationships.append({
-                "id": rel.get("id"),
-                "source": rel.get("source_entity_name"),
-                "target": rel.get("target_entity_name"),
-                "type": rel.get("type"),
-                "bidirectional": rel.get("bidirectional", False)
-            })
+    for rel in relationship_index.for_entities(entity_ids):
+        related_relationships.append({
+            "id": rel.get("id"),
+            "source": rel.get("source_entity_name"),
+            "target": rel.get("target_entity_name"),
+            "type": rel.get("type"),
+            "bidirectional": rel.get("bidirectional", False)
+        })
 
     return {
         "noteId": note_id,
@@ -1366,6 +2200,32 @@ def get_note_entities(note_id: str) -> Dict[str, Any]:
 
 # Migration functions
 
+def get_migration_checkpoint_path() -> str:
+    """Get the path to the migration checkpoint file."""
+    return os.path.join(KNOWLEDGE_GRAPH_DIR, "migration_checkpoint.json")
+
+
+def load_migration_checkpoint() -> Optional[Dict[str, Any]]:
+    """Load the last migration job checkpoint, if any."""
+    path = get_migration_checkpoint_path()
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return None
+
+
+def save_migration_checkpoint(checkpoint: Dict[str, Any]):
+    """Persist a migration job checkpoint (written atomically)."""
+    ensure_kg_dir()
+    checkpoint["updated_at"] = datetime.utcnow().isoformat()
+
+    path = get_migration_checkpoint_path()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
 class MigrationState:
     """Track migration progress."""
     _instance = None
@@ -1379,13 +2239,20 @@ class MigrationState:
     def reset(self):
         self.running = False
         self.cancelled = False
+        self.job_id = None
+        self.resumed = False
+        self.workers = 0
         self.total = 0
         self.processed = 0
         self.failed = 0
+        self.skipped = 0
         self.current = None
+        self.in_progress = {}
         self.errors = []
         self.started_at = None
         self.completed_at = None
+        self.started_monotonic = None
+        self.rate_limiter = None
 
 
 migration_state = MigrationState()
@@ -1393,96 +2260,228 @@ migration_state = MigrationState()
 
 async def migrate_all_conversations(
     model: Optional[str] = None,
-    force_reprocess: bool = False
+    force_reprocess: bool = False,
+    workers: Optional[int] = None,
+    resume: bool = False,
+    bypass_cache: bool = False
 ) -> Dict[str, Any]:
     """
     Migrate all existing synthesizer conversations to the knowledge graph.
 
+    Conversations are processed by a pool of concurrent workers sharing a
+    token-bucket rate limiter. Each finished conversation is checkpointed to
+    disk, so an interrupted job can be resumed without redoing finished work.
+
     Args:
         model: Model to use for entity extraction (defaults to settings)
         force_reprocess: If True, reprocess already-processed conversations
+        workers: Number of concurrent conversation workers (defaults to settings)
+        resume: Continue the last interrupted job from its checkpoint
+        bypass_cache: Re-extract every note instead of reusing cached results
 
     Returns:
         Migration result summary
     """
-    global migration_state
-
-    if model is None:
-        model = get_knowledge_graph_model()
+    global migration_state, _extraction_rate_limiter
 
     if migration_state.running:
         return {"error": "Migration already running"}
 
+    migration_settings = get_kg_migration_settings()
+    if workers is None:
+        workers = migration_settings["workers"]
+    workers = max(1, workers)
+
+    checkpoint = load_migration_checkpoint() if resume else None
+    if checkpoint and checkpoint.get("status") == "running":
+        # Pick the interrupted job back up with its original parameters
+        force_reprocess = checkpoint.get("force_reprocess", False)
+        bypass_cache = checkpoint.get("bypass_cache", False)
+        if model is None:
+            model = checkpoint.get("model")
+    else:
+        checkpoint = None
+
+    if model is None:
+        model = get_knowledge_graph_model()
+
     migration_state.reset()
     migration_state.running = True
+    migration_state.workers = workers
     migration_state.started_at = datetime.utcnow().isoformat()
+    migration_state.started_monotonic = time.monotonic()
+
+    if checkpoint is None:
+        # Get all synthesizer conversations
+        all_conversations = list_conversations()
+        synth_conversations = [c for c in all_conversations if c.get("mode") in ("synthesizer", "discovery")]
+
+        # Filter to unprocessed (unless force)
+        if not force_reprocess:
+            processed = set(load_entities().get("processed_conversations", []))
+            synth_conversations = [c for c in synth_conversations if c["id"] not in processed]
+
+        checkpoint = {
+            "job_id": str(uuid.uuid4())[:8],
+            "status": "running",
+            "model": model,
+            "force_reprocess": force_reprocess,
+            "bypass_cache": bypass_cache,
+            "started_at": migration_state.started_at,
+            "targets": [
+                {"id": c["id"], "title": c.get("title", c["id"])}
+                for c in synth_conversations
+            ],
+            "completed": {},
+        }
+        save_migration_checkpoint(checkpoint)
+    else:
+        migration_state.resumed = True
 
-    # Get all synthesizer conversations
-    all_conversations = list_conversations()
-    synth_conversations = [c for c in all_conversations if c.get("mode") in ("synthesizer", "discovery")]
-
-    # Load current state
-    data = load_entities()
-    processed = set(data.get("processed_conversations", []))
+    completed = checkpoint["completed"]
+    pending = [t for t in checkpoint["targets"] if t["id"] not in completed]
 
-    # Filter to unprocessed (unless force)
-    if not force_reprocess:
-        synth_conversations = [c for c in synth_conversations if c["id"] not in processed]
+    migration_state.job_id = checkpoint["job_id"]
+    migration_state.total = len(checkpoint["targets"])
+    migration_state.skipped = len(checkpoint["targets"]) - len(pending)
+    migration_state.processed = sum(1 for c in completed.values() if c.get("status") == "done")
+    migration_state.failed = sum(1 for c in completed.values() if c.get("status") == "failed")
 
-    migration_state.total = len(synth_conversations)
+    limiter = TokenBucketRateLimiter(
+        requests_per_minute=migration_settings["requests_per_minute"],
+        tokens_per_minute=migration_settings["tokens_per_minute"]
+    )
+    migration_state.rate_limiter = limiter
+    _extraction_rate_limiter = limiter
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for target in pending:
+        queue.put_nowait(target)
+
+    def record(conversation_id: str, status: str, error: Optional[str] = None):
+        completed[conversation_id] = {
+            "status": status,
+            "error": error,
+            "completed_at": datetime.utcnow().isoformat()
+        }
+        save_migration_checkpoint(checkpoint)
 
-    try:
-        for conv in synth_conversations:
-            if migration_state.cancelled:
-                break
+    async def worker():
+        while not migration_state.cancelled:
+            try:
+                target = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
 
-            migration_state.current = conv.get("title", conv["id"])
+            conversation_id = target["id"]
+            migration_state.in_progress[conversation_id] = target.get("title", conversation_id)
+            migration_state.current = target.get("title", conversation_id)
 
             try:
-                result = await extract_entities_for_conversation(conv["id"], model)
+                result = await extract_entities_for_conversation(
+                    conversation_id, model, bypass_cache=bypass_cache
+                )
 
                 if "error" in result:
                     migration_state.errors.append({
-                        "conversation_id": conv["id"],
+                        "conversation_id": conversation_id,
                         "error": result["error"]
                     })
                     migration_state.failed += 1
+                    record(conversation_id, "failed", result["error"])
                 else:
                     migration_state.processed += 1
+                    record(conversation_id, "done")
 
             except Exception as e:
                 migration_state.errors.append({
-                    "conversation_id": conv["id"],
+                    "conversation_id": conversation_id,
                     "error": str(e)
                 })
                 migration_state.failed += 1
+                record(conversation_id, "failed", str(e))
 
-            # Small delay to avoid rate limiting
-            await asyncio.sleep(0.5)
+            finally:
+                migration_state.in_progress.pop(conversation_id, None)
+                migration_state.current = next(iter(migration_state.in_progress.values()), None)
 
+    interrupted = False
+    try:
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    except asyncio.CancelledError:
+        # Shutdown, not a user cancel: the checkpoint stays "running" so
+        # resume_interrupted_migration picks the job up on next start
+        interrupted = True
+        raise
     finally:
+        if migration_state.cancelled:
+            checkpoint["status"] = "cancelled"
+        elif not interrupted and queue.empty():
+            checkpoint["status"] = "completed"
+        save_migration_checkpoint(checkpoint)
+
+        _extraction_rate_limiter = None
         migration_state.running = False
         migration_state.completed_at = datetime.utcnow().isoformat()
         migration_state.current = None
+        migration_state.in_progress = {}
 
     return get_migration_status()
 
 
+def resume_interrupted_migration() -> Optional[asyncio.Task]:
+    """
+    Resume a migration job that was still running when the process stopped.
+
+    Must be called from within a running event loop (e.g. app startup).
+
+    Returns:
+        The scheduled task, or None if there was nothing to resume
+    """
+    checkpoint = load_migration_checkpoint()
+    if not checkpoint or checkpoint.get("status") != "running" or migration_state.running:
+        return None
+
+    logger.info(f"Resuming interrupted knowledge graph migration {checkpoint.get('job_id')}")
+    return asyncio.create_task(migrate_all_conversations(resume=True))
+
+
 def get_migration_status() -> Dict[str, Any]:
-    """Get current migration status."""
+    """Get current migration status, including throughput and ETA."""
     global migration_state
 
+    done_this_run = migration_state.processed + migration_state.failed - migration_state.skipped
+    pending = migration_state.total - migration_state.processed - migration_state.failed
+
+    elapsed_seconds = None
+    throughput_per_minute = None
+    eta_seconds = None
+    if migration_state.started_monotonic is not None:
+        elapsed_seconds = round(time.monotonic() - migration_state.started_monotonic, 1)
+        if migration_state.running and elapsed_seconds > 0 and done_this_run > 0:
+            rate = done_this_run / elapsed_seconds
+            throughput_per_minute = round(rate * 60, 2)
+            eta_seconds = round(pending / rate, 1)
+
     return {
         "running": migration_state.running,
         "cancelled": migration_state.cancelled,
+        "job_id": migration_state.job_id,
+        "resumed": migration_state.resumed,
+        "workers": migration_state.workers,
         "total": migration_state.total,
         "processed": migration_state.processed,
         "failed": migration_state.failed,
-        "pending": migration_state.total - migration_state.processed - migration_state.failed,
+        "pending": pending,
         "current": migration_state.current,
+        "in_progress": list(migration_state.in_progress.values()),
         "errors": migration_state.errors[-10:],  # Last 10 errors
         "started_at": migration_state.started_at,
-        "completed_at": migration_state.completed_at
+        "completed_at": migration_state.completed_at,
+        "elapsed_seconds": elapsed_seconds,
+        "throughput_per_minute": throughput_per_minute,
+        "eta_seconds": eta_seconds,
+        "rate_limit": migration_state.rate_limiter.get_stats() if migration_state.rate_limiter else None
     }
 
 
@@ -1557,7 +2556,7 @@ def dismiss_link(link_id: str) -> bool:
 
 def find_duplicate_entities(threshold: float = 0.7) -> List[Dict[str, Any]]:
     """
-    Find potential duplicate entities using fuzzy string matching.
+    Find potential duplicate entities by trigram similarity of their names.
 
     Args:
         threshold: Similarity threshold (0-1) for considering duplicates
@@ -1577,57 +2576,28 @@ def find_duplicate_entities(threshold: float = 0.7) -> List[Dict[str, Any]]:
     for merge in merged:
         merged_ids.update(merge.get("merged", []))
 
-    # Group entities by name similarity
-    entity_list = [
-        (eid, e) for eid, e in entities.items()
-        if eid not in merged_ids
-    ]
+    # Cluster similar names among the entities that were not merged away
+    from . import entity_dedup
 
+    candidates = set(entities) - merged_ids
     duplicates = []
-    processed = set()
-
-    for i, (id1, e1) in enumerate(entity_list):
-        if id1 in processed:
-            continue
-
-        group = [{
-            "id": id1,
-            "name": e1.get("name"),
-            "type": e1.get("type"),
-            "mention_count": len(e1.get("mentions", [])),
-            "reviewed": id1 in reviewed
-        }]
-
-        name1 = e1.get("name", "").lower()
-
-        for id2, e2 in entity_list[i+1:]:
-            if id2 in processed:
-                continue
-
-            name2 = e2.get("name", "").lower()
-
-            # Calculate similarity
-            similarity = SequenceMatcher(None, name1, name2).ratio()
-
-            if similarity >= threshold:
-                group.append({
-                    "id": id2,
-                    "name": e2.get("name"),
-                    "type": e2.get("type"),
-                    "mention_count": len(e2.get("mentions", [])),
-                    "reviewed": id2 in reviewed,
-                    "similarity": similarity
-                })
-                processed.add(id2)
-
-        # Only include groups with duplicates
-        if len(group) > 1:
-            duplicates.append({
-                "group_id": str(uuid.uuid4())[:8],
-                "entities": group,
-                "suggested_canonical": max(group, key=lambda x: x["mention_count"])["id"]
+    for cluster in entity_dedup.group_duplicates(entity_dedup.get_duplicate_pairs(threshold), allowed=candidates):
+        group = []
+        for eid in cluster["members"]:
+            entity = entities[eid]
+            group.append({
+                "id": eid,
+                "name": entity.get("name"),
+                "type": entity.get("type"),
+                "mention_count": len(entity.get("mentions", [])),
+                "reviewed": eid in reviewed,
+                "similarity": cluster["similarity"][eid]
             })
-            processed.add(id1)
+        duplicates.append({
+            "group_id": cluster["group_id"],
+            "entities": group,
+            "suggested_canonical": max(group, key=lambda x: x["mention_count"])["id"]
+        })
 
     return duplicates
 
@@ -1643,44 +2613,45 @@ def merge_entities(canonical_id: str, merge_ids: List[str]) -> Dict[str, Any]:
     Returns:
         Updated canonical entity
     """
-    data = load_entities()
-    manual_data = load_manual_links()
-
-    entities = data.get("entities", {})
-
-    if canonical_id not in entities:
-        return {"error": "Canonical entity not found"}
-
-    canonical = entities[canonical_id]
-
-    # Merge mentions from other entities
-    for merge_id in merge_ids:
-        if merge_id in entities and merge_id != canonical_id:
-            merged_entity = entities[merge_id]
-            canonical["mentions"].extend(merged_entity.get("mentions", []))
+    with entity_transaction() as txn:
+        data = txn.data
+        entities = data.get("entities", {})
+
+        if canonical_id not in entities:
+            txn.rollback()
+            return {"error": "Canonical entity not found"}
+
+        canonical = entities[canonical_id]
+
+        # Merge mentions from other entities
+        for merge_id in merge_ids:
+            if merge_id in entities and merge_id != canonical_id:
+                merged_entity = entities[merge_id]
+                canonical["mentions"].extend(merged_entity.get("mentions", []))
+
+        # Update note_entities to point to canonical
+        note_entities = data.get("note_entities", {})
+        for note_key, entity_ids in note_entities.items():
+            updated = []
+            for eid in entity_ids:
+                if eid in merge_ids:
+                    if canonical_id not in updated:
+                        updated.append(canonical_id)
+                else:
+                    updated.append(eid)
+            note_entities[note_key] = updated
 
-    # Update note_entities to point to canonical
-    note_entities = data.get("note_entities", {})
-    for note_key, entity_ids in note_entities.items():
-        updated = []
-        for eid in entity_ids:
-            if eid in merge_ids:
-                if canonical_id not in updated:
-                    updated.append(canonical_id)
-            else:
-                updated.append(eid)
-        note_entities[note_key] = updated
+        # Merged entities keep their type, provenance and validation, so
+        # the counts are unchanged; this keeps the counters' stamp current
+        quality_counters.record_changes(data)
 
     # Record the merge
+    manual_data = load_manual_links()
     manual_data["entity_merges"].append({
         "canonical": canonical_id,
         "merged": merge_ids,
         "merged_at": datetime.utcnow().isoformat()
     })
-
-    # Save both files
-    data["updated_at"] = datetime.utcnow().isoformat()
-    save_entities(data)
     save_manual_links(manual_data)
 
     return canonical
@@ -1717,35 +2688,28 @@ async def get_connection_suggestions(
     data = load_entities()
     manual_data = load_manual_links()
 
-    # Get all synthesizer conversations
-    all_conversations = list_conversations()
-    synth_conversations = [c for c in all_conversations if c.get("mode") in ("synthesizer", "discovery")]
+    from . import note_catalog
 
-    # Collect notes from different sources
+    # Collect notes from different sources (recent 20 sources, for performance)
     notes_by_source = {}
     all_notes = []
 
-    for conv in synth_conversations[:20]:  # Limit to recent 20 sources for performance
-        full_conv = get_conversation(conv["id"])
-        if not full_conv:
-            continue
-
-        conv_notes = []
-        for msg in full_conv.get("messages", []):
-            if msg.get("role") == "assistant":
-                for note in msg.get("notes", []):
-                    note_data = {
-                        "id": f"note:{conv['id']}:{note['id']}",
-                        "title": note.get("title", ""),
-                        "tags": note.get("tags", []),
-                        "body": note.get("body", ""),
-                        "source_id": conv["id"]
-                    }
-                    conv_notes.append(note_data)
-                    all_notes.append(note_data)
+    for note in note_catalog.list_notes(modes=("synthesizer", "discovery")):
+        source_id = note["conversation_id"]
+        if source_id not in notes_by_source:
+            if len(notes_by_source) >= 20:
+                break
+            notes_by_source[source_id] = []
 
-        if conv_notes:
-            notes_by_source[conv["id"]] = conv_notes
+        note_data = {
+            "id": note["id"],
+            "title": note["title"],
+            "tags": note["tags"],
+            "body": note["body"],
+            "source_id": source_id
+        }
+        notes_by_source[source_id].append(note_data)
+        all_notes.append(note_data)
 
     if len(all_notes) < 2:
         return []
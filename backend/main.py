@@ -1,9 +1,9 @@
 """FastAPI backend for LLM Council."""
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 import uuid
@@ -16,7 +16,7 @@ import os
 import httpx
 from datetime import datetime
 
-from . import storage, config, prompts, threads, settings, content, synthesizer, synthesizer_kg, search, tweet, visualiser, openrouter, diagram_styles, knowledge_graph, graph_rag, graph_search, brainstorm_styles, podcast_characters
+from . import storage, config, prompts, threads, settings, content, synthesizer, synthesizer_kg, search, tweet, visualiser, openrouter, diagram_styles, knowledge_graph, graph_rag, graph_search, graph_sync, graph_index, graph_clusters, graph_layout, wire_format, graph_query, brainstorm_styles, podcast_characters
 from .council import run_full_council, generate_conversation_title, generate_synthesizer_title, generate_visualiser_title, stage1_collect_responses, stage2_collect_rankings, stage3_synthesize_final, calculate_aggregate_rankings
 from .summarizer import generate_summary
 
@@ -31,8 +31,20 @@ async def lifespan(app: FastAPI):
     search.preload_model()
     # Startup: Initialize brainstorm prompts
     brainstorm_styles.initialize_default_prompts()
+    # Startup: Resume a knowledge graph migration interrupted by a restart
+    migration_task = knowledge_graph.resume_interrupted_migration()
+    # Startup: Periodically check the quality counters against a full rebuild
+    from . import graph_quality
+    consistency_task = asyncio.create_task(graph_quality.run_consistency_checks_periodically())
+    # Startup: Run queued sleep compute sessions, resuming any interrupted by a restart
+    from . import sleep_scheduler
+    scheduler_task = asyncio.create_task(sleep_scheduler.run_scheduler())
     yield
     # Shutdown: Clean up
+    consistency_task.cancel()
+    scheduler_task.cancel()
+    if migration_task:
+        migration_task.cancel()
 
 
 app = FastAPI(title="LLM Council API", lifespan=lifespan)
@@ -270,9 +282,16 @@ async def get_features():
 
 
 @app.get("/api/conversations", response_model=List[ConversationMetadata])
-async def list_conversations():
-    """List all conversations (metadata only)."""
-    return storage.list_conversations()
+async def list_conversations(request: Request, format: Optional[str] = None):
+    """List all conversations (metadata only). Supports the compact wire format."""
+    conversations = storage.list_conversations()
+    encoding = wire_format.negotiate_format(request, format)
+    if encoding:
+        payload = wire_format.encode_records(
+            conversations, interned=("mode", "source_type", "diagram_style", "prompt_title")
+        )
+        return wire_format.compact_response(payload, request, encoding)
+    return conversations
 
 
 @app.post("/api/conversations", response_model=Conversation)
@@ -799,7 +818,9 @@ async def continue_thread(conversation_id: str, thread_id: str, request: Continu
             context = request.compiled_context or threads.compile_context_from_comments(
                 conversation,
                 thread_context.get("comment_ids", []),
-                thread_context.get("context_segments")
+                thread_context.get("context_segments"),
+                model=thread["model"],
+                question=request.question
             )
 
         # Continue the thread
@@ -1189,7 +1210,9 @@ async def continue_session_thread(
             context = request.compiled_context or threads.compile_context_from_comments(
                 conversation,
                 thread_context.get("comment_ids", []),
-                thread_context.get("context_segments")
+                thread_context.get("context_segments"),
+                model=thread["model"],
+                question=request.question
             )
 
         response = await threads.continue_thread(
@@ -1596,6 +1619,29 @@ async def update_chairman(request: UpdateChairmanRequest):
     return {"success": True, "chairman_model": request.model}
 
 
+@app.get("/api/settings/model-context-limits")
+async def get_model_context_limits():
+    """Get context window sizes (tokens) by model ID prefix, used to budget prompt context."""
+    return {"limits": settings.get_model_context_limits()}
+
+
+class UpdateModelContextLimitRequest(BaseModel):
+    """Request to override the context window for a model or model prefix."""
+    model_prefix: str
+    tokens: Optional[int] = None
+
+
+@app.put("/api/settings/model-context-limits")
+async def update_model_context_limit(request: UpdateModelContextLimitRequest):
+    """Override a model's context window (tokens=null removes the override)."""
+    if not request.model_prefix:
+        raise HTTPException(status_code=400, detail="Model prefix is required")
+    if request.tokens is not None and request.tokens <= 0:
+        raise HTTPException(status_code=400, detail="Tokens must be positive")
+
+    return {"limits": settings.set_model_context_limit(request.model_prefix, request.tokens)}
+
+
 class UpdateDefaultPromptRequest(BaseModel):
     """Request to update the default prompt."""
     prompt_filename: Optional[str] = None
@@ -2204,48 +2250,32 @@ async def score_note(conversation_id: str, note_id: str, request: NoteScoreReque
 
 
 @app.get("/api/notes/unscored")
-async def get_unscored_notes(limit: int = 50):
+async def get_unscored_notes(limit: int = 50, offset: int = 0):
     """Get notes that haven't been scored yet."""
-    conversations = storage.list_conversations()
-    unscored = []
-
-    for conv_summary in conversations:
-        if conv_summary.get("mode") != "synthesizer":
-            continue
-
-        conv = storage.get_conversation(conv_summary["id"])
-        if not conv:
-            continue
-
-        for msg in conv.get("messages", []):
-            if msg.get("role") == "assistant" and msg.get("notes"):
-                for note in msg["notes"]:
-                    quality = note.get("quality", {})
-                    if quality.get("score") is None:
-                        unscored.append({
-                            "conversation_id": conv["id"],
-                            "conversation_title": conv.get("title", "Untitled"),
-                            "note_id": note.get("id"),
-                            "note_title": note.get("title"),
-                            "note_body": note.get("body", "")[:200] + "..." if len(note.get("body", "")) > 200 else note.get("body", ""),
-                            "tags": note.get("tags", []),
-                            "starred": quality.get("starred", False),
-                            "created_at": conv.get("created_at"),
-                        })
-
-        if len(unscored) >= limit:
-            break
-
-    # Sort by created_at (oldest first)
-    unscored.sort(key=lambda x: x.get("created_at", ""), reverse=False)
+    from . import note_catalog
 
-    return {"unscored_notes": unscored[:limit]}
+    unscored = []
+    # Oldest first; ordering in the catalog keeps consecutive pages consistent
+    for note in note_catalog.list_notes(scored=False, oldest_first=True, offset=offset, limit=limit):
+        body = note["body"]
+        unscored.append({
+            "conversation_id": note["conversation_id"],
+            "conversation_title": note["conversation_title"],
+            "note_id": note["note_id"],
+            "note_title": note["title"],
+            "note_body": body[:200] + "..." if len(body) > 200 else body,
+            "tags": note["tags"],
+            "starred": note["starred"],
+            "created_at": note["created_at"],
+        })
+
+    return {"unscored_notes": unscored}
 
 
 @app.get("/api/notes/quality-stats")
 async def get_note_quality_stats():
     """Get statistics about note quality across all conversations."""
-    conversations = storage.list_conversations()
+    from . import note_catalog
 
     stats = {
         "total_notes": 0,
@@ -2263,40 +2293,30 @@ async def get_note_quality_stats():
 
     total_score = 0
 
-    for conv_summary in conversations:
-        if conv_summary.get("mode") != "synthesizer":
-            continue
-
-        conv = storage.get_conversation(conv_summary["id"])
-        if not conv:
-            continue
+    for note in note_catalog.list_notes():
+        stats["total_notes"] += 1
+        quality = note["quality"]
+
+        # Starred count
+        if note["starred"]:
+            stats["starred_notes"] += 1
+
+        # Score tracking
+        score = note["score"]
+        if score is not None:
+            stats["scored_notes"] += 1
+            total_score += score
+            if 1 <= score <= 5:
+                stats["score_distribution"][score] += 1
+        else:
+            stats["unscored_notes"] += 1
 
-        for msg in conv.get("messages", []):
-            if msg.get("role") == "assistant" and msg.get("notes"):
-                for note in msg["notes"]:
-                    stats["total_notes"] += 1
-                    quality = note.get("quality", {})
-
-                    # Starred count
-                    if quality.get("starred"):
-                        stats["starred_notes"] += 1
-
-                    # Score tracking
-                    score = quality.get("score")
-                    if score is not None:
-                        stats["scored_notes"] += 1
-                        total_score += score
-                        if 1 <= score <= 5:
-                            stats["score_distribution"][score] += 1
-                    else:
-                        stats["unscored_notes"] += 1
-
-                    # Review status
-                    status = quality.get("review_status", "unreviewed")
-                    if status in stats["review_status"]:
-                        stats["review_status"][status] += 1
-                    else:
-                        stats["review_status"]["unreviewed"] += 1
+        # Review status
+        status = quality.get("review_status", "unreviewed")
+        if status in stats["review_status"]:
+            stats["review_status"][status] += 1
+        else:
+            stats["review_status"]["unreviewed"] += 1
 
     # Calculate average
     if stats["scored_notes"] > 0:
@@ -3974,51 +3994,117 @@ class ManualLinkRequest(BaseModel):
 
 
 @app.get("/api/knowledge-graph")
-async def get_knowledge_graph(tags: Optional[str] = None):
+async def get_knowledge_graph(
+    request: Request,
+    tags: Optional[str] = None,
+    types: Optional[str] = None,
+    entity_types: Optional[str] = None,
+    source_types: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    min_mentions: Optional[int] = None,
+    since: Optional[int] = None,
+    layout: bool = True,
+    format: Optional[str] = None,
+    include_bodies: bool = False
+):
     """
-    Get the full knowledge graph.
+    Get the full knowledge graph, or the part of it matching the filters.
+
+    Responses carry an ETag for the graph version and honour If-None-Match.
+    With since=<version>, only nodes and links changed after that version
+    are returned (falls back to the full graph if the version is too old;
+    unfiltered requests only).
+    Nodes include precomputed x/y layout coordinates unless layout=false.
+    The full graph can be requested in the compact columnar encoding
+    (format=compact|msgpack or the matching Accept header); note bodies
+    are then omitted unless include_bodies=true.
 
     Args:
-        tags: Optional comma-separated list of tags to filter by
+        tags: Optional comma-separated list of note tags to filter by
+        types: Optional comma-separated node types (note, source, entity)
+        entity_types: Optional comma-separated entity types
+        source_types: Optional comma-separated source types
+        date_from: Optional ISO date; only notes created on or after it
+        date_to: Optional ISO date; only notes created on or before it
+        min_mentions: Optional minimum mention count for entities
+        since: Graph version the client already has
+        layout: Include server-computed node positions
+        format: Optional wire format (compact, msgpack)
+        include_bodies: Keep note bodies in compact responses
     """
-    graph = knowledge_graph.build_graph()
-
-    # Apply tag filter if provided
-    if tags:
-        tag_list = [t.strip().lower() for t in tags.split(",")]
-        # Filter nodes to only include notes with matching tags
-        filtered_note_ids = set()
-        for node in graph["nodes"]:
-            if node["type"] == "note":
-                node_tags = [t.lower() for t in node.get("tags", [])]
-                if any(tag in node_tags for tag in tag_list):
-                    filtered_note_ids.add(node["id"])
-
-        # Include source nodes for filtered notes
-        source_ids = set()
-        for node in graph["nodes"]:
-            if node["type"] == "note" and node["id"] in filtered_note_ids:
-                source_ids.add(node.get("sourceId"))
-
-        # Filter nodes
-        filtered_nodes = [
-            n for n in graph["nodes"]
-            if n["type"] == "entity"
-            or n["id"] in filtered_note_ids
-            or n["id"] in source_ids
-        ]
-
-        # Filter links to only include those between filtered nodes
-        node_ids = {n["id"] for n in filtered_nodes}
-        filtered_links = [
-            l for l in graph["links"]
-            if l["source"] in node_ids and l["target"] in node_ids
-        ]
-
-        graph["nodes"] = filtered_nodes
-        graph["links"] = filtered_links
-
-    return graph
+    def split(value: Optional[str]) -> Optional[List[str]]:
+        return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+    query = graph_query.GraphQuery(
+        tags=split(tags),
+        node_types=split(types),
+        entity_types=split(entity_types),
+        source_types=split(source_types),
+        date_from=date_from,
+        date_to=date_to,
+        min_mentions=min_mentions,
+    )
+
+    _, version = graph_sync.get_versioned_graph()
+    encoding = wire_format.negotiate_format(request, format)
+    variant = "|".join(
+        f"{k}={v}" for k, v in sorted(request.query_params.items())
+        if k in ("tags", "types", "entity_types", "source_types", "date_from", "date_to", "min_mentions")
+    ) + ("" if layout else "|nolayout")
+    if encoding:
+        variant += f"|{encoding}" + ("|bodies" if include_bodies else "")
+    etag = graph_sync.graph_etag(version, variant)
+
+    if graph_sync.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    positions = {}
+    if layout:
+        # First layout for a version can take a moment; keep the event loop free
+        positions, _ = await graph_layout.get_graph_layout_async()
+
+    def with_position(node: Dict[str, Any]) -> Dict[str, Any]:
+        xy = positions.get(node["id"])
+        return {**node, "x": xy[0], "y": xy[1]} if xy else node
+
+    if since is not None and query.is_empty():
+        delta = graph_sync.get_graph_delta(since)
+        if delta is not None:
+            for op in ("added", "changed"):
+                delta["nodes"][op] = [with_position(n) for n in delta["nodes"][op]]
+            return JSONResponse(delta, headers={"ETag": etag})
+
+    # Filters are resolved against indexes before any node is copied; the
+    # cached graph is shared, so annotate into a copy
+    graph = {**graph_query.query_graph(query), "version": version}
+    if positions:
+        graph["nodes"] = [with_position(n) for n in graph["nodes"]]
+
+    if encoding:
+        return wire_format.compact_response(
+            wire_format.encode_graph(graph, include_bodies=include_bodies),
+            request, encoding, headers={"ETag": etag}
+        )
+
+    return JSONResponse(graph, headers={"ETag": etag})
+
+
+@app.get("/api/knowledge-graph/nodes/bodies")
+async def get_knowledge_graph_node_bodies(ids: str):
+    """
+    Get note bodies by node ID, for clients using the compact graph format.
+
+    Args:
+        ids: Comma-separated node IDs
+    """
+    index, _ = graph_index.get_graph_index()
+    bodies = {}
+    for node_id in ids.split(","):
+        node = index.nodes.get(node_id.strip())
+        if node and "body" in node:
+            bodies[node["id"]] = node["body"]
+    return {"bodies": bodies}
 
 
 @app.get("/api/knowledge-graph/stats")
@@ -4029,11 +4115,17 @@ async def get_knowledge_graph_stats():
 
 @app.get("/api/knowledge-graph/search")
 async def search_knowledge_graph_endpoint(
+    request: Request,
     q: str,
     types: Optional[str] = None,
     entity_types: Optional[str] = None,
     tags: Optional[str] = None,
-    limit: int = 20
+    source_types: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    min_mentions: Optional[int] = None,
+    limit: int = 20,
+    format: Optional[str] = None
 ):
     """
     Search knowledge graph nodes by semantic similarity.
@@ -4043,7 +4135,12 @@ async def search_knowledge_graph_endpoint(
         types: Optional comma-separated list of node types (entity, note, source)
         entity_types: Optional comma-separated list of entity types (person, organization, etc.)
         tags: Optional comma-separated list of tags to filter notes by
+        source_types: Optional comma-separated list of source types to filter notes by
+        date_from: Optional ISO date; only notes created on or after it
+        date_to: Optional ISO date; only notes created on or before it
+        min_mentions: Optional minimum mention count for entities
         limit: Maximum results to return (default 20)
+        format: Optional wire format (compact, msgpack)
 
     Returns:
         Object with results array and query info
@@ -4052,15 +4149,26 @@ async def search_knowledge_graph_endpoint(
     node_types = [t.strip() for t in types.split(",")] if types else None
     entity_type_list = [t.strip() for t in entity_types.split(",")] if entity_types else None
     tag_list = [t.strip() for t in tags.split(",")] if tags else None
+    source_type_list = [t.strip() for t in source_types.split(",")] if source_types else None
 
     results = graph_search.search_knowledge_graph(
         query=q,
         node_types=node_types,
         entity_types=entity_type_list,
         tags=tag_list,
-        limit=limit
+        limit=limit,
+        source_types=source_type_list,
+        date_from=date_from,
+        date_to=date_to,
+        min_mentions=min_mentions
     )
 
+    encoding = wire_format.negotiate_format(request, format)
+    if encoding:
+        payload = wire_format.encode_records(results, interned=("type", "entityType", "tags"))
+        payload.update({"query": q, "total": len(results)})
+        return wire_format.compact_response(payload, request, encoding)
+
     return {
         "results": results,
         "query": q,
@@ -4068,6 +4176,78 @@ async def search_knowledge_graph_endpoint(
     }
 
 
+@app.get("/api/knowledge-graph/subgraph")
+async def get_knowledge_graph_subgraph(
+    center: str,
+    hops: int = 2,
+    limit: int = 50,
+    types: Optional[str] = None
+):
+    """
+    Get the k-hop neighbourhood of a node, ranked by connection strength.
+
+    Args:
+        center: Node ID to start from (note:..., entity:..., source:...)
+        hops: Maximum hops from the center (1-4)
+        limit: Maximum nodes to return, including the center (max 500)
+        types: Optional comma-separated list of node types to include (entity, note, source)
+    """
+    node_types = [t.strip() for t in types.split(",")] if types else None
+    result = graph_index.get_subgraph(center, hops=hops, limit=limit, types=node_types)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+
+@app.get("/api/knowledge-graph/distance")
+async def get_knowledge_graph_distance(source: str, target: str):
+    """
+    Get the shortest-path distance (in hops) between two nodes.
+
+    Args:
+        source: Node ID (note:..., entity:..., source:...)
+        target: Node ID
+    """
+    from . import graph_distance
+    distances = graph_distance.get_distance_index()
+    for node_id in (source, target):
+        if node_id not in distances.rows:
+            raise HTTPException(status_code=404, detail=f"Node not found: {node_id}")
+    return {"source": source, "target": target, "distance": distances.distance(source, target)}
+
+
+class BridgeScoreRequest(BaseModel):
+    """Request to score a bridge between notes."""
+    note_ids: List[str]
+
+
+@app.post("/api/knowledge-graph/bridge-score")
+async def score_knowledge_graph_bridge(request: BridgeScoreRequest):
+    """Score a bridge note linking the given notes by current distance and path length reduction."""
+    from . import graph_distance
+    return graph_distance.score_bridge(request.note_ids)
+
+
+@app.get("/api/knowledge-graph/clusters")
+async def get_knowledge_graph_clusters():
+    """
+    Get a clustered overview of the knowledge graph.
+
+    Returns community super-nodes with member counts and aggregated
+    inter-cluster links, for rendering large graphs at low detail.
+    """
+    return graph_clusters.get_cluster_overview()
+
+
+@app.get("/api/knowledge-graph/clusters/{cluster_id}")
+async def expand_knowledge_graph_cluster(cluster_id: str):
+    """Expand one cluster into its member nodes and links."""
+    result = graph_clusters.expand_cluster(cluster_id)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+
 @app.get("/api/knowledge-graph/notes/{note_id:path}/related")
 async def get_related_notes(note_id: str):
     """
@@ -4096,31 +4276,48 @@ async def normalize_entities():
 
 
 @app.post("/api/knowledge-graph/extract/{conversation_id}")
-async def extract_entities(conversation_id: str, background_tasks: BackgroundTasks):
+async def extract_entities(conversation_id: str, background_tasks: BackgroundTasks, force: bool = False):
     """
     Extract entities from a conversation's notes.
-    Runs in background for large conversations.
+    Unchanged notes reuse cached results unless force=true.
     """
     # Run extraction synchronously for immediate feedback
-    result = await knowledge_graph.extract_entities_for_conversation(conversation_id)
+    result = await knowledge_graph.extract_entities_for_conversation(conversation_id, bypass_cache=force)
     return result
 
 
+@app.get("/api/knowledge-graph/extraction/stats")
+async def get_extraction_stats():
+    """Get cumulative entity extraction request counts, cache hits and estimated savings."""
+    return knowledge_graph.get_extraction_stats_summary()
+
+
 @app.post("/api/knowledge-graph/migrate")
 async def start_migration(
     background_tasks: BackgroundTasks,
-    force: bool = False
+    force: bool = False,
+    resume: bool = False,
+    workers: Optional[int] = None,
+    bypass_cache: bool = False
 ):
     """
     Start migration of all existing synthesizer conversations.
-    Runs as a background task.
+    Runs as a background task with concurrent, rate-limited workers.
+    Pass resume=true to continue the last interrupted job from its checkpoint,
+    and bypass_cache=true to re-extract notes that haven't changed.
     """
     status = knowledge_graph.get_migration_status()
     if status["running"]:
         raise HTTPException(status_code=409, detail="Migration already running")
 
     # Start migration in background
-    background_tasks.add_task(knowledge_graph.migrate_all_conversations, force_reprocess=force)
+    background_tasks.add_task(
+        knowledge_graph.migrate_all_conversations,
+        force_reprocess=force,
+        workers=workers,
+        resume=resume,
+        bypass_cache=bypass_cache
+    )
 
     return {"status": "started", "message": "Migration started in background"}
 
@@ -4138,17 +4335,22 @@ async def cancel_migration():
 
 
 @app.post("/api/knowledge-graph/rebuild")
-async def rebuild_knowledge_graph(background_tasks: BackgroundTasks):
+async def rebuild_knowledge_graph(background_tasks: BackgroundTasks, bypass_cache: bool = False):
     """
     Rebuild the entire knowledge graph from scratch.
-    This re-extracts all entities from all conversations.
+    This reprocesses all conversations; notes that haven't changed reuse
+    cached extraction results unless bypass_cache=true.
     """
     status = knowledge_graph.get_migration_status()
     if status["running"]:
         raise HTTPException(status_code=409, detail="Migration already running")
 
     # Start full rebuild in background
-    background_tasks.add_task(knowledge_graph.migrate_all_conversations, force_reprocess=True)
+    background_tasks.add_task(
+        knowledge_graph.migrate_all_conversations,
+        force_reprocess=True,
+        bypass_cache=bypass_cache
+    )
 
     return {"status": "started", "message": "Full rebuild started in background"}
 
@@ -4270,6 +4472,54 @@ async def chat_with_knowledge_graph(request: GraphRAGChatRequest):
     }
 
 
+@app.post("/api/knowledge-graph/chat/stream")
+async def chat_with_knowledge_graph_stream(request: GraphRAGChatRequest):
+    """
+    Chat with the knowledge graph, streaming the response via Server-Sent Events.
+
+    Emits the session ID, then the retrieved notes, then answer tokens
+    (with citation events as notes are first cited), and finally the
+    complete answer with citations and follow-ups. The turn is saved to
+    chat history like the non-streaming endpoint.
+    """
+    session_id = request.session_id or str(uuid.uuid4())[:8]
+
+    # Get conversation history, then add the user message (creates session if new)
+    history = graph_rag.get_chat_history(session_id)
+    graph_rag.add_to_chat_history(session_id, "user", request.message)
+
+    async def event_generator():
+        yield f"data: {json.dumps({'type': 'session', 'data': {'session_id': session_id}})}\n\n"
+        try:
+            async for event in graph_rag.stream_knowledge_graph_query(
+                question=request.message,
+                conversation_history=history
+            ):
+                if event["type"] == "complete":
+                    result = event["data"]
+                    graph_rag.add_to_chat_history(
+                        session_id,
+                        "assistant",
+                        result["answer"],
+                        citations=result.get("citations"),
+                        follow_ups=result.get("follow_ups"),
+                        notes_searched=result.get("notes_searched")
+                    )
+                    event = {"type": "complete", "data": {"session_id": session_id, **result}}
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
+
+
 @app.get("/api/knowledge-graph/chat/sessions")
 async def list_chat_sessions():
     """List all chat sessions with metadata."""
@@ -4343,9 +4593,9 @@ async def cancel_discovery():
 
 
 @app.get("/api/knowledge-graph/discoveries")
-async def list_discoveries(status: Optional[str] = None, limit: int = 50):
-    """List discoveries with optional status filter."""
-    return {"discoveries": knowledge_discovery.list_discoveries(status=status, limit=limit)}
+async def list_discoveries(status: Optional[str] = None, limit: int = 50, sort: str = "recent"):
+    """List discoveries with optional status filter, newest or highest structural impact first."""
+    return {"discoveries": knowledge_discovery.list_discoveries(status=status, limit=limit, sort=sort)}
 
 
 @app.get("/api/knowledge-graph/discoveries/{discovery_id}")
@@ -4479,6 +4729,9 @@ class KGEntityExtractionRequest(BaseModel):
     max_entities: Optional[int] = None
     max_relationships: Optional[int] = None
     similarity_threshold: Optional[float] = None
+    batch_extraction: Optional[bool] = None
+    batch_max_notes: Optional[int] = None
+    batch_token_budget: Optional[int] = None
 
 
 @app.put("/api/settings/knowledge-graph/entity-extraction")
@@ -4488,6 +4741,28 @@ async def set_kg_entity_extraction_endpoint(request: KGEntityExtractionRequest):
         max_entities=request.max_entities,
         max_relationships=request.max_relationships,
         similarity_threshold=request.similarity_threshold,
+        batch_extraction=request.batch_extraction,
+        batch_max_notes=request.batch_max_notes,
+        batch_token_budget=request.batch_token_budget,
+    )
+
+
+# ---- Migration Settings ----
+
+class KGMigrationRequest(BaseModel):
+    """Request to update migration job runner settings."""
+    workers: Optional[int] = None
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+
+
+@app.put("/api/settings/knowledge-graph/migration")
+async def set_kg_migration_endpoint(request: KGMigrationRequest):
+    """Update migration concurrency and rate limits."""
+    return settings.set_kg_migration_settings(
+        workers=request.workers,
+        requests_per_minute=request.requests_per_minute,
+        tokens_per_minute=request.tokens_per_minute,
     )
 
 
@@ -4537,6 +4812,8 @@ class KGChatRequest(BaseModel):
     history_limit: Optional[int] = None
     similarity_weight: Optional[float] = None
     mention_weight: Optional[float] = None
+    retrieval_top_k: Optional[int] = None
+    retrieval_budget_ms: Optional[int] = None
 
 
 @app.put("/api/settings/knowledge-graph/chat")
@@ -4547,6 +4824,8 @@ async def set_kg_chat_endpoint(request: KGChatRequest):
         history_limit=request.history_limit,
         similarity_weight=request.similarity_weight,
         mention_weight=request.mention_weight,
+        retrieval_top_k=request.retrieval_top_k,
+        retrieval_budget_ms=request.retrieval_budget_ms,
     )
 
 
@@ -4576,6 +4855,7 @@ async def set_kg_sleep_compute_settings_endpoint(request: KGSleepComputeRequest)
 # =============================================================================
 
 from . import sleep_compute
+from . import sleep_scheduler
 from . import brainstorm_styles
 
 
@@ -4596,12 +4876,18 @@ class SleepComputeStartRequest(BaseModel):
     notes_target: int = 10
     model: Optional[str] = None
     entry_points: Optional[List[SleepComputeEntryPoint]] = None
+    priority: int = 0
+    schedule: str = "now"  # "now" or "idle"
+    parallel_branches: bool = False
+    branch_concurrency: Optional[int] = None
+    max_cost: Optional[float] = None
+    max_tokens: Optional[int] = None
 
 
 @app.post("/api/knowledge-graph/sleep-compute/start")
-async def start_sleep_compute_endpoint(request: SleepComputeStartRequest, background_tasks: BackgroundTasks):
+async def start_sleep_compute_endpoint(request: SleepComputeStartRequest):
     """
-    Start a new sleep compute session.
+    Queue a new sleep compute session.
 
     Budget parameters:
     - depth: Graph traversal hops (1-3)
@@ -4610,7 +4896,16 @@ async def start_sleep_compute_endpoint(request: SleepComputeStartRequest, backgr
     - notes_target: Target number of bridge notes to generate (5-30)
     - entry_points: Optional list of notes or topics to start from
 
-    Returns immediately with session_id. Computation runs in background.
+    Scheduling:
+    - priority: Queued sessions with higher priority run first
+    - schedule: "now" to run when a worker is free, "idle" to wait for the idle window
+
+    Branch-parallel expansion:
+    - parallel_branches: Expand each surviving idea concurrently in later turns
+    - branch_concurrency: Maximum concurrent branch calls (1-10)
+    - max_cost / max_tokens: Session budget; no further turns or branches start once spent
+
+    Returns immediately with session_id. The scheduler runs the session in background.
     """
     entry_points_data = None
     if request.entry_points:
@@ -4625,38 +4920,47 @@ async def start_sleep_compute_endpoint(request: SleepComputeStartRequest, backgr
         turns=request.turns,
         notes_target=request.notes_target,
         model=request.model,
-        entry_points=entry_points_data
+        entry_points=entry_points_data,
+        priority=request.priority,
+        schedule=request.schedule,
+        parallel_branches=request.parallel_branches,
+        branch_concurrency=request.branch_concurrency,
+        max_cost=request.max_cost,
+        max_tokens=request.max_tokens
     )
 
-    # If session created successfully, run computation in background
+    # If session was queued, let the scheduler pick it up
     if "error" not in result and "session_id" in result:
-        background_tasks.add_task(sleep_compute.run_sleep_compute, result["session_id"])
+        sleep_scheduler.wake()
 
     return result
 
 
 @app.get("/api/knowledge-graph/sleep-compute/status")
-async def get_sleep_compute_status():
-    """Get current sleep compute session status."""
-    return sleep_compute.get_sleep_compute_status()
+async def get_sleep_compute_status(session_id: Optional[str] = None):
+    """Get sleep compute status (latest running session unless one is given) and the queue."""
+    return sleep_compute.get_sleep_compute_status(session_id)
 
 
 @app.post("/api/knowledge-graph/sleep-compute/cancel")
-async def cancel_sleep_compute():
-    """Cancel running sleep compute session."""
-    return sleep_compute.cancel_sleep_compute()
+async def cancel_sleep_compute(session_id: Optional[str] = None):
+    """Cancel a running or queued sleep compute session."""
+    return sleep_compute.cancel_sleep_compute(session_id)
 
 
 @app.post("/api/knowledge-graph/sleep-compute/pause")
-async def pause_sleep_compute():
-    """Pause running sleep compute session."""
-    return sleep_compute.pause_sleep_compute()
+async def pause_sleep_compute(session_id: Optional[str] = None):
+    """Pause a running sleep compute session."""
+    return sleep_compute.pause_sleep_compute(session_id)
 
 
 @app.post("/api/knowledge-graph/sleep-compute/resume")
-async def resume_sleep_compute():
-    """Resume paused sleep compute session."""
-    return sleep_compute.resume_sleep_compute()
+async def resume_sleep_compute(session_id: Optional[str] = None):
+    """Resume a paused sleep compute session."""
+    result = sleep_compute.resume_sleep_compute(session_id)
+    if result["status"] == "queued":
+        sleep_scheduler.wake()
+    return result
 
 
 @app.get("/api/knowledge-graph/sleep-compute/session/{session_id}")
@@ -4805,6 +5109,7 @@ class AgentCurationAnalyzeRequest(BaseModel):
     rubrics: Optional[List[str]] = None
     threshold: float = 0.7
     max_candidates: int = 50
+    concurrency: int = 4  # Clamped to 1-10 simultaneous LLM requests
 
 
 @app.post("/api/knowledge-graph/curation/analyze-with-agent")
@@ -4828,6 +5133,7 @@ async def analyze_curation_with_agent(request: AgentCurationAnalyzeRequest):
         duplicates = await graph_curation_agent.find_duplicate_candidates_with_agent(
             threshold=request.threshold,
             max_candidates=request.max_candidates,
+            concurrency=max(1, min(10, request.concurrency)),
         )
         all_candidates.extend([c.to_dict() for c in duplicates])
 
@@ -4848,6 +5154,65 @@ async def analyze_curation_with_agent(request: AgentCurationAnalyzeRequest):
     return {"candidates": all_candidates}
 
 
+@app.post("/api/knowledge-graph/curation/analyze-with-agent/stream")
+async def analyze_curation_with_agent_stream(request: AgentCurationAnalyzeRequest):
+    """
+    Agent-enhanced curation analysis, streamed via Server-Sent Events.
+
+    Emits a candidate event per duplicate as soon as its decision is
+    available (cached decisions first, then LLM decisions as they
+    complete), followed by the candidates of the other rubrics, and
+    finally a complete event with all candidates in the same order as
+    the non-streaming endpoint.
+    """
+    from . import graph_curation_agent
+
+    rubrics = request.rubrics or ["duplicates"]
+
+    async def event_generator():
+        duplicates = []
+        others = []
+        try:
+            if "duplicates" in rubrics:
+                async for candidate in graph_curation_agent.stream_duplicate_candidates_with_agent(
+                    threshold=request.threshold,
+                    max_candidates=request.max_candidates,
+                    concurrency=max(1, min(10, request.concurrency)),
+                ):
+                    duplicates.append(candidate)
+                    yield f"data: {json.dumps({'type': 'candidate', 'data': candidate.to_dict()})}\n\n"
+
+            if "missing" in rubrics:
+                others.extend(graph_curation.find_missing_relationship_candidates(
+                    min_co_occurrence=3,
+                    max_candidates=request.max_candidates,
+                ))
+
+            if "suspect" in rubrics:
+                others.extend(graph_curation.validate_existing_relationships(
+                    max_candidates=request.max_candidates,
+                ))
+
+            for candidate in others:
+                yield f"data: {json.dumps({'type': 'candidate', 'data': candidate.to_dict()})}\n\n"
+
+            # Sort by agent confidence, as the non-streaming endpoint does
+            duplicates.sort(key=lambda c: -c.agent_confidence if c.agent_confidence else 0)
+            all_candidates = [c.to_dict() for c in duplicates + others]
+            yield f"data: {json.dumps({'type': 'complete', 'data': {'candidates': all_candidates}})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
+
+
 class AgentDecisionFeedbackRequest(BaseModel):
     """Request to record user feedback on agent decision."""
     candidate_id: str
@@ -4999,6 +5364,13 @@ async def get_quality_metrics_endpoint():
     return graph_quality.get_quality_metrics()
 
 
+@app.post("/api/knowledge-graph/quality/consistency-check")
+async def run_quality_consistency_check_endpoint():
+    """Rebuild the quality and feedback counters from scratch and report drift."""
+    from . import graph_quality
+    return await asyncio.to_thread(graph_quality.run_consistency_check)
+
+
 @app.get("/api/knowledge-graph/feedback")
 async def get_feedback_dashboard_endpoint():
     """Get feedback learning dashboard data."""
@@ -5147,6 +5519,12 @@ class SleepComputeSettingsRequest(BaseModel):
     default_max_notes: Optional[int] = None
     default_turns: Optional[int] = None
     model: Optional[str] = None
+    max_concurrent_sessions: Optional[int] = None
+    branch_concurrency: Optional[int] = None
+    max_session_cost: Optional[float] = None
+    max_session_tokens: Optional[int] = None
+    idle_window_start: Optional[str] = None  # "HH:MM", local time
+    idle_window_end: Optional[str] = None
 
 
 @app.put("/api/settings/sleep-compute")
@@ -5161,8 +5539,25 @@ async def update_sleep_compute_settings_endpoint(request: SleepComputeSettingsRe
         updates["default_turns"] = request.default_turns
     if request.model is not None:
         updates["model"] = request.model
+    if request.max_concurrent_sessions is not None:
+        updates["max_concurrent_sessions"] = max(1, request.max_concurrent_sessions)
+    if request.branch_concurrency is not None:
+        updates["branch_concurrency"] = max(1, min(10, request.branch_concurrency))
+    if request.max_session_cost is not None:
+        updates["max_session_cost"] = request.max_session_cost
+    if request.max_session_tokens is not None:
+        updates["max_session_tokens"] = request.max_session_tokens
+    if request.idle_window_start is not None:
+        updates["idle_window_start"] = request.idle_window_start
+    if request.idle_window_end is not None:
+        updates["idle_window_end"] = request.idle_window_end
 
-    return sleep_compute.update_sleep_compute_settings(updates)
+    try:
+        result = sleep_compute.update_sleep_compute_settings(updates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sleep_scheduler.wake()
+    return result
 
 
 if __name__ == "__main__":
@@ -0,0 +1,302 @@
+"""Catalog of notes across all conversations.
+
+A flat, persistent table of every note, keyed by "note:{conversation}:{id}"
+with tags, quality score and star status, creation time and source
+metadata, so callers that only need notes do not load and re-parse every
+conversation.
+
+The catalog is kept in step with conversation storage by file signature
+(mtime and size): on each read, only conversations whose files changed
+since the last refresh are parsed again, and the result is persisted.
+"""
+
+import json
+import os
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import knowledge_graph, storage
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored note fields change, to rebuild existing catalogs
+CATALOG_FORMAT = 1
+
+_catalog_lock = threading.Lock()
+_catalog_cache: Dict[str, Any] = {"path": None, "state": None, "index": None}
+
+
+def get_note_catalog_path() -> str:
+    """Get the path to the note catalog file."""
+    return os.path.join(knowledge_graph.KNOWLEDGE_GRAPH_DIR, "note_catalog.json")
+
+
+def _empty_state() -> Dict[str, Any]:
+    return {"format": CATALOG_FORMAT, "conversations": {}}
+
+
+def load_note_catalog() -> Dict[str, Any]:
+    """Load the persisted catalog state (per-conversation notes and signatures)."""
+    path = get_note_catalog_path()
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+            if state.get("format") == CATALOG_FORMAT:
+                return state
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read note catalog, rebuilding: {e}")
+    return _empty_state()
+
+
+def save_note_catalog(state: Dict[str, Any]):
+    """Persist the catalog state atomically."""
+    knowledge_graph.ensure_kg_dir()
+    path = get_note_catalog_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _conversation_signatures() -> Dict[str, List[int]]:
+    """Map conversation ID -> [mtime_ns, size] of its storage file."""
+    signatures = {}
+    if os.path.isdir(storage.DATA_DIR):
+        with os.scandir(storage.DATA_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    signatures[entry.name[:-len(".json")]] = [stat.st_mtime_ns, stat.st_size]
+    return signatures
+
+
+def _conversation_notes(conversation: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Notes of a conversation, from assistant messages (plain or structured content)."""
+    notes = []
+    for msg in conversation.get("messages", []):
+        if msg.get("role") != "assistant":
+            continue
+        if msg.get("notes"):
+            notes.extend(msg["notes"])
+        elif isinstance(msg.get("content"), dict) and "notes" in msg["content"]:
+            notes.extend(msg["content"]["notes"])
+    return notes
+
+
+def catalog_conversation(
+    conversation_id: str,
+    conversation: Dict[str, Any],
+    signature: Optional[List[int]] = None
+) -> Dict[str, Any]:
+    """
+    Build the catalog entry for one conversation.
+
+    Args:
+        conversation_id: Conversation ID (its storage file name)
+        conversation: Full conversation dict
+        signature: Storage file signature the entry was built from
+
+    Returns:
+        Dict with conversation metadata and its note records
+    """
+    title = conversation.get("title", "Untitled")
+
+    # Source info from the first assistant message, as in the graph
+    source_url = None
+    source_title = None
+    source_type = "article"
+    for msg in conversation.get("messages", []):
+        if msg.get("role") == "assistant":
+            source_url = msg.get("source_url")
+            source_title = msg.get("source_title")
+            source_type = msg.get("source_type", "article")
+            break
+
+    notes = []
+    for idx, note in enumerate(_conversation_notes(conversation)):
+        if note.get("id") is None:
+            continue
+        quality = note.get("quality") or {}
+        notes.append({
+            "id": f"note:{conversation_id}:{note['id']}",
+            "note_id": note["id"],
+            "conversation_id": conversation_id,
+            "conversation_title": title,
+            "mode": conversation.get("mode", "council"),
+            "title": note.get("title", ""),
+            "body": note.get("body", ""),
+            "tags": note.get("tags", []),
+            "quality": quality,
+            "score": quality.get("score"),
+            "starred": bool(quality.get("starred", False)),
+            "created_at": conversation.get("created_at"),
+            "sequence": idx + 1,
+            "source_url": source_url,
+            "source_title": source_title,
+            "source_type": source_type,
+        })
+
+    return {
+        "signature": signature,
+        "mode": conversation.get("mode", "council"),
+        "title": title,
+        "created_at": conversation.get("created_at"),
+        "notes": notes,
+    }
+
+
+def _build_index(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Lookup structures over the catalog: by note key, in order, by tag and by conversation."""
+    conversations = sorted(
+        state["conversations"].items(),
+        key=lambda item: item[1].get("created_at") or "",
+        reverse=True,
+    )
+
+    notes = {}
+    ordered = []
+    tags: Dict[str, List[str]] = {}
+    by_conversation: Dict[str, List[str]] = {}
+    for conversation_id, entry in conversations:
+        by_conversation[conversation_id] = [note["id"] for note in entry["notes"]]
+        for note in entry["notes"]:
+            notes[note["id"]] = note
+            ordered.append(note["id"])
+            for tag in note.get("tags", []):
+                tags.setdefault(tag.lower().strip(), []).append(note["id"])
+
+    return {"notes": notes, "ordered": ordered, "tags": tags, "conversations": by_conversation}
+
+
+def refresh_note_catalog() -> Dict[str, Any]:
+    """
+    Bring the catalog up to date with conversation storage.
+
+    Only conversations whose storage files changed are parsed again.
+
+    Returns:
+        The catalog index (see _build_index)
+    """
+    path = get_note_catalog_path()
+    signatures = _conversation_signatures()
+
+    with _catalog_lock:
+        state = _catalog_cache["state"] if _catalog_cache["path"] == path else None
+        if state is None:
+            state = load_note_catalog()
+        conversations = state["conversations"]
+
+        changed = False
+        for conversation_id in list(conversations):
+            if conversation_id not in signatures:
+                del conversations[conversation_id]
+                changed = True
+
+        for conversation_id, signature in signatures.items():
+            entry = conversations.get(conversation_id)
+            if entry and entry.get("signature") == signature:
+                continue
+            try:
+                conversation = storage.get_conversation(conversation_id)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable conversation {conversation_id}: {e}")
+                continue
+            if conversation is None:
+                continue
+            conversations[conversation_id] = catalog_conversation(conversation_id, conversation, signature)
+            changed = True
+
+        if changed:
+            save_note_catalog(state)
+
+        if changed or _catalog_cache["index"] is None or _catalog_cache["path"] != path:
+            _catalog_cache.update(path=path, state=state, index=_build_index(state))
+
+        return _catalog_cache["index"]
+
+
+def get_note(note_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a note by its catalog key ("note:{conversation}:{id}").
+
+    Returns:
+        Copy of the note record, or None if not found
+    """
+    note = refresh_note_catalog()["notes"].get(note_id)
+    return dict(note) if note else None
+
+
+def list_notes(
+    modes: Optional[Iterable[str]] = ("synthesizer",),
+    tag: Optional[str] = None,
+    conversation_id: Optional[str] = None,
+    scored: Optional[bool] = None,
+    min_score: Optional[int] = None,
+    starred: Optional[bool] = None,
+    oldest_first: bool = False,
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    List catalog notes, newest conversation first, in note order.
+
+    Args:
+        modes: Conversation modes to include (None for all)
+        tag: Only notes with this tag (case-insensitive)
+        conversation_id: Only notes from this conversation
+        scored: Only scored (True) or unscored (False) notes
+        min_score: Only notes scored at least this
+        starred: Only starred (True) or unstarred (False) notes
+        oldest_first: Order oldest conversation first instead
+        offset: Number of matching notes to skip
+        limit: Maximum notes to return
+
+    Returns:
+        Copies of the matching note records
+    """
+    index = refresh_note_catalog()
+    if conversation_id:
+        keys = index["conversations"].get(conversation_id, [])
+    elif tag:
+        keys = index["tags"].get(tag.lower().strip(), [])
+    else:
+        keys = index["ordered"]
+    if oldest_first:
+        keys = _oldest_first(index, keys)
+
+    # A conversation's notes, further filtered by tag
+    tag_keys = set(index["tags"].get(tag.lower().strip(), [])) if tag and conversation_id else None
+
+    modes = set(modes) if modes is not None else None
+    results = []
+    skipped = 0
+    for key in keys:
+        note = index["notes"][key]
+        if modes is not None and note["mode"] not in modes:
+            continue
+        if tag_keys is not None and key not in tag_keys:
+            continue
+        if scored is not None and (note["score"] is not None) != scored:
+            continue
+        if min_score is not None and (note["score"] is None or note["score"] < min_score):
+            continue
+        if starred is not None and note["starred"] != starred:
+            continue
+        if skipped < offset:
+            skipped += 1
+            continue
+        results.append(dict(note))
+        if limit is not None and len(results) >= limit:
+            break
+
+    return results
+
+
+def _oldest_first(index: Dict[str, Any], keys: List[str]) -> List[str]:
+    """Reorder keys oldest conversation first, keeping note order within each."""
+    groups: Dict[str, List[str]] = {}
+    for key in keys:
+        groups.setdefault(index["notes"][key]["conversation_id"], []).append(key)
+    return [key for group in reversed(list(groups.values())) for key in group]
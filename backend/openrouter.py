@@ -1,8 +1,9 @@
 """OpenRouter API client for making LLM requests."""
 
+import json
 import httpx
 import logging
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 from .config import OPENROUTER_API_URL
 from .settings import get_openrouter_api_key
 
@@ -26,7 +27,8 @@ async def query_model(
         timeout: Request timeout in seconds
 
     Returns:
-        Response dict with 'content', optional 'reasoning_details', and 'generation_id', or None if failed
+        Response dict with 'content', optional 'reasoning_details', 'generation_id' and
+        'usage' (token counts), or None if failed
     """
     api_key = get_openrouter_api_key()
     if not api_key:
@@ -58,7 +60,8 @@ async def query_model(
             return {
                 'content': message.get('content'),
                 'reasoning_details': message.get('reasoning_details'),
-                'generation_id': data.get('id')
+                'generation_id': data.get('id'),
+                'usage': data.get('usage')
             }
 
     except httpx.TimeoutException:
@@ -73,6 +76,84 @@ async def query_model(
         return {"error": f"Failed to query model '{model}': {str(e)}"}
 
 
+async def stream_model(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float = 120.0
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a completion from a single model via OpenRouter API.
+
+    Args:
+        model: OpenRouter model identifier (e.g., "openai/gpt-4o")
+        messages: List of message dicts with 'role' and 'content'
+        timeout: Timeout in seconds between received chunks
+
+    Yields:
+        {'content': delta} for each content chunk, then a final
+        {'generation_id': id}; or a single {'error': message} on failure
+    """
+    api_key = get_openrouter_api_key()
+    if not api_key:
+        logger.error("No OpenRouter API key configured")
+        yield {"error": "No OpenRouter API key configured. Go to Settings to add your key."}
+        return
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": True,
+    }
+
+    generation_id = None
+    try:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream("POST", OPENROUTER_API_URL, headers=headers, json=payload) as response:
+                if response.status_code >= 400:
+                    body = (await response.aread()).decode(errors="replace")
+                    error_text = body[:200] if body else "No error details"
+                    logger.error(f"HTTP error streaming {model}: {response.status_code} - {error_text}")
+                    yield {"error": f"API error ({response.status_code}): {error_text}"}
+                    return
+
+                async for line in response.aiter_lines():
+                    # Blank lines separate events; lines starting with ':' are keep-alive comments
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+
+                    if chunk.get("error"):
+                        message = chunk["error"].get("message", str(chunk["error"]))
+                        yield {"error": f"API error: {message}"}
+                        return
+
+                    generation_id = generation_id or chunk.get("id")
+                    choices = chunk.get("choices") or [{}]
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        yield {"content": content}
+
+        yield {"generation_id": generation_id}
+
+    except httpx.TimeoutException:
+        logger.error(f"Timeout streaming model {model}")
+        yield {"error": f"Request timed out. The model '{model}' may be slow or unavailable."}
+    except Exception as e:
+        logger.error(f"Error streaming model {model}: {e}")
+        yield {"error": f"Failed to query model '{model}': {str(e)}"}
+
+
 async def get_generation_cost(generation_id: str) -> Optional[float]:
     """
     Fetch the cost for a specific generation from OpenRouter.
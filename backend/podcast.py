@@ -1307,7 +1307,7 @@ async def discover_relevant_notes(topic: str, limit: int = 10) -> List[Dict[str,
     Returns:
         List of note dicts with id, title, body, tags, source_url, conversation_id, score
     """
-    from . import search, storage
+    from . import search, note_catalog
 
     if not topic.strip():
         return []
@@ -1326,35 +1326,16 @@ async def discover_relevant_notes(topic: str, limit: int = 10) -> List[Dict[str,
         if result.get("mode") != "synthesizer":
             continue
 
-        conv_id = result["id"]
-        conversation = storage.get_conversation(conv_id)
-        if not conversation:
-            continue
-
-        # Extract notes from the conversation
-        notes = extract_notes_from_conversation(conversation)
-        if not notes:
-            continue
-
-        # Get source URL from the conversation
-        source_url = None
-        source_title = None
-        for msg in conversation.get("messages", []):
-            if msg.get("role") == "assistant":
-                source_url = msg.get("source_url")
-                source_title = msg.get("source_title")
-                if source_url:
-                    break
-
         # Add each note with full content and metadata
-        for note in notes:
+        conv_id = result["id"]
+        for note in note_catalog.list_notes(modes=None, conversation_id=conv_id):
             discovered_notes.append({
-                "id": note.get("id"),
-                "title": note.get("title", "Untitled"),
-                "body": note.get("body", ""),
-                "tags": note.get("tags", []),
-                "source_url": source_url,
-                "source_title": source_title,
+                "id": note["note_id"],
+                "title": note["title"] or "Untitled",
+                "body": note["body"],
+                "tags": note["tags"],
+                "source_url": note["source_url"],
+                "source_title": note["source_title"],
                 "conversation_id": conv_id,
                 "conversation_title": result.get("title", ""),
                 "score": result.get("score", 0),
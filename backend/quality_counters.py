@@ -0,0 +1,168 @@
+"""Incrementally maintained knowledge graph quality counters.
+
+Quality and provenance aggregates (entities by validation status, type,
+source, model and validator; relationships by status and type) are kept
+in the entity store under "quality_counters" and updated by delta inside
+the same transaction as the change that affects them, so dashboards read
+them instead of scanning every entity.
+
+Counters are stamped with the store version they describe. A write that
+does not maintain them (bulk edits) leaves the stamp behind; such
+counters are treated as stale and rebuilt from scratch on next use.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_KEY = "quality_counters"
+
+
+def empty_counters() -> Dict[str, Any]:
+    """Counters for an empty entity store."""
+    return {
+        "entities": {
+            "total": 0,
+            "status": {},
+            "manual": 0,
+            "types": {},
+            "by_source": {},
+            "by_model": {},
+            "by_validator": {},
+        },
+        "relationships": {
+            "total": 0,
+            "status": {},
+            "types": {},
+        },
+        "version": None,
+    }
+
+
+def _bump(table: Dict[str, int], key: str, delta: int):
+    value = table.get(key, 0) + delta
+    if value:
+        table[key] = value
+    else:
+        table.pop(key, None)
+
+
+def _apply_entity(counters: Dict[str, Any], entity: Dict[str, Any], sign: int):
+    stats = counters["entities"]
+    validation = entity.get("validation") or {}
+    provenance = entity.get("provenance") or {}
+
+    stats["total"] += sign
+    _bump(stats["status"], validation.get("status", "extracted"), sign)
+    if provenance.get("source") == "manual":
+        stats["manual"] += sign
+    _bump(stats["types"], entity.get("type", "unknown"), sign)
+    _bump(stats["by_source"], provenance.get("source") or "unknown", sign)
+
+    model = provenance.get("extraction_model")
+    if model:
+        _bump(stats["by_model"], model.split("/")[-1], sign)
+
+    validator = validation.get("validated_by")
+    if validator:
+        _bump(stats["by_validator"], validator, sign)
+
+
+def _apply_relationship(counters: Dict[str, Any], relationship: Dict[str, Any], sign: int):
+    stats = counters["relationships"]
+    validation = relationship.get("validation") or {}
+
+    stats["total"] += sign
+    _bump(stats["status"], validation.get("status", "extracted"), sign)
+    _bump(stats["types"], relationship.get("type", "unknown"), sign)
+
+
+def compute_counters(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build counters from scratch by scanning the entity store."""
+    counters = empty_counters()
+    for entity in data.get("entities", {}).values():
+        _apply_entity(counters, entity, 1)
+    for relationship in data.get("entity_relationships", []):
+        _apply_relationship(counters, relationship, 1)
+    counters["version"] = data.get("version", 0)
+    return counters
+
+
+def is_current(data: Dict[str, Any]) -> bool:
+    """Whether the stored counters describe this version of the store."""
+    counters = data.get(COUNTERS_KEY)
+    return bool(counters) and counters.get("version") == data.get("version", 0)
+
+
+def snapshot(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of the fields of an entity or relationship that counters depend on."""
+    return {
+        "type": item.get("type", "unknown"),
+        "validation": dict(item.get("validation") or {}),
+        "provenance": dict(item.get("provenance") or {}),
+    }
+
+
+def record_changes(
+    data: Dict[str, Any],
+    entities_before: Iterable[Dict[str, Any]] = (),
+    entities_after: Iterable[Dict[str, Any]] = (),
+    relationships_before: Iterable[Dict[str, Any]] = (),
+    relationships_after: Iterable[Dict[str, Any]] = ()
+):
+    """
+    Update the counters for changed entities and relationships.
+
+    Call inside an entity transaction, after modifying the data. Items in
+    *_before are removed from the counts (use snapshot() of items modified
+    in place) and items in *_after are added. The counters are stamped
+    with the version the transaction's save will give the store.
+
+    Args:
+        data: Entity store being modified
+        entities_before: Previous state of changed or removed entities
+        entities_after: New state of changed or added entities
+        relationships_before: Previous state of changed or removed relationships
+        relationships_after: New state of changed or added relationships
+    """
+    counters = data.get(COUNTERS_KEY)
+    next_version = data.get("version", 0) + 1
+    # Already stamped with next_version if this transaction recorded earlier changes
+    if counters and counters.get("version") in (data.get("version", 0), next_version):
+        for entity in entities_before:
+            _apply_entity(counters, entity, -1)
+        for entity in entities_after:
+            _apply_entity(counters, entity, 1)
+        for relationship in relationships_before:
+            _apply_relationship(counters, relationship, -1)
+        for relationship in relationships_after:
+            _apply_relationship(counters, relationship, 1)
+    else:
+        # Stale (or missing): the data already includes this change
+        logger.info("Quality counters are stale; rebuilding")
+        counters = compute_counters(data)
+
+    counters["version"] = next_version
+    data[COUNTERS_KEY] = counters
+
+
+def counter_drift(stored: Optional[Dict[str, Any]], actual: Dict[str, Any], prefix: str = "") -> Dict[str, Dict[str, Any]]:
+    """
+    Differences between stored and freshly computed counters.
+
+    Returns:
+        Dict mapping dotted counter paths to {"stored", "actual"}
+    """
+    drift = {}
+    stored = stored or {}
+    for key in set(stored) | set(actual):
+        if key == "version" and not prefix:
+            continue
+        path = f"{prefix}{key}"
+        a, b = stored.get(key), actual.get(key)
+        if isinstance(a, dict) or isinstance(b, dict):
+            drift.update(counter_drift(a if isinstance(a, dict) else {}, b if isinstance(b, dict) else {}, f"{path}."))
+        elif (a or 0) != (b or 0):
+            drift[path] = {"stored": a or 0, "actual": b or 0}
+    return drift
@@ -0,0 +1,184 @@
+"""Embedding-first note retrieval for knowledge graph chat.
+
+Each chat turn embeds the question once and then works on a bounded
+candidate pool:
+
+1. Vector search over note embeddings (one matrix-vector product against
+   the cached, normalized note matrix)
+2. Expansion through the entities the question mentions, via the graph
+   adjacency index
+3. MMR re-ranking, so the top-k notes are relevant but not redundant
+
+Note content comes from the cached graph (addressable by note ID) instead
+of re-reading conversations. Stages after vector search are skipped once
+the latency budget is spent.
+"""
+
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import graph_index, graph_search
+from .entity_matcher import get_entity_matcher
+from .knowledge_graph import get_indexed_entities
+from .settings import get_kg_chat_settings
+
+logger = logging.getLogger(__name__)
+
+# Candidates considered per result slot before MMR
+CANDIDATE_POOL_FACTOR = 4
+
+# Notes scanned per question entity during expansion (hub entities are capped)
+EXPANSION_SCAN_LIMIT = 200
+
+# Relevance vs. diversity trade-off for MMR (1.0 = relevance only)
+MMR_LAMBDA = 0.7
+
+
+def mmr_select(relevance: np.ndarray, vectors: np.ndarray, k: int, lambda_: float = MMR_LAMBDA) -> List[int]:
+    """
+    Greedy maximal marginal relevance selection.
+
+    Args:
+        relevance: (n,) relevance score per candidate
+        vectors: (n, dim) unit vectors per candidate (zero rows are never redundant)
+        k: Number of candidates to select
+        lambda_: Weight of relevance against redundancy
+
+    Returns:
+        Selected candidate positions, in selection order
+    """
+    n = len(relevance)
+    selected: List[int] = []
+    redundancy = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+
+    for _ in range(min(k, n)):
+        scores = lambda_ * relevance - (1 - lambda_) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, vectors @ vectors[best], out=redundancy)
+
+    return selected
+
+
+def _note_key(note_id: str) -> str:
+    parts = note_id.split(":")
+    return f"{parts[1]}:{parts[2]}" if len(parts) >= 3 else note_id
+
+
+def retrieve_notes(
+    question: str,
+    top_k: Optional[int] = None,
+    budget_ms: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve the notes most relevant to a question.
+
+    Args:
+        question: User's question
+        top_k: Notes to return (defaults to settings)
+        budget_ms: Soft latency budget in milliseconds (defaults to settings)
+
+    Returns:
+        List of {"node", "score", "note_key"} dicts, best first
+
+    Raises:
+        LookupError: If no note embeddings have been indexed yet
+    """
+    settings = get_kg_chat_settings()
+    top_k = top_k or settings["retrieval_top_k"]
+    budget_ms = budget_ms or settings["retrieval_budget_ms"]
+    deadline = time.perf_counter() + budget_ms / 1000.0
+
+    # Vectors already indexed; callers keep the index in sync off the request path
+    ids, rows, matrix = graph_search.get_node_vectors("note", sync=False)
+    if not ids:
+        raise LookupError("No note embeddings indexed yet")
+    index, _ = graph_index.get_graph_index()
+
+    query = np.asarray(list(graph_search.get_model().embed([question]))[0], dtype=np.float32)
+    query /= max(float(np.linalg.norm(query)), 1e-9)
+    similarities = matrix @ query
+
+    # Stage 1: vector search
+    pool = min(len(ids), top_k * CANDIDATE_POOL_FACTOR)
+    top = np.argpartition(-similarities, pool - 1)[:pool]
+    candidates: Dict[str, Dict[str, float]] = {
+        ids[i]: {"similarity": float(similarities[i]), "mentions": 0} for i in top
+    }
+
+    # Stage 2: expand through entities named in the question
+    if time.perf_counter() < deadline:
+        entities, _ = get_indexed_entities()
+        for entity_id in get_entity_matcher(entities.get("entities", {})).match(question):
+            for neighbor_id, link in index.neighbors(f"entity:{entity_id}")[:EXPANSION_SCAN_LIMIT]:
+                if link.get("type") != "mentions":
+                    continue
+                row = rows.get(neighbor_id)
+                candidate = candidates.setdefault(neighbor_id, {
+                    "similarity": float(similarities[row]) if row is not None else 0.0,
+                    "mentions": 0,
+                })
+                candidate["mentions"] += 1
+
+    candidate_ids = [c for c in candidates if c in index.nodes]
+    relevance = np.asarray([
+        settings["similarity_weight"] * candidates[c]["similarity"]
+        + settings["mention_weight"] * min(candidates[c]["mentions"], 3) / 3
+        for c in candidate_ids
+    ], dtype=np.float32)
+
+    # Stage 3: diversify
+    if time.perf_counter() < deadline:
+        vectors = np.zeros((len(candidate_ids), matrix.shape[1]), dtype=np.float32)
+        for i, c in enumerate(candidate_ids):
+            if c in rows:
+                vectors[i] = matrix[rows[c]]
+        order = mmr_select(relevance, vectors, top_k)
+    else:
+        logger.info(f"Retrieval budget of {budget_ms}ms spent; skipping diversification")
+        order = list(np.argsort(-relevance)[:top_k])
+
+    return [
+        {
+            "node": index.nodes[candidate_ids[i]],
+            "score": round(float(relevance[i]), 4),
+            "note_key": _note_key(candidate_ids[i]),
+        }
+        for i in order
+    ]
+
+
+def get_note_content(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Get full note content for retrieved notes from the cached graph.
+
+    Args:
+        items: Retrieved items with a "node" (and optional "score")
+
+    Returns:
+        Notes with id, title, tags, body, source_title, conversation_id and score
+    """
+    index, _ = graph_index.get_graph_index()
+    notes = []
+    for item in items:
+        node = index.nodes.get(item["node"]["id"], item["node"])
+        parts = node["id"].split(":")
+        if len(parts) < 3:
+            continue
+        source = index.nodes.get(node.get("sourceId"), {})
+        notes.append({
+            "id": node["id"],
+            "title": node.get("title", ""),
+            "tags": node.get("tags", []),
+            "body": node.get("body", ""),
+            "source_title": source.get("title", ""),
+            "conversation_id": parts[1],
+            "score": item.get("score", 0),
+        })
+    return notes
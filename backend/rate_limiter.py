@@ -0,0 +1,93 @@
+"""Token-bucket rate limiting for outbound LLM requests."""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+
+class TokenBucketRateLimiter:
+    """
+    Async rate limiter with independent request and token buckets.
+
+    Each bucket refills continuously at its per-minute rate up to one
+    minute of capacity, so short bursts are allowed while the long-run
+    rate stays bounded. A limit of 0 or None disables that bucket.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None
+    ):
+        self.requests_per_minute = requests_per_minute or 0
+        self.tokens_per_minute = tokens_per_minute or 0
+        self._request_tokens = float(self.requests_per_minute)
+        self._token_tokens = float(self.tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        self.requests = 0
+        self.tokens = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        if self.requests_per_minute:
+            self._request_tokens = min(
+                float(self.requests_per_minute),
+                self._request_tokens + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute:
+            self._token_tokens = min(
+                float(self.tokens_per_minute),
+                self._token_tokens + elapsed * self.tokens_per_minute / 60.0
+            )
+
+    def _delay_for(self, tokens: int) -> float:
+        """Seconds until both buckets can cover a request of this size."""
+        delay = 0.0
+        if self.requests_per_minute and self._request_tokens < 1:
+            delay = max(delay, (1 - self._request_tokens) * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            # A single request larger than the bucket only waits for a full bucket
+            needed = min(tokens, self.tokens_per_minute)
+            if self._token_tokens < needed:
+                delay = max(delay, (needed - self._token_tokens) * 60.0 / self.tokens_per_minute)
+        return delay
+
+    async def acquire(self, tokens: int = 0):
+        """
+        Wait until a request of the given estimated token size may proceed.
+
+        Args:
+            tokens: Estimated tokens the request will consume
+        """
+        async with self._lock:
+            while True:
+                self._refill()
+                delay = self._delay_for(tokens)
+                if delay <= 0:
+                    break
+                self.wait_seconds += delay
+                await asyncio.sleep(delay)
+
+            if self.requests_per_minute:
+                self._request_tokens -= 1
+            if self.tokens_per_minute:
+                self._token_tokens -= min(tokens, self.tokens_per_minute)
+
+            self.requests += 1
+            self.tokens += tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counters for status reporting."""
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "requests": self.requests,
+            "tokens": self.tokens,
+            "wait_seconds": round(self.wait_seconds, 2),
+        }
@@ -0,0 +1,135 @@
+"""Indexed view over knowledge graph entity relationships."""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+RelationshipKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+# Fields every relationship row carries, in persisted column order
+CORE_RELATIONSHIP_FIELDS = [
+    "id",
+    "source_entity_id",
+    "target_entity_id",
+    "source_entity_name",
+    "target_entity_name",
+    "type",
+    "bidirectional",
+    "source_note",
+]
+
+
+def relationship_key(rel: Dict[str, Any]) -> RelationshipKey:
+    """Identity of a relationship for duplicate checks: (source, target, type)."""
+    return (rel.get("source_entity_id"), rel.get("target_entity_id"), rel.get("type"))
+
+
+class RelationshipIndex:
+    """
+    Index over a relationship list.
+
+    Wraps the list in place (so ``data["entity_relationships"]`` stays the
+    source of truth) and keeps lookups by (source, target, type), by id and
+    by entity incidence. Relationships added through ``add`` are appended to
+    the underlying list and indexed; edits made directly to the list are
+    picked up on the next rebuild.
+    """
+
+    def __init__(self, relationships: Optional[List[Dict[str, Any]]] = None):
+        self.relationships = relationships if relationships is not None else []
+        self.rebuild()
+
+    def rebuild(self):
+        """Rebuild every index from the underlying list."""
+        self.by_key: Dict[RelationshipKey, Dict[str, Any]] = {}
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_entity: Dict[str, List[Dict[str, Any]]] = {}
+        self._position: Dict[int, int] = {}
+        for rel in self.relationships:
+            self._index(rel)
+
+    def _index(self, rel: Dict[str, Any]):
+        self._position[id(rel)] = len(self._position)
+        self.by_key.setdefault(relationship_key(rel), rel)
+        if rel.get("id"):
+            self.by_id[rel["id"]] = rel
+
+        source_id = rel.get("source_entity_id")
+        target_id = rel.get("target_entity_id")
+        if source_id:
+            self.by_entity.setdefault(source_id, []).append(rel)
+        if target_id and target_id != source_id:
+            self.by_entity.setdefault(target_id, []).append(rel)
+
+    def __len__(self) -> int:
+        return len(self.relationships)
+
+    def is_stale(self) -> bool:
+        """Whether the list changed size outside ``add`` (same-size edits are not detected)."""
+        return len(self._position) != len(self.relationships)
+
+    def contains(self, source_id: str, target_id: str, rel_type: str) -> bool:
+        """Check whether a (source, target, type) relationship exists."""
+        return (source_id, target_id, rel_type) in self.by_key
+
+    def add(self, rel: Dict[str, Any]) -> bool:
+        """
+        Add a relationship unless one with the same (source, target, type) exists.
+
+        Returns:
+            True if the relationship was added
+        """
+        if relationship_key(rel) in self.by_key:
+            return False
+        self.relationships.append(rel)
+        self._index(rel)
+        return True
+
+    def get(self, relationship_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a relationship by id."""
+        return self.by_id.get(relationship_id)
+
+    def for_entity(self, entity_id: str) -> List[Dict[str, Any]]:
+        """Relationships where the entity is source or target."""
+        return self.by_entity.get(entity_id, [])
+
+    def for_entities(self, entity_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Relationships touching any of the entities, each listed once, in storage order."""
+        found = {}
+        for entity_id in entity_ids:
+            for rel in self.by_entity.get(entity_id, []):
+                found[id(rel)] = rel
+        return sorted(found.values(), key=lambda r: self._position[id(r)])
+
+
+def compact_relationships(relationships: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Encode relationships as column names plus value rows.
+
+    Avoids repeating every key in every relationship on disk. Optional
+    fields that a relationship lacks are stored as null.
+    """
+    fields = list(CORE_RELATIONSHIP_FIELDS)
+    seen = set(fields)
+    for rel in relationships:
+        for key in rel:
+            if key not in seen:
+                seen.add(key)
+                fields.append(key)
+
+    return {
+        "fields": fields,
+        "rows": [[rel.get(field) for field in fields] for rel in relationships],
+    }
+
+
+def expand_relationships(compact: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Decode relationships written by compact_relationships."""
+    fields = compact.get("fields", [])
+    core = set(CORE_RELATIONSHIP_FIELDS)
+    relationships = []
+    for row in compact.get("rows", []):
+        rel = {}
+        for field, value in zip(fields, row):
+            if value is not None or field in core:
+                rel[field] = value
+        relationships.append(rel)
+    return relationships
@@ -146,6 +146,54 @@ def set_chairman_model(model: str) -> None:
     save_settings(settings)
 
 
+# Context window sizes (tokens) by model ID prefix; the longest matching prefix wins
+DEFAULT_MODEL_CONTEXT_LIMITS = {
+    "anthropic/": 200000,
+    "openai/": 128000,
+    "openai/gpt-4.1": 1000000,
+    "openai/gpt-5": 400000,
+    "google/": 1000000,
+    "x-ai/": 256000,
+    "moonshotai/": 256000,
+    "deepseek/": 128000,
+    "meta-llama/": 128000,
+    "mistralai/": 128000,
+}
+DEFAULT_MODEL_CONTEXT_LIMIT = 32000
+
+
+def get_model_context_limits() -> Dict[str, int]:
+    """
+    Get context window sizes by model ID prefix.
+    Priority: settings file overrides > defaults
+    """
+    settings = load_settings()
+    return {**DEFAULT_MODEL_CONTEXT_LIMITS, **settings.get("model_context_limits", {})}
+
+
+def set_model_context_limit(model_prefix: str, tokens: Optional[int]) -> Dict[str, int]:
+    """Override the context window for a model or model prefix (None removes the override)."""
+    settings = load_settings()
+    overrides = settings.setdefault("model_context_limits", {})
+    if tokens is None:
+        overrides.pop(model_prefix, None)
+    else:
+        overrides[model_prefix] = tokens
+    save_settings(settings)
+    return get_model_context_limits()
+
+
+def get_model_context_limit(model: Optional[str]) -> int:
+    """Get the context window size in tokens for a model."""
+    if not model:
+        return DEFAULT_MODEL_CONTEXT_LIMIT
+    limits = get_model_context_limits()
+    matches = [prefix for prefix in limits if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_MODEL_CONTEXT_LIMIT
+    return limits[max(matches, key=len)]
+
+
 def get_default_prompt() -> Optional[str]:
     """Get the default system prompt filename."""
     settings = load_settings()
@@ -893,6 +941,14 @@ DEFAULT_KG_CHAT_MODEL = "anthropic/claude-sonnet-4-20250514"
 DEFAULT_KG_MAX_ENTITIES = 5
 DEFAULT_KG_MAX_RELATIONSHIPS = 3
 DEFAULT_KG_SIMILARITY_THRESHOLD = 0.85
+DEFAULT_KG_BATCH_EXTRACTION = False
+DEFAULT_KG_BATCH_MAX_NOTES = 8
+DEFAULT_KG_BATCH_TOKEN_BUDGET = 6000
+
+# Migration defaults
+DEFAULT_KG_MIGRATION_WORKERS = 4
+DEFAULT_KG_MIGRATION_REQUESTS_PER_MINUTE = 60
+DEFAULT_KG_MIGRATION_TOKENS_PER_MINUTE = 100000
 
 # Visualization defaults
 DEFAULT_KG_NODE_SIZE_SOURCE = 8
@@ -915,6 +971,8 @@ DEFAULT_KG_CHAT_CONTEXT_MAX_LENGTH = 8000
 DEFAULT_KG_CHAT_HISTORY_LIMIT = 20
 DEFAULT_KG_CHAT_SIMILARITY_WEIGHT = 0.7
 DEFAULT_KG_CHAT_MENTION_WEIGHT = 0.3
+DEFAULT_KG_CHAT_RETRIEVAL_TOP_K = 10
+DEFAULT_KG_CHAT_RETRIEVAL_BUDGET_MS = 1500
 
 # Sleep Time Compute defaults
 DEFAULT_KG_SLEEP_COMPUTE_DEPTH = 2
@@ -1003,6 +1061,9 @@ def get_kg_entity_extraction_settings() -> Dict[str, Any]:
         "max_entities": settings.get("kg_max_entities", DEFAULT_KG_MAX_ENTITIES),
         "max_relationships": settings.get("kg_max_relationships", DEFAULT_KG_MAX_RELATIONSHIPS),
         "similarity_threshold": settings.get("kg_similarity_threshold", DEFAULT_KG_SIMILARITY_THRESHOLD),
+        "batch_extraction": settings.get("kg_batch_extraction", DEFAULT_KG_BATCH_EXTRACTION),
+        "batch_max_notes": settings.get("kg_batch_max_notes", DEFAULT_KG_BATCH_MAX_NOTES),
+        "batch_token_budget": settings.get("kg_batch_token_budget", DEFAULT_KG_BATCH_TOKEN_BUDGET),
     }
 
 
@@ -1010,6 +1071,9 @@ def set_kg_entity_extraction_settings(
     max_entities: Optional[int] = None,
     max_relationships: Optional[int] = None,
     similarity_threshold: Optional[float] = None,
+    batch_extraction: Optional[bool] = None,
+    batch_max_notes: Optional[int] = None,
+    batch_token_budget: Optional[int] = None,
 ) -> Dict[str, Any]:
     """Set entity extraction settings."""
     settings = load_settings()
@@ -1019,10 +1083,47 @@ def set_kg_entity_extraction_settings(
         settings["kg_max_relationships"] = max_relationships
     if similarity_threshold is not None:
         settings["kg_similarity_threshold"] = similarity_threshold
+    if batch_extraction is not None:
+        settings["kg_batch_extraction"] = batch_extraction
+    if batch_max_notes is not None:
+        settings["kg_batch_max_notes"] = max(1, batch_max_notes)
+    if batch_token_budget is not None:
+        settings["kg_batch_token_budget"] = max(500, batch_token_budget)
     save_settings(settings)
     return get_kg_entity_extraction_settings()
 
 
+# -------------------------
+# Migration Settings
+# -------------------------
+
+def get_kg_migration_settings() -> Dict[str, Any]:
+    """Get migration job runner settings."""
+    settings = load_settings()
+    return {
+        "workers": settings.get("kg_migration_workers", DEFAULT_KG_MIGRATION_WORKERS),
+        "requests_per_minute": settings.get("kg_migration_requests_per_minute", DEFAULT_KG_MIGRATION_REQUESTS_PER_MINUTE),
+        "tokens_per_minute": settings.get("kg_migration_tokens_per_minute", DEFAULT_KG_MIGRATION_TOKENS_PER_MINUTE),
+    }
+
+
+def set_kg_migration_settings(
+    workers: Optional[int] = None,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Set migration job runner settings (0 disables a rate limit)."""
+    settings = load_settings()
+    if workers is not None:
+        settings["kg_migration_workers"] = max(1, workers)
+    if requests_per_minute is not None:
+        settings["kg_migration_requests_per_minute"] = max(0, requests_per_minute)
+    if tokens_per_minute is not None:
+        settings["kg_migration_tokens_per_minute"] = max(0, tokens_per_minute)
+    save_settings(settings)
+    return get_kg_migration_settings()
+
+
 # -------------------------
 # Visualization Settings
 # -------------------------
@@ -1121,6 +1222,8 @@ def get_kg_chat_settings() -> Dict[str, Any]:
         "history_limit": settings.get("kg_chat_history_limit", DEFAULT_KG_CHAT_HISTORY_LIMIT),
         "similarity_weight": settings.get("kg_chat_similarity_weight", DEFAULT_KG_CHAT_SIMILARITY_WEIGHT),
         "mention_weight": settings.get("kg_chat_mention_weight", DEFAULT_KG_CHAT_MENTION_WEIGHT),
+        "retrieval_top_k": settings.get("kg_chat_retrieval_top_k", DEFAULT_KG_CHAT_RETRIEVAL_TOP_K),
+        "retrieval_budget_ms": settings.get("kg_chat_retrieval_budget_ms", DEFAULT_KG_CHAT_RETRIEVAL_BUDGET_MS),
     }
 
 
@@ -1129,6 +1232,8 @@ def set_kg_chat_settings(
     history_limit: Optional[int] = None,
     similarity_weight: Optional[float] = None,
     mention_weight: Optional[float] = None,
+    retrieval_top_k: Optional[int] = None,
+    retrieval_budget_ms: Optional[int] = None,
 ) -> Dict[str, Any]:
     """Set chat/RAG settings."""
     settings = load_settings()
@@ -1140,6 +1245,10 @@ def set_kg_chat_settings(
         settings["kg_chat_similarity_weight"] = similarity_weight
     if mention_weight is not None:
         settings["kg_chat_mention_weight"] = mention_weight
+    if retrieval_top_k is not None:
+        settings["kg_chat_retrieval_top_k"] = retrieval_top_k
+    if retrieval_budget_ms is not None:
+        settings["kg_chat_retrieval_budget_ms"] = retrieval_budget_ms
     save_settings(settings)
     return get_kg_chat_settings()
 
@@ -1188,6 +1297,7 @@ def get_knowledge_graph_settings() -> Dict[str, Any]:
     return {
         "models": get_kg_model_settings(),
         "entity_extraction": get_kg_entity_extraction_settings(),
+        "migration": get_kg_migration_settings(),
         "visualization": get_kg_visualization_settings(),
         "search": get_kg_search_settings(),
         "chat": get_kg_chat_settings(),
@@ -13,11 +13,13 @@ import logging
 import asyncio
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 
 from .openrouter import query_model, get_generation_cost
 from .storage import get_conversation, list_conversations, save_conversation, update_conversation_cost, update_conversation_summary
 from .graph_search import search_knowledge_graph
+from . import discovery_candidates, graph_distance, graph_search, note_catalog
+from .graph_index import get_subgraph
 from .knowledge_graph import load_entities, build_graph
 from .brainstorm_styles import get_style, list_styles, get_enabled_styles
 from .summarizer import generate_summary
@@ -30,9 +32,31 @@ KNOWLEDGE_GRAPH_DIR = os.getenv("KNOWLEDGE_GRAPH_DIR", "data/knowledge_graph")
 # Default model for sleep compute sessions
 SLEEP_COMPUTE_MODEL = "anthropic/claude-opus-4.5"
 
-# Maximum concurrent workers
+# Default number of sessions the scheduler runs at once
 MAX_WORKERS = 3
 
+# When a queued session may start: as soon as a worker is free, or only in the idle window
+SCHEDULES = ("now", "idle")
+
+# Branch-parallel expansion: concurrent model calls per session, and ideas expanded per turn
+DEFAULT_BRANCH_CONCURRENCY = 3
+DEFAULT_MAX_BRANCHES = 5
+
+DEFAULT_SETTINGS = {
+    "default_depth": 2,
+    "default_max_notes": 30,
+    "default_turns": 3,
+    "model": None,
+    "max_concurrent_sessions": MAX_WORKERS,
+    "branch_concurrency": DEFAULT_BRANCH_CONCURRENCY,
+    # Per-session budget defaults (None for unlimited)
+    "max_session_cost": None,
+    "max_session_tokens": None,
+    # Local time window for sessions scheduled to run while idle (e.g. overnight)
+    "idle_window_start": "01:00",
+    "idle_window_end": "06:00",
+}
+
 
 def ensure_kg_dir():
     """Ensure the knowledge graph directory exists."""
@@ -55,35 +79,35 @@ def load_sessions() -> Dict[str, Any]:
 
     return {
         "sessions": {},
-        "active_sessions": [],  # List of active session IDs (max 3)
-        "settings": {
-            "default_depth": 2,
-            "default_max_notes": 30,
-            "default_turns": 3,
-            "model": None
-        }
+        "settings": dict(DEFAULT_SETTINGS)
     }
 
 
 def save_sessions(data: Dict[str, Any]):
-    """Save sleep compute sessions to storage."""
+    """Save sleep compute sessions to storage atomically."""
     ensure_kg_dir()
     data["updated_at"] = datetime.utcnow().isoformat()
 
     path = get_sessions_path()
-    with open(path, 'w') as f:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
         json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _save_session(session: Dict[str, Any]):
+    """Write one session back to storage (checkpoint)."""
+    data = load_sessions()
+    data["sessions"][session["id"]] = session
+    save_sessions(data)
 
 
 class SleepComputeState:
-    """Track sleep compute session state (singleton)."""
-    _instance = None
+    """Track the in-memory progress of one running sleep compute session."""
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.reset()
-        return cls._instance
+    def __init__(self, session_id: Optional[str] = None):
+        self.reset()
+        self.session_id = session_id
 
     def reset(self):
         self.running = False
@@ -97,79 +121,135 @@ class SleepComputeState:
         self.started_at = None
         self.error = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "paused": self.paused,
+            "cancelled": self.cancelled,
+            "session_id": self.session_id,
+            "phase": self.phase,
+            "current_turn": self.current_turn,
+            "total_turns": self.total_turns,
+            "progress": self.progress,
+            "started_at": self.started_at,
+            "error": self.error
+        }
 
-sleep_compute_state = SleepComputeState()
 
+# Session ID -> state of sessions started in this process (latest last)
+_session_states: Dict[str, SleepComputeState] = {}
 
-def get_sleep_compute_status() -> Dict[str, Any]:
-    """Get current sleep compute status."""
-    global sleep_compute_state
 
-    return {
-        "running": sleep_compute_state.running,
-        "paused": sleep_compute_state.paused,
-        "cancelled": sleep_compute_state.cancelled,
-        "session_id": sleep_compute_state.session_id,
-        "phase": sleep_compute_state.phase,
-        "current_turn": sleep_compute_state.current_turn,
-        "total_turns": sleep_compute_state.total_turns,
-        "progress": sleep_compute_state.progress,
-        "started_at": sleep_compute_state.started_at,
-        "error": sleep_compute_state.error
-    }
+def _get_state(session_id: Optional[str] = None) -> Optional[SleepComputeState]:
+    """State of a session, or of the most recently started running (else last) session."""
+    if session_id:
+        return _session_states.get(session_id)
+    running = [state for state in _session_states.values() if state.running]
+    if running:
+        return running[-1]
+    return next(reversed(_session_states.values()), None)
+
+
+def get_sleep_compute_status(session_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get sleep compute status.
+
+    Args:
+        session_id: Session to report on (defaults to the latest running one)
+
+    Returns:
+        That session's progress, plus every running session and the queue
+    """
+    state = _get_state(session_id) or SleepComputeState(session_id)
+    status = state.to_dict()
+
+    data = load_sessions()
+    queued = [
+        session for session in data["sessions"].values()
+        if session.get("status") == "queued"
+    ]
+    queued.sort(key=lambda s: (-s.get("priority", 0), s.get("queued_at") or ""))
+
+    status["active_sessions"] = [s.to_dict() for s in _session_states.values() if s.running]
+    status["queued_sessions"] = [
+        {"session_id": s["id"], "priority": s.get("priority", 0), "schedule": s.get("schedule", "now")}
+        for s in queued
+    ]
+    return status
 
 
-def cancel_sleep_compute():
-    """Cancel running sleep compute session."""
-    global sleep_compute_state
+def cancel_sleep_compute(session_id: Optional[str] = None):
+    """Cancel a running or queued sleep compute session (defaults to the latest running one)."""
+    state = _get_state(session_id)
 
-    if sleep_compute_state.running:
-        sleep_compute_state.cancelled = True
+    if state and state.running:
+        state.cancelled = True
 
         # Update session status
         data = load_sessions()
-        if sleep_compute_state.session_id and sleep_compute_state.session_id in data["sessions"]:
-            data["sessions"][sleep_compute_state.session_id]["status"] = "cancelled"
+        if state.session_id in data["sessions"]:
+            data["sessions"][state.session_id]["status"] = "cancelled"
             save_sessions(data)
 
         return {"status": "cancelling"}
 
+    if session_id:
+        data = load_sessions()
+        session = data["sessions"].get(session_id)
+        if session and session.get("status") in ("queued", "paused"):
+            session["status"] = "cancelled"
+            save_sessions(data)
+            return {"status": "cancelled"}
+
     return {"status": "not_running"}
 
 
-def pause_sleep_compute():
-    """Pause running sleep compute session."""
-    global sleep_compute_state
+def pause_sleep_compute(session_id: Optional[str] = None):
+    """Pause a running sleep compute session (defaults to the latest running one)."""
+    state = _get_state(session_id)
 
-    if sleep_compute_state.running and not sleep_compute_state.paused:
-        sleep_compute_state.paused = True
+    if state and state.running and not state.paused:
+        state.paused = True
 
         # Update session status
         data = load_sessions()
-        if sleep_compute_state.session_id and sleep_compute_state.session_id in data["sessions"]:
-            data["sessions"][sleep_compute_state.session_id]["status"] = "paused"
+        if state.session_id in data["sessions"]:
+            data["sessions"][state.session_id]["status"] = "paused"
             save_sessions(data)
 
         return {"status": "paused"}
 
-    return {"status": "not_running" if not sleep_compute_state.running else "already_paused"}
+    return {"status": "not_running" if not (state and state.running) else "already_paused"}
+
 
+def resume_sleep_compute(session_id: Optional[str] = None):
+    """
+    Resume a paused sleep compute session.
 
-def resume_sleep_compute():
-    """Resume paused sleep compute session."""
-    global sleep_compute_state
+    A session paused in a previous process has no running task; it is put
+    back in the queue and continues from its last checkpoint.
+    """
+    state = _get_state(session_id)
 
-    if sleep_compute_state.paused:
-        sleep_compute_state.paused = False
+    if state and state.paused:
+        state.paused = False
 
         # Update session status
         data = load_sessions()
-        if sleep_compute_state.session_id and sleep_compute_state.session_id in data["sessions"]:
-            data["sessions"][sleep_compute_state.session_id]["status"] = "running"
+        if state.session_id in data["sessions"]:
+            data["sessions"][state.session_id]["status"] = "running"
             save_sessions(data)
 
         return {"status": "resumed"}
 
+    if session_id and not (state and state.running):
+        data = load_sessions()
+        session = data["sessions"].get(session_id)
+        if session and session.get("status") == "paused":
+            session["status"] = "queued"
+            save_sessions(data)
+            return {"status": "queued"}
+
     return {"status": "not_paused"}
 
 
@@ -193,26 +273,56 @@ def list_sessions(limit: int = 20) -> List[Dict[str, Any]]:
 def get_sleep_compute_settings() -> Dict[str, Any]:
     """Get sleep compute default settings."""
     data = load_sessions()
-    return data.get("settings", {
-        "default_depth": 2,
-        "default_max_notes": 30,
-        "default_turns": 3,
-        "model": None
-    })
+    return {**DEFAULT_SETTINGS, **data.get("settings", {})}
 
 
 def update_sleep_compute_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
-    """Update sleep compute default settings."""
+    """
+    Update sleep compute default settings.
+
+    Raises:
+        ValueError: If an idle window bound is not "HH:MM"
+    """
+    for key in ("idle_window_start", "idle_window_end"):
+        if key in settings:
+            try:
+                datetime.strptime(settings[key], "%H:%M")
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be HH:MM")
+
     data = load_sessions()
+    data["settings"] = {**DEFAULT_SETTINGS, **data.get("settings", {})}
 
     for key, value in settings.items():
-        if key in data["settings"]:
+        if key in DEFAULT_SETTINGS:
             data["settings"][key] = value
 
     save_sessions(data)
     return data["settings"]
 
 
+def _session_note(note: Dict[str, Any]) -> Dict[str, Any]:
+    """Session note dict from a note catalog record."""
+    return {
+        "id": note["id"],
+        "title": note["title"],
+        "body": note["body"],
+        "tags": note["tags"],
+        "source_id": note["conversation_id"],
+        "source_title": note["conversation_title"]
+    }
+
+
+def _restore_notes(note_ids: List[str]) -> List[Dict[str, Any]]:
+    """Reload checkpointed session notes by ID, skipping notes deleted since."""
+    notes = []
+    for note_id in note_ids:
+        note = note_catalog.get_note(note_id)
+        if note:
+            notes.append(_session_note(note))
+    return notes
+
+
 def _collect_notes_for_session(
     prompt: str,
     depth: int = 2,
@@ -231,33 +341,8 @@ def _collect_notes_for_session(
     Returns:
         List of note dicts with content and metadata
     """
-    # Get all synthesizer conversations
-    all_conversations = list_conversations()
-    synth_conversations = [c for c in all_conversations if c.get("mode") == "synthesizer"]
-
-    # Collect all notes
-    all_notes = []
-    for conv in synth_conversations:
-        full_conv = get_conversation(conv["id"])
-        if not full_conv:
-            continue
-
-        source_title = full_conv.get("title", "Untitled")
-
-        for msg in full_conv.get("messages", []):
-            if msg.get("role") != "assistant":
-                continue
-
-            for note in msg.get("notes", []):
-                note_id = f"note:{conv['id']}:{note['id']}"
-                all_notes.append({
-                    "id": note_id,
-                    "title": note.get("title", ""),
-                    "body": note.get("body", ""),
-                    "tags": note.get("tags", []),
-                    "source_id": conv["id"],
-                    "source_title": source_title
-                })
+    # Collect all synthesizer notes from the note catalog
+    all_notes = [_session_note(note) for note in note_catalog.list_notes()]
 
     if not all_notes:
         return []
@@ -283,10 +368,24 @@ def _collect_notes_for_session(
                 note["relevance_score"] = 1.0  # Highest relevance for selected notes
                 relevant_notes.append(note)
 
+        # Expand selected notes through the graph, up to depth hops away
+        for note_id in entry_note_ids:
+            if len(relevant_notes) >= max_notes:
+                break
+            subgraph = get_subgraph(note_id, hops=depth, limit=max_notes, types=["note", "entity"])
+            existing_ids = {n["id"] for n in relevant_notes}
+            for node in subgraph.get("nodes", []):
+                if node["type"] != "note" or node["id"] in existing_ids or node["id"] not in notes_by_id:
+                    continue
+                note = notes_by_id[node["id"]]
+                note["relevance_score"] = 0.9 / node["hop"]  # Closer notes rank higher
+                relevant_notes.append(note)
+
         # Then find related notes via topics (tag matching)
         if entry_topics:
+            existing_ids = {n["id"] for n in relevant_notes}
             for note in all_notes:
-                if note["id"] in entry_note_ids:
+                if note["id"] in existing_ids:
                     continue  # Already added
                 note_tags = [t.lower() for t in note.get("tags", [])]
                 for topic in entry_topics:
@@ -375,13 +474,87 @@ def _parse_json_response(content: str) -> Any:
         raise
 
 
+def _budget_exhausted(session: Dict[str, Any]) -> bool:
+    """Whether the session has spent its cost or token budget (if it has one)."""
+    config = session["config"]
+    max_cost = config.get("max_cost")
+    max_tokens = config.get("max_tokens")
+    if max_cost is not None and session.get("total_cost", 0) >= max_cost:
+        return True
+    if max_tokens is not None and session.get("total_tokens", 0) >= max_tokens:
+        return True
+    return False
+
+
+async def _query_ideas(
+    session: Dict[str, Any],
+    prompt: str,
+    model: str,
+    result: Dict[str, Any]
+):
+    """
+    Run one brainstorming prompt and parse the ideas into `result`.
+
+    Records the generation ID, cost and tokens on both `result` and the
+    session, and sets result["error"] on failure.
+    """
+    messages = [{"role": "user", "content": prompt}]
+
+    response = await query_model(model, messages, timeout=120.0)
+
+    if not response or not response.get("content"):
+        result["error"] = "No response from model"
+        return
+
+    if response.get("error"):
+        result["error"] = response["error"]
+        return
+
+    usage = response.get("usage") or {}
+    tokens = usage.get("total_tokens") or 0
+    session["total_tokens"] = session.get("total_tokens", 0) + tokens
+
+    # Track generation ID for cost
+    generation_id = response.get("generation_id")
+    if generation_id:
+        result["generation_ids"].append(generation_id)
+        session["generation_ids"].append(generation_id)
+
+        # Fetch cost immediately
+        cost = await get_generation_cost(generation_id)
+        if cost:
+            session["total_cost"] = session.get("total_cost", 0) + cost
+
+    # Parse response
+    try:
+        ideas = _parse_json_response(response["content"])
+        if isinstance(ideas, list):
+            result["ideas"] = ideas
+        else:
+            result["ideas"] = [ideas]
+    except json.JSONDecodeError as e:
+        result["error"] = f"Failed to parse response: {e}"
+        result["raw_response"] = response["content"][:500]
+
+
+def _notes_content(
+    notes: List[Dict[str, Any]],
+    candidate_pairs: Optional[List[Dict[str, Any]]] = None
+) -> str:
+    notes_content = _format_notes_for_prompt(notes)
+    if candidate_pairs:
+        notes_content += "\n\n" + discovery_candidates.format_candidate_pairs(candidate_pairs, notes)
+    return notes_content
+
+
 async def _execute_turn(
     session: Dict[str, Any],
     turn_number: int,
     style: Dict[str, Any],
     notes: List[Dict[str, Any]],
     previous_ideas: List[Dict[str, Any]],
-    model: str
+    model: str,
+    candidate_pairs: Optional[List[Dict[str, Any]]] = None
 ) -> Dict[str, Any]:
     """
     Execute a single brainstorming turn.
@@ -393,12 +566,11 @@ async def _execute_turn(
         notes: Notes to analyze
         previous_ideas: Ideas from previous turns
         model: Model to use
+        candidate_pairs: Mined note pairs to steer the turn towards
 
     Returns:
         Turn result with ideas
     """
-    global sleep_compute_state
-
     turn_result = {
         "turn_number": turn_number,
         "style": style["id"],
@@ -407,7 +579,7 @@ async def _execute_turn(
         "generation_ids": []
     }
 
-    notes_content = _format_notes_for_prompt(notes)
+    notes_content = _notes_content(notes, candidate_pairs)
 
     # Choose prompt based on turn number
     if turn_number == 1:
@@ -421,39 +593,108 @@ async def _execute_turn(
         prompt = prompt_template.replace("{idea}", idea_json)
         prompt = prompt.replace("{notes_content}", notes_content)
 
-    messages = [{"role": "user", "content": prompt}]
+    await _query_ideas(session, prompt, model, turn_result)
 
-    response = await query_model(model, messages, timeout=120.0)
+    turn_result["completed_at"] = datetime.utcnow().isoformat()
+    return turn_result
 
-    if not response or not response.get("content"):
-        turn_result["error"] = "No response from model"
-        return turn_result
 
-    if response.get("error"):
-        turn_result["error"] = response["error"]
-        return turn_result
+async def _execute_branch_turn(
+    session: Dict[str, Any],
+    turn_number: int,
+    style: Dict[str, Any],
+    notes: List[Dict[str, Any]],
+    branches: List[Dict[str, Any]],
+    model: str,
+    candidate_pairs: Optional[List[Dict[str, Any]]] = None,
+    concurrency: int = DEFAULT_BRANCH_CONCURRENCY,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Execute an expansion turn with one concurrent model call per idea.
 
-    # Track generation ID for cost
-    generation_id = response.get("generation_id")
-    if generation_id:
-        turn_result["generation_ids"].append(generation_id)
-        session["generation_ids"].append(generation_id)
+    Each surviving idea is expanded on its own branch, at most
+    `concurrency` at a time. Branches that would start after the session
+    budget is spent are skipped, and a branch whose call raises is marked
+    failed without stopping the others. Ideas are merged in branch order,
+    not completion order, so the result does not depend on model latency.
 
-        # Fetch cost immediately
-        cost = await get_generation_cost(generation_id)
-        if cost:
-            session["total_cost"] = session.get("total_cost", 0) + cost
+    Args:
+        session: Current session data
+        turn_number: Current turn number (1-indexed, > 1)
+        style: Brainstorming style dict
+        notes: Notes to analyze
+        branches: Ideas to expand, best first
+        model: Model to use
+        candidate_pairs: Mined note pairs to steer the turn towards
+        concurrency: Maximum branches in flight
+        on_progress: Called with the partial turn result after each branch lands
 
-    # Parse response
+    Returns:
+        Turn result with merged ideas and per-branch results
+    """
+    turn_result = {
+        "turn_number": turn_number,
+        "style": style["id"],
+        "mode": "branches",
+        "started_at": datetime.utcnow().isoformat(),
+        "ideas": [],
+        "branches": [
+            {"branch": i, "status": "pending", "ideas": [], "generation_ids": []}
+            for i in range(len(branches))
+        ],
+        "generation_ids": []
+    }
+
+    notes_content = _notes_content(notes, candidate_pairs)
+    prompt_template = style.get("expansion_prompt", "").replace("{notes_content}", notes_content)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def expand(i: int, idea: Dict[str, Any]):
+        branch = turn_result["branches"][i]
+        async with semaphore:
+            if _budget_exhausted(session):
+                branch["status"] = "skipped"
+                branch["error"] = "Session budget exhausted"
+                return
+
+            branch["status"] = "running"
+            prompt = prompt_template.replace("{idea}", json.dumps([idea], indent=2))
+            try:
+                await _query_ideas(session, prompt, model, branch)
+            except Exception as e:
+                logger.warning(f"Branch {i} of turn {turn_number} failed: {e}")
+                branch["ideas"] = []
+                branch["error"] = str(e)
+
+        branch["status"] = "failed" if branch.get("error") else "completed"
+        for branch_idea in branch["ideas"]:
+            if isinstance(branch_idea, dict):
+                branch_idea["branch"] = i
+        turn_result["generation_ids"].extend(branch["generation_ids"])
+
+        # Partial merge of the branches landed so far, in branch order
+        turn_result["ideas"] = [
+            branch_idea for b in turn_result["branches"] for branch_idea in b["ideas"]
+        ]
+        if on_progress:
+            on_progress(turn_result)
+
+    tasks = [asyncio.ensure_future(expand(i, idea)) for i, idea in enumerate(branches)]
     try:
-        ideas = _parse_json_response(response["content"])
-        if isinstance(ideas, list):
-            turn_result["ideas"] = ideas
-        else:
-            turn_result["ideas"] = [ideas]
-    except json.JSONDecodeError as e:
-        turn_result["error"] = f"Failed to parse response: {e}"
-        turn_result["raw_response"] = response["content"][:500]
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # Don't leave sibling branches spending budget after the turn has failed
+        for task in tasks:
+            task.cancel()
+        raise
+
+    turn_result["generation_ids"] = [
+        generation_id for b in turn_result["branches"] for generation_id in b["generation_ids"]
+    ]
+    failed = [b for b in turn_result["branches"] if b["status"] == "failed"]
+    if failed and len(failed) == len(branches):
+        turn_result["error"] = failed[0]["error"]
 
     turn_result["completed_at"] = datetime.utcnow().isoformat()
     return turn_result
@@ -503,8 +744,9 @@ def _generate_bridge_suggestions(
     """
     Generate final bridge note suggestions from brainstorming ideas.
 
-    Converts raw ideas into discovery-compatible format.
-    Limited to notes_target number of suggestions.
+    Converts raw ideas into discovery-compatible format, ranks them by
+    structural impact on the graph (see graph_distance.rank_bridges) and
+    keeps the top notes_target.
     """
     suggestions = []
 
@@ -576,11 +818,7 @@ def _generate_bridge_suggestions(
 
         suggestions.append(suggestion)
 
-        # Stop if we've reached the target
-        if len(suggestions) >= notes_target:
-            break
-
-    return suggestions[:notes_target]
+    return graph_distance.rank_bridges(suggestions)[:notes_target]
 
 
 def create_sleep_session(
@@ -591,10 +829,19 @@ def create_sleep_session(
     turns: int = 3,
     notes_target: int = 10,
     model: Optional[str] = None,
-    entry_points: Optional[List[Dict[str, Any]]] = None
+    entry_points: Optional[List[Dict[str, Any]]] = None,
+    priority: int = 0,
+    schedule: str = "now",
+    parallel_branches: bool = False,
+    branch_concurrency: Optional[int] = None,
+    max_cost: Optional[float] = None,
+    max_tokens: Optional[int] = None
 ) -> Dict[str, Any]:
     """
-    Create a new sleep compute session (synchronous, returns immediately).
+    Queue a new sleep compute session (synchronous, returns immediately).
+
+    The session is run by the scheduler (see sleep_scheduler) once a worker
+    is free.
 
     Args:
         prompt: User's discovery prompt
@@ -605,27 +852,16 @@ def create_sleep_session(
         notes_target: Target number of bridge notes to generate (5-30)
         model: Model to use (defaults to settings or SLEEP_COMPUTE_MODEL)
         entry_points: Optional list of entry points (notes or topics) to start from
+        priority: Queued sessions with higher priority run first
+        schedule: "now" to run when a worker is free, "idle" to wait for the idle window
+        parallel_branches: Expand each surviving idea on its own concurrent branch
+        branch_concurrency: Maximum branches in flight (defaults to settings)
+        max_cost: Session cost budget in USD (defaults to settings; None for unlimited)
+        max_tokens: Session token budget (defaults to settings; None for unlimited)
 
     Returns:
         Dict with session_id and status, or error
     """
-    global sleep_compute_state
-
-    # Check max workers limit
-    data = load_sessions()
-    active_sessions = data.get("active_sessions", [])
-    # Clean up stale entries (sessions that no longer exist or are not running)
-    active_sessions = [
-        sid for sid in active_sessions
-        if sid in data["sessions"] and data["sessions"][sid].get("status") == "running"
-    ]
-
-    if len(active_sessions) >= MAX_WORKERS:
-        return {"error": f"Maximum workers ({MAX_WORKERS}) already running. Wait for one to complete."}
-
-    if sleep_compute_state.running:
-        return {"error": "Sleep compute already running"}
-
     # Get style
     style = get_style(style_id)
     if not style:
@@ -634,72 +870,83 @@ def create_sleep_session(
     if not style.get("enabled", True):
         return {"error": f"Style '{style_id}' is disabled"}
 
-    # Get model from settings if not provided
+    if schedule not in SCHEDULES:
+        return {"error": f"Schedule must be one of: {', '.join(SCHEDULES)}"}
+
+    # Get model and budget defaults from settings if not provided
+    settings = get_sleep_compute_settings()
     if not model:
-        settings = get_sleep_compute_settings()
         model = settings.get("model") or SLEEP_COMPUTE_MODEL
+    if branch_concurrency is None:
+        branch_concurrency = settings["branch_concurrency"]
+    if max_cost is None:
+        max_cost = settings["max_session_cost"]
+    if max_tokens is None:
+        max_tokens = settings["max_session_tokens"]
 
     # Validate parameters
     depth = max(1, min(3, depth))
     max_notes = max(10, min(50, max_notes))
     turns = max(2, min(5, turns))
     notes_target = max(5, min(30, notes_target))
+    branch_concurrency = max(1, min(10, branch_concurrency))
 
     # Initialize session
     session_id = f"sleep_{uuid.uuid4().hex[:8]}"
+    now = datetime.utcnow().isoformat()
     session = {
         "id": session_id,
-        "status": "running",
+        "status": "queued",
+        "priority": priority,
+        "schedule": schedule,
+        "queued_at": now,
         "config": {
             "style": style_id,
             "depth": depth,
             "max_notes": max_notes,
             "turns": turns,
             "notes_target": notes_target,
-            "model": model
+            "model": model,
+            "parallel_branches": parallel_branches,
+            "branch_concurrency": branch_concurrency,
+            "max_branches": DEFAULT_MAX_BRANCHES,
+            "max_cost": max_cost,
+            "max_tokens": max_tokens
         },
         "prompt": prompt,
         "entry_points": entry_points or [],
         "progress": {
             "current_turn": 0,
-            "phase": "initializing"
+            "phase": "queued"
         },
         "turns": [],
+        "checkpoint": None,
         "final_output": None,
         "generation_ids": [],
         "total_cost": 0.0,
-        "created_at": datetime.utcnow().isoformat()
+        "total_tokens": 0,
+        "created_at": now
     }
 
-    # Save initial session and add to active list
-    data = load_sessions()
-    data["sessions"][session_id] = session
-    # Update active_sessions list
-    active_sessions = data.get("active_sessions", [])
-    active_sessions.append(session_id)
-    data["active_sessions"] = active_sessions
-    save_sessions(data)
-
-    # Initialize state
-    sleep_compute_state.reset()
-    sleep_compute_state.running = True
-    sleep_compute_state.session_id = session_id
-    sleep_compute_state.total_turns = turns
-    sleep_compute_state.started_at = datetime.utcnow().isoformat()
-    sleep_compute_state.phase = "initializing"
+    _save_session(session)
 
     return {
-        "status": "started",
+        "status": "queued",
         "session_id": session_id,
+        "priority": priority,
+        "schedule": schedule,
         "config": session["config"]
     }
 
 
 async def run_sleep_compute(session_id: str) -> Dict[str, Any]:
     """
-    Run the sleep compute session (async, runs in background).
+    Run a sleep compute session, continuing from its last checkpoint.
 
-    This function should be called via BackgroundTasks after create_sleep_session.
+    Called by the scheduler (see sleep_scheduler). The collected notes,
+    the pruned ideas after every turn and the final bridge suggestions are
+    checkpointed to the session, so a session interrupted by a restart
+    resumes where it stopped instead of starting over.
 
     Args:
         session_id: The session ID returned from create_sleep_session
@@ -707,8 +954,6 @@ async def run_sleep_compute(session_id: str) -> Dict[str, Any]:
     Returns:
         Session result dict
     """
-    global sleep_compute_state
-
     # Load session
     data = load_sessions()
     session = data["sessions"].get(session_id)
@@ -717,6 +962,9 @@ async def run_sleep_compute(session_id: str) -> Dict[str, Any]:
         logger.error(f"Session {session_id} not found")
         return {"error": "Session not found", "session_id": session_id}
 
+    if session.get("status") in ("completed", "cancelled", "failed"):
+        return {"status": session["status"], "session_id": session_id}
+
     # Extract config
     config = session["config"]
     style_id = config["style"]
@@ -732,66 +980,129 @@ async def run_sleep_compute(session_id: str) -> Dict[str, Any]:
     if not style:
         session["status"] = "failed"
         session["error"] = f"Style '{style_id}' not found"
-        data["sessions"][session_id] = session
-        save_sessions(data)
-        sleep_compute_state.running = False
+        _save_session(session)
         return {"error": session["error"], "session_id": session_id}
 
-    try:
-        # Phase 1: Collect notes
-        sleep_compute_state.phase = "collecting"
-        sleep_compute_state.progress = 5
-        session["progress"]["phase"] = "collecting"
-        data["sessions"][session_id] = session
-        save_sessions(data)
+    state = SleepComputeState(session_id)
+    state.running = True
+    state.total_turns = turns
+    state.started_at = datetime.utcnow().isoformat()
+    state.phase = "initializing"
+    _session_states.pop(session_id, None)
+    _session_states[session_id] = state
+
+    checkpoint = session.get("checkpoint")
+    session["status"] = "running"
+    session.setdefault("started_at", state.started_at)
+    if checkpoint:
+        session["resumed_at"] = state.started_at
+        logger.info(f"Resuming sleep compute session {session_id} after turn {checkpoint['completed_turns']}")
+    _save_session(session)
 
-        notes = _collect_notes_for_session(prompt, depth, max_notes, entry_points=entry_points)
+    try:
+        # Phase 1: Collect notes, or restore them from the checkpoint
+        if checkpoint:
+            notes = _restore_notes(checkpoint["note_ids"])
+            candidate_pairs = checkpoint.get("candidate_pairs", [])
+            # Drop partial results of a turn cut off by the interruption
+            session["turns"] = [
+                t for t in session["turns"] if t["turn_number"] <= checkpoint["completed_turns"]
+            ]
+        else:
+            state.phase = "collecting"
+            state.progress = 5
+            session["progress"]["phase"] = "collecting"
+            _save_session(session)
+
+            session["turns"] = []
+            notes = _collect_notes_for_session(prompt, depth, max_notes, entry_points=entry_points)
+
+            # Narrow the notes to mined candidate pairs (all notes if none were found)
+            await graph_search.sync_kg_index()
+            candidate_pairs = await asyncio.to_thread(discovery_candidates.mine_candidate_pairs, notes)
+            if candidate_pairs:
+                notes = discovery_candidates.select_pair_notes(notes, candidate_pairs)
+
+            checkpoint = {
+                "note_ids": [n["id"] for n in notes],
+                "candidate_pairs": candidate_pairs,
+                "completed_turns": 0,
+                "ideas": [],
+                "bridge_suggestions": None
+            }
+            session["checkpoint"] = checkpoint
+            _save_session(session)
 
         if len(notes) < 2:
-            sleep_compute_state.error = "Not enough notes for discovery"
+            state.error = "Not enough notes for discovery"
             session["status"] = "failed"
-            session["error"] = sleep_compute_state.error
-            data["sessions"][session_id] = session
-            save_sessions(data)
-            return {"error": sleep_compute_state.error, "notes_found": len(notes)}
+            session["error"] = state.error
+            _save_session(session)
+            return {"error": state.error, "notes_found": len(notes)}
 
-        if sleep_compute_state.cancelled:
+        if state.cancelled:
             session["status"] = "cancelled"
-            data["sessions"][session_id] = session
-            save_sessions(data)
+            _save_session(session)
             return {"status": "cancelled"}
 
         # Phase 2: Multi-turn brainstorming
-        sleep_compute_state.phase = "brainstorming"
-        all_ideas = []
+        state.phase = "brainstorming"
+        all_ideas = checkpoint["ideas"]
 
-        for turn_num in range(1, turns + 1):
-            if sleep_compute_state.cancelled:
+        for turn_num in range(checkpoint["completed_turns"] + 1, turns + 1):
+            if state.cancelled:
                 session["status"] = "cancelled"
                 break
 
             # Wait if paused
-            while sleep_compute_state.paused:
+            while state.paused:
                 await asyncio.sleep(0.5)
-                if sleep_compute_state.cancelled:
+                if state.cancelled:
                     break
 
-            sleep_compute_state.current_turn = turn_num
-            sleep_compute_state.progress = 10 + (turn_num / turns) * 70
+            if _budget_exhausted(session):
+                logger.info(f"Sleep compute session {session_id} spent its budget after turn {turn_num - 1}")
+                session["budget_exhausted"] = True
+                break
+
+            state.current_turn = turn_num
+            state.progress = 10 + (turn_num / turns) * 70
 
             session["progress"]["current_turn"] = turn_num
             session["progress"]["phase"] = "brainstorming"
 
             # Execute turn
-            turn_result = await _execute_turn(
-                session=session,
-                turn_number=turn_num,
-                style=style,
-                notes=notes,
-                previous_ideas=all_ideas,
-                model=model
-            )
-
+            turns_before = len(session["turns"])
+            if config.get("parallel_branches") and turn_num > 1 and all_ideas:
+                def save_partial(partial: Dict[str, Any]):
+                    # Stream the branches landed so far to the session record
+                    del session["turns"][turns_before:]
+                    session["turns"].append(partial)
+                    _save_session(session)
+
+                turn_result = await _execute_branch_turn(
+                    session=session,
+                    turn_number=turn_num,
+                    style=style,
+                    notes=notes,
+                    branches=all_ideas[:config.get("max_branches", DEFAULT_MAX_BRANCHES)],
+                    model=model,
+                    candidate_pairs=candidate_pairs,
+                    concurrency=config.get("branch_concurrency", DEFAULT_BRANCH_CONCURRENCY),
+                    on_progress=save_partial
+                )
+            else:
+                turn_result = await _execute_turn(
+                    session=session,
+                    turn_number=turn_num,
+                    style=style,
+                    notes=notes,
+                    previous_ideas=all_ideas,
+                    model=model,
+                    candidate_pairs=candidate_pairs
+                )
+
+            del session["turns"][turns_before:]
             session["turns"].append(turn_result)
 
             # Accumulate and prune ideas
@@ -799,25 +1110,28 @@ async def run_sleep_compute(session_id: str) -> Dict[str, Any]:
             all_ideas = _prune_ideas(all_ideas, max_keep=15)
 
             # Checkpoint save
-            data = load_sessions()
-            data["sessions"][session_id] = session
-            save_sessions(data)
+            checkpoint["completed_turns"] = turn_num
+            checkpoint["ideas"] = all_ideas
+            session["status"] = "paused" if state.paused else "running"
+            _save_session(session)
 
-        if sleep_compute_state.cancelled:
-            data = load_sessions()
-            data["sessions"][session_id] = session
-            save_sessions(data)
+        if state.cancelled:
+            session["status"] = "cancelled"
+            _save_session(session)
             return {"status": "cancelled", "session_id": session_id}
 
         # Phase 3: Generate final bridge suggestions
-        sleep_compute_state.phase = "synthesizing"
-        sleep_compute_state.progress = 85
+        state.phase = "synthesizing"
+        state.progress = 85
 
         session["progress"]["phase"] = "synthesizing"
 
-        # Get notes_target from config, default to 10
-        notes_target = config.get("notes_target", 10)
-        bridge_suggestions = _generate_bridge_suggestions(session, all_ideas, notes_target)
+        if checkpoint.get("bridge_suggestions") is None:
+            # Get notes_target from config, default to 10
+            notes_target = config.get("notes_target", 10)
+            checkpoint["bridge_suggestions"] = _generate_bridge_suggestions(session, all_ideas, notes_target)
+            _save_session(session)
+        bridge_suggestions = checkpoint["bridge_suggestions"]
 
         session["final_output"] = {
             "bridge_suggestions": bridge_suggestions,
@@ -825,22 +1139,21 @@ async def run_sleep_compute(session_id: str) -> Dict[str, Any]:
             "notes_analyzed": len(notes)
         }
 
-        session["status"] = "completed"
-        session["completed_at"] = datetime.utcnow().isoformat()
-
-        sleep_compute_state.progress = 100
-
-        # Save final session (active_sessions cleanup is done in finally block)
-        data = load_sessions()
-        data["sessions"][session_id] = session
-        save_sessions(data)
-
-        # Add suggestions to discoveries
+        # Add suggestions to discoveries (skipping any added before an interruption)
         from . import knowledge_discovery
         discoveries_data = knowledge_discovery.load_discoveries()
-        discoveries_data["discoveries"].extend(bridge_suggestions)
+        existing_ids = {d.get("id") for d in discoveries_data["discoveries"]}
+        discoveries_data["discoveries"].extend(
+            s for s in bridge_suggestions if s["id"] not in existing_ids
+        )
         knowledge_discovery.save_discoveries(discoveries_data)
 
+        session["status"] = "completed"
+        session["completed_at"] = datetime.utcnow().isoformat()
+        _save_session(session)
+
+        state.progress = 100
+
         return {
             "status": "completed",
             "session_id": session_id,
@@ -853,25 +1166,16 @@ async def run_sleep_compute(session_id: str) -> Dict[str, Any]:
 
     except Exception as e:
         logger.error(f"Sleep compute error: {e}")
-        sleep_compute_state.error = str(e)
+        state.error = str(e)
 
-        data = load_sessions()
         session["status"] = "failed"
         session["error"] = str(e)
-        data["sessions"][session_id] = session
-        save_sessions(data)
+        _save_session(session)
 
         return {"error": str(e), "session_id": session_id}
 
     finally:
-        sleep_compute_state.running = False
-        data = load_sessions()
-        # Remove this session from active_sessions list
-        active_sessions = data.get("active_sessions", [])
-        if session_id in active_sessions:
-            active_sessions.remove(session_id)
-        data["active_sessions"] = active_sessions
-        save_sessions(data)
+        state.running = False
 
 
 def delete_session(session_id: str) -> bool:
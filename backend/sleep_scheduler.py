@@ -0,0 +1,158 @@
+"""Scheduler for sleep compute sessions.
+
+Sessions are queued durably in the sleep sessions store (status "queued",
+with a priority). A single background task started with the app picks the
+next queued sessions, highest priority then oldest first, and runs up to
+the configured number at once. Sessions scheduled as "idle" only start
+inside the configured idle window (e.g. overnight); a session that is
+already running when the window closes is left to finish.
+
+Sessions left "running" by a restart are queued again on startup and
+continue from their last checkpoint (see sleep_compute.run_sleep_compute).
+"""
+
+import asyncio
+import logging
+from datetime import datetime, time
+from typing import Any, Dict, List, Optional
+
+from . import sleep_compute
+
+logger = logging.getLogger(__name__)
+
+# Seconds between queue checks when nothing wakes the scheduler
+# (also bounds how late an idle-window session starts)
+SCHEDULER_POLL_INTERVAL = 60
+
+# Session ID -> task of sessions this process is running
+_running: Dict[str, asyncio.Task] = {}
+
+_wake_event: Optional[asyncio.Event] = None
+
+
+def _parse_time(value: str) -> time:
+    hours, minutes = value.split(":")
+    return time(int(hours), int(minutes))
+
+
+def in_idle_window(now: datetime, start: str, end: str) -> bool:
+    """
+    Whether a local time falls in the idle window.
+
+    Args:
+        now: Local time to check
+        start: Window start, "HH:MM"
+        end: Window end, "HH:MM" (a window may wrap past midnight)
+    """
+    start_time, end_time = _parse_time(start), _parse_time(end)
+    current = now.time()
+    if start_time <= end_time:
+        return start_time <= current < end_time
+    return current >= start_time or current < end_time
+
+
+def select_sessions(
+    data: Dict[str, Any],
+    settings: Dict[str, Any],
+    now: datetime
+) -> List[str]:
+    """
+    Pick the queued sessions to start now.
+
+    Args:
+        data: Sleep sessions store
+        settings: Sleep compute settings (concurrency limit and idle window)
+        now: Current local time
+
+    Returns:
+        Session IDs in start order, up to the free worker count
+    """
+    capacity = max(0, int(settings["max_concurrent_sessions"]) - len(_running))
+    if capacity == 0:
+        return []
+
+    idle = in_idle_window(now, settings["idle_window_start"], settings["idle_window_end"])
+    queued = [
+        session for session in data["sessions"].values()
+        if session.get("status") == "queued"
+        and session["id"] not in _running
+        and (session.get("schedule", "now") != "idle" or idle)
+    ]
+    queued.sort(key=lambda s: (-s.get("priority", 0), s.get("queued_at") or s.get("created_at") or ""))
+    return [session["id"] for session in queued[:capacity]]
+
+
+def recover_interrupted_sessions() -> List[str]:
+    """
+    Queue sessions a restart left "running" so they resume from their checkpoint.
+
+    Returns:
+        IDs of the re-queued sessions
+    """
+    data = sleep_compute.load_sessions()
+    recovered = []
+    for session_id, session in data["sessions"].items():
+        if session.get("status") == "running" and session_id not in _running:
+            session["status"] = "queued"
+            session["interruptions"] = session.get("interruptions", 0) + 1
+            recovered.append(session_id)
+
+    if recovered:
+        sleep_compute.save_sessions(data)
+        logger.info(f"Re-queued {len(recovered)} interrupted sleep compute sessions")
+    return recovered
+
+
+def wake():
+    """Ask the scheduler to check the queue now (e.g. after queueing a session)."""
+    if _wake_event is not None:
+        _wake_event.set()
+
+
+async def _run_session(session_id: str):
+    try:
+        await sleep_compute.run_sleep_compute(session_id)
+    finally:
+        _running.pop(session_id, None)
+        wake()
+
+
+def dispatch(now: Optional[datetime] = None) -> List[str]:
+    """
+    Start tasks for the queued sessions that may run now.
+
+    Must be called from the event loop.
+
+    Returns:
+        IDs of the started sessions
+    """
+    data = sleep_compute.load_sessions()
+    settings = sleep_compute.get_sleep_compute_settings()
+    started = select_sessions(data, settings, now or datetime.now())
+    for session_id in started:
+        _running[session_id] = asyncio.create_task(_run_session(session_id))
+    return started
+
+
+async def run_scheduler(poll_interval: float = SCHEDULER_POLL_INTERVAL):
+    """Background task: recover interrupted sessions, then keep dispatching queued ones."""
+    global _wake_event
+    _wake_event = asyncio.Event()
+
+    try:
+        recover_interrupted_sessions()
+        while True:
+            _wake_event.clear()
+            try:
+                dispatch()
+            except Exception as e:
+                logger.error(f"Sleep compute scheduling failed: {e}")
+            try:
+                await asyncio.wait_for(_wake_event.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        # Sessions cut off here stay "running" and are resumed on next startup
+        for task in list(_running.values()):
+            task.cancel()
+        _wake_event = None
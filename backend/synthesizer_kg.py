@@ -8,11 +8,18 @@ from typing import List, Dict, Any, Optional
 from .openrouter import query_model
 from .settings import get_synthesizer_model, get_knowledge_graph_model
 from .graph_search import search_knowledge_graph
+from . import note_catalog
 from .knowledge_graph import build_graph, load_entities
 from .synthesizer import parse_zettels
+from .context_packer import ContextItem, context_budget, pack_context
 
 logger = logging.getLogger(__name__)
 
+# Token budget for related notes in the generation prompt (the source
+# content being processed shares the same context window)
+CONTEXT_NOTES_SHARE = 0.1
+CONTEXT_NOTES_MAX_TOKENS = 3000
+
 # Prompt for extracting topics from source content (first pass)
 TOPIC_EXTRACTION_PROMPT = """Analyze the following content and extract the key topics and entities.
 
@@ -137,7 +144,7 @@ async def get_related_notes_for_topics(
                     "id": result.get("id"),
                     "title": note_data.get("title", title),
                     "tags": note_data.get("tags", result.get("tags", [])),
-                    "body": note_data.get("body", "")[:500],  # Truncate for context
+                    "body": note_data.get("body", ""),  # Trimmed to budget when formatted
                     "relevance_score": result.get("score", 0)
                 })
 
@@ -152,32 +159,45 @@ async def get_related_notes_for_topics(
 
 
 def _get_note_details(note_id: str) -> Optional[Dict[str, Any]]:
-    """Get full note details from the knowledge graph."""
+    """Get full note details from the note catalog."""
     try:
-        graph = build_graph()
-        for node in graph.get("nodes", []):
-            if node.get("id") == note_id and node.get("type") == "note":
-                return node
-        return None
+        return note_catalog.get_note(note_id)
     except Exception as e:
         logger.error(f"Error getting note details: {e}")
         return None
 
 
-def format_context_notes_for_prompt(notes: List[Dict[str, Any]]) -> str:
-    """Format related notes for inclusion in the prompt."""
+def format_context_notes_for_prompt(
+    notes: List[Dict[str, Any]],
+    model: Optional[str] = None,
+    query: Optional[str] = None
+) -> str:
+    """
+    Format related notes for inclusion in the prompt.
+
+    Notes are packed by relevance into a token budget for the model, with
+    long bodies cut to their most relevant sentences.
+
+    Args:
+        notes: Related notes (with relevance_score)
+        model: Model the prompt is for (sets the token budget)
+        query: Topics the excerpts should focus on
+    """
     if not notes:
         return "No existing related notes found in your knowledge base."
 
-    formatted = []
+    items = []
     for i, note in enumerate(notes, 1):
         tags_str = " ".join(note.get("tags", [])) if note.get("tags") else "(no tags)"
-        formatted.append(f"""### Note {i}: {note.get('title', 'Untitled')}
-Tags: {tags_str}
-{note.get('body', '')}
-""")
+        items.append(ContextItem(
+            f"### Note {i}: {note.get('title', 'Untitled')}\nTags: {tags_str}\n",
+            f"{note.get('body', '')}\n",
+            note.get("relevance_score", 0) - i * 1e-6,
+        ))
 
-    return "\n---\n".join(formatted)
+    budget = context_budget(model, share=CONTEXT_NOTES_SHARE, cap=CONTEXT_NOTES_MAX_TOKENS)
+    packed = pack_context(items, budget, model=model, query=query, separator="\n---\n")
+    return "\n---\n".join(text for text in packed if text is not None)
 
 
 def get_existing_tags() -> List[str]:
@@ -264,7 +284,9 @@ async def generate_zettels_knowledge_graph(
     logger.info(f"Knowledge Graph Mode: Generating notes with model {model}")
 
     # Format context notes for the prompt
-    context_notes_text = format_context_notes_for_prompt(context_notes)
+    context_notes_text = format_context_notes_for_prompt(
+        context_notes, model=model, query=" ".join(topics_extracted["topics"])
+    )
 
     # Format existing tags
     existing_tags_text = ", ".join(existing_tags[:30]) if existing_tags else "(no existing tags yet)"
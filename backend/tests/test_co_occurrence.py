@@ -0,0 +1,114 @@
+"""Tests for the sparse co-occurrence index."""
+
+import math
+import random
+from unittest.mock import patch
+
+import pytest
+
+from backend import co_occurrence, graph_curation, knowledge_graph
+from backend.co_occurrence import CoOccurrenceIndex
+
+
+NOTE_ENTITIES = {
+    "c1:n1": ["rag", "llm", "vectors"],
+    "c1:n2": ["rag", "llm"],
+    "c2:n1": ["rag", "llm", "python"],
+    "c2:n2": ["python", "vectors"],
+    "c3:n1": ["python"],
+}
+
+
+def brute_force_counts(note_entities):
+    counts = {}
+    for entity_ids in note_entities.values():
+        unique = sorted(set(entity_ids))
+        for i, a in enumerate(unique):
+            for b in unique[i + 1:]:
+                counts[(a, b)] = counts.get((a, b), 0) + 1
+    return counts
+
+
+def index_counts(index):
+    stats = index.pair_stats()
+    return {
+        tuple(sorted((index.entity_ids[a], index.entity_ids[b]))): c
+        for a, b, c in zip(stats["a"].tolist(), stats["b"].tolist(), stats["count"].tolist())
+    }
+
+
+class TestCoOccurrenceIndex:
+    """Tests for counts, scoring and evidence."""
+
+    def test_counts_and_shared_notes(self):
+        index = CoOccurrenceIndex()
+        index.sync(NOTE_ENTITIES)
+
+        assert index_counts(index) == brute_force_counts(NOTE_ENTITIES)
+        assert index.count("llm", "rag") == index.count("rag", "llm") == 3
+        assert index.count("rag", "missing") == 0
+        assert index.shared_notes("rag", "llm") == ["c1:n1", "c1:n2", "c2:n1"]
+        assert index.shared_notes("vectors", "python", limit=1) == ["c2:n2"]
+
+    def test_npmi_prefers_exclusive_pairs(self):
+        index = CoOccurrenceIndex()
+        index.sync(NOTE_ENTITIES)
+
+        # rag and llm always appear together: p(a,b) = p(a) = p(b) = 3/5
+        assert index.npmi("rag", "llm") == pytest.approx(1.0)
+        expected = math.log((1 / 5) / ((3 / 5) * (2 / 5))) / -math.log(1 / 5)
+        assert index.npmi("rag", "vectors") == pytest.approx(expected)
+        assert index.npmi("rag", "python") < index.npmi("rag", "vectors")
+
+    def test_incremental_sync_matches_rebuild(self):
+        rng = random.Random(3)
+        entities = [f"e{i}" for i in range(30)]
+        notes = {f"n{i}": rng.sample(entities, rng.randint(1, 6)) for i in range(200)}
+
+        index = CoOccurrenceIndex()
+        index.sync(notes)
+        for _ in range(5):
+            updated = dict(notes)
+            for key in rng.sample(list(notes), 10):
+                updated[key] = rng.sample(entities, rng.randint(1, 6))
+            del updated[rng.choice(list(updated))]
+            updated["new"] = ["e1", "e2", "brand_new"]
+            notes = updated
+
+            with patch.object(index, "_rebuild", side_effect=AssertionError("rebuilt")):
+                assert index.sync(notes) is True
+            assert index_counts(index) == brute_force_counts(notes)
+            assert index.shared_notes("e1", "e2") == sorted(
+                (k for k, ids in notes.items() if "e1" in ids and "e2" in ids), key=index.note_positions.get
+            )
+
+        assert index.sync(notes) is False
+
+
+class TestMissingRelationships:
+    """Tests for curation candidates built on the index."""
+
+    def test_candidates_ranked_by_npmi_once_per_pair(self):
+        co_occurrence.reset_co_occurrence_index()
+        entities = {eid: {"name": eid.upper(), "mentions": []} for eid in ("rag", "llm", "vectors", "python")}
+        data = {
+            "version": 1,
+            "entities": entities,
+            "note_entities": NOTE_ENTITIES,
+            "entity_relationships": [{"source_entity_id": "vectors", "target_entity_id": "python"}],
+        }
+        curation = {"dismissed_candidates": ["rel_python_rag"]}
+
+        with patch.object(knowledge_graph, "get_indexed_entities", return_value=(data, None)), \
+             patch.object(graph_curation, "load_entities", return_value=data), \
+             patch.object(graph_curation, "load_curation_data", return_value=curation):
+            candidates = graph_curation.find_missing_relationship_candidates(min_co_occurrence=1)
+
+        pairs = [tuple(sorted(c.entities)) for c in candidates]
+        assert len(pairs) == len(set(pairs))
+        # Existing and dismissed pairs are skipped
+        assert ("python", "vectors") not in pairs and ("python", "rag") not in pairs
+        assert pairs[0] == ("llm", "rag")
+        assert candidates[0].confidence == pytest.approx(0.9)
+        assert candidates[0].evidence[0]["shared_notes"] == ["c1:n1", "c1:n2", "c2:n1"]
+        co_occurrence.reset_co_occurrence_index()
@@ -0,0 +1,80 @@
+"""Tests for token-budgeted context packing."""
+
+from unittest.mock import patch
+
+from backend import graph_rag
+from backend.context_packer import (
+    ContextItem,
+    context_budget,
+    count_tokens,
+    pack_context,
+    salient_excerpt,
+)
+
+
+LONG_BODY = (
+    "Transformers replaced recurrence with attention. "
+    "The weather in the paper's city was mild that year. "
+    "Retrieval augmented generation grounds answers in retrieved documents. "
+    "Authors thanked their funding agencies. "
+    "Dense retrieval uses embeddings to find documents for generation."
+)
+
+
+class TestTokenCounting:
+    """Tests for local token estimates and budgets."""
+
+    def test_model_family_ratio_and_non_ascii(self):
+        text = "a" * 70
+        assert count_tokens(text, "anthropic/claude-sonnet-4.5") == 20
+        assert count_tokens(text, "openai/gpt-5.1") == 18
+        assert count_tokens("日本語", "openai/gpt-5.1") == 3
+
+    def test_budget_uses_settings_context_limit(self):
+        with patch("backend.settings.load_settings", return_value={"model_context_limits": {"acme/": 10000}}):
+            assert context_budget("acme/small") == 5000
+            assert context_budget("acme/small", cap=1200) == 1200
+            assert context_budget("anthropic/claude-sonnet-4.5", share=0.1) == 20000
+
+
+class TestPacking:
+    """Tests for excerpting and packing."""
+
+    def test_excerpt_keeps_query_relevant_sentences_in_order(self):
+        excerpt = salient_excerpt(LONG_BODY, 40, query="how does retrieval for generation work", model="openai/gpt-5.1")
+
+        assert "Retrieval augmented generation" in excerpt
+        assert "Dense retrieval" in excerpt
+        assert "weather" not in excerpt and "funding" not in excerpt
+        assert excerpt.index("Retrieval augmented") < excerpt.index("Dense retrieval")
+        assert count_tokens(excerpt, "openai/gpt-5.1") <= 40
+
+    def test_packs_by_score_trims_then_drops(self):
+        items = [
+            ContextItem("low: ", "x" * 400, score=0.1),
+            ContextItem("high: ", "y" * 200, score=0.9),
+            ContextItem("mid: ", LONG_BODY, score=0.5),
+        ]
+        packed = pack_context(items, 110, model="openai/gpt-5.1", query="retrieval")
+
+        assert packed[1] == "high: " + "y" * 200
+        assert packed[2].startswith("mid: ") and len(packed[2]) < len("mid: " + LONG_BODY)
+        assert packed[0] is None
+
+
+class TestRagContext:
+    """Tests for graph RAG context building."""
+
+    def test_trimmed_notes_keep_their_numbers(self):
+        notes = [
+            {"title": "Filler", "body": "Unrelated filler text. " * 60, "score": 0.2},
+            {"title": "RAG", "body": LONG_BODY, "score": 0.9},
+        ]
+        with patch("backend.settings.load_settings", return_value={}):
+            context = graph_rag.build_rag_context(notes, max_length=600, model="openai/gpt-5.1", question="retrieval")
+
+        # Higher-scored note 2 fits whole; note 1 is cut down but keeps its number
+        assert '[Note 1] "Filler"' in context and '[Note 2] "RAG"' in context
+        assert LONG_BODY in context
+        assert "[…]" in context
+        assert count_tokens(context, "openai/gpt-5.1") <= 150
@@ -0,0 +1,129 @@
+"""Tests for concurrent agent curation and the decision cache."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from backend import co_occurrence, graph_curation, graph_curation_agent, knowledge_graph
+from backend.graph_curation import CurationCandidate
+from backend.graph_curation_agent import AgentDecision
+
+
+def make_data():
+    entities = {
+        f"e{i}": {"name": f"Entity {i}", "type": "concept", "mentions": [{"context": f"about entity {i}"}]}
+        for i in range(8)
+    }
+    return {"version": 1, "entities": entities, "note_entities": {"c1:n1": ["e0", "e1"]}, "entity_relationships": []}
+
+
+def make_candidates(count=4):
+    return [
+        CurationCandidate(
+            id=f"dup_e{2 * i}_e{2 * i + 1}",
+            rubric="duplicate",
+            confidence=0.8,
+            entities=[f"e{2 * i}", f"e{2 * i + 1}"],
+            entity_names=[f"Entity {2 * i}", f"Entity {2 * i + 1}"],
+            suggested_action="merge",
+            reasoning="similar",
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    data = make_data()
+    co_occurrence.reset_co_occurrence_index()
+    with patch.object(graph_curation, "CURATION_DIR", str(tmp_path)), \
+         patch.object(graph_curation_agent, "load_entities", return_value=data), \
+         patch.object(knowledge_graph, "get_indexed_entities", return_value=(data, None)), \
+         patch("backend.settings.load_settings", return_value={}):
+        yield data
+    co_occurrence.reset_co_occurrence_index()
+
+
+class FakeAgent:
+    """Stands in for the LLM call, recording calls and concurrency."""
+
+    def __init__(self, source="agent"):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.source = source
+
+    async def __call__(self, entity_a, entity_b, shared_notes=None, existing_relationships=None, model=None):
+        self.calls.append(entity_a["name"])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later pairs finish first
+        await asyncio.sleep(0.01 * (10 - len(self.calls)))
+        self.in_flight -= 1
+        return AgentDecision(decision="same", confidence=0.9, reasoning=f"{entity_a['name']} same", source=self.source)
+
+
+class TestConcurrentAnalysis:
+    """Tests for bounded concurrency and result order."""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency_keeps_candidate_order(self, store):
+        agent = FakeAgent()
+        with patch.object(graph_curation_agent, "analyze_entity_pair", agent):
+            streamed = [p async for p, _ in graph_curation_agent.stream_duplicate_analysis(make_candidates(), concurrency=2)]
+
+        assert agent.max_in_flight == 2
+
+        with patch.object(graph_curation_agent, "MAX_AGENT_CONCURRENCY", 3), \
+             patch.object(graph_curation_agent, "load_decision_cache", return_value={"entries": {}}), \
+             patch.object(graph_curation_agent, "analyze_entity_pair", agent):
+            [p async for p, _ in graph_curation_agent.stream_duplicate_analysis(make_candidates(), concurrency=100)]
+        assert agent.max_in_flight == 3
+        assert streamed != sorted(streamed)  # yielded as completed
+
+        with patch.object(graph_curation_agent, "load_decision_cache", return_value={"entries": {}}), \
+             patch.object(graph_curation_agent, "analyze_entity_pair", FakeAgent()):
+            results = await graph_curation_agent.analyze_duplicate_candidates_with_agent(make_candidates(), concurrency=3)
+        assert [c.id for c in results] == [c.id for c in make_candidates()]
+
+
+class TestDecisionCache:
+    """Tests for skipping already-decided pairs."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_pairs_are_not_resent(self, store):
+        agent = FakeAgent()
+        with patch.object(graph_curation_agent, "analyze_entity_pair", agent):
+            await graph_curation_agent.analyze_duplicate_candidates_with_agent(make_candidates())
+            assert len(agent.calls) == 4
+
+            # Second run is served from the cache, except for a changed entity
+            store["entities"]["e2"]["mentions"].append({"context": "new context"})
+            results = await graph_curation_agent.analyze_duplicate_candidates_with_agent(make_candidates())
+
+        assert agent.calls[4:] == ["Entity 2"]
+        assert [c.agent_decision["source"] for c in results] == ["cache", "agent", "cache", "cache"]
+        assert results[0].suggested_action == "merge"
+
+        with open(graph_curation_agent.get_decision_cache_path()) as f:
+            keys = list(json.load(f)["entries"])
+        assert len(keys) == 5
+        assert all(key.endswith(f"|{graph_curation_agent.PROMPT_VERSION}") for key in keys)
+
+    @pytest.mark.asyncio
+    async def test_prompt_change_and_fallbacks_bypass_cache(self, store):
+        fallback = FakeAgent(source="fallback")
+        with patch.object(graph_curation_agent, "analyze_entity_pair", fallback):
+            await graph_curation_agent.analyze_duplicate_candidates_with_agent(make_candidates(2))
+            await graph_curation_agent.analyze_duplicate_candidates_with_agent(make_candidates(2))
+        assert len(fallback.calls) == 4
+
+        agent = FakeAgent()
+        with patch.object(graph_curation_agent, "analyze_entity_pair", agent):
+            await graph_curation_agent.analyze_duplicate_candidates_with_agent(make_candidates(2))
+            with patch.object(graph_curation_agent, "PROMPT_VERSION", "changed"):
+                await graph_curation_agent.analyze_duplicate_candidates_with_agent(make_candidates(2))
+            await graph_curation_agent.analyze_duplicate_candidates_with_agent(make_candidates(2), model="other/model")
+        assert len(agent.calls) == 6
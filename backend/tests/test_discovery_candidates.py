@@ -0,0 +1,117 @@
+"""Tests for candidate-pair mining ahead of LLM discovery."""
+
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from backend import discovery_candidates, graph_index, graph_search, knowledge_discovery
+from backend.relationship_index import RelationshipIndex
+
+
+def make_vectors(weights):
+    """Unit vectors sharing one axis; the similarity of two notes is the product of their weights."""
+    ids = list(weights)
+    matrix = np.zeros((len(ids), len(ids) + 1), dtype=np.float32)
+    for i, note_id in enumerate(ids):
+        weight = weights[note_id]
+        matrix[i, 0] = weight
+        matrix[i, i + 1] = np.sqrt(1 - weight ** 2)
+    return ids, {note_id: i for i, note_id in enumerate(ids)}, matrix
+
+
+def make_note(note_id, source_id, tags=()):
+    return {"id": note_id, "title": note_id.upper(), "body": "", "tags": list(tags), "source_id": source_id}
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    """Patch vectors, entity data and manual links; returns a setter."""
+    state = {"entities": {}, "relationships": [], "manual_links": []}
+
+    def setup(weights, note_entities=None, relationships=(), manual_links=()):
+        monkeypatch.setattr(graph_search, "get_node_vectors", lambda node_type, **kwargs: make_vectors(weights))
+        state.update(entities=note_entities or {}, relationships=list(relationships), manual_links=list(manual_links))
+
+    monkeypatch.setattr(discovery_candidates, "get_indexed_entities", lambda: (
+        {"note_entities": state["entities"]}, RelationshipIndex(state["relationships"])
+    ))
+    monkeypatch.setattr(discovery_candidates, "load_manual_links", lambda: {"manual_links": state["manual_links"]})
+    monkeypatch.setattr(graph_search, "sync_kg_index", AsyncMock())
+    return setup
+
+
+class TestMineCandidatePairs:
+    """Tests for mine_candidate_pairs."""
+
+    def test_connected_and_same_source_pairs_are_excluded(self, graph):
+        graph(
+            {"note:a:1": 0.95, "note:a:2": 0.9, "note:b:1": 0.85, "note:c:1": 0.8, "note:d:1": 0.0},
+            note_entities={"a:2": ["e1"], "c:1": ["e1"]},
+            manual_links=[{"source": "note:b:1", "target": "note:c:1"}],
+        )
+        notes = [
+            make_note("note:a:1", "a", ["#Memory"]),
+            make_note("note:a:2", "a"),
+            make_note("note:b:1", "b", ["#memory"]),
+            make_note("note:c:1", "c"),
+            make_note("note:d:1", "d"),
+        ]
+
+        pairs = discovery_candidates.mine_candidate_pairs(notes)
+
+        assert [pair["notes"] for pair in pairs] == [["note:a:2", "note:b:1"], ["note:a:1", "note:c:1"]]
+        assert pairs[0]["similarity"] == pytest.approx(0.765, abs=1e-3)
+        assert [n["id"] for n in discovery_candidates.select_pair_notes(notes, pairs)] == [
+            "note:a:1", "note:a:2", "note:b:1", "note:c:1",
+        ]
+
+    def test_graph_close_pairs_rank_below_distant_ones(self, graph):
+        graph(
+            {"note:p:1": 0.95, "note:q:1": 0.95, "note:r:1": 0.8},
+            note_entities={"p:1": ["e1"], "q:1": ["e2"], "r:1": ["e3"]},
+            relationships=[{"id": "r1", "source_entity_id": "e1", "target_entity_id": "e2", "type": "uses"}],
+        )
+        notes = [make_note("note:p:1", "p"), make_note("note:q:1", "q"), make_note("note:r:1", "r")]
+
+        pairs = discovery_candidates.mine_candidate_pairs(notes)
+
+        assert pairs[-1]["notes"] == ["note:p:1", "note:q:1"]
+        assert pairs[-1]["overlap"] == 1.0
+        assert pairs[-1]["score"] == 0.0
+        assert pairs[0]["score"] > 0.7
+
+    def test_limits_and_missing_embeddings(self, graph):
+        graph({f"note:{s}:1": 0.9 for s in "abcd"})
+        notes = [make_note(f"note:{s}:1", s) for s in "abcd"]
+
+        pairs = discovery_candidates.mine_candidate_pairs(notes, per_note=1)
+        assert len(pairs) == 2
+        assert len({note_id for pair in pairs for note_id in pair["notes"]}) == 4
+        assert len(discovery_candidates.mine_candidate_pairs(notes, limit=1)) == 1
+
+        assert discovery_candidates.mine_candidate_pairs([make_note("note:x:1", "x"), notes[0]]) == []
+
+
+class TestDiscoveryPrompt:
+    """Tests for the candidate pairs reaching the discovery prompt."""
+
+    async def test_only_paired_notes_are_sent(self, graph, tmp_path, monkeypatch):
+        graph({"note:a:1": 0.9, "note:b:1": 0.9, "note:c:1": 0.1})
+        notes = [make_note("note:a:1", "a"), make_note("note:b:1", "b"), make_note("note:c:1", "c")]
+        monkeypatch.setattr(knowledge_discovery, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+        monkeypatch.setattr(graph_index, "get_graph_index", lambda: (graph_index.GraphIndex({"nodes": []}, []), 1))
+        knowledge_discovery.discovery_state.reset()
+
+        with patch.object(knowledge_discovery, "_collect_notes_for_discovery", return_value=notes), \
+                patch.object(knowledge_discovery, "_filter_trivial_connections", side_effect=lambda n: n), \
+                patch.object(knowledge_discovery, "query_model", AsyncMock(return_value={"content": "[]"})) as query:
+            result = await knowledge_discovery.run_discovery_analysis("memory", model="test/model")
+
+        prompt = query.call_args.args[1][0]["content"]
+        assert "## Candidate Pairs" in prompt
+        assert "note:a:1 (NOTE:A:1) <-> note:b:1 (NOTE:B:1)" in prompt
+        assert "note:c:1" not in prompt
+        assert result["notes_analyzed"] == 2
+        assert knowledge_discovery.load_discoveries()["discovery_runs"][-1]["candidate_pairs"] == 1
+        graph_search.sync_kg_index.assert_awaited_once()
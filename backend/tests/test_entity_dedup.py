@@ -0,0 +1,123 @@
+"""Tests for trigram-blocked duplicate entity detection."""
+
+import math
+import random
+from difflib import SequenceMatcher
+from unittest.mock import patch
+
+from backend import entity_dedup, graph_curation, knowledge_graph
+from backend.entity_dedup import find_similar_pairs, group_duplicates, normalize_key
+
+
+def entity(name, mentions=1, etype="concept"):
+    return {"name": name, "type": etype, "mentions": [{"note_id": f"n{i}"} for i in range(mentions)]}
+
+
+ENTITIES = {
+    "e1": entity("Large Language Model", 3),
+    "e2": entity("large language models", 2),
+    "e3": entity("The Large-Language Model", 0),
+    "e4": entity("Retrieval Augmented Generation", 1),
+    "e5": entity("Graph Neural Network", 1, "technology"),
+    "e6": entity("Graph Neural Networks", 4),
+}
+
+
+def exact_trigram_cosine(a, b):
+    def grams(name):
+        padded = f"##{normalize_key(name)}#"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    ga, gb = grams(a), grams(b)
+    return len(ga & gb) / math.sqrt(len(ga) * len(gb))
+
+
+def name_similarity(a, b):
+    return max(
+        SequenceMatcher(None, normalize_key(a), normalize_key(b)).ratio(),
+        SequenceMatcher(None, a.lower(), b.lower()).ratio()
+    )
+
+
+class TestFindSimilarPairs:
+    """Tests for candidate generation and scoring."""
+
+    def test_normalized_keys_match_exactly(self):
+        assert normalize_key("The GPT-4") == normalize_key("gpt 4") == "gpt4"
+        assert normalize_key("Acme Inc") == "acme"
+
+        pairs = find_similar_pairs(["The GPT-4", "gpt 4", "Claude"], 0.7)
+        assert [(i, j) for i, j, _ in pairs] == [(0, 1)]
+        assert pairs[0][2] == 1.0
+
+    def test_matches_brute_force_away_from_the_threshold(self):
+        rng = random.Random(7)
+        syllables = ["ka", "lo", "mi", "ne", "tron", "graph", "net", "data", "model"]
+        names = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 5))) for _ in range(300)]
+        names += [n + "s" for n in names[:40]]
+
+        found = {(i, j): sim for i, j, sim in find_similar_pairs(names, 0.7)}
+        for i in range(len(names)):
+            for j in range(i + 1, len(names)):
+                similarity = name_similarity(names[i], names[j])
+                if similarity < 0.7:
+                    assert (i, j) not in found
+                elif exact_trigram_cosine(names[i], names[j]) >= 0.6:
+                    assert found[(i, j)] == similarity
+
+    def test_short_names_differing_by_a_character_match(self):
+        names = ["LLM", "LLMs", "RAG", "RAGs", "GPT-4", "GPT-4o", "PostgreSQL", "Postgres", "Go", "Git"]
+
+        found = {(i, j) for i, j, _ in find_similar_pairs(names, 0.7)}
+        assert found == {(0, 1), (2, 3), (4, 5), (6, 7)}
+        assert {(i, j) for i, j, _ in find_similar_pairs(names, 0.85)} == {(0, 1), (2, 3), (4, 5), (6, 7)}
+
+    def test_ignores_empty_names(self):
+        assert find_similar_pairs(["", "!!", "a"], 0.5) == []
+
+
+class TestGrouping:
+    """Tests for union-find grouping."""
+
+    def test_groups_are_transitive_and_respect_allowed(self):
+        pairs = [("a", "b", 0.9), ("b", "c", 0.8), ("x", "y", 0.75)]
+
+        groups = group_duplicates(pairs)
+        assert sorted(g["members"] for g in groups) == [["a", "b", "c"], ["x", "y"]]
+        abc = next(g for g in groups if "a" in g["members"])
+        assert abc["similarity"] == {"a": 0.9, "b": 0.9, "c": 0.8}
+
+        assert [g["members"] for g in group_duplicates(pairs, allowed={"a", "c", "x", "y"})] == [["x", "y"]]
+
+
+class TestDuplicateCallers:
+    """Tests for the knowledge graph and curation entry points."""
+
+    def setup_method(self):
+        entity_dedup._cache.update({"key": None, "pairs": None})
+        self.data = {"version": 1, "entities": ENTITIES}
+
+    def test_find_duplicate_entities_excludes_merged(self):
+        manual = {"reviewed_entities": ["e6"], "entity_merges": [{"merged": ["e3"]}]}
+        with patch.object(knowledge_graph, "get_indexed_entities", return_value=(self.data, None)), \
+             patch.object(knowledge_graph, "load_entities", return_value=self.data), \
+             patch.object(knowledge_graph, "load_manual_links", return_value=manual):
+            groups = knowledge_graph.find_duplicate_entities(0.7)
+
+        by_members = {tuple(e["id"] for e in g["entities"]): g for g in groups}
+        assert set(by_members) == {("e1", "e2"), ("e5", "e6")}
+        assert by_members[("e5", "e6")]["suggested_canonical"] == "e6"
+        assert [e["reviewed"] for e in by_members[("e5", "e6")]["entities"]] == [False, True]
+
+    def test_curation_candidates_keep_ids_and_confidence(self):
+        curation = {"dismissed_candidates": ["dup_e5_e6"]}
+        with patch.object(knowledge_graph, "get_indexed_entities", return_value=(self.data, None)), \
+             patch.object(graph_curation, "load_entities", return_value=self.data), \
+             patch.object(graph_curation, "load_curation_data", return_value=curation):
+            candidates = graph_curation.find_duplicate_candidates(0.7)
+
+        # e3 has no mentions and e5/e6 was dismissed
+        assert [c.id for c in candidates] == ["dup_e1_e2"]
+        candidate = candidates[0]
+        assert candidate.entities == ["e1", "e2"]
+        # similarity * 0.6 + same type + substring + both mentioned twice
+        assert abs(candidate.confidence - min(1.0, 0.6 + 0.35)) < 0.05
@@ -0,0 +1,51 @@
+"""Tests for the Aho-Corasick entity matcher."""
+
+from unittest.mock import patch
+
+from backend import entity_matcher
+from backend.entity_matcher import EntityMatcher, extract_entities
+
+
+ENTITIES = {
+    "e1": {"name": "Language Model", "aliases": ["LM"]},
+    "e2": {"name": "Large Language Model", "aliases": ["LLMs", "LLM"]},
+    "e3": {"name": "GPT-4"},
+    "e4": {"name": "RAG"},
+}
+
+
+class TestEntityMatcher:
+    """Tests for automaton construction and matching."""
+
+    def test_matches_names_and_aliases_on_word_boundaries(self):
+        matcher = EntityMatcher()
+        matcher.sync(ENTITIES)
+
+        assert matcher.match("How do LLMs compare to GPT 4 for rag?") == ["e2", "e3", "e4"]
+        # Overlapping names both match; substrings inside words do not
+        assert matcher.match("a large language model!") == ["e2", "e1"]
+        assert matcher.match("fragments and paragraphs") == []
+
+    def test_incremental_sync_applies_renames_and_removals(self):
+        matcher = EntityMatcher()
+        matcher.sync(ENTITIES)
+
+        updated = {**ENTITIES, "e4": {"name": "Retrieval Augmented Generation"}}
+        del updated["e3"]
+        assert matcher.sync(updated) is True
+        assert matcher.sync(updated) is False
+
+        assert matcher.match("GPT-4 and RAG") == []
+        assert matcher.match("retrieval-augmented generation") == ["e4"]
+
+
+class TestExtractEntities:
+    """Tests for the embedding fallback."""
+
+    def test_falls_back_to_nearest_entities_only_without_exact_match(self):
+        with patch.object(entity_matcher, "nearest_entities", return_value=["e4"]) as nearest:
+            assert extract_entities("what is gpt-4", ENTITIES) == ["e3"]
+            nearest.assert_not_called()
+
+            assert extract_entities("how does retrieval work", ENTITIES) == ["e4"]
+            assert extract_entities("how does retrieval work", ENTITIES, fuzzy=False) == []
@@ -0,0 +1,135 @@
+"""Tests for transactional updates to the entity store."""
+
+import threading
+import pytest
+from unittest.mock import patch
+
+from backend import knowledge_graph
+from backend.knowledge_graph import entity_transaction, load_entities
+
+
+@pytest.fixture
+def kg_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestEntityTransaction:
+    """Tests for entity_transaction."""
+
+    def test_commits_on_exit_and_bumps_version(self, kg_dir):
+        with entity_transaction() as txn:
+            txn.data["entities"]["e1"] = {"id": "e1", "name": "RAG", "mentions": []}
+
+        data = load_entities()
+        assert "e1" in data["entities"]
+        assert data["version"] == 1
+        assert not (kg_dir / "entities.json.tmp").exists()
+
+    def test_rollback_and_exception_discard_changes(self, kg_dir):
+        with entity_transaction() as txn:
+            txn.data["entities"]["e1"] = {"id": "e1"}
+            txn.rollback()
+
+        with pytest.raises(RuntimeError):
+            with entity_transaction() as txn:
+                txn.data["entities"]["e2"] = {"id": "e2"}
+                raise RuntimeError("boom")
+
+        assert load_entities()["entities"] == {}
+
+    def test_nested_transactions_share_data(self, kg_dir):
+        with entity_transaction() as outer:
+            with entity_transaction() as inner:
+                assert inner.data is outer.data
+                inner.data["entities"]["e1"] = {"id": "e1"}
+
+        data = load_entities()
+        assert "e1" in data["entities"]
+        assert data["version"] == 1
+
+    def test_nested_rollback_undoes_only_the_inner_block(self, kg_dir):
+        rel = {"id": "r1", "source_entity_id": "a", "target_entity_id": "b", "type": "uses"}
+        knowledge_graph.add_entity_relationship(rel)
+
+        with entity_transaction() as outer:
+            entities = outer.data["entities"]
+            entities["e1"] = {"id": "e1", "mentions": []}
+            # A duplicate makes the nested helper roll back
+            assert not knowledge_graph.add_entity_relationship({**rel, "id": "r2"})
+
+            with pytest.raises(RuntimeError):
+                with entity_transaction() as inner:
+                    inner.data["entities"]["e1"]["mentions"].append("m1")
+                    inner.data["entities"]["e2"] = {"id": "e2"}
+                    raise RuntimeError("boom")
+
+            # References taken before the nested blocks still point at the live data
+            assert entities is outer.data["entities"]
+            entities["e3"] = {"id": "e3"}
+
+        data = load_entities()
+        assert data["entities"] == {"e1": {"id": "e1", "mentions": []}, "e3": {"id": "e3"}}
+        assert [r["id"] for r in data["entity_relationships"]] == ["r1"]
+
+    def test_concurrent_writers_do_not_lose_updates(self, kg_dir):
+        def writer(prefix):
+            for i in range(10):
+                with entity_transaction() as txn:
+                    txn.data["entities"][f"{prefix}{i}"] = {"id": f"{prefix}{i}"}
+
+        threads = [threading.Thread(target=writer, args=(p,)) for p in "abc"]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(load_entities()["entities"]) == 30
+
+
+class TestRelationshipOperations:
+    """Tests for row-level relationship operations."""
+
+    def test_add_and_delete_relationship(self, kg_dir):
+        rel = {"id": "r1", "source_entity_id": "a", "target_entity_id": "b", "type": "uses"}
+
+        assert knowledge_graph.add_entity_relationship(rel)
+        assert not knowledge_graph.add_entity_relationship({**rel, "id": "r2"})
+        assert knowledge_graph.delete_entity_relationship("r1")["id"] == "r1"
+        assert knowledge_graph.delete_entity_relationship("r1") is None
+        assert load_entities()["entity_relationships"] == []
+
+    def test_nested_operations_share_an_index_and_skip_full_snapshots(self, kg_dir):
+        rel = {"id": "r1", "source_entity_id": "a", "target_entity_id": "b", "type": "uses"}
+
+        with entity_transaction() as txn:
+            txn.data["entities"]["e1"] = {"id": "e1", "mentions": []}
+            with patch.object(knowledge_graph, "RelationshipIndex", wraps=knowledge_graph.RelationshipIndex) as index, \
+                 patch.object(knowledge_graph, "_snapshot_containers", wraps=knowledge_graph._snapshot_containers) as snapshot:
+                assert knowledge_graph.add_entity_relationship(rel)
+                assert not knowledge_graph.add_entity_relationship({**rel, "id": "r2"})
+                assert knowledge_graph.add_entity_relationship({**rel, "id": "r3", "type": "cites"})
+                assert knowledge_graph.delete_entity_relationship("r1")["id"] == "r1"
+                assert knowledge_graph.delete_entity_relationship("r1") is None
+
+            assert index.call_count == 2  # built once, rebuilt after the delete
+            assert all(txn.data["entities"] not in call.args for call in snapshot.call_args_list)
+
+        data = load_entities()
+        assert [r["id"] for r in data["entity_relationships"]] == ["r3"]
+        assert data["quality_counters"]["relationships"]["total"] == 1
+
+    def test_failed_nested_operation_leaves_relationships_unchanged(self, kg_dir):
+        rel = {"id": "r1", "source_entity_id": "a", "target_entity_id": "b", "type": "uses"}
+        knowledge_graph.add_entity_relationship(rel)
+
+        with entity_transaction() as txn:
+            with patch.object(knowledge_graph.quality_counters, "record_changes", side_effect=RuntimeError("boom")):
+                with pytest.raises(RuntimeError):
+                    knowledge_graph.add_entity_relationship({**rel, "id": "r2", "type": "cites"})
+                with pytest.raises(RuntimeError):
+                    knowledge_graph.delete_entity_relationship("r1")
+            assert [r["id"] for r in txn.data["entity_relationships"]] == ["r1"]
+            assert knowledge_graph.add_entity_relationship({**rel, "id": "r3", "type": "cites"})
+
+        assert [r["id"] for r in load_entities()["entity_relationships"]] == ["r1", "r3"]
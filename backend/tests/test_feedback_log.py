@@ -0,0 +1,120 @@
+"""Tests for the columnar feedback log and its vectorized analyses."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from backend import graph_feedback
+from backend.feedback_log import ColumnarLog, group_counts
+
+
+SCHEMA = {"kind": "category", "score": "float", "count": "int", "flag": "bool"}
+
+
+@pytest.fixture
+def feedback_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_feedback, "FEEDBACK_DIR", str(tmp_path))
+    monkeypatch.setattr(graph_feedback, "_feedback_logs", {})
+    monkeypatch.setattr(graph_feedback, "_counters_cache", {"directory": None, "offsets": None, "counters": None})
+    return tmp_path
+
+
+class TestColumnarLog:
+    """Tests for ColumnarLog."""
+
+    def test_append_and_read_round_trip(self, tmp_path):
+        log = ColumnarLog(str(tmp_path), "events", SCHEMA)
+        assert log.offset() == 0
+
+        log.append([{"kind": "a", "score": 0.5, "count": 2, "flag": True}, {"kind": None}])
+        assert log.append([{"kind": "a", "score": 1.0, "count": 3}]) == 3
+
+        columns = ColumnarLog(str(tmp_path), "events", SCHEMA).read(1)
+        assert columns["kind"].tolist() == [1, 0]
+        assert np.isnan(columns["score"][0])
+        assert log.categories("kind") == ["a", None]
+        assert log.records() == [
+            {"kind": "a", "score": 0.5, "count": 2, "flag": True},
+            {"kind": None, "score": None, "count": 0, "flag": False},
+            {"kind": "a", "score": 1.0, "count": 3, "flag": False},
+        ]
+
+    def test_torn_append_is_ignored_and_repaired(self, tmp_path):
+        log = ColumnarLog(str(tmp_path), "events", SCHEMA)
+        log.append([{"kind": "a", "score": 0.1, "count": 1}])
+
+        # An interrupted append wrote one column but not the others
+        with open(log._column_path("score"), "ab") as f:
+            np.array([0.9]).tofile(f)
+
+        assert log.offset() == 1
+        assert log.check(repair=True) == {"rows": 1, "torn_columns": {"score": 2}}
+        assert log.check() == {"rows": 1, "torn_columns": {}}
+
+    def test_group_counts_keeps_first_occurrence_order(self):
+        keys, counts = group_counts(np.array([5, 2, 5, 9, 2, 5]))
+        assert keys.tolist() == [5, 2, 9]
+        assert counts.tolist() == [3, 2, 1]
+
+        keys, totals = group_counts(np.array([1, 0, 1]), weights=np.array([1, 0, 1]))
+        assert totals.tolist() == [2, 0]
+
+
+class TestFeedbackAnalytics:
+    """Tests for feedback counters built from the log."""
+
+    def test_vectorized_counters_match_records(self, feedback_dir):
+        graph_feedback.record_entity_correction("e1", "validate", original_type="person", extraction_confidence=0.96)
+        graph_feedback.record_entity_correction("e2", "reject", original_type="person", rejection_reason="generic", extraction_confidence=0.97)
+        graph_feedback.record_entity_correction(
+            "e3", "correct", original_name="Dr. Alexandria Smith", original_type="person",
+            corrected_name="Alexandria Smith", corrected_type="concept", extraction_confidence=0.6,
+        )
+        first = graph_feedback.analyze_correction_patterns()
+        assert first["entity_corrections"]["person"]["reject"] == 1
+
+        # Appended events are folded into the cached counters
+        graph_feedback.record_entity_correction("e4", "reject", original_type=None)
+        graph_feedback.record_relationship_correction("r1", "correct_type", original_type="uses", corrected_type="extends")
+        graph_feedback.record_relationship_correction("r2", "reject")
+
+        patterns = graph_feedback.analyze_correction_patterns()
+        person = patterns["entity_corrections"]["person"]
+        assert person["total"] == 3
+        assert person["common_corrections"] == {"title_removed": 1, "type:person->concept": 1}
+        assert person["common_rejections"] == {"generic": 1}
+        assert patterns["entity_corrections"]["unknown"]["common_rejections"] == {"unspecified": 1}
+        assert patterns["relationship_corrections"]["type_corrections"] == {"uses->extends": 1}
+        assert patterns["relationship_corrections"]["rejection_reasons"] == {"unspecified": 1}
+        assert patterns["total_corrections"] == 6
+
+        brackets = graph_feedback.analyze_confidence_accuracy()["confidence_brackets"]
+        assert brackets["0.95-1.0"] == {"total": 2, "validated": 1, "accuracy": 0.5}
+        assert brackets["0.5-0.7"]["validated"] == 1
+        assert brackets["unknown"]["total"] == 1
+
+        assert graph_feedback.get_feedback_counters() == graph_feedback.compute_feedback_counters()
+        assert graph_feedback.check_feedback_counters() == {"torn_columns": {}, "drift": {}, "repaired": False}
+
+    def test_legacy_json_records_are_imported(self, feedback_dir):
+        legacy = {
+            "entity_corrections": [{
+                "entity_id": "e1", "action": "validate", "original_type": "person",
+                "recorded_at": "2025-01-02T03:04:05.123456",
+            }],
+            "relationship_corrections": [],
+            "decision_outcomes": [{
+                "candidate_id": "dup_a_b", "agent_decision": "same", "user_action": "dismiss",
+                "user_agreed": False, "override_reason": "different",
+            }],
+        }
+        with open(feedback_dir / "feedback_data.json", "w") as f:
+            json.dump(legacy, f)
+
+        data = graph_feedback.load_feedback_data()
+        assert data["entity_corrections"][0]["recorded_at"] == "2025-01-02T03:04:05.123456"
+        assert data["decision_outcomes"][0]["override_reason"] == "different"
+        assert not os.path.exists(feedback_dir / "feedback_data.json")
+        assert graph_feedback.analyze_agent_accuracy()["agreement_rate"] == 0.0
@@ -0,0 +1,70 @@
+"""Tests for knowledge graph community clustering."""
+
+import pytest
+from unittest.mock import patch
+
+from backend import graph_clusters, knowledge_graph
+from backend.graph_index import GraphIndex
+
+
+def clique(prefix, size):
+    nodes = [{"id": f"note:{prefix}:{i}", "type": "note", "title": f"{prefix}{i}", "tags": [prefix]} for i in range(size)]
+    links = [
+        {"source": a["id"], "target": b["id"], "type": "shared_tag", "value": prefix}
+        for i, a in enumerate(nodes) for b in nodes[i + 1:]
+    ]
+    return nodes, links
+
+
+def two_communities():
+    a_nodes, a_links = clique("a", 4)
+    b_nodes, b_links = clique("b", 4)
+    bridge = {"source": "note:a:0", "target": "note:b:0", "type": "sequential", "order": 1}
+    return {"nodes": a_nodes + b_nodes, "links": a_links + b_links + [bridge], "stats": {}}
+
+
+@pytest.fixture
+def kg_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    monkeypatch.setattr(graph_clusters, "_clusters_cache", {"version": None, "index": None, "result": None})
+    return tmp_path
+
+
+class TestLabelPropagation:
+    """Tests for propagate_labels."""
+
+    def test_separates_weakly_bridged_communities(self):
+        labels = graph_clusters.propagate_labels(GraphIndex(two_communities(), []))
+
+        assert len({labels[f"note:a:{i}"] for i in range(4)}) == 1
+        assert len({labels[f"note:b:{i}"] for i in range(4)}) == 1
+        assert labels["note:a:0"] != labels["note:b:0"]
+
+    def test_warm_start_keeps_existing_labels(self):
+        index = GraphIndex(two_communities(), [])
+        first = graph_clusters.propagate_labels(index)
+        assert graph_clusters.propagate_labels(index, first, max_iterations=1) == first
+
+
+class TestClusterEndpoints:
+    """Tests for the overview and expand helpers."""
+
+    def test_overview_and_expand(self, kg_dir):
+        index = GraphIndex(two_communities(), [])
+        with patch("backend.graph_clusters.get_graph_index", return_value=(index, 3)):
+            overview = graph_clusters.get_cluster_overview()
+
+            assert overview["stats"]["clusters"] == 2
+            assert [c["size"] for c in overview["nodes"]] == [4, 4]
+            assert overview["nodes"][0]["counts"] == {"note": 4}
+            assert overview["links"][0]["count"] == 1
+
+            cluster_id = overview["nodes"][0]["id"]
+            expanded = graph_clusters.expand_cluster(cluster_id)
+            assert len(expanded["nodes"]) == 4
+            assert len(expanded["links"]) == 6
+            assert len(expanded["external_links"]) == 1
+
+            assert graph_clusters.expand_cluster("cluster:missing") == {"error": "Cluster not found"}
+
+        assert graph_clusters.load_cluster_labels()["version"] == 3
@@ -0,0 +1,87 @@
+"""Tests for graph distances and bridge scoring."""
+
+import pytest
+
+from backend import graph_distance, graph_index
+
+
+def chain_graph(length, extra_notes=()):
+    """Notes c0..c{length-1} linked in a line, plus unlinked notes."""
+    ids = [f"note:c{i}:n1" for i in range(length)] + list(extra_notes)
+    nodes = [{"id": node_id, "type": "note"} for node_id in ids]
+    links = [{"source": ids[i], "target": ids[i + 1], "type": "manual"} for i in range(length - 1)]
+    return graph_index.GraphIndex({"nodes": nodes, "links": links}, [])
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    """Install a graph index; returns a setter."""
+    monkeypatch.setattr(graph_distance, "_distance_cache", {"index": None, "distances": None})
+
+    def setup(index):
+        monkeypatch.setattr(graph_index, "get_graph_index", lambda: (index, 1))
+        return graph_distance.get_distance_index()
+
+    return setup
+
+
+class TestDistance:
+    """Tests for DistanceIndex.distance."""
+
+    def test_exact_distances_and_unreachable(self, graph):
+        distances = graph(chain_graph(6, extra_notes=["note:x:n1"]))
+
+        assert distances.distance("note:c0:n1", "note:c5:n1") == 5
+        assert distances.distance("note:c2:n1", "note:c2:n1") == 0
+        assert distances.distance("note:c0:n1", "note:x:n1") is None
+        assert distances.distance("note:c0:n1", "note:missing") is None
+        assert graph_distance.get_distance_index() is distances
+
+    def test_landmark_bounds_on_large_graphs(self, graph, monkeypatch):
+        monkeypatch.setattr(graph_distance, "EXACT_DISTANCE_MAX_NODES", 3)
+        distances = graph(chain_graph(6, extra_notes=["note:x:n1"]))
+
+        # Every node of a chain lies on a path through the end landmarks
+        assert distances.distance("note:c0:n1", "note:c5:n1") == 5
+        assert distances.distance("note:c1:n1", "note:c3:n1") == 2
+        assert distances.distance("note:c0:n1", "note:x:n1") is None
+
+
+class TestBridgeScoring:
+    """Tests for score_bridge and rank_bridges."""
+
+    def test_distant_and_disconnected_notes_score_higher(self, graph):
+        graph(chain_graph(6, extra_notes=["note:x:n1"]))
+
+        far = graph_distance.score_bridge(["note:c0:n1", "note:c5:n1"])
+        near = graph_distance.score_bridge(["note:c0:n1", "note:c1:n1"])
+        joining = graph_distance.score_bridge(["note:c0:n1", "note:x:n1"])
+
+        assert far["distance"] == 5 and far["connected"]
+        assert near["distance"] == 1 and near["structural_impact"] == 0.0
+        assert far["structural_impact"] > 0
+        assert far["path_length_after"] < far["path_length_before"]
+        assert not joining["connected"] and joining["distance"] is None
+        assert joining["pairwise"] == {"note:c0:n1|note:x:n1": None}
+        assert joining["structural_impact"] > far["structural_impact"]
+        assert graph_distance.score_bridge(["note:c0:n1", "note:missing"])["structural_impact"] == 0.0
+
+    def test_rank_bridges_orders_by_impact(self, graph, monkeypatch):
+        graph(chain_graph(6))
+        candidates = [
+            {"title": "near", "source_notes": ["note:c0:n1", "note:c1:n1"]},
+            {"title": "far", "source_notes": ["note:c0:n1", "note:c5:n1"]},
+            {"title": "also near", "source_notes": ["note:c2:n1", "note:c3:n1"]},
+        ]
+
+        ranked = graph_distance.rank_bridges(candidates)
+        assert [c["title"] for c in ranked] == ["far", "near", "also near"]
+        assert ranked[0]["graph_distance"]["distance"] == 5
+
+        def fail():
+            raise RuntimeError("graph unavailable")
+
+        monkeypatch.setattr(graph_index, "get_graph_index", fail)
+        monkeypatch.setattr(graph_distance, "_distance_cache", {"index": None, "distances": None})
+        unscored = [{"title": "a", "source_notes": ["note:c0:n1", "note:c5:n1"]}]
+        assert graph_distance.rank_bridges(unscored) == [{"title": "a", "source_notes": ["note:c0:n1", "note:c5:n1"]}]
@@ -0,0 +1,88 @@
+"""Tests for the graph adjacency index and k-hop subgraphs."""
+
+import pytest
+from unittest.mock import patch
+
+from backend import graph_index
+from backend.graph_index import GraphIndex, get_subgraph
+
+
+def note(node_id, source="source:c1"):
+    return {"id": node_id, "type": "note", "title": node_id, "sourceId": source}
+
+
+GRAPH = {
+    "nodes": [
+        {"id": "source:c1", "type": "source"},
+        {"id": "source:c2", "type": "source"},
+        note("note:c1:a"),
+        note("note:c1:b"),
+        note("note:c2:x", "source:c2"),
+        note("note:c2:y", "source:c2"),
+        {"id": "entity:rag", "type": "entity", "name": "RAG"},
+        {"id": "entity:llm", "type": "entity", "name": "LLM"},
+    ],
+    "links": [
+        {"source": "note:c1:a", "target": "note:c1:b", "type": "sequential", "order": 1},
+        {"source": "note:c1:a", "target": "entity:rag", "type": "mentions"},
+        {"source": "note:c2:x", "target": "entity:rag", "type": "mentions"},
+        {"source": "note:c2:y", "target": "entity:llm", "type": "mentions"},
+    ],
+    "stats": {},
+}
+
+RELATIONSHIPS = [{"source_entity_id": "rag", "target_entity_id": "llm", "type": "uses"}]
+
+
+@pytest.fixture
+def index():
+    built = GraphIndex(GRAPH, RELATIONSHIPS)
+    with patch("backend.graph_index.get_graph_index", return_value=(built, 7)):
+        yield built
+
+
+class TestGraphIndex:
+    """Tests for adjacency construction."""
+
+    def test_adds_source_and_relationship_edges(self, index):
+        neighbor_types = {(n, l["type"]) for n, l in index.neighbors("entity:rag")}
+        assert ("entity:llm", "relationship") in neighbor_types
+        assert ("source:c1", "source") in {(n, l["type"]) for n, l in index.neighbors("note:c1:a")}
+
+
+class TestSubgraph:
+    """Tests for get_subgraph."""
+
+    def test_one_hop_ranks_by_edge_weight(self, index):
+        result = get_subgraph("note:c1:a", hops=1)
+
+        ranked = [(n["id"], n["score"]) for n in result["nodes"]]
+        assert ranked == [
+            ("note:c1:a", 0),
+            ("entity:rag", 10),
+            ("note:c1:b", 3),
+            ("source:c1", 2),
+        ]
+        assert result["version"] == 7
+        assert all(l["weight"] for l in result["links"])
+
+    def test_types_filter_and_multi_hop(self, index):
+        result = get_subgraph("note:c1:a", hops=3, types=["note", "entity"])
+
+        hops = {n["id"]: n["hop"] for n in result["nodes"]}
+        assert hops["note:c2:x"] == 2
+        assert hops["entity:llm"] == 2
+        assert hops["note:c2:y"] == 3
+        assert not any(n["type"] == "source" for n in result["nodes"])
+
+    def test_node_budget_truncates(self, index):
+        result = get_subgraph("note:c1:a", hops=3, limit=3)
+
+        assert len(result["nodes"]) == 3
+        assert result["truncated"] is True
+        assert {l["source"] for l in result["links"]} | {l["target"] for l in result["links"]} <= {
+            n["id"] for n in result["nodes"]
+        }
+
+    def test_unknown_center(self, index):
+        assert get_subgraph("note:missing") == {"error": "Node not found"}
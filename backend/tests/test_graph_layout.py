@@ -0,0 +1,113 @@
+"""Tests for server-side graph layout."""
+
+import threading
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from backend import graph_layout, knowledge_graph
+from backend.graph_index import GraphIndex
+
+
+def two_clusters(extra_nodes=()):
+    nodes = [{"id": f"note:{c}:{i}", "type": "note"} for c in "ab" for i in range(5)]
+    links = [
+        {"source": f"note:{c}:{i}", "target": f"note:{c}:{j}", "type": "shared_tag"}
+        for c in "ab" for i in range(5) for j in range(i + 1, 5)
+    ]
+    links.append({"source": "note:a:0", "target": "note:b:0", "type": "sequential"})
+    for node_id, neighbor in extra_nodes:
+        nodes.append({"id": node_id, "type": "note"})
+        links.append({"source": node_id, "target": neighbor, "type": "mentions"})
+    return GraphIndex({"nodes": nodes, "links": links}, [])
+
+
+def mean_distance(positions, group_a, group_b):
+    return np.mean([
+        np.linalg.norm(np.subtract(positions[a], positions[b]))
+        for a in group_a for b in group_b if a != b
+    ])
+
+
+@pytest.fixture
+def kg_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    monkeypatch.setattr(graph_layout, "_layout_cache", {"version": None, "index": None, "positions": None})
+    return tmp_path
+
+
+class TestComputeLayout:
+    """Tests for compute_layout."""
+
+    def test_clusters_are_laid_out_apart(self):
+        positions = graph_layout.compute_layout(two_clusters())
+
+        a = [f"note:a:{i}" for i in range(5)]
+        b = [f"note:b:{i}" for i in range(5)]
+        assert all(np.isfinite(positions[n]).all() for n in a + b)
+        assert mean_distance(positions, a, a) < mean_distance(positions, a, b)
+
+    def test_is_deterministic(self):
+        assert graph_layout.compute_layout(two_clusters()) == graph_layout.compute_layout(two_clusters())
+
+    def test_warm_start_keeps_existing_nodes_stable(self):
+        first = graph_layout.compute_layout(two_clusters())
+        second = graph_layout.compute_layout(two_clusters([("note:new:1", "note:b:3")]), first)
+
+        assert all(second[n] == first[n] for n in first)
+        new_to_anchor = np.linalg.norm(np.subtract(second["note:new:1"], second["note:b:3"]))
+        new_to_other = np.linalg.norm(np.subtract(second["note:new:1"], second["note:a:3"]))
+        assert new_to_anchor < new_to_other
+
+
+class TestGraphLayoutCache:
+    """Tests for per-version caching and persistence."""
+
+    def test_persists_and_reuses_positions(self, kg_dir):
+        index = two_clusters()
+        with patch("backend.graph_layout.get_graph_index", return_value=(index, 2)):
+            positions, version = graph_layout.get_graph_layout()
+
+        assert version == 2
+        assert graph_layout.load_layout()["positions"] == positions
+
+        graph_layout._layout_cache["version"] = None
+        with patch("backend.graph_layout.get_graph_index", return_value=(index, 2)), \
+             patch("backend.graph_layout.compute_layout") as compute:
+            assert graph_layout.get_graph_layout()[0] == positions
+        compute.assert_not_called()
+
+    def test_delta_positions_patch_cached_layout(self, kg_dir):
+        with patch("backend.graph_layout.get_graph_index", return_value=(two_clusters(), 1)):
+            client, _ = graph_layout.get_graph_layout()
+        client = dict(client)
+
+        with patch("backend.graph_layout.get_graph_index",
+                   return_value=(two_clusters([("note:new:1", "note:b:3")]), 2)):
+            full, _ = graph_layout.get_graph_layout()
+
+        # A delta carries positions for the added node only
+        client["note:new:1"] = full["note:new:1"]
+        assert client == full
+
+    async def test_async_layout_only_offloads_the_simulation(self, kg_dir):
+        index = two_clusters()
+        threads = {}
+
+        def graph_index():
+            threads["index"] = threading.current_thread()
+            return index, 3
+
+        def compute(*args):
+            threads["compute"] = threading.current_thread()
+            return {node_id: [0.0, 0.0] for node_id in index.nodes}
+
+        with patch("backend.graph_layout.get_graph_index", graph_index), \
+             patch("backend.graph_layout.compute_layout", compute):
+            positions, version = await graph_layout.get_graph_layout_async()
+
+        assert version == 3 and len(positions) == 10
+        assert threads["index"] is threading.main_thread()
+        assert threads["compute"] is not threading.main_thread()
+        assert graph_layout.load_layout()["version"] == 3
@@ -0,0 +1,97 @@
+"""Tests for filtered knowledge graph queries."""
+
+import pytest
+from unittest.mock import patch
+
+from backend import graph_query
+from backend.graph_query import GraphQuery, GraphQueryIndex
+
+
+def note(node_id, tags, created_at, source="source:c1", source_type="article"):
+    return {
+        "id": node_id, "type": "note", "title": node_id, "tags": tags,
+        "created_at": created_at, "sourceId": source, "sourceType": source_type,
+    }
+
+
+GRAPH = {
+    "nodes": [
+        {"id": "source:c1", "type": "source", "sourceType": "article"},
+        {"id": "source:c2", "type": "source", "sourceType": "youtube"},
+        note("note:c1:a", ["#RAG", "#llm"], "2025-01-10T09:00:00"),
+        note("note:c1:b", ["#agents"], "2025-02-01T12:00:00"),
+        note("note:c2:x", ["#rag"], "2025-03-05T08:00:00", "source:c2", "youtube"),
+        {"id": "entity:rag", "type": "entity", "entityType": "concept", "mentionCount": 2},
+        {"id": "entity:openai", "type": "entity", "entityType": "organization", "mentionCount": 1},
+        {"id": "entity:langchain", "type": "entity", "entityType": "technology", "mentionCount": 1},
+    ],
+    "links": [
+        {"source": "note:c1:a", "target": "note:c1:b", "type": "sequential", "order": 1},
+        {"source": "note:c1:a", "target": "entity:rag", "type": "mentions"},
+        {"source": "note:c1:a", "target": "entity:openai", "type": "mentions"},
+        {"source": "note:c2:x", "target": "entity:rag", "type": "mentions"},
+        {"source": "note:c1:b", "target": "entity:langchain", "type": "mentions"},
+    ],
+    "stats": {"processedConversations": 2},
+}
+
+
+@pytest.fixture
+def current_graph():
+    graph_query._query_index_cache.update({"graph": None, "index": None})
+    with patch("backend.graph_query.graph_sync.get_versioned_graph", return_value=(GRAPH, 4)):
+        yield GRAPH
+
+
+class TestSelect:
+    """Tests for resolving filters to node IDs."""
+
+    def test_tags_select_notes_with_their_sources_and_entities(self):
+        index = GraphQueryIndex(GRAPH)
+        selected = index.select(GraphQuery(tags=["rag"]))
+
+        assert selected == {
+            "note:c1:a", "note:c2:x", "source:c1", "source:c2", "entity:rag", "entity:openai",
+        }
+
+    def test_date_range_is_inclusive_of_end_day(self):
+        index = GraphQueryIndex(GRAPH)
+
+        assert index.notes_in_range("2025-02-01", "2025-03-05") == {"note:c1:b", "note:c2:x"}
+        assert index.notes_in_range(None, "2025-01-31") == {"note:c1:a"}
+
+    def test_combined_note_filters_scan_only_the_smallest_bucket(self):
+        class UnscannableSet(set):
+            def __iter__(self):
+                raise AssertionError("all notes were scanned")
+
+        index = GraphQueryIndex(GRAPH)
+        index.by_type["note"] = UnscannableSet(index.by_type["note"])
+
+        assert index.select_notes(GraphQuery(tags=["rag"], source_types=["youtube"])) == {"note:c2:x"}
+        assert index.select_notes(GraphQuery(tags=["#RAG"], date_to="2025-01-31")) == {"note:c1:a"}
+        assert index.select_notes(GraphQuery(source_types=["article"], date_from="2025-02-01")) == {"note:c1:b"}
+        assert index.select_notes(GraphQuery(tags=["missing"], source_types=["article"])) == set()
+
+    def test_entity_filters_and_node_types(self):
+        index = GraphQueryIndex(GRAPH)
+
+        assert index.select(GraphQuery(node_types=["entity"], min_mentions=2)) == {"entity:rag"}
+        assert index.select(GraphQuery(
+            node_types=["entity"], source_types=["article"], entity_types=["technology", "organization"]
+        )) == {"entity:openai", "entity:langchain"}
+
+
+class TestQueryGraph:
+    """Tests for query_graph."""
+
+    def test_unfiltered_query_returns_cached_graph(self, current_graph):
+        assert graph_query.query_graph(GraphQuery()) is current_graph
+
+    def test_filtered_graph_keeps_only_internal_links(self, current_graph):
+        result = graph_query.query_graph(GraphQuery(source_types=["youtube"]))
+
+        assert [n["id"] for n in result["nodes"]] == ["source:c2", "note:c2:x", "entity:rag"]
+        assert result["links"] == [{"source": "note:c2:x", "target": "entity:rag", "type": "mentions"}]
+        assert result["stats"]["notes"] == 1
+        assert result["stats"]["processedConversations"] == 2
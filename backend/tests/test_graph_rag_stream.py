@@ -0,0 +1,99 @@
+"""Tests for streaming graph RAG chat responses."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from backend import graph_rag
+from backend.graph_rag import AnswerStreamParser
+
+
+RESPONSE = "ANSWER:\nRAG grounds answers [Note 2] in retrieved notes [Note 1].\n\nFOLLOW_UPS:\n- What is MMR?\n- Why embeddings?"
+
+NOTES = [
+    {"id": "note:c1:a", "title": "A", "body": "alpha", "conversation_id": "c1"},
+    {"id": "note:c1:b", "title": "B", "body": "beta", "conversation_id": "c1"},
+]
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.fixture(autouse=True)
+def no_index_refresh():
+    with patch.object(graph_rag.graph_search, "refresh_kg_index_in_background"):
+        yield
+
+
+class TestAnswerStreamParser:
+    """Tests for incremental answer extraction."""
+
+    @pytest.mark.parametrize("size", [1, 3, 7, 200])
+    def test_streams_only_the_answer_section(self, size):
+        parser = AnswerStreamParser()
+        streamed = "".join(parser.feed(c) for c in chunks(RESPONSE, size)) + parser.finish()
+
+        assert streamed == "RAG grounds answers [Note 2] in retrieved notes [Note 1].\n\n"
+        assert streamed.strip() == graph_rag.parse_rag_response(RESPONSE, NOTES)["answer"]
+
+    def test_unformatted_response_is_streamed_whole(self):
+        parser = AnswerStreamParser()
+        streamed = "".join(parser.feed(c) for c in chunks("Just an answer.", 4)) + parser.finish()
+
+        assert streamed == "Just an answer."
+
+
+class TestStreamQuery:
+    """Tests for the streaming event sequence."""
+
+    @pytest.mark.asyncio
+    async def test_notes_then_tokens_then_complete(self):
+        async def fake_stream(model, messages, timeout=120.0):
+            for c in chunks(RESPONSE, 5):
+                yield {"content": c}
+            yield {"generation_id": "gen-1"}
+
+        turn = {"full_notes": NOTES, "messages": [{"role": "user", "content": "q"}]}
+        with patch.object(graph_rag, "prepare_rag_turn", return_value=turn), \
+             patch.object(graph_rag, "stream_model", fake_stream):
+            events = [e async for e in graph_rag.stream_knowledge_graph_query("q", model="m")]
+
+        types = [e["type"] for e in events]
+        assert types[0] == "notes" and types[-1] == "complete"
+        assert [e["data"]["note_id"] for e in events if e["type"] == "citation"] == ["note:c1:b", "note:c1:a"]
+
+        result = events[-1]["data"]
+        assert "".join(e["data"] for e in events if e["type"] == "token").strip() == result["answer"]
+        assert result["follow_ups"] == ["What is MMR?", "Why embeddings?"]
+        assert [c["note_id"] for c in result["citations"]] == ["note:c1:a", "note:c1:b"]
+
+    @pytest.mark.asyncio
+    async def test_empty_stream_completes_with_empty_response_answer(self):
+        async def fake_stream(model, messages, timeout=120.0):
+            yield {"generation_id": "gen-1"}
+
+        turn = {"full_notes": NOTES, "messages": [{"role": "user", "content": "q"}]}
+        with patch.object(graph_rag, "prepare_rag_turn", return_value=turn), \
+             patch.object(graph_rag, "stream_model", fake_stream), \
+             patch.object(graph_rag, "query_model", AsyncMock(return_value=None)):
+            events = [e async for e in graph_rag.stream_knowledge_graph_query("q", model="m")]
+            expected = await graph_rag.query_knowledge_graph("q", model="m")
+
+        assert [e["type"] for e in events] == ["notes", "complete"]
+        assert events[-1]["data"] == expected
+        assert expected["answer"].startswith("Model 'm' returned empty response")
+
+
+class TestQuery:
+    """Tests for the non-streaming query."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("response", [None, {"content": ""}])
+    async def test_empty_model_response(self, response):
+        turn = {"full_notes": NOTES, "messages": [{"role": "user", "content": "q"}]}
+        with patch.object(graph_rag, "prepare_rag_turn", return_value=turn), \
+             patch.object(graph_rag, "query_model", AsyncMock(return_value=response)):
+            result = await graph_rag.query_knowledge_graph("q", model="m")
+
+        assert result["answer"].startswith("Model 'm' returned empty response")
+        assert result["notes_searched"] == 2
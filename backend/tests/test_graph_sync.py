@@ -0,0 +1,97 @@
+"""Tests for knowledge graph versioning and delta sync."""
+
+import itertools
+import pytest
+from unittest.mock import patch
+
+from backend import graph_sync, knowledge_graph
+
+
+def note(node_id, title):
+    return {"id": node_id, "type": "note", "title": title}
+
+
+@pytest.fixture
+def kg_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    monkeypatch.setattr(graph_sync, "_graph_cache", {"input_key": None, "graph": None, "state": None})
+    return tmp_path
+
+
+@pytest.fixture
+def fake_graph(kg_dir):
+    """Mutable graph returned by build_graph; every call sees new inputs."""
+    graph = {
+        "nodes": [note("note:c:1", "One"), note("note:c:2", "Two")],
+        "links": [{"source": "note:c:1", "target": "note:c:2", "type": "sequential", "order": 1}],
+        "stats": {},
+    }
+    keys = (str(i) for i in itertools.count())
+
+    def build():
+        return {**graph, "nodes": list(graph["nodes"]), "links": list(graph["links"])}
+
+    with patch("backend.graph_sync.knowledge_graph.build_graph", side_effect=build), \
+         patch("backend.graph_sync.compute_input_key", side_effect=lambda: next(keys)):
+        yield graph
+
+
+class TestGraphVersions:
+    """Tests for version bumps and deltas."""
+
+    def test_version_only_bumps_on_real_changes(self, fake_graph):
+        _, v1 = graph_sync.get_versioned_graph()
+        _, v2 = graph_sync.get_versioned_graph()
+        assert v1 == v2 == 1
+
+        fake_graph["nodes"][0] = note("note:c:1", "One (edited)")
+        _, v3 = graph_sync.get_versioned_graph()
+        assert v3 == 2
+
+    def test_delta_reports_added_changed_and_removed(self, fake_graph):
+        graph_sync.get_versioned_graph()
+
+        fake_graph["nodes"] = [note("note:c:1", "One (edited)"), note("note:c:3", "Three")]
+        fake_graph["links"] = []
+        graph_sync.get_versioned_graph()
+        fake_graph["nodes"].append(note("note:c:4", "Four"))
+
+        delta = graph_sync.get_graph_delta(1)
+
+        assert delta["version"] == 3
+        assert [n["id"] for n in delta["nodes"]["added"]] == ["note:c:3", "note:c:4"]
+        assert [n["title"] for n in delta["nodes"]["changed"]] == ["One (edited)"]
+        assert delta["nodes"]["removed"] == ["note:c:2"]
+        assert delta["links"]["removed"] == ["note:c:1|note:c:2|sequential|"]
+
+    def test_node_added_then_removed_is_omitted(self, fake_graph):
+        graph_sync.get_versioned_graph()
+        fake_graph["nodes"].append(note("note:c:3", "Three"))
+        graph_sync.get_versioned_graph()
+        fake_graph["nodes"].pop()
+
+        delta = graph_sync.get_graph_delta(1)
+        assert delta["version"] == 3
+        assert delta["nodes"] == {"added": [], "changed": [], "removed": []}
+
+    def test_unknown_or_expired_versions_need_full_graph(self, fake_graph, monkeypatch):
+        monkeypatch.setattr(graph_sync, "GRAPH_CHANGE_LOG_LIMIT", 1)
+        graph_sync.get_versioned_graph()
+        for title in ("A", "B"):
+            fake_graph["nodes"][0] = note("note:c:1", title)
+            graph_sync.get_versioned_graph()
+
+        assert graph_sync.get_graph_delta(1) is None
+        assert graph_sync.get_graph_delta(99) is None
+        assert graph_sync.get_graph_delta(2)["version"] == 3
+
+
+class TestEtags:
+    """Tests for ETag helpers."""
+
+    def test_etag_matching(self):
+        etag = graph_sync.graph_etag(4)
+        assert graph_sync.etag_matches(etag, etag)
+        assert graph_sync.etag_matches(f'"kg-1", W/{etag}', etag)
+        assert not graph_sync.etag_matches('"kg-3"', etag)
+        assert graph_sync.graph_etag(4, "ai") != etag
@@ -0,0 +1,137 @@
+"""Tests for batched multi-note entity extraction."""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from backend import knowledge_graph
+from backend.knowledge_graph import (
+    pack_note_batches,
+    _parse_batch_response,
+    extract_entities_batch,
+    extract_entities_for_conversation,
+)
+
+
+SAMPLE_NOTES = [
+    {"id": "n1", "title": "Transformers", "body": "Transformers power GPT-4, built by OpenAI.", "tags": []},
+    {"id": "n2", "title": "RAG", "body": "RAG builds on vector search.", "tags": []},
+    {"id": "n3", "title": "Empty", "body": "Nothing notable here.", "tags": []},
+]
+
+
+@pytest.fixture
+def kg_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestPackNoteBatches:
+    """Tests for note batch packing."""
+
+    def test_respects_max_notes(self):
+        notes = [{"id": str(i), "title": "t", "body": "b"} for i in range(5)]
+        batches = pack_note_batches(notes, max_notes=2, token_budget=10_000)
+        assert [len(b) for b in batches] == [2, 2, 1]
+
+    def test_respects_token_budget(self):
+        notes = [{"id": str(i), "title": "t", "body": "x" * 400} for i in range(4)]
+        batches = pack_note_batches(notes, max_notes=10, token_budget=250)
+        assert [len(b) for b in batches] == [2, 2]
+
+    def test_oversized_note_gets_own_batch(self):
+        notes = [
+            {"id": "big", "title": "t", "body": "x" * 10_000},
+            {"id": "small", "title": "t", "body": "y"},
+        ]
+        batches = pack_note_batches(notes, max_notes=10, token_budget=100)
+        assert [[n["id"] for n in b] for b in batches] == [["big"], ["small"]]
+
+
+class TestParseBatchResponse:
+    """Tests for per-note parsing of batched responses."""
+
+    def test_parses_full_object(self):
+        content = "```json\n" + json.dumps({"n1": {"entities": []}, "n2": {"entities": []}}) + "\n```"
+        assert set(_parse_batch_response(content, ["n1", "n2"])) == {"n1", "n2"}
+
+    def test_recovers_notes_from_truncated_response(self):
+        content = '{"n1": {"entities": [{"name": "RAG", "type": "concept"}], "relationships": []}, "n2": {"entities": [{"na'
+        parsed = _parse_batch_response(content, ["n1", "n2"])
+        assert list(parsed) == ["n1"]
+        assert parsed["n1"]["entities"][0]["name"] == "RAG"
+
+    def test_ignores_unknown_note_ids(self):
+        content = json.dumps({"n1": {"entities": []}, "other": {"entities": []}})
+        assert list(_parse_batch_response(content, ["n1"])) == ["n1"]
+
+
+class TestExtractEntitiesBatch:
+    """Tests for the batched extraction request."""
+
+    @pytest.mark.asyncio
+    async def test_returns_entities_and_relationships_per_note(self):
+        payload = {
+            "n1": {
+                "entities": [
+                    {"name": "GPT-4", "type": "technology", "context": "model"},
+                    {"name": "OpenAI", "type": "organization", "context": "lab"},
+                ],
+                "relationships": [{"source": "GPT-4", "target": "OpenAI", "type": "created_by"}],
+            },
+            "n2": {"entities": "not a list"},
+        }
+        mock_query = AsyncMock(return_value={"content": json.dumps(payload)})
+
+        with patch("backend.knowledge_graph.query_model", mock_query):
+            results = await extract_entities_batch(SAMPLE_NOTES[:2], "conv-1", model="test/model")
+
+        assert mock_query.await_count == 1
+        assert set(results) == {"n1"}
+        entities, relationships = results["n1"]
+        assert [e["name"] for e in entities] == ["GPT-4", "OpenAI"]
+        assert relationships[0]["type"] == "created_by"
+        assert relationships[0]["source_note"] == "note:conv-1:n1"
+
+
+class TestBatchedConversationExtraction:
+    """Tests for batched mode in extract_entities_for_conversation."""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_single_note_path_for_missing_notes(self, kg_dir):
+        conversation = {
+            "id": "conv-1",
+            "mode": "synthesizer",
+            "messages": [{"role": "assistant", "notes": SAMPLE_NOTES}],
+        }
+        batch_payload = {
+            "n1": {"entities": [{"name": "Transformers", "type": "technology"}], "relationships": []},
+            "n2": {"entities": [{"name": "RAG", "type": "concept"}], "relationships": []},
+        }
+
+        async def fake_query(model, messages, timeout=120.0):
+            prompt = messages[0]["content"]
+            if "[Note n1]" in prompt:
+                return {"content": json.dumps(batch_payload)}
+            return {"content": json.dumps([{"name": "Fallback", "type": "concept"}])}
+
+        settings = {"batch_extraction": True, "batch_max_notes": 8, "batch_token_budget": 6000}
+
+        with patch("backend.knowledge_graph.get_conversation", return_value=conversation), \
+             patch("backend.knowledge_graph.get_kg_entity_extraction_settings", return_value=settings), \
+             patch("backend.knowledge_graph.query_model", side_effect=fake_query):
+            result = await extract_entities_for_conversation(
+                "conv-1", model="test/model", use_source_context=False
+            )
+
+        stats = result["extraction_stats"]
+        assert stats["mode"] == "batched"
+        assert stats["batched_requests"] == 1
+        assert stats["notes_batched"] == 2
+        assert stats["fallback_notes"] == 1
+        assert stats["llm_requests"] == 2
+        assert stats["requests_saved"] == 1
+        assert result["entities_extracted"] == 3
+
+        cumulative = knowledge_graph.get_extraction_stats()
+        assert cumulative["batched_requests"] == 1
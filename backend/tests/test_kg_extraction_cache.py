@@ -0,0 +1,144 @@
+"""Tests for the per-note entity extraction cache."""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from backend import knowledge_graph
+from backend.knowledge_graph import extract_entities_for_conversation
+from backend.source_metadata import SourceMetadata
+
+
+SINGLE_MODE = {"batch_extraction": False, "batch_max_notes": 8, "batch_token_budget": 6000}
+
+
+def make_conversation(notes):
+    return {
+        "id": "conv-1",
+        "mode": "synthesizer",
+        "messages": [{"role": "assistant", "notes": notes}],
+    }
+
+
+@pytest.fixture
+def kg_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    return tmp_path
+
+
+class CountingModel:
+    """Fake query_model that returns one entity per note and counts calls."""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self, model, messages, timeout=120.0):
+        self.calls += 1
+        if self.fail:
+            return None
+        return {"content": json.dumps([{"name": "Transformers", "type": "technology"}])}
+
+
+async def run_extraction(conversation, fake_model, model="test/model", **kwargs):
+    kwargs.setdefault("use_source_context", False)
+    with patch("backend.knowledge_graph.get_conversation", return_value=conversation), \
+         patch("backend.knowledge_graph.get_kg_entity_extraction_settings", return_value=SINGLE_MODE), \
+         patch("backend.knowledge_graph.query_model", new=fake_model):
+        return await extract_entities_for_conversation(
+            "conv-1", model=model, **kwargs
+        )
+
+
+class TestExtractionCache:
+    """Tests for cache reuse across re-extractions."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_notes_skip_llm(self, kg_dir):
+        notes = [
+            {"id": "n1", "title": "A", "body": "First"},
+            {"id": "n2", "title": "B", "body": "Second"},
+        ]
+        fake = CountingModel()
+
+        await run_extraction(make_conversation(notes), fake)
+        assert fake.calls == 2
+
+        result = await run_extraction(make_conversation(notes), fake)
+        assert fake.calls == 2
+        stats = result["extraction_stats"]
+        assert stats["cache_hits"] == 2
+        assert stats["requests_avoided_by_cache"] == 2
+        assert stats["estimated_prompt_tokens_avoided_by_cache"] > 0
+        assert result["entities_extracted"] == 2
+
+    @pytest.mark.asyncio
+    async def test_only_edited_notes_are_reextracted(self, kg_dir):
+        notes = [
+            {"id": "n1", "title": "A", "body": "First"},
+            {"id": "n2", "title": "B", "body": "Second"},
+        ]
+        fake = CountingModel()
+        await run_extraction(make_conversation(notes), fake)
+
+        edited = [notes[0], {**notes[1], "body": "Second, revised"}]
+        result = await run_extraction(make_conversation(edited), fake)
+
+        assert fake.calls == 3
+        assert result["extraction_stats"]["cache_hits"] == 1
+        assert result["extraction_stats"]["cache_misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_source_metadata_skipped_when_all_notes_cached(self, kg_dir):
+        notes = [{"id": "n1", "title": "A", "body": "First"}]
+        conversation = make_conversation(notes)
+        conversation["messages"][0]["source_url"] = "https://example.com/post"
+        metadata = AsyncMock(return_value=SourceMetadata())
+        fake = CountingModel()
+
+        with patch("backend.knowledge_graph.extract_source_metadata", metadata):
+            await run_extraction(conversation, fake, use_source_context=True)
+            assert metadata.await_count == 1
+
+            result = await run_extraction(conversation, fake, use_source_context=True)
+            assert metadata.await_count == 1
+            assert result["extraction_stats"]["cache_hits"] == 1
+
+            conversation["messages"][0]["notes"] = [{**notes[0], "body": "First, revised"}]
+            await run_extraction(conversation, fake, use_source_context=True)
+            assert metadata.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_model_change_and_force_bypass_cache(self, kg_dir):
+        notes = [{"id": "n1", "title": "A", "body": "First"}]
+        fake = CountingModel()
+        await run_extraction(make_conversation(notes), fake)
+
+        await run_extraction(make_conversation(notes), fake, model="other/model")
+        assert fake.calls == 2
+
+        await run_extraction(make_conversation(notes), fake, bypass_cache=True)
+        assert fake.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_extractions_are_not_cached(self, kg_dir):
+        notes = [{"id": "n1", "title": "A", "body": "First"}]
+        await run_extraction(make_conversation(notes), CountingModel(fail=True))
+
+        assert knowledge_graph.load_extraction_cache()["notes"] == {}
+
+        fake = CountingModel()
+        await run_extraction(make_conversation(notes), fake)
+        assert fake.calls == 1
+
+    def test_prompt_version_covers_batch_prompt_and_source_context(self, monkeypatch):
+        version = knowledge_graph.extraction_prompt_version()
+        assert version == knowledge_graph.EXTRACTION_PROMPT_VERSION
+
+        monkeypatch.setattr(knowledge_graph, "BATCH_EXTRACTION_PROMPT", knowledge_graph.BATCH_EXTRACTION_PROMPT + " ")
+        batch_changed = knowledge_graph.extraction_prompt_version()
+        monkeypatch.undo()
+        monkeypatch.setattr(knowledge_graph, "build_source_context_prompt", lambda metadata: "CONTEXT")
+        context_changed = knowledge_graph.extraction_prompt_version()
+
+        assert len({version, batch_changed, context_changed}) == 3
@@ -0,0 +1,155 @@
+"""Tests for the concurrent, checkpointed knowledge graph migration runner."""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from backend import knowledge_graph
+from backend.rate_limiter import TokenBucketRateLimiter
+
+
+CONVERSATIONS = [
+    {"id": f"conv-{i}", "title": f"Source {i}", "mode": "synthesizer"}
+    for i in range(6)
+]
+
+MIGRATION_SETTINGS = {"workers": 3, "requests_per_minute": 0, "tokens_per_minute": 0}
+
+
+@pytest.fixture
+def kg_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    knowledge_graph.migration_state.reset()
+    return tmp_path
+
+
+class TestTokenBucketRateLimiter:
+    """Tests for the token-bucket rate limiter."""
+
+    @pytest.mark.asyncio
+    async def test_burst_within_capacity_does_not_wait(self):
+        limiter = TokenBucketRateLimiter(requests_per_minute=10, tokens_per_minute=10_000)
+        for _ in range(5):
+            await limiter.acquire(100)
+        stats = limiter.get_stats()
+        assert stats["requests"] == 5
+        assert stats["tokens"] == 500
+        assert stats["wait_seconds"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waits_when_request_bucket_is_empty(self):
+        limiter = TokenBucketRateLimiter(requests_per_minute=60)
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            limiter._last_refill -= delay
+
+        limiter._request_tokens = 0
+        with patch("backend.rate_limiter.asyncio.sleep", side_effect=fake_sleep):
+            await limiter.acquire()
+
+        assert sleeps and sleeps[0] == pytest.approx(1.0, abs=0.05)
+
+    @pytest.mark.asyncio
+    async def test_unlimited_when_no_limits(self):
+        limiter = TokenBucketRateLimiter()
+        await limiter.acquire(1_000_000)
+        assert limiter.get_stats()["wait_seconds"] == 0
+
+
+class TestMigrationRunner:
+    """Tests for migrate_all_conversations."""
+
+    @pytest.mark.asyncio
+    async def test_runs_workers_concurrently_and_checkpoints(self, kg_dir):
+        active = 0
+        peak = 0
+
+        async def fake_extract(conversation_id, model=None, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"conversation_id": conversation_id}
+
+        with patch("backend.knowledge_graph.list_conversations", return_value=CONVERSATIONS), \
+             patch("backend.knowledge_graph.get_kg_migration_settings", return_value=MIGRATION_SETTINGS), \
+             patch("backend.knowledge_graph.extract_entities_for_conversation", side_effect=fake_extract):
+            status = await knowledge_graph.migrate_all_conversations(model="test/model")
+
+        assert peak == 3
+        assert status["processed"] == 6
+        assert status["pending"] == 0
+        checkpoint = knowledge_graph.load_migration_checkpoint()
+        assert checkpoint["status"] == "completed"
+        assert set(checkpoint["completed"]) == {c["id"] for c in CONVERSATIONS}
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_checkpointed_conversations(self, kg_dir):
+        knowledge_graph.save_migration_checkpoint({
+            "job_id": "job1",
+            "status": "running",
+            "model": "test/model",
+            "force_reprocess": True,
+            "targets": [{"id": c["id"], "title": c["title"]} for c in CONVERSATIONS],
+            "completed": {
+                "conv-0": {"status": "done"},
+                "conv-1": {"status": "done"},
+                "conv-2": {"status": "failed", "error": "boom"},
+            },
+        })
+        extracted = []
+
+        async def fake_extract(conversation_id, model=None, **kwargs):
+            extracted.append(conversation_id)
+            return {"conversation_id": conversation_id}
+
+        with patch("backend.knowledge_graph.get_kg_migration_settings", return_value=MIGRATION_SETTINGS), \
+             patch("backend.knowledge_graph.extract_entities_for_conversation", side_effect=fake_extract):
+            status = await knowledge_graph.migrate_all_conversations(resume=True)
+
+        assert sorted(extracted) == ["conv-3", "conv-4", "conv-5"]
+        assert status["resumed"] is True
+        assert status["job_id"] == "job1"
+        assert status["processed"] == 5
+        assert status["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shutdown_cancel_leaves_checkpoint_resumable(self, kg_dir):
+        extracted = []
+
+        async def slow_extract(conversation_id, model=None, **kwargs):
+            await asyncio.sleep(0.01 if conversation_id in ("conv-0", "conv-1", "conv-2") else 10)
+            extracted.append(conversation_id)
+            return {"conversation_id": conversation_id}
+
+        with patch("backend.knowledge_graph.list_conversations", return_value=CONVERSATIONS), \
+             patch("backend.knowledge_graph.get_kg_migration_settings", return_value=MIGRATION_SETTINGS), \
+             patch("backend.knowledge_graph.extract_entities_for_conversation", side_effect=slow_extract):
+            task = asyncio.create_task(knowledge_graph.migrate_all_conversations(model="test/model"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        checkpoint = knowledge_graph.load_migration_checkpoint()
+        assert checkpoint["status"] == "running"
+        assert set(checkpoint["completed"]) == {"conv-0", "conv-1", "conv-2"}
+        assert not knowledge_graph.migration_state.running
+
+        # The next startup picks the job back up where it stopped
+        extracted.clear()
+
+        async def fast_extract(conversation_id, model=None, **kwargs):
+            extracted.append(conversation_id)
+            return {"conversation_id": conversation_id}
+
+        with patch("backend.knowledge_graph.get_kg_migration_settings", return_value=MIGRATION_SETTINGS), \
+             patch("backend.knowledge_graph.extract_entities_for_conversation", side_effect=fast_extract):
+            status = await knowledge_graph.resume_interrupted_migration()
+
+        assert sorted(extracted) == ["conv-3", "conv-4", "conv-5"]
+        assert status["processed"] == 6
+        assert knowledge_graph.load_migration_checkpoint()["status"] == "completed"
@@ -0,0 +1,95 @@
+"""Tests for the shared note catalog."""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from backend import knowledge_graph, note_catalog, storage
+
+
+def make_conversation(conversation_id, created_at, notes, mode="synthesizer"):
+    return {
+        "id": conversation_id,
+        "title": f"Title {conversation_id}",
+        "created_at": created_at,
+        "mode": mode,
+        "messages": [
+            {"role": "user", "content": "https://example.com"},
+            {"role": "assistant", "source_url": f"https://example.com/{conversation_id}", "source_type": "youtube", "notes": notes},
+        ],
+    }
+
+
+@pytest.fixture
+def conversations(tmp_path, monkeypatch):
+    data_dir = tmp_path / "conversations"
+    data_dir.mkdir()
+    monkeypatch.setattr(storage, "DATA_DIR", str(data_dir))
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path / "knowledge_graph"))
+    monkeypatch.setattr(note_catalog, "_catalog_cache", {"path": None, "state": None, "index": None})
+
+    def save(conversation):
+        (data_dir / f"{conversation['id']}.json").write_text(json.dumps(conversation))
+
+    save(make_conversation("old", "2025-01-01T00:00:00", [
+        {"id": "n1", "title": "Attention", "body": "Self-attention", "tags": ["#AI", "#transformers"], "quality": {"score": 4}},
+        {"id": "n2", "title": "Scaling", "body": "Scaling laws", "tags": ["#ai"], "quality": {"starred": True}},
+    ]))
+    save(make_conversation("new", "2025-02-01T00:00:00", [
+        {"id": "n1", "title": "Retrieval", "body": "RAG", "tags": ["#rag"]},
+    ]))
+    save(make_conversation("chat", "2025-03-01T00:00:00", [], mode="council"))
+    return save
+
+
+class TestNoteCatalog:
+    """Tests for note lookup and filtering."""
+
+    def test_lookup_by_id_tag_quality_and_page(self, conversations):
+        note = note_catalog.get_note("note:old:n2")
+        assert note["title"] == "Scaling"
+        assert note["starred"] is True
+        assert note["source_type"] == "youtube"
+        assert note["source_url"] == "https://example.com/old"
+        assert note["created_at"] == "2025-01-01T00:00:00"
+        assert note_catalog.get_note("note:old:missing") is None
+
+        assert [n["id"] for n in note_catalog.list_notes()] == ["note:new:n1", "note:old:n1", "note:old:n2"]
+        assert [n["id"] for n in note_catalog.list_notes(oldest_first=True)] == ["note:old:n1", "note:old:n2", "note:new:n1"]
+        assert [n["id"] for n in note_catalog.list_notes(tag="#ai")] == ["note:old:n1", "note:old:n2"]
+        assert [n["id"] for n in note_catalog.list_notes(scored=False)] == ["note:new:n1", "note:old:n2"]
+        assert [n["id"] for n in note_catalog.list_notes(min_score=4)] == ["note:old:n1"]
+        assert [n["id"] for n in note_catalog.list_notes(offset=1, limit=1)] == ["note:old:n1"]
+        assert [
+            n["id"] for offset in range(2)
+            for n in note_catalog.list_notes(scored=False, oldest_first=True, offset=offset, limit=1)
+        ] == ["note:old:n2", "note:new:n1"]
+        assert [n["id"] for n in note_catalog.list_notes(conversation_id="old", tag="#transformers")] == ["note:old:n1"]
+        assert note_catalog.list_notes(modes=("council",)) == []
+
+    def test_only_changed_conversations_are_reparsed(self, conversations):
+        note_catalog.refresh_note_catalog()
+
+        updated = make_conversation("new", "2025-02-01T00:00:00", [
+            {"id": "n1", "title": "Retrieval", "body": "RAG", "tags": ["#rag"], "quality": {"score": 5}},
+        ])
+        conversations(updated)
+        os.remove(os.path.join(storage.DATA_DIR, "chat.json"))
+
+        with patch.object(storage, "get_conversation", wraps=storage.get_conversation) as get_conversation:
+            assert note_catalog.get_note("note:new:n1")["score"] == 5
+            note_catalog.list_notes()
+
+        assert [call.args[0] for call in get_conversation.call_args_list] == ["new"]
+
+    def test_persisted_catalog_is_reused(self, conversations):
+        note_catalog.refresh_note_catalog()
+        assert os.path.exists(note_catalog.get_note_catalog_path())
+
+        # A fresh process loads the catalog instead of parsing conversations
+        note_catalog._catalog_cache.update(path=None, state=None, index=None)
+        with patch.object(storage, "get_conversation") as get_conversation:
+            assert len(note_catalog.list_notes()) == 3
+        get_conversation.assert_not_called()
@@ -5,6 +5,7 @@ Run with:
     uv run pytest backend/tests/test_podcast_discovery.py -v
 """
 
+import json
 import pytest
 import sys
 from pathlib import Path
@@ -14,11 +15,28 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 
+@pytest.fixture
+def save_conversations(tmp_path, monkeypatch):
+    """Store conversations where the note catalog reads them."""
+    from backend import knowledge_graph, storage
+
+    data_dir = tmp_path / "conversations"
+    data_dir.mkdir()
+    monkeypatch.setattr(storage, "DATA_DIR", str(data_dir))
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path / "knowledge_graph"))
+
+    def save(*conversations):
+        for conversation in conversations:
+            (data_dir / f"{conversation['id']}.json").write_text(json.dumps(conversation))
+
+    return save
+
+
 class TestDiscoverRelevantNotes:
     """Tests for the discover_relevant_notes function."""
 
     @pytest.mark.asyncio
-    async def test_discover_notes_by_topic(self):
+    async def test_discover_notes_by_topic(self, save_conversations):
         """Finds relevant notes from knowledge graph based on topic."""
         from backend.podcast import discover_relevant_notes
 
@@ -87,15 +105,9 @@ class TestDiscoverRelevantNotes:
             ]
         }
 
-        def get_conv_side_effect(conv_id):
-            if conv_id == "conv-1":
-                return mock_conversation_1
-            elif conv_id == "conv-2":
-                return mock_conversation_2
-            return None
+        save_conversations(mock_conversation_1, mock_conversation_2)
 
-        with patch('backend.search.search', return_value=mock_search_results) as mock_search, \
-             patch('backend.storage.get_conversation', side_effect=get_conv_side_effect):
+        with patch('backend.search.search', return_value=mock_search_results) as mock_search:
 
             # Call the function
             result = await discover_relevant_notes("artificial intelligence", limit=10)
@@ -109,7 +121,7 @@ class TestDiscoverRelevantNotes:
             assert result[1]["title"] == "Gradient Descent"
 
     @pytest.mark.asyncio
-    async def test_discover_notes_returns_full_content(self):
+    async def test_discover_notes_returns_full_content(self, save_conversations):
         """Returns note body, not just metadata."""
         from backend.podcast import discover_relevant_notes
 
@@ -143,8 +155,9 @@ class TestDiscoverRelevantNotes:
             ]
         }
 
-        with patch('backend.search.search', return_value=mock_search_results), \
-             patch('backend.storage.get_conversation', return_value=mock_conversation):
+        save_conversations(mock_conversation)
+
+        with patch('backend.search.search', return_value=mock_search_results):
 
             result = await discover_relevant_notes("test topic", limit=10)
 
@@ -162,7 +175,7 @@ class TestDiscoverRelevantNotes:
             assert note["similarity"] == 0.95
 
     @pytest.mark.asyncio
-    async def test_discover_notes_respects_limit(self):
+    async def test_discover_notes_respects_limit(self, save_conversations):
         """Limits results to requested count."""
         from backend.podcast import discover_relevant_notes
 
@@ -198,8 +211,9 @@ class TestDiscoverRelevantNotes:
                 ]
             }
 
-        with patch('backend.search.search', return_value=mock_search_results), \
-             patch('backend.storage.get_conversation', side_effect=make_mock_conversation):
+        save_conversations(*(make_mock_conversation(r["id"]) for r in mock_search_results))
+
+        with patch('backend.search.search', return_value=mock_search_results):
 
             # Request only 3 results
             result = await discover_relevant_notes("test topic", limit=3)
@@ -228,7 +242,7 @@ class TestDiscoverRelevantNotes:
             assert result == []
 
     @pytest.mark.asyncio
-    async def test_discover_notes_filters_non_synthesizer(self):
+    async def test_discover_notes_filters_non_synthesizer(self, save_conversations):
         """Filters out non-synthesizer conversations."""
         from backend.podcast import discover_relevant_notes
 
@@ -275,8 +289,9 @@ class TestDiscoverRelevantNotes:
             ]
         }
 
-        with patch('backend.search.search', return_value=mock_search_results), \
-             patch('backend.storage.get_conversation', return_value=mock_conversation):
+        save_conversations(mock_conversation)
+
+        with patch('backend.search.search', return_value=mock_search_results):
 
             result = await discover_relevant_notes("test", limit=10)
 
@@ -285,7 +300,7 @@ class TestDiscoverRelevantNotes:
             assert result[0]["conversation_id"] == "synth-conv"
 
     @pytest.mark.asyncio
-    async def test_discover_notes_multiple_notes_per_conversation(self):
+    async def test_discover_notes_multiple_notes_per_conversation(self, save_conversations):
         """Handles conversations with multiple notes."""
         from backend.podcast import discover_relevant_notes
 
@@ -330,8 +345,9 @@ class TestDiscoverRelevantNotes:
             ]
         }
 
-        with patch('backend.search.search', return_value=mock_search_results), \
-             patch('backend.storage.get_conversation', return_value=mock_conversation):
+        save_conversations(mock_conversation)
+
+        with patch('backend.search.search', return_value=mock_search_results):
 
             result = await discover_relevant_notes("test", limit=10)
 
@@ -0,0 +1,132 @@
+"""Tests for incrementally maintained quality and feedback counters."""
+
+import pytest
+
+from backend import graph_feedback, graph_quality, knowledge_graph, quality_counters
+from backend.knowledge_graph import entity_transaction, load_entities
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path / "knowledge_graph"))
+    monkeypatch.setattr(graph_feedback, "FEEDBACK_DIR", str(tmp_path / "feedback"))
+    monkeypatch.setattr(graph_feedback, "_counters_cache", {"directory": None, "offsets": None, "counters": None})
+    monkeypatch.setattr(graph_quality, "_rebuilt_counters", {"key": None, "counters": None})
+
+    with entity_transaction() as txn:
+        for i, entity_type in enumerate(["person", "concept", "concept"]):
+            txn.data["entities"][f"e{i}"] = {
+                "id": f"e{i}",
+                "name": f"Entity {i}",
+                "type": entity_type,
+                "mentions": [],
+                "provenance": {"source": "extraction", "extraction_model": "openai/gpt-4o", "extraction_confidence": 0.6 + 0.1 * i},
+            }
+        txn.data["entity_relationships"].append({
+            "id": "r1", "source_entity_id": "e0", "target_entity_id": "e1", "type": "mentions",
+        })
+    return tmp_path
+
+
+def make_changes():
+    graph_quality.validate_entity("e0", "validate")
+    graph_quality.validate_entity("e1", "correct", correction={"name": "Entity One", "type": "technology"})
+    graph_quality.validate_entity("e2", "reject", reason="too generic")
+    graph_quality.add_manual_entity("c1:n1", "Manual", "event", context="added by hand")
+    graph_quality.validate_relationship("r1", "correct_type", new_type="uses")
+    knowledge_graph.add_entity_relationship({
+        "id": "r2", "source_entity_id": "e0", "target_entity_id": "e2", "type": "knows",
+    })
+    knowledge_graph.delete_entity_relationship("r1")
+
+
+class TestQualityCounters:
+    """Tests for the entity store counters."""
+
+    def test_incremental_updates_match_full_rebuild(self, stores):
+        make_changes()
+
+        data = load_entities()
+        assert quality_counters.is_current(data)
+        stored = data[quality_counters.COUNTERS_KEY]
+        assert quality_counters.counter_drift(stored, quality_counters.compute_counters(data)) == {}
+
+        metrics = graph_quality.get_quality_metrics()
+        assert metrics["entities"] == {
+            "total": 4, "extracted": 0, "validated": 2, "corrected": 1, "rejected": 1, "manual": 1,
+        }
+        assert metrics["relationships"]["total"] == 1
+        assert metrics["relationship_types"] == {"knows": 1}
+        assert metrics["entity_types"] == {"person": 1, "technology": 1, "concept": 1, "event": 1}
+
+        provenance = graph_quality.get_provenance_stats()
+        assert provenance["by_source"] == {"extraction": 3, "manual": 1}
+        assert provenance["by_model"] == {"gpt-4o": 3}
+        assert provenance["by_validator"] == {"user": 4}
+
+    def test_untracked_writes_are_rebuilt(self, stores):
+        graph_quality.validate_entity("e0", "validate")
+
+        # A write that does not maintain the counters leaves them stale
+        with entity_transaction() as txn:
+            del txn.data["entities"]["e2"]
+
+        assert not quality_counters.is_current(load_entities())
+        assert graph_quality.get_quality_metrics()["entities"]["total"] == 2
+
+        # The next tracked write rebuilds them before applying its change
+        graph_quality.validate_entity("e1", "validate")
+        data = load_entities()
+        assert quality_counters.is_current(data)
+        assert data[quality_counters.COUNTERS_KEY]["entities"]["status"] == {"validated": 2}
+
+    def test_merges_and_normalization_keep_counters_current(self, stores):
+        graph_quality.add_manual_entity("c1:n1", "Entity", "concept")
+        knowledge_graph.merge_entities("e1", ["e2"])
+        assert quality_counters.is_current(load_entities())
+
+        assert knowledge_graph.run_hierarchical_normalization()["new_relationships_created"] == 3
+        data = load_entities()
+        assert quality_counters.is_current(data)
+        stored = data[quality_counters.COUNTERS_KEY]
+        assert quality_counters.counter_drift(stored, quality_counters.compute_counters(data)) == {}
+        assert stored["relationships"]["types"] == {"mentions": 1, "specialization_of": 3}
+
+    def test_consistency_check_reports_and_repairs_drift(self, stores):
+        graph_quality.validate_entity("e0", "validate")
+        with entity_transaction() as txn:
+            txn.data[quality_counters.COUNTERS_KEY]["entities"]["types"]["person"] = 7
+            txn.data[quality_counters.COUNTERS_KEY]["version"] += 1
+
+        result = graph_quality.check_quality_counters()
+        assert not result["stale"]
+        assert result["drift"] == {"entities.types.person": {"stored": 7, "actual": 1}}
+        assert result["repaired"]
+
+        assert graph_quality.check_quality_counters() == {"stale": False, "drift": {}, "repaired": False}
+
+
+class TestFeedbackCounters:
+    """Tests for the feedback counters."""
+
+    def test_dashboard_reads_match_rebuild_from_records(self, stores):
+        make_changes()
+        graph_feedback.record_curation_decision("dup_a_b", "same", "accept", "A", "B", agent_confidence=0.9)
+        graph_feedback.record_curation_decision("dup_c_d", "related", "dismiss", "C", "D", override_reason="different")
+
+        counters = graph_feedback.get_feedback_counters()
+        assert counters == graph_feedback.compute_feedback_counters()
+        assert counters["records"] == {"entity_corrections": 3, "relationship_corrections": 1, "decision_outcomes": 2}
+
+        patterns = graph_feedback.analyze_correction_patterns()
+        assert patterns["entity_corrections"]["concept"]["reject"] == 1
+        assert patterns["entity_corrections"]["concept"]["common_rejections"] == {"too generic": 1}
+        assert patterns["relationship_corrections"]["type_corrected"] == 1
+        assert patterns["total_corrections"] == 4
+
+        agent = graph_feedback.analyze_agent_accuracy()
+        assert agent["agreement_rate"] == 0.5
+        assert agent["common_override_reasons"] == {"different": 1}
+
+        assert graph_feedback.get_feedback_dashboard()["total_feedback"] == 6
+        assert graph_feedback.check_feedback_counters()["drift"] == {}
@@ -0,0 +1,103 @@
+"""Tests for embedding-first graph RAG retrieval."""
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from backend import graph_rag, rag_retrieval
+from backend.graph_index import GraphIndex
+from backend.rag_retrieval import mmr_select, retrieve_notes
+
+
+GRAPH = {
+    "nodes": [
+        {"id": "source:c1", "type": "source", "title": "Paper"},
+        {"id": "note:c1:a", "type": "note", "title": "A", "body": "alpha", "sourceId": "source:c1"},
+        {"id": "note:c1:b", "type": "note", "title": "B", "body": "beta", "sourceId": "source:c1"},
+        {"id": "note:c1:c", "type": "note", "title": "C", "body": "gamma", "sourceId": "source:c1"},
+        {"id": "note:c1:d", "type": "note", "title": "D", "body": "delta", "sourceId": "source:c1"},
+        {"id": "entity:rag", "type": "entity", "name": "RAG"},
+    ],
+    "links": [{"source": "note:c1:d", "target": "entity:rag", "type": "mentions"}],
+    "stats": {},
+}
+
+# a and b are near-duplicates; c is less similar but distinct; d is unrelated
+NOTE_IDS = ["note:c1:a", "note:c1:b", "note:c1:c", "note:c1:d"]
+MATRIX = np.asarray([[1.0, 0.0, 0.0], [0.99, 0.14, 0.0], [0.6, 0.0, 0.8], [0.0, 1.0, 0.0]], dtype=np.float32)
+MATRIX /= np.linalg.norm(MATRIX, axis=1, keepdims=True)
+QUERY = np.asarray([1.0, 0.0, 0.3], dtype=np.float32)
+QUERY /= np.linalg.norm(QUERY)
+
+SETTINGS = {
+    "similarity_weight": 0.7, "mention_weight": 0.3,
+    "retrieval_top_k": 2, "retrieval_budget_ms": 10_000,
+}
+
+
+@pytest.fixture
+def store():
+    model = MagicMock()
+    model.embed.return_value = [QUERY]
+    entities = {"entities": {"rag": {"name": "RAG"}}}
+    rows = {node_id: i for i, node_id in enumerate(NOTE_IDS)}
+    with patch.object(rag_retrieval.graph_search, "get_node_vectors", return_value=(NOTE_IDS, rows, MATRIX)), \
+         patch.object(rag_retrieval.graph_search, "get_model", return_value=model), \
+         patch.object(rag_retrieval.graph_index, "get_graph_index", return_value=(GraphIndex(GRAPH, []), 1)), \
+         patch.object(rag_retrieval, "get_indexed_entities", return_value=(entities, None)), \
+         patch.object(rag_retrieval, "get_kg_chat_settings", return_value=SETTINGS):
+        yield
+
+
+class TestMMR:
+    """Tests for maximal marginal relevance selection."""
+
+    def test_prefers_distinct_candidate_over_near_duplicate(self):
+        relevance = MATRIX[:3] @ QUERY
+
+        assert mmr_select(relevance, MATRIX[:3], 2, lambda_=1.0) == [0, 1]
+        assert mmr_select(relevance, MATRIX[:3], 2, lambda_=0.5) == [0, 2]
+
+
+class TestRetrieveNotes:
+    """Tests for the retrieval pipeline."""
+
+    def test_vector_search_with_diversification(self, store):
+        results = retrieve_notes("what is alpha", top_k=2)
+
+        assert [r["node"]["id"] for r in results] == ["note:c1:a", "note:c1:c"]
+        assert results[0]["note_key"] == "c1:a"
+
+    def test_entity_mentions_boost_notes(self, store):
+        results = retrieve_notes("how does RAG relate to alpha", top_k=4)
+
+        scores = {r["node"]["id"]: r["score"] for r in results}
+        assert scores["note:c1:d"] == pytest.approx(0.1, abs=1e-3)
+
+    def test_note_content_comes_from_graph(self, store):
+        notes = rag_retrieval.get_note_content(retrieve_notes("alpha", top_k=1))
+
+        assert notes == [{
+            "id": "note:c1:a", "title": "A", "tags": [], "body": "alpha",
+            "source_title": "Paper", "conversation_id": "c1", "score": pytest.approx(0.7 * QUERY[0], abs=1e-3),
+        }]
+
+
+class TestEmptyIndex:
+    """Tests for retrieval before any notes are embedded."""
+
+    def test_falls_back_to_keyword_matching(self):
+        empty = ([], {}, np.zeros((0, 0), dtype=np.float32))
+        keyword = [{"node": GRAPH["nodes"][1], "score": 1.0, "note_key": "c1:a"}]
+        with patch.object(rag_retrieval.graph_search, "get_node_vectors", return_value=empty), \
+             patch.object(graph_rag, "get_indexed_entities", return_value=({"entities": {}}, None)), \
+             patch.object(graph_rag.graph_sync, "get_versioned_graph", return_value=(GRAPH, 1)), \
+             patch.object(graph_rag, "find_relevant_notes", return_value=keyword) as find, \
+             patch.object(graph_rag, "get_full_note_content", return_value=[]) as content, \
+             patch("backend.settings.load_settings", return_value={}):
+            with pytest.raises(LookupError):
+                retrieve_notes("alpha")
+            graph_rag.prepare_rag_turn("alpha")
+
+        find.assert_called_once()
+        content.assert_called_once_with(keyword)
@@ -0,0 +1,95 @@
+"""Tests for the indexed relationship store."""
+
+import json
+import pytest
+
+from backend import knowledge_graph
+from backend.relationship_index import (
+    RelationshipIndex,
+    compact_relationships,
+    expand_relationships,
+)
+
+
+def make_rel(rel_id, source, target, rel_type="uses", **extra):
+    return {
+        "id": rel_id,
+        "source_entity_id": source,
+        "target_entity_id": target,
+        "source_entity_name": source.upper(),
+        "target_entity_name": target.upper(),
+        "type": rel_type,
+        "bidirectional": False,
+        "source_note": "note:conv-1:n1",
+        **extra,
+    }
+
+
+@pytest.fixture
+def kg_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestRelationshipIndex:
+    """Tests for RelationshipIndex lookups."""
+
+    def test_add_skips_duplicate_keys(self):
+        rels = [make_rel("r1", "a", "b")]
+        index = RelationshipIndex(rels)
+
+        assert index.contains("a", "b", "uses")
+        assert not index.add(make_rel("r2", "a", "b"))
+        assert index.add(make_rel("r3", "a", "b", rel_type="part_of"))
+        assert [r["id"] for r in rels] == ["r1", "r3"]
+        assert index.get("r3") is rels[1]
+
+    def test_for_entities_dedupes_in_storage_order(self):
+        rels = [make_rel("r1", "b", "c"), make_rel("r2", "a", "b"), make_rel("r3", "x", "y")]
+        index = RelationshipIndex(rels)
+
+        assert [r["id"] for r in index.for_entity("b")] == ["r1", "r2"]
+        assert [r["id"] for r in index.for_entities(["a", "b", "c"])] == ["r1", "r2"]
+
+
+class TestCompactStorage:
+    """Tests for compact relationship persistence."""
+
+    def test_round_trip_preserves_optional_fields(self):
+        rels = [make_rel("r1", "a", "b"), make_rel("r2", "a", "c", auto_generated=True)]
+        restored = expand_relationships(compact_relationships(rels))
+
+        assert restored == rels
+
+    def test_save_writes_compact_and_load_expands(self, kg_dir):
+        data = knowledge_graph.load_entities()
+        data["entity_relationships"] = [make_rel("r1", "a", "b")]
+        knowledge_graph.save_entities(data)
+
+        raw = json.loads((kg_dir / "entities.json").read_text())
+        assert "entity_relationships" not in raw
+        assert raw["entity_relationships_compact"]["rows"][0][0] == "r1"
+        assert data["entity_relationships"][0]["id"] == "r1"
+        assert knowledge_graph.load_entities()["entity_relationships"] == data["entity_relationships"]
+
+    def test_loads_legacy_list_format(self, kg_dir):
+        legacy = {
+            "entities": {},
+            "note_entities": {},
+            "entity_relationships": [make_rel("r1", "a", "b")],
+            "processed_conversations": [],
+        }
+        (kg_dir / "entities.json").write_text(json.dumps(legacy))
+
+        assert knowledge_graph.load_entities()["entity_relationships"][0]["id"] == "r1"
+
+    def test_indexed_entities_refresh_after_save(self, kg_dir):
+        data = knowledge_graph.load_entities()
+        knowledge_graph.save_entities(data)
+        _, index = knowledge_graph.get_indexed_entities()
+        assert len(index) == 0
+
+        data["entity_relationships"].append(make_rel("r1", "a", "b"))
+        knowledge_graph.save_entities(data)
+        _, index = knowledge_graph.get_indexed_entities()
+        assert index.contains("a", "b", "uses")
@@ -0,0 +1,234 @@
+"""Tests for the sleep compute scheduler, checkpoints, resume and branch expansion."""
+
+import asyncio
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend import graph_index, knowledge_discovery, note_catalog, sleep_compute, sleep_scheduler
+
+
+NOTES = {
+    f"note:c{i}:n1": {
+        "id": f"note:c{i}:n1", "title": f"Note {i}", "body": "Body", "tags": [],
+        "conversation_id": f"c{i}", "conversation_title": f"Source {i}",
+    }
+    for i in range(3)
+}
+
+
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    monkeypatch.setattr(sleep_compute, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    monkeypatch.setattr(knowledge_discovery, "KNOWLEDGE_GRAPH_DIR", str(tmp_path))
+    monkeypatch.setattr(sleep_compute, "_session_states", {})
+    monkeypatch.setattr(sleep_scheduler, "_running", {})
+    monkeypatch.setattr(sleep_compute, "get_style", lambda style_id: {"id": style_id, "enabled": True})
+    monkeypatch.setattr(sleep_compute.discovery_candidates, "mine_candidate_pairs", lambda notes: [])
+    monkeypatch.setattr(sleep_compute.graph_search, "sync_kg_index", AsyncMock())
+    monkeypatch.setattr(note_catalog, "get_note", lambda note_id: NOTES.get(note_id))
+    monkeypatch.setattr(graph_index, "get_graph_index", lambda: (graph_index.GraphIndex({"nodes": []}, []), 1))
+    monkeypatch.setattr(
+        sleep_compute, "_collect_notes_for_session",
+        lambda *args, **kwargs: [sleep_compute._session_note(note) for note in NOTES.values()],
+    )
+    return tmp_path
+
+
+def turn(turn_number):
+    return {
+        "turn_number": turn_number,
+        "ideas": [{"bridge_title": f"Idea {turn_number}", "note_ids": ["note:c0:n1", "note:c1:n1"]}],
+    }
+
+
+class TestScheduling:
+    """Tests for picking queued sessions."""
+
+    def test_idle_window_wraps_midnight(self):
+        assert sleep_scheduler.in_idle_window(datetime(2025, 1, 1, 23, 30), "22:00", "06:00")
+        assert sleep_scheduler.in_idle_window(datetime(2025, 1, 1, 5, 59), "22:00", "06:00")
+        assert not sleep_scheduler.in_idle_window(datetime(2025, 1, 1, 12, 0), "22:00", "06:00")
+        assert sleep_scheduler.in_idle_window(datetime(2025, 1, 1, 2, 0), "01:00", "06:00")
+
+    def test_priority_idle_window_and_concurrency(self, sessions):
+        low = sleep_compute.create_sleep_session("p", "s", priority=0)["session_id"]
+        high = sleep_compute.create_sleep_session("p", "s", priority=5)["session_id"]
+        overnight = sleep_compute.create_sleep_session("p", "s", priority=9, schedule="idle")["session_id"]
+        assert "error" in sleep_compute.create_sleep_session("p", "s", schedule="later")
+
+        sleep_compute.update_sleep_compute_settings({"max_concurrent_sessions": 2})
+        with pytest.raises(ValueError):
+            sleep_compute.update_sleep_compute_settings({"idle_window_start": "25:00"})
+        settings = sleep_compute.get_sleep_compute_settings()
+        data = sleep_compute.load_sessions()
+
+        assert sleep_scheduler.select_sessions(data, settings, datetime(2025, 1, 1, 12, 0)) == [high, low]
+        assert sleep_scheduler.select_sessions(data, settings, datetime(2025, 1, 1, 3, 0)) == [overnight, high]
+
+        sleep_scheduler._running[high] = None
+        assert sleep_scheduler.select_sessions(data, settings, datetime(2025, 1, 1, 12, 0)) == [low]
+
+    async def test_dispatch_runs_queued_sessions(self, sessions):
+        session_id = sleep_compute.create_sleep_session("p", "s")["session_id"]
+
+        with patch.object(sleep_compute, "run_sleep_compute", AsyncMock()) as run:
+            assert sleep_scheduler.dispatch() == [session_id]
+            await sleep_scheduler._running[session_id]
+
+        run.assert_awaited_once_with(session_id)
+        assert sleep_scheduler._running == {}
+
+
+class TestCheckpoints:
+    """Tests for per-turn checkpoints and resuming after an interruption."""
+
+    async def test_interrupted_session_resumes_from_checkpoint(self, sessions):
+        session_id = sleep_compute.create_sleep_session("p", "s", turns=3)["session_id"]
+
+        # The process dies during turn 2
+        execute = AsyncMock(side_effect=[turn(1), KeyboardInterrupt()])
+        with patch.object(sleep_compute, "_execute_turn", execute), pytest.raises(KeyboardInterrupt):
+            await sleep_compute.run_sleep_compute(session_id)
+
+        session = sleep_compute.get_session(session_id)
+        assert session["status"] == "running"
+        assert session["checkpoint"]["completed_turns"] == 1
+        assert session["checkpoint"]["note_ids"] == list(NOTES)
+        assert [idea["bridge_title"] for idea in session["checkpoint"]["ideas"]] == ["Idea 1"]
+
+        # On restart it is queued again and continues with turn 2
+        assert sleep_scheduler.recover_interrupted_sessions() == [session_id]
+        execute = AsyncMock(side_effect=lambda **kwargs: turn(kwargs["turn_number"]))
+        with patch.object(sleep_compute, "_execute_turn", execute), \
+                patch.object(sleep_compute, "_collect_notes_for_session") as collect:
+            result = await sleep_compute.run_sleep_compute(session_id)
+
+        collect.assert_not_called()
+        assert [call.kwargs["turn_number"] for call in execute.call_args_list] == [2, 3]
+        assert result["status"] == "completed"
+        assert result["turns_completed"] == 3
+
+        session = sleep_compute.get_session(session_id)
+        assert session["status"] == "completed"
+        assert session["interruptions"] == 1
+        suggestion_ids = [s["id"] for s in session["checkpoint"]["bridge_suggestions"]]
+        assert [d["id"] for d in knowledge_discovery.load_discoveries()["discoveries"]] == suggestion_ids
+
+    async def test_cancelled_session_is_not_run(self, sessions):
+        session_id = sleep_compute.create_sleep_session("p", "s")["session_id"]
+        assert sleep_compute.cancel_sleep_compute(session_id) == {"status": "cancelled"}
+
+        with patch.object(sleep_compute, "_execute_turn", AsyncMock()) as execute:
+            result = await sleep_compute.run_sleep_compute(session_id)
+
+        assert result["status"] == "cancelled"
+        execute.assert_not_called()
+        assert sleep_compute.get_sleep_compute_status()["queued_sessions"] == []
+
+
+STYLE = {"id": "s", "initial_prompt": "Notes: {notes_content}", "expansion_prompt": "Expand {idea}"}
+
+
+def fake_model(delays, tokens=10):
+    """query_model stand-in: answers each branch after its delay, tracking calls in flight."""
+    calls = {"in_flight": 0, "max_in_flight": 0}
+
+    async def query(model, messages, timeout=None):
+        title = json.loads(messages[0]["content"][len("Expand "):])[0]["bridge_title"]
+        calls["in_flight"] += 1
+        calls["max_in_flight"] = max(calls["max_in_flight"], calls["in_flight"])
+        await asyncio.sleep(delays.get(title, 0))
+        calls["in_flight"] -= 1
+        content = json.dumps([{"bridge_title": f"{title}/a"}, {"bridge_title": f"{title}/b"}])
+        return {"content": content, "usage": {"total_tokens": tokens}}
+
+    return query, calls
+
+
+class TestBranchExpansion:
+    """Tests for branch-parallel expansion turns."""
+
+    async def test_branches_merge_in_branch_order_and_stream(self, sessions, monkeypatch):
+        query, calls = fake_model({"A": 0.03, "B": 0.0, "C": 0.01})
+        monkeypatch.setattr(sleep_compute, "query_model", query)
+        session = {"config": {}, "generation_ids": []}
+        partials = []
+
+        result = await sleep_compute._execute_branch_turn(
+            session, 2, STYLE, [], [{"bridge_title": t} for t in "ABC"], "m",
+            concurrency=2, on_progress=lambda turn: partials.append([i["bridge_title"] for i in turn["ideas"]]),
+        )
+
+        assert [idea["bridge_title"] for idea in result["ideas"]] == ["A/a", "A/b", "B/a", "B/b", "C/a", "C/b"]
+        assert [idea["branch"] for idea in result["ideas"]] == [0, 0, 1, 1, 2, 2]
+        assert partials[0] == ["B/a", "B/b"]
+        assert partials[-1] == [idea["bridge_title"] for idea in result["ideas"]]
+        assert calls["max_in_flight"] == 2
+        assert session["total_tokens"] == 30
+
+    async def test_budget_stops_branches_and_turns(self, sessions, monkeypatch):
+        query, _ = fake_model({})
+        monkeypatch.setattr(sleep_compute, "query_model", query)
+        session = {"config": {"max_tokens": 15}, "generation_ids": []}
+
+        result = await sleep_compute._execute_branch_turn(
+            session, 2, STYLE, [], [{"bridge_title": t} for t in "ABC"], "m", concurrency=1,
+        )
+        assert [b["status"] for b in result["branches"]] == ["completed", "completed", "skipped"]
+
+        # A session whose first turn spends the budget goes straight to synthesis
+        monkeypatch.setattr(sleep_compute, "get_style", lambda style_id: STYLE)
+        session_id = sleep_compute.create_sleep_session("p", "s", turns=3, parallel_branches=True, max_tokens=10)["session_id"]
+        first_turn = AsyncMock(return_value=turn(1))
+
+        async def spend_budget(**kwargs):
+            kwargs["session"]["total_tokens"] = 10
+            return await first_turn(**kwargs)
+
+        with patch.object(sleep_compute, "_execute_turn", spend_budget):
+            result = await sleep_compute.run_sleep_compute(session_id)
+
+        session = sleep_compute.get_session(session_id)
+        assert result["status"] == "completed"
+        assert session["budget_exhausted"]
+        assert len(session["turns"]) == 1
+
+    async def test_failing_branch_does_not_stop_or_outlive_the_others(self, sessions, monkeypatch):
+        query, _ = fake_model({"A": 0.01, "C": 0.01})
+
+        async def flaky(model, messages, timeout=None):
+            if '"B"' in messages[0]["content"]:
+                raise ValueError("unparseable")
+            return await query(model, messages, timeout)
+
+        monkeypatch.setattr(sleep_compute, "query_model", flaky)
+        branches = [{"bridge_title": t} for t in "ABC"]
+
+        result = await sleep_compute._execute_branch_turn({"config": {}, "generation_ids": []}, 2, STYLE, [], branches, "m")
+        assert [b["status"] for b in result["branches"]] == ["completed", "failed", "completed"]
+        assert result["branches"][1]["error"] == "unparseable"
+        assert [idea["bridge_title"] for idea in result["ideas"]] == ["A/a", "A/b", "C/a", "C/b"]
+
+        # An error escaping the turn cancels the branches still in flight
+        finished = []
+
+        async def tracked(model, messages, timeout=None):
+            response = await query(model, messages, timeout)
+            finished.append(response["content"])
+            return response
+
+        monkeypatch.setattr(sleep_compute, "query_model", tracked)
+
+        def fail(turn):
+            raise RuntimeError("save failed")
+
+        with pytest.raises(RuntimeError):
+            await sleep_compute._execute_branch_turn(
+                {"config": {}, "generation_ids": []}, 2, STYLE, [],
+                [{"bridge_title": "B"}, {"bridge_title": "A"}], "m", on_progress=fail,
+            )
+        await asyncio.sleep(0.03)
+        assert len(finished) == 1
@@ -0,0 +1,88 @@
+"""Tests for the compact columnar wire format."""
+
+import gzip
+import json
+from unittest.mock import MagicMock
+
+from backend import wire_format
+from backend.wire_format import (
+    StringTable,
+    decode_columnar,
+    encode_columnar,
+    encode_graph,
+)
+
+
+def make_request(accept="", accept_encoding=""):
+    request = MagicMock()
+    request.headers = {"accept": accept, "accept-encoding": accept_encoding}
+    return request
+
+
+GRAPH = {
+    "version": 3,
+    "nodes": [
+        {"id": "source:c1", "type": "source", "title": "Src", "sourceType": "article"},
+        {"id": "note:c1:a", "type": "note", "title": "A", "tags": ["ai", "rag"], "body": "long", "sourceId": "source:c1"},
+        {"id": "entity:x", "type": "entity", "name": "X", "entityType": "concept", "mentionCount": 2},
+    ],
+    "links": [{"source": "note:c1:a", "target": "entity:x", "type": "mentions"}],
+}
+
+
+class TestColumnarEncoding:
+    """Tests for encode/decode round trips."""
+
+    def test_round_trip_with_interning(self):
+        table = StringTable()
+        records = [{"type": "note", "tags": ["ai"], "n": 1}, {"type": "note", "tags": ["ai", "ml"]}]
+        encoded = encode_columnar(records, table, interned=("type", "tags"))
+
+        assert encoded["columns"]["type"] == [0, 0]
+        assert table.strings == ["note", "ai", "ml"]
+        assert decode_columnar(encoded, table.strings) == records
+
+    def test_non_string_values_in_interned_fields_are_sent_raw(self):
+        table = StringTable()
+        records = [{"type": "shared_tag", "value": "ai"}, {"type": "similar", "value": 3}, {"type": "similar", "value": 0.8}]
+        encoded = encode_columnar(records, table, interned=("type", "value"))
+
+        assert encoded["interned"] == ["type"]
+        assert encoded["columns"]["value"] == ["ai", 3, 0.8]
+        assert decode_columnar(encoded, table.strings) == records
+
+    def test_graph_shares_strings_and_omits_bodies(self):
+        encoded = encode_graph(GRAPH)
+        strings = encoded["strings"]
+        nodes = decode_columnar(encoded["nodes"], strings)
+        links = decode_columnar(encoded["links"], strings)
+
+        assert encoded["version"] == 3
+        assert "body" not in encoded["nodes"]["columns"]
+        assert nodes[1] == {k: v for k, v in GRAPH["nodes"][1].items() if k != "body"}
+        assert links == GRAPH["links"]
+        assert encoded["links"]["columns"]["source"][0] == encoded["nodes"]["columns"]["id"][1]
+
+        with_bodies = encode_graph(GRAPH, include_bodies=True)
+        assert decode_columnar(with_bodies["nodes"], with_bodies["strings"])[1]["body"] == "long"
+
+
+class TestNegotiation:
+    """Tests for format negotiation and compressed responses."""
+
+    def test_negotiates_from_param_and_accept_header(self):
+        assert wire_format.negotiate_format(make_request(), None) is None
+        assert wire_format.negotiate_format(make_request(), "compact") == "compact"
+        accept = wire_format.COMPACT_JSON_MEDIA_TYPE
+        assert wire_format.negotiate_format(make_request(accept=accept), None) == "compact"
+        assert wire_format.negotiate_format(make_request(), "msgpack") in ("msgpack", "compact")
+
+    def test_gzip_compressed_compact_json(self):
+        payload = wire_format.encode_records([{"type": "note", "title": "t" * 50}] * 100, interned=("type",))
+        response = wire_format.compact_response(
+            payload, make_request(accept_encoding="gzip, deflate"), "compact", headers={"ETag": '"kg-1"'}
+        )
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == '"kg-1"'
+        assert json.loads(gzip.decompress(response.body)) == payload
@@ -3,6 +3,7 @@
 from typing import List, Dict, Any, Optional
 from .openrouter import query_model
 from .storage import get_conversation, get_comments
+from .context_packer import ContextItem, context_budget, pack_context
 
 
 def _collect_all_comments(conversation: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -31,67 +32,83 @@ def _collect_all_comments(conversation: Dict[str, Any]) -> List[Dict[str, Any]]:
 def compile_context_from_comments(
     conversation: Dict[str, Any],
     comment_ids: List[str],
-    context_segments: Optional[List[Dict[str, Any]]] = None
+    context_segments: Optional[List[Dict[str, Any]]] = None,
+    model: Optional[str] = None,
+    question: Optional[str] = None
 ) -> str:
     """
     Compile context from comments and optional manual segments into a formatted string.
 
+    The result is kept within a token budget for the model: comments are
+    packed first, and pinned segments that do not fit whole are cut to
+    their most relevant sentences.
+
     Args:
         conversation: The conversation dict
         comment_ids: List of comment IDs to include
         context_segments: Optional list of manually added segments
+        model: Model the context is for (sets the token budget)
+        question: Optional question, used to choose segment excerpts
 
     Returns:
         Formatted context string
     """
-    context_parts: List[str] = []
-
     all_comments = _collect_all_comments(conversation)
     relevant_comments = [c for c in all_comments if c["id"] in comment_ids]
 
-    if relevant_comments:
+    comment_items = []
+    for comment in relevant_comments:
+        # Detect source type - check for note_id as fallback
+        source_type = comment.get("source_type") or ("synthesizer" if comment.get("note_id") else "council")
+        selection = comment["selection"]
+        content = comment["content"]
+
+        if source_type == "council":
+            stage = comment.get("stage")
+            model_name = comment.get("model")
+            origin = f"\nStage {stage} response from {model_name}:"
+        else:  # synthesizer
+            note_title = comment.get("note_title", "Note")
+            origin = f"\nFrom note '{note_title}':"
+
+        # Comments are short and were explicitly chosen, so they are packed first and never trimmed
+        comment_items.append(ContextItem(
+            f'{origin}\nSelected text: "{selection}"\nUser comment: {content}\n', score=2.0
+        ))
+
+    segment_items = []
+    for i, segment in enumerate(context_segments or []):
+        # Detect source type - check for note_id as fallback
+        source_type = segment.get("source_type") or ("synthesizer" if segment.get("note_id") else "council")
+        label = segment.get("label") or "Selected segment"
+        content = segment.get("content") or ""
+
+        if source_type == "council":
+            stage = segment.get("stage")
+            model_name = segment.get("model")
+            header = f"\n{label} (Stage {stage} • {model_name}):\n"
+        else:  # synthesizer
+            note_title = segment.get("note_title", "Note")
+            header = f"\n{label} (Note: {note_title}):\n"
+
+        segment_items.append(ContextItem(header, f"{content.strip()}\n", score=1.0 - i * 1e-6))
+
+    packed = pack_context(comment_items + segment_items, context_budget(model), model=model, query=question)
+    packed_comments = [text for text in packed[:len(comment_items)] if text is not None]
+    packed_segments = [text for text in packed[len(comment_items):] if text is not None]
+
+    context_parts: List[str] = []
+    if packed_comments:
         context_parts.append(
             "The user has highlighted and commented on specific content:\n"
         )
+        context_parts.extend(packed_comments)
 
-        for comment in relevant_comments:
-            # Detect source type - check for note_id as fallback
-            source_type = comment.get("source_type") or ("synthesizer" if comment.get("note_id") else "council")
-            selection = comment["selection"]
-            content = comment["content"]
-
-            if source_type == "council":
-                stage = comment.get("stage")
-                model = comment.get("model")
-                context_parts.append(f"\nStage {stage} response from {model}:")
-            else:  # synthesizer
-                note_title = comment.get("note_title", "Note")
-                context_parts.append(f"\nFrom note '{note_title}':")
-
-            context_parts.append(f'Selected text: "{selection}"')
-            context_parts.append(f"User comment: {content}\n")
-
-    if context_segments:
+    if packed_segments:
         context_parts.append(
             "The user also pinned larger context segments for your reference:\n"
         )
-        for segment in context_segments:
-            # Detect source type - check for note_id as fallback
-            source_type = segment.get("source_type") or ("synthesizer" if segment.get("note_id") else "council")
-            label = segment.get("label") or "Selected segment"
-            content = segment.get("content") or ""
-
-            if source_type == "council":
-                stage = segment.get("stage")
-                model = segment.get("model")
-                context_parts.append(
-                    f"\n{label} (Stage {stage} • {model}):\n{content.strip()}\n"
-                )
-            else:  # synthesizer
-                note_title = segment.get("note_title", "Note")
-                context_parts.append(
-                    f"\n{label} (Note: {note_title}):\n{content.strip()}\n"
-                )
+        context_parts.extend(packed_segments)
 
     return "\n".join(context_parts).strip()
 
@@ -119,7 +136,9 @@ async def query_with_context(
         Response dict with 'content' and optional 'reasoning_details', or None if failed
     """
     # Compile context from comments and segments, unless an explicit compiled blob is provided
-    context = compiled_context or compile_context_from_comments(conversation, comment_ids, context_segments)
+    context = compiled_context or compile_context_from_comments(
+        conversation, comment_ids, context_segments, model=model, question=question
+    )
 
     # Build messages
     messages = []
@@ -0,0 +1,243 @@
+"""Compact columnar wire format for large list and graph payloads.
+
+Clients opt in with ``format=compact`` / ``format=msgpack`` or an Accept
+header. Lists of records are sent as one array per field instead of one
+object per record, repeated strings (IDs, types, tags, URLs) are interned
+into a shared string table, and the result is MessagePack- or
+JSON-encoded and then brotli- or gzip-compressed per Accept-Encoding.
+
+msgpack and brotli are optional: without them, compact JSON and gzip
+are used instead.
+"""
+
+import gzip
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from fastapi import Request
+from fastapi.responses import Response
+
+logger = logging.getLogger(__name__)
+
+COMPACT_JSON_MEDIA_TYPE = "application/vnd.wizengamot.compact+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Responses smaller than this are not worth compressing
+COMPRESSION_MIN_BYTES = 1024
+
+# Node fields with few distinct values, or values repeated across nodes
+GRAPH_NODE_INTERNED = ("id", "type", "group", "sourceId", "sourceUrl", "sourceType", "entityType", "tags", "created_at")
+GRAPH_LINK_INTERNED = ("source", "target", "type", "value", "label")
+
+
+class StringTable:
+    """Interns strings to indices into a shared list."""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def intern(self, value: Any) -> Any:
+        """Intern a string (or each string in a list); other values pass through."""
+        if isinstance(value, str):
+            idx = self._index.get(value)
+            if idx is None:
+                idx = len(self.strings)
+                self._index[value] = idx
+                self.strings.append(value)
+            return idx
+        if isinstance(value, list):
+            return [self.intern(v) for v in value]
+        return value
+
+
+def _internable(value: Any) -> bool:
+    """Whether a value is null, a string or a list of strings."""
+    if value is None or isinstance(value, str):
+        return True
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def encode_columnar(
+    records: Sequence[Dict[str, Any]],
+    table: StringTable,
+    interned: Iterable[str] = (),
+    omit: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """
+    Encode a list of dicts as one value array per field.
+
+    Missing fields are encoded as null. Values of interned fields are
+    replaced by indices into the string table. An interned field holding
+    any other value (a number, say) is sent as a plain column instead,
+    so every integer in an interned column is a string table index.
+
+    Args:
+        records: Records to encode
+        table: Shared string table
+        interned: Fields whose string values should be interned
+        omit: Fields to leave out entirely
+
+    Returns:
+        Dict with count, columns and the list of interned column names
+    """
+    omit = set(omit)
+    fields: List[str] = []
+    seen = set()
+    for record in records:
+        for key in record:
+            if key not in seen and key not in omit:
+                seen.add(key)
+                fields.append(key)
+
+    interned_fields = set(interned)
+    interned = []
+    columns = {}
+    for field in fields:
+        values = [r.get(field) for r in records]
+        if field in interned_fields and all(_internable(v) for v in values):
+            interned.append(field)
+            columns[field] = [table.intern(v) for v in values]
+        else:
+            columns[field] = values
+
+    return {"count": len(records), "columns": columns, "interned": interned}
+
+
+def decode_columnar(encoded: Dict[str, Any], strings: List[str]) -> List[Dict[str, Any]]:
+    """
+    Decode encode_columnar output back to a list of dicts.
+
+    Null values are dropped, so fields that were missing stay missing.
+    """
+    interned = set(encoded.get("interned", []))
+
+    def resolve(value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return strings[value]
+        if isinstance(value, list):
+            return [resolve(v) for v in value]
+        return value
+
+    records = [{} for _ in range(encoded["count"])]
+    for field, values in encoded["columns"].items():
+        for record, value in zip(records, values):
+            if value is None:
+                continue
+            record[field] = resolve(value) if field in interned else value
+    return records
+
+
+def encode_records(
+    records: Sequence[Dict[str, Any]],
+    interned: Iterable[str] = (),
+    omit: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """Encode a single list of records with its own string table."""
+    table = StringTable()
+    encoded = encode_columnar(records, table, interned, omit)
+    return {"format": "columnar", "strings": table.strings, "records": encoded}
+
+
+def encode_graph(graph: Dict[str, Any], include_bodies: bool = False) -> Dict[str, Any]:
+    """
+    Encode a knowledge graph with nodes and links sharing one string table.
+
+    Note bodies are omitted unless requested; clients fetch them by ID.
+
+    Args:
+        graph: Graph dict with nodes and links (plus any metadata)
+        include_bodies: Keep note bodies in the node columns
+    """
+    table = StringTable()
+    nodes = encode_columnar(
+        graph.get("nodes", []), table, GRAPH_NODE_INTERNED,
+        omit=() if include_bodies else ("body",)
+    )
+    links = encode_columnar(graph.get("links", []), table, GRAPH_LINK_INTERNED)
+
+    encoded = {k: v for k, v in graph.items() if k not in ("nodes", "links")}
+    encoded.update({"format": "columnar", "strings": table.strings, "nodes": nodes, "links": links})
+    return encoded
+
+
+def negotiate_format(request: Request, format: Optional[str] = None) -> Optional[str]:
+    """
+    Pick the wire encoding for a request.
+
+    Args:
+        request: Incoming request (Accept header is checked)
+        format: Optional explicit format query parameter ("compact", "msgpack" or "json")
+
+    Returns:
+        "msgpack", "compact", or None for the default JSON response
+    """
+    if format:
+        requested = format.lower()
+    else:
+        accept = request.headers.get("accept", "")
+        if MSGPACK_MEDIA_TYPE in accept or "application/x-msgpack" in accept:
+            requested = "msgpack"
+        elif COMPACT_JSON_MEDIA_TYPE in accept:
+            requested = "compact"
+        else:
+            return None
+
+    if requested == "msgpack":
+        try:
+            import msgpack  # noqa: F401
+            return "msgpack"
+        except ImportError:
+            logger.debug("msgpack not installed, falling back to compact JSON")
+            return "compact"
+    if requested == "compact":
+        return "compact"
+    return None
+
+
+def _compress(body: bytes, accept_encoding: str) -> tuple:
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return body, None
+    if "br" in accept_encoding:
+        try:
+            import brotli
+            return brotli.compress(body, quality=5), "br"
+        except ImportError:
+            pass
+    if "gzip" in accept_encoding:
+        return gzip.compress(body, compresslevel=6), "gzip"
+    return body, None
+
+
+def compact_response(
+    payload: Dict[str, Any],
+    request: Request,
+    encoding: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Serialize an encoded payload as MessagePack or compact JSON, compressed.
+
+    Args:
+        payload: Output of encode_graph / encode_records
+        request: Incoming request (Accept-Encoding is checked)
+        encoding: "msgpack" or "compact" (from negotiate_format)
+        headers: Extra response headers (e.g. ETag)
+    """
+    if encoding == "msgpack":
+        import msgpack
+        body = msgpack.packb(payload, use_bin_type=True)
+        media_type = MSGPACK_MEDIA_TYPE
+    else:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        media_type = COMPACT_JSON_MEDIA_TYPE
+
+    body, content_encoding = _compress(body, request.headers.get("accept-encoding", ""))
+
+    response_headers = {"Vary": "Accept, Accept-Encoding"}
+    response_headers.update(headers or {})
+    if content_encoding:
+        response_headers["Content-Encoding"] = content_encoding
+
+    return Response(content=body, media_type=media_type, headers=response_headers)
@@ -2806,6 +2806,68 @@ export const api = {
     return response.json();
   },
 
+  /**
+   * Chat with the knowledge graph, streaming the answer as it is generated.
+   * @param {string} message - The user's question
+   * @param {string|null} sessionId - Optional session ID for conversation continuity
+   * @param {function} onEvent - Callback for stream events: ({type, data}) => void
+   *   (session, notes, token, citation)
+   * @returns {Promise<object>} Final result with session_id, answer, citations, follow_ups
+   */
+  async chatWithKnowledgeGraphStream(message, sessionId = null, onEvent) {
+    const body = { message };
+    if (sessionId) {
+      body.session_id = sessionId;
+    }
+
+    const response = await fetch(`${API_BASE}/api/knowledge-graph/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body),
+    });
+    if (!response.ok) {
+      throw new Error('Failed to chat with knowledge graph');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let finalResult = null;
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n\n');
+      buffer = lines.pop() || '';
+
+      for (const line of lines) {
+        if (!line.startsWith('data: ')) continue;
+        let data;
+        try {
+          data = JSON.parse(line.slice(6));
+        } catch (parseError) {
+          // Skip malformed JSON lines
+          console.warn('Failed to parse SSE data:', parseError);
+          continue;
+        }
+        if (data.type === 'error') {
+          throw new Error(data.message);
+        } else if (data.type === 'complete') {
+          finalResult = data.data;
+        } else if (onEvent) {
+          onEvent({ type: data.type, data: data.data });
+        }
+      }
+    }
+
+    if (!finalResult) {
+      throw new Error('Stream ended without result');
+    }
+    return finalResult;
+  },
+
   /**
    * Get chat history for a session.
    * @param {string} sessionId - The session ID
@@ -3213,10 +3275,12 @@ export const api = {
   },
 
   /**
-   * Get current sleep compute session status.
+   * Get sleep compute status and the session queue.
+   * @param {string} sessionId - Session to report on (defaults to the latest running one)
    */
-  async getSleepComputeStatus() {
-    const response = await fetch(`${API_BASE}/api/knowledge-graph/sleep-compute/status`);
+  async getSleepComputeStatus(sessionId = null) {
+    const query = sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : '';
+    const response = await fetch(`${API_BASE}/api/knowledge-graph/sleep-compute/status${query}`);
     if (!response.ok) {
       throw new Error('Failed to get sleep compute status');
     }
@@ -3224,10 +3288,12 @@ export const api = {
   },
 
   /**
-   * Cancel running sleep compute session.
+   * Cancel a running or queued sleep compute session.
+   * @param {string} sessionId - The session ID (defaults to the latest running one)
    */
-  async cancelSleepCompute() {
-    const response = await fetch(`${API_BASE}/api/knowledge-graph/sleep-compute/cancel`, {
+  async cancelSleepCompute(sessionId = null) {
+    const query = sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : '';
+    const response = await fetch(`${API_BASE}/api/knowledge-graph/sleep-compute/cancel${query}`, {
       method: 'POST',
     });
     if (!response.ok) {
@@ -3237,10 +3303,12 @@ export const api = {
   },
 
   /**
-   * Pause running sleep compute session.
+   * Pause a running sleep compute session.
+   * @param {string} sessionId - The session ID (defaults to the latest running one)
    */
-  async pauseSleepCompute() {
-    const response = await fetch(`${API_BASE}/api/knowledge-graph/sleep-compute/pause`, {
+  async pauseSleepCompute(sessionId = null) {
+    const query = sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : '';
+    const response = await fetch(`${API_BASE}/api/knowledge-graph/sleep-compute/pause${query}`, {
       method: 'POST',
     });
     if (!response.ok) {
@@ -3250,10 +3318,12 @@ export const api = {
   },
 
   /**
-   * Resume paused sleep compute session.
+   * Resume a paused sleep compute session.
+   * @param {string} sessionId - The session ID (defaults to the latest running one)
    */
-  async resumeSleepCompute() {
-    const response = await fetch(`${API_BASE}/api/knowledge-graph/sleep-compute/resume`, {
+  async resumeSleepCompute(sessionId = null) {
+    const query = sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : '';
+    const response = await fetch(`${API_BASE}/api/knowledge-graph/sleep-compute/resume${query}`, {
       method: 'POST',
     });
     if (!response.ok) {
@@ -3457,6 +3527,66 @@ export const api = {
     return response.json();
   },
 
+  /**
+   * Analyze curation with the agent, receiving candidates as decisions arrive.
+   * @param {Object} options - Same options as analyzeCurationWithAgent, plus concurrency
+   * @param {function} onCandidate - Called with each candidate as it is decided
+   * @returns {Promise<Object>} All candidates once analysis completes
+   */
+  async analyzeCurationWithAgentStream(options = {}, onCandidate) {
+    const response = await fetch(`${API_BASE}/api/knowledge-graph/curation/analyze-with-agent/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        rubrics: options.rubrics || ['duplicates'],
+        threshold: options.threshold || 0.7,
+        max_candidates: options.maxCandidates || 50,
+        concurrency: options.concurrency || 4,
+      }),
+    });
+    if (!response.ok) {
+      throw new Error('Failed to analyze curation with agent');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let finalResult = null;
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n\n');
+      buffer = lines.pop() || '';
+
+      for (const line of lines) {
+        if (!line.startsWith('data: ')) continue;
+        let data;
+        try {
+          data = JSON.parse(line.slice(6));
+        } catch (parseError) {
+          // Skip malformed JSON lines
+          console.warn('Failed to parse SSE data:', parseError);
+          continue;
+        }
+        if (data.type === 'error') {
+          throw new Error(data.message);
+        } else if (data.type === 'complete') {
+          finalResult = data.data;
+        } else if (data.type === 'candidate' && onCandidate) {
+          onCandidate(data.data);
+        }
+      }
+    }
+
+    if (!finalResult) {
+      throw new Error('Stream ended without result');
+    }
+    return finalResult;
+  },
+
   /**
    * Record user feedback on agent decision.
    * @param {Object} feedback - Feedback data
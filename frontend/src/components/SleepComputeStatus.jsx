@@ -15,6 +15,9 @@ import {
 import { api } from '../api';
 import './SleepComputeStatus.css';
 
+// Session statuses after which the session will not run again
+const FINISHED_STATUSES = ['completed', 'cancelled', 'failed'];
+
 /**
  * SleepComputeStatus - Progress indicator with turn tracking
  */
@@ -42,17 +45,13 @@ export default function SleepComputeStatus({
 
     const pollStatus = async () => {
       try {
-        const statusResult = await api.getSleepComputeStatus();
+        const statusResult = await api.getSleepComputeStatus(sessionId);
+        const sessionResult = await api.getSleepComputeSession(sessionId);
         setStatus(statusResult);
+        setSession(sessionResult);
 
-        // If we have a session ID, get full session data
-        if (statusResult.session_id) {
-          const sessionResult = await api.getSleepComputeSession(statusResult.session_id);
-          setSession(sessionResult);
-        }
-
-        // Stop polling when done
-        if (!statusResult.running && statusResult.session_id === sessionId) {
+        // Stop polling when done; queued and paused sessions can still run
+        if (!statusResult.running && FINISHED_STATUSES.includes(sessionResult.status)) {
           setPolling(false);
           if (onComplete) {
             onComplete(statusResult);
@@ -71,23 +70,23 @@ export default function SleepComputeStatus({
 
   const handlePause = useCallback(async () => {
     try {
-      await api.pauseSleepCompute();
+      await api.pauseSleepCompute(sessionId);
     } catch (err) {
       console.error('Failed to pause:', err);
     }
-  }, []);
+  }, [sessionId]);
 
   const handleResume = useCallback(async () => {
     try {
-      await api.resumeSleepCompute();
+      await api.resumeSleepCompute(sessionId);
     } catch (err) {
       console.error('Failed to resume:', err);
     }
-  }, []);
+  }, [sessionId]);
 
   const handleCancel = useCallback(async () => {
     try {
-      await api.cancelSleepCompute();
+      await api.cancelSleepCompute(sessionId);
       setPolling(false);
       if (onCancel) {
         onCancel();
@@ -95,7 +94,7 @@ export default function SleepComputeStatus({
     } catch (err) {
       console.error('Failed to cancel:', err);
     }
-  }, [onCancel]);
+  }, [sessionId, onCancel]);
 
   if (!status) {
     return (
@@ -106,6 +105,13 @@ export default function SleepComputeStatus({
     );
   }
 
+  // A session paused before a restart, or waiting in the queue, has no running task
+  const active = status.running || ['queued', 'paused'].includes(session?.status);
+  const paused = status.paused || session?.status === 'paused';
+  const queued = !status.running && session?.status === 'queued';
+  const cancelled = status.cancelled || session?.status === 'cancelled';
+  const failed = status.error || session?.status === 'failed';
+
   const getPhaseLabel = (phase) => {
     switch (phase) {
       case 'collecting':
@@ -120,16 +126,19 @@ export default function SleepComputeStatus({
   };
 
   const getStatusIcon = () => {
-    if (status.cancelled) {
+    if (cancelled) {
       return <AlertCircle size={20} className="status-icon cancelled" />;
     }
-    if (status.error) {
+    if (failed) {
       return <AlertCircle size={20} className="status-icon error" />;
     }
-    if (!status.running) {
+    if (!active) {
       return <CheckCircle size={20} className="status-icon completed" />;
     }
-    if (status.paused) {
+    if (queued) {
+      return <Clock size={20} className="status-icon paused" />;
+    }
+    if (paused) {
       return <Pause size={20} className="status-icon paused" />;
     }
     return <Moon size={20} className="status-icon running" />;
@@ -141,7 +150,7 @@ export default function SleepComputeStatus({
   };
 
   return (
-    <div className={`sleep-compute-status ${status.running ? 'running' : 'done'} ${expanded ? 'expanded' : ''}`}>
+    <div className={`sleep-compute-status ${active ? 'running' : 'done'} ${expanded ? 'expanded' : ''}`}>
       <div
         className={`sleep-status-header ${expanded ? 'expanded' : ''}`}
         onClick={() => setExpanded(!expanded)}
@@ -149,13 +158,15 @@ export default function SleepComputeStatus({
         <div className="sleep-status-header-left">
           {getStatusIcon()}
           <div className="sleep-status-title">
-            {status.running
-              ? status.paused
-                ? 'Sleep Time Compute Paused'
-                : 'Sleep Time Compute Running'
-              : status.cancelled
+            {active
+              ? queued
+                ? 'Sleep Time Compute Queued'
+                : paused
+                  ? 'Sleep Time Compute Paused'
+                  : 'Sleep Time Compute Running'
+              : cancelled
                 ? 'Sleep Time Compute Cancelled'
-                : status.error
+                : failed
                   ? 'Sleep Time Compute Failed'
                   : 'Sleep Time Compute Complete'
             }
@@ -167,10 +178,10 @@ export default function SleepComputeStatus({
         />
       </div>
 
-      {status.running && (
+      {active && (
         <>
           <div className="sleep-status-phase">
-            {getPhaseLabel(status.phase)}
+            {queued ? 'Waiting for a free worker slot...' : getPhaseLabel(status.phase)}
           </div>
 
           <div className="sleep-status-progress">
@@ -181,10 +192,12 @@ export default function SleepComputeStatus({
           </div>
 
           <div className="sleep-status-meta">
-            <div className="sleep-status-meta-item">
-              <Clock size={12} />
-              <span>Started {formatRelativeTime(status.started_at)}</span>
-            </div>
+            {status.started_at && (
+              <div className="sleep-status-meta-item">
+                <Clock size={12} />
+                <span>Started {formatRelativeTime(status.started_at)}</span>
+              </div>
+            )}
             {session?.total_cost > 0 && (
               <div className="sleep-status-meta-item">
                 <DollarSign size={12} />
@@ -194,7 +207,7 @@ export default function SleepComputeStatus({
           </div>
 
           <div className="sleep-status-actions">
-            {status.paused ? (
+            {queued ? null : paused ? (
               <button
                 className="kg-btn kg-btn-primary"
                 onClick={handleResume}
@@ -222,7 +235,7 @@ export default function SleepComputeStatus({
         </>
       )}
 
-      {!status.running && session && (
+      {!active && session && (
         <div className="sleep-status-summary">
           {session.final_output && (
             <>
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark knowledge graph payload size and serialization time per wire format.
+
+Compares the default JSON response with the compact columnar encoding
+(JSON and, if installed, MessagePack), raw and compressed.
+
+Usage:
+    cd /path/to/llm-council
+    uv run python scripts/benchmark_wire_format.py
+
+Options:
+    --notes N      Synthetic notes to generate (default 2000)
+    --live         Benchmark the real graph from the data directory instead
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.wire_format import encode_graph
+
+
+def synthetic_graph(note_count: int) -> dict:
+    """Build a graph shaped like build_graph output."""
+    rng = random.Random(42)
+    sources = max(1, note_count // 12)
+    entities = max(1, note_count // 4)
+    tags = [f"topic-{i}" for i in range(150)]
+    nodes, links = [], []
+
+    for s in range(sources):
+        source_type = rng.choice(["article", "youtube", "podcast", "pdf"])
+        url = f"https://example.com/source/{s}"
+        nodes.append({"id": f"source:conv{s}", "type": "source", "title": f"Source {s}",
+                      "url": url, "sourceType": source_type, "conversationId": f"conv{s}"})
+        for i in range(note_count // sources):
+            note_id = f"note:conv{s}:n{i}"
+            nodes.append({
+                "id": note_id, "type": "note", "title": f"Note {s}-{i}",
+                "tags": rng.sample(tags, 3), "body": "Lorem ipsum dolor sit amet. " * 30,
+                "group": f"conv{s}", "sequence": i + 1, "sourceId": f"source:conv{s}",
+                "sourceUrl": url, "sourceType": source_type,
+                "created_at": "2025-01-01T00:00:00", "quality": {},
+            })
+            if i:
+                links.append({"source": f"note:conv{s}:n{i - 1}", "target": note_id, "type": "sequential", "order": i})
+            for e in rng.sample(range(entities), 2):
+                links.append({"source": note_id, "target": f"entity:e{e}", "type": "mentions"})
+
+    for e in range(entities):
+        nodes.append({"id": f"entity:e{e}", "type": "entity", "name": f"Entity {e}",
+                      "entityType": rng.choice(["concept", "person", "technology"]), "mentionCount": 3})
+
+    return {"nodes": nodes, "links": links, "stats": {}}
+
+
+def timed(fn, repeat: int = 5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def report(name: str, body: bytes, ms: float):
+    gz = len(gzip.compress(body, compresslevel=6))
+    line = f"{name:<28} {len(body) / 1024:>10.1f} KB  gzip {gz / 1024:>8.1f} KB"
+    try:
+        import brotli
+        line += f"  br {len(brotli.compress(body, quality=5)) / 1024:>8.1f} KB"
+    except ImportError:
+        pass
+    print(f"{line}  encode {ms:>7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    if args.live:
+        from backend.knowledge_graph import build_graph
+        graph = build_graph()
+    else:
+        graph = synthetic_graph(args.notes)
+
+    print(f"{len(graph['nodes'])} nodes, {len(graph['links'])} links\n")
+
+    body, ms = timed(lambda: json.dumps(graph).encode())
+    report("json (current)", body, ms)
+
+    body, ms = timed(lambda: json.dumps(encode_graph(graph, include_bodies=True), separators=(",", ":")).encode())
+    report("compact json + bodies", body, ms)
+
+    body, ms = timed(lambda: json.dumps(encode_graph(graph), separators=(",", ":")).encode())
+    report("compact json, lazy bodies", body, ms)
+
+    try:
+        import msgpack
+        body, ms = timed(lambda: msgpack.packb(encode_graph(graph), use_bin_type=True))
+        report("msgpack, lazy bodies", body, ms)
+    except ImportError:
+        print("msgpack not installed; skipping")
+
+
+if __name__ == "__main__":
+    main()